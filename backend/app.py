@@ -1,24 +1,52 @@
-from flask import Flask, request, jsonify
-from celery import Celery
+from flask import Flask, request, jsonify, Response, stream_with_context
 from config import Config
+import base64
+import hashlib
+import json
 import logging
+import threading
+import time
+from datetime import datetime
 import tasks  # Import tasks module
+from services.weaviate_service import WeaviateService
+from services.cache_service import CacheService, similar_tickets_cache_key
+from services.tenants import allowed_projects, is_allowed_project, project_from_key
+from services.webhook_service import (
+    EnqueueBatcher, WebhookCoalescer, WebhookDeduplicator, comment_event, payload_key, webhook_identity
+)
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
-# Initialize Celery
-celery = Celery(
-    'tasks',  # Changed to match tasks module name
-    broker=app.config['CELERY_BROKER_URL'],
-    backend=app.config['CELERY_RESULT_BACKEND']
-)
+# Celery app shared with the workers so task routing (query vs ingest queues)
+# and priorities are defined in one place
+from celery_app import celery
+
+# Per-process batchers publishing webhook work to the broker, created on first
+# use so their timer threads start inside each gunicorn worker
+_webhook_batchers = {}
+_webhook_batchers_lock = threading.Lock()
 
-# Load tasks module for registration
-celery.config_from_object(app.config)
+def _webhook_batcher(task_name, countdown=None):
+    """Batcher publishing one ``task_name`` message per batch of items"""
+    with _webhook_batchers_lock:
+        if task_name not in _webhook_batchers:
+            _webhook_batchers[task_name] = EnqueueBatcher(
+                lambda items: celery.send_task(task_name, args=[items], countdown=countdown).id,
+                window_seconds=Config.WEBHOOK_BATCH_WINDOW_MS / 1000.0,
+                max_items=Config.WEBHOOK_BATCH_MAX
+            )
+        return _webhook_batchers[task_name]
+
+def _enqueue_batched(task_name, item, countdown=None):
+    """Queue ``item`` and wait until its batch is on the broker; returns (task_id, batch_size)"""
+    future = _webhook_batcher(task_name, countdown).submit(item)
+    return future.result(timeout=Config.WEBHOOK_BATCH_WINDOW_MS / 1000.0 + 10)
 
 @app.route('/webhook/jira', methods=['POST'])
 def jira_webhook():
+    identity = None
+    deduplicator = None
     try:
         data = request.json
         if not data:
@@ -26,19 +54,87 @@ def jira_webhook():
 
         app.logger.info(f"Received Jira webhook: {data.get('webhookEvent')}")
         
-        # Queue the webhook processing task
-        task = celery.send_task('tasks.process_jira_webhook', args=[data])
+        # Jira retries deliveries it considers failed (timeouts included); drop the repeats
+        identity = webhook_identity(data, request.headers)
+        deduplicator = WebhookDeduplicator()
+        if not deduplicator.first_delivery(identity):
+            return jsonify({
+                'status': 'duplicate',
+                'message': 'Webhook delivery already received'
+            }), 200
+        
+        issue = data.get('issue') or {}
+        if not issue.get('id'):
+            # Nothing to reference: queue the body as-is
+            task = celery.send_task('tasks.process_jira_webhook', args=[data])
+            return jsonify({
+                'status': 'accepted',
+                'task_id': task.id,
+                'message': 'Webhook received and processing started'
+            }), 202
+        
+        # Filter at the edge so other projects never reach the broker
+        project_key = (issue.get('fields') or {}).get('project', {}).get('key', '')
+        if not is_allowed_project(project_key):
+            return jsonify({
+                'status': 'skipped',
+                'message': f"Issue from project '{project_key}' skipped (only processing {', '.join(allowed_projects())})"
+            }), 200
+        
+        if Config.WEBHOOK_DEBOUNCE_ENABLED:
+            return _coalesce_webhook(data)
+        
+        # Queue a reference to the issue; the body is parked in Redis for the worker
+        # (without it the worker fetches the issue from Jira)
+        ref = {'issue_id': str(issue['id']), 'payload_key': None}
+        if Config.WEBHOOK_USE_PAYLOAD:
+            ref['payload_key'] = payload_key(identity or f"issue:{issue['id']}:{issue.get('fields', {}).get('updated')}")
+            CacheService().set_json(ref['payload_key'], data, ttl=Config.WEBHOOK_PAYLOAD_TTL)
+        task_id, batch_size = _enqueue_batched('tasks.process_webhook_batch', ref)
         
         return jsonify({
             'status': 'accepted',
-            'task_id': task.id,
+            'task_id': task_id,
+            'batch_size': batch_size,
             'message': 'Webhook received and processing started'
         }), 202
 
     except Exception as e:
         app.logger.error(f"Webhook error: {str(e)}")
+        # Not queued: let Jira's retry of this delivery through
+        if deduplicator is not None:
+            deduplicator.forget(identity)
         return jsonify({'error': str(e)}), 500
 
+def _coalesce_webhook(data):
+    """Mark the issue dirty and schedule one delayed sync per burst of events"""
+    issue = data['issue']
+    issue_id = str(issue['id'])
+    
+    coalescer = WebhookCoalescer()
+    # The webhook body is kept with the dirty marker so the sync can skip the Jira fetch
+    if coalescer.mark_dirty(issue_id, issue=issue, comment=comment_event(data)):
+        try:
+            task_id, batch_size = _enqueue_batched(
+                'tasks.sync_dirty_issues', issue_id, countdown=coalescer.quiet_seconds
+            )
+        except Exception:
+            # The next event (or Jira's retry) must be able to schedule the sync
+            coalescer.unschedule(issue_id)
+            raise
+        return jsonify({
+            'status': 'accepted',
+            'task_id': task_id,
+            'batch_size': batch_size,
+            'message': f'Webhook received, issue sync scheduled in {coalescer.quiet_seconds:g}s'
+        }), 202
+    
+    return jsonify({
+        'status': 'accepted',
+        'task_id': None,
+        'message': 'Webhook received, coalesced into the pending issue sync'
+    }), 202
+
 @app.route('/api/query', methods=['POST'])
 def query():
     try:
@@ -47,21 +143,219 @@ def query():
         if not user_query:
             return jsonify({'error': 'Query is required'}), 400
         
+        # Optional project (tenant) to restrict the question to
+        project = data.get('project')
+        if project and not is_allowed_project(project):
+            return jsonify({'error': f"project must be one of {', '.join(allowed_projects())}"}), 400
+
         # Execute task and wait for result
-        task = celery.send_task('tasks.process_user_query', args=[user_query])
+        sent_at = time.time()
+        task = celery.send_task('tasks.process_user_query', args=[user_query],
+                                kwargs={'project': project} if project else None)
         result = task.get(timeout=300)
+        timing = _server_timing(sent_at, result)
         
         if result.get('status') == 'error':
-            return jsonify(result), 500
+            return jsonify(result), 500, timing
             
         return jsonify({
             'status': 'success',
             'summary': result.get('summary'),
             'message': 'Query processed successfully'
-        }), 200
+        }), 200, timing
 
     except Exception as e:
         app.logger.error(f"Query error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def _server_timing(sent_at, result):
+    """Server-Timing header splitting a query into broker queue wait and task
+    execution (read by benchmarks/bench_load.py)"""
+    started_at = result.get('started_at')
+    finished_at = result.get('timestamp')
+    if not started_at or not finished_at:
+        return {}
+    return {'Server-Timing': f"queue;dur={max(0.0, started_at - sent_at) * 1000:.1f}, "
+                             f"task;dur={max(0.0, finished_at - started_at) * 1000:.1f}"}
+
+
+
+
+SEARCH_FILTER_FIELDS = ('status', 'priority', 'labels', 'created_after', 'created_before')
+SEARCH_DATE_FIELDS = ('created_after', 'created_before')
+SEARCH_VECTORS = ('fused', 'content', 'comments')
+
+
+def _search_fingerprint(query, filters):
+    """Identify a query + filter combination so cursors can't be replayed
+    against a different search."""
+    raw = json.dumps({'q': query, 'f': filters}, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def _is_iso_date(value):
+    """True for an ISO 8601 date or datetime string (as the created filters expect)"""
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, TypeError, ValueError):
+        return False
+    return True
+
+
+def _encode_cursor(fingerprint, offset):
+    raw = json.dumps({'s': fingerprint, 'o': offset}).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor, fingerprint):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        offset = int(data['o'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if data.get('s') != fingerprint or offset < 0:
+        raise ValueError('Cursor does not belong to this search')
+    return offset
+
+
+def _ticket_hit(result, rank):
+    """Public view of a search/similarity result"""
+    ticket = result['properties']
+    return {
+        'rank': rank,
+        'key': result['key'],
+        'score': result['score'],
+        'summary': ticket.get('summary'),
+        'status': ticket.get('status'),
+        'priority': ticket.get('priority'),
+        'resolution_date': ticket.get('resolutionDate'),
+        'snippet': WeaviateService.resolution_snippet(ticket),
+        'tier': result.get('tier', 'hot')
+    }
+
+
+@app.route('/api/search', methods=['POST'])
+def search():
+    """Retrieval-only search: ranked similar tickets, no LLM call.
+
+    Runs synchronously on the pooled Weaviate client and streams NDJSON:
+    one ``meta`` line, one ``ticket`` line per hit and a closing ``end``
+    line carrying ``next_cursor`` (null when there are no more results).
+    """
+    data = request.json or {}
+    user_query = data.get('query')
+    if not user_query:
+        return jsonify({'error': 'Query is required'}), 400
+
+    filters = {field: data[field] for field in SEARCH_FILTER_FIELDS if data.get(field)}
+    for field in SEARCH_DATE_FIELDS:
+        if field in filters and not _is_iso_date(filters[field]):
+            return jsonify({'error': f"{field} must be an ISO 8601 date (e.g. 2024-01-31)"}), 400
+    # One project (tenant) or, by default, every configured project
+    project = data.get('project')
+    if project and not is_allowed_project(project):
+        return jsonify({'error': f"project must be one of {', '.join(allowed_projects())}"}), 400
+    filters['project'] = project or allowed_projects()
+    # Named vector to search on collections that have them (default: weighted fusion)
+    target_vector = data.get('vector')
+    if target_vector and target_vector not in SEARCH_VECTORS:
+        return jsonify({'error': f"vector must be one of {', '.join(SEARCH_VECTORS)}"}), 400
+    fingerprint = _search_fingerprint(user_query, dict(filters, vector=target_vector) if target_vector else filters)
+    try:
+        limit = max(1, min(int(data.get('limit', 10)), 100))
+        if data.get('cursor'):
+            offset = _decode_cursor(data['cursor'], fingerprint)
+        else:
+            offset = max(0, int(data.get('offset', 0)))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        yield json.dumps({'type': 'meta', 'query': user_query, 'offset': offset, 'limit': limit}) + '\n'
+        try:
+            weaviate_service = WeaviateService.shared()
+            # Ask for one extra hit to know whether another page exists
+            results = weaviate_service.search_tiered(user_query, limit=limit + 1, offset=offset, filters=filters,
+                                                     target_vector=target_vector)
+        except Exception as e:
+            app.logger.error(f"Search error: {str(e)}")
+            yield json.dumps({'type': 'error', 'error': str(e)}) + '\n'
+            return
+
+        has_more = len(results) > limit
+        results = results[:limit]
+        for rank, result in enumerate(results, offset + 1):
+            yield json.dumps(dict(type='ticket', **_ticket_hit(result, rank)), default=str) + '\n'
+
+        next_offset = offset + len(results)
+        yield json.dumps({
+            'type': 'end',
+            'count': len(results),
+            'next_offset': next_offset if has_more else None,
+            'next_cursor': _encode_cursor(fingerprint, next_offset) if has_more else None
+        }) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/tickets/<issue_key>/similar', methods=['GET'])
+def similar_tickets(issue_key):
+    """Nearest historical tickets to a stored ticket.
+
+    Uses the ticket's stored vector (no re-embedding, no LLM). Results are
+    cached per ticket key together with the ticket's ``updated`` timestamp
+    and collection, and served only while both still match the stored
+    ticket: bulk imports, reindexes and collection swaps invalidate them as
+    surely as process_jira_webhook's delete. A hit costs one fetch, a miss
+    one more ANN query.
+    """
+    issue_key = issue_key.upper()
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), Config.SIMILAR_TICKETS_MAX))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    cache = CacheService()
+    cache_key = similar_tickets_cache_key(issue_key)
+    try:
+        weaviate_service = WeaviateService.shared()
+        ticket = weaviate_service.get_ticket(issue_key, include_vector=True)
+        if ticket is None:
+            return jsonify({'error': f'Ticket {issue_key} not found'}), 404
+        # As cached: JSON with dates as strings
+        updated = json.loads(json.dumps(ticket['properties'].get('updated'), default=str))
+        collection = weaviate_service.collection_name
+        cached = cache.get_json(cache_key)
+        if cached is not None and cached.get('updated') == updated and cached.get('collection') == collection:
+            return jsonify({
+                'status': 'success',
+                'key': issue_key,
+                'updated': updated,
+                'cached': True,
+                'similar': cached.get('similar', [])[:limit]
+            }), 200
+        if not ticket.get('vector'):
+            return jsonify({'error': f'Ticket {issue_key} has no stored vector'}), 409
+
+        # Compute the maximum neighbour list once so every limit is served from cache
+        results = weaviate_service.find_similar(
+            ticket['vector'],
+            limit=Config.SIMILAR_TICKETS_MAX,
+            filters={'project': ticket['properties'].get('project') or project_from_key(issue_key)},
+            exclude_key=issue_key
+        )
+    except Exception as e:
+        app.logger.error(f"Similar tickets error for {issue_key}: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    similar = [_ticket_hit(result, rank) for rank, result in enumerate(results, 1)]
+    entry = json.loads(json.dumps({'updated': updated, 'collection': collection, 'similar': similar}, default=str))
+    cache.set_json(cache_key, entry, ttl=Config.SIMILAR_TICKETS_CACHE_TTL)
 
+    return jsonify({
+        'status': 'success',
+        'key': issue_key,
+        'updated': entry['updated'],
+        'cached': False,
+        'similar': entry['similar'][:limit]
+    }), 200
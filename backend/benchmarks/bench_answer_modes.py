@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compare answer-generation latency: single Gemini call vs map-reduce
+Runs every query in the benchmark set through process_user_query once per mode
+(in-process, no Celery) and reports retrieval + generation timings.
+
+Usage (from backend/):
+    python3 benchmarks/bench_answer_modes.py [--queries benchmarks/benchmark_queries.txt] [--runs 1]
+
+Requires a populated Weaviate, Redis (map-step cache) and GEMINI_API_KEY.
+Map results are cached, so run with a flushed cache to measure cold latency.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tasks import process_user_query  # noqa: E402
+
+MODES = ('single', 'map_reduce')
+
+
+def load_queries(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', default=os.path.join(os.path.dirname(__file__), 'benchmark_queries.txt'))
+    parser.add_argument('--runs', type=int, default=1, help='Repetitions per query and mode')
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    timings = {mode: [] for mode in MODES}
+    generation = {mode: [] for mode in MODES}
+
+    print("=" * 70)
+    print(f"⏱️  ANSWER MODE BENCHMARK - {len(queries)} queries x {args.runs} run(s)")
+    print("=" * 70)
+
+    for query in queries:
+        for mode in MODES:
+            for _ in range(args.runs):
+                started = time.perf_counter()
+                result = process_user_query.run(query, answer_mode=mode)
+                elapsed = time.perf_counter() - started
+                if result.get('status') != 'success':
+                    print(f"   ❌ [{mode}] {query[:50]}: {result.get('message')}")
+                    continue
+                timings[mode].append(elapsed)
+                generation[mode].append(result.get('generation_seconds', elapsed))
+                print(f"   [{mode:<10}] {elapsed:6.1f}s total, {result.get('generation_seconds', 0):6.1f}s generation"
+                      f" - {result.get('tickets_found')} tickets - {query[:45]}")
+
+    print()
+    print(f"{'mode':<12}{'n':>4}{'mean':>9}{'p50':>9}{'p90':>9}{'gen mean':>10}")
+    for mode in MODES:
+        values = timings[mode]
+        if not values:
+            print(f"{mode:<12}{0:>4}")
+            continue
+        print(f"{mode:<12}{len(values):>4}{statistics.mean(values):>9.1f}{percentile(values, 50):>9.1f}"
+              f"{percentile(values, 90):>9.1f}{statistics.mean(generation[mode]):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
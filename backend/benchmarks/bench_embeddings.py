@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Client-side embedding throughput (EMBEDDING_MODE=client)
+Embeds the 'content' and 'comments' texts of synthetic tickets through EmbeddingService:
+
+  - one text per call (how the t2v-transformers module embeds, object by object)
+  - batched across tickets at several batch sizes
+  - the same tickets again with a warm Redis cache (skipped when Redis is down)
+
+  --weaviate: also times insert_issues into two temporary collections, one embedded by
+  Weaviate's t2v-transformers module and one with self-provided vectors.
+
+Usage (from backend/):
+    python3 benchmarks/bench_embeddings.py [--provider hashing|sentence_transformers] [--tickets 300]
+    python3 benchmarks/bench_embeddings.py --provider sentence_transformers --weaviate
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis  # noqa: E402
+from config import Config  # noqa: E402
+from services.cache_service import get_redis_client  # noqa: E402
+from services.embedding_service import EmbeddingService, create_embedder, vector_text  # noqa: E402
+from services.weaviate_schema import NAMED_VECTOR_SOURCES  # noqa: E402
+from services.weaviate_service import WeaviateService  # noqa: E402
+from bench_named_vectors import make_ticket  # noqa: E402
+
+
+def ticket_texts(tickets):
+    builder = WeaviateService(client=object())  # only the property builders are used
+    objects = [builder.build_issue_object(ticket) for ticket in tickets]
+    return [vector_text(obj, sources) for obj in objects for sources in NAMED_VECTOR_SOURCES.values()]
+
+
+def timed(service, texts, per_call):
+    started = time.perf_counter()
+    for start in range(0, len(texts), per_call):
+        service.embed(texts[start:start + per_call])
+    return time.perf_counter() - started
+
+
+def redis_available():
+    try:
+        return get_redis_client().ping()
+    except redis.RedisError:
+        return False
+
+
+def measure_weaviate(tickets, embedder):
+    import weaviate
+    from services.weaviate_schema import create_issue_collection
+
+    client = weaviate.connect_to_local(host="localhost", port=8080, grpc_port=50051)
+    rows = []
+    try:
+        for mode in ('weaviate', 'client'):
+            name = f"BenchEmbed_{mode}"
+            if client.collections.exists(name):
+                client.collections.delete(name)
+            create_issue_collection(client, name, chunks=False, embedding_mode=mode)
+            service = WeaviateService(client=client, collection_name=name,
+                                      embedding_service=EmbeddingService(embedder))
+            try:
+                started = time.perf_counter()
+                failures = service.insert_issues(tickets)
+                rows.append((mode, time.perf_counter() - started, len(failures)))
+            finally:
+                client.collections.delete(name)
+    finally:
+        client.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--provider', choices=['hashing', 'sentence_transformers'], default='hashing')
+    parser.add_argument('--tickets', type=int, default=300)
+    parser.add_argument('--batch-sizes', default='8,32,64,128')
+    parser.add_argument('--weaviate', action='store_true', help='Also time bulk inserts in Weaviate')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tickets = [make_ticket(rng, n) for n in range(1, args.tickets + 1)]
+    texts = ticket_texts(tickets)
+    chars = sum(len(text) for text in texts)
+    embedder = create_embedder(args.provider)
+
+    print("=" * 70)
+    print(f"🧠 EMBEDDING THROUGHPUT - {embedder.model_id}, {len(texts)} texts ({chars} chars)")
+    print("=" * 70)
+
+    # The cache is bypassed for the cold runs so every text is embedded
+    Config.EMBEDDING_CACHE_ENABLED = False
+    rows = [('1 per call', timed(EmbeddingService(embedder), texts, 1))]
+    for size in (int(s) for s in args.batch_sizes.split(',')):
+        rows.append((f"batch {size}", timed(EmbeddingService(embedder, batch_size=size), texts, len(texts))))
+    for label, seconds in rows:
+        print(f"   {label:<12} {len(texts) / seconds:>9.0f} texts/s {chars / seconds / 1000:>9.0f}k chars/s")
+
+    if redis_available():
+        Config.EMBEDDING_CACHE_ENABLED = True
+        service = EmbeddingService(embedder)
+        timed(service, texts, len(texts))
+        warm = EmbeddingService(embedder)
+        seconds = timed(warm, texts, len(texts))
+        print(f"   {'warm cache':<12} {len(texts) / seconds:>9.0f} texts/s "
+              f"({warm.stats['cache_hits']} cache hits, {warm.stats['embedded']} embedded)")
+    else:
+        print("   (Redis is not reachable; warm-cache run skipped)")
+    print()
+
+    if args.weaviate:
+        for mode, seconds, failures in measure_weaviate(tickets, embedder):
+            print(f"   insert_issues, EMBEDDING_MODE={mode:<9} {len(tickets) / seconds:>7.1f} tickets/s "
+                  f"({failures} failures)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Ingestion throughput against the local fake Jira server (fakes/jira_server.py)
+Starts the fake server on a free port with a synthetic corpus, points the real
+JiraService at it and runs the bulk import pipeline of ingest.py. Reports
+tickets/s, Jira API calls per ticket, 429 rate-limit responses and errors for
+each listing mode, so regressions in fetching, pagination or retry behaviour
+show up without Atlassian credentials.
+
+Modes: jql (offset pagination), jql-token (nextPageToken), deprecated (/search
+answers 410 and the importer must switch to /search/jql), range (key scan).
+The sink discards tickets by default (pure fetch cost); --sink local also writes
+them through WeaviateService into an in-memory local vector store.
+
+Usage (from backend/):
+    python3 benchmarks/bench_ingestion.py [--tickets 2000] [--modes jql,jql-token,deprecated,range]
+    python3 benchmarks/bench_ingestion.py --latency 0.05 --rate-limit 100 --error-rate 0.01 --workers 8
+    python3 benchmarks/bench_ingestion.py --sink local
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# The fake corpus must never reach the real raw issue cache, and the local sink
+# embeds offline without Redis; set before config is imported
+os.environ['RAW_CACHE_ENABLED'] = 'false'
+os.environ.setdefault('EMBEDDING_PROVIDER', 'hashing')
+os.environ.setdefault('EMBEDDING_CACHE_ENABLED', 'false')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes.jira_corpus import JiraCorpus  # noqa: E402
+from fakes.behaviour import serve_in_thread  # noqa: E402
+from fakes.jira_server import FakeJiraBehaviour, create_app  # noqa: E402
+from services.bulk_import import ImportCheckpoint  # noqa: E402
+from services.ingest_pipeline import IngestPipeline, JqlSource, KeyRangeSource, jira_fetcher  # noqa: E402
+from services.jira_service import JiraService  # noqa: E402
+
+MODES = ('jql', 'jql-token', 'deprecated', 'range')
+
+
+def local_sink():
+    from services.local_vector_store import LocalClient
+    from services.weaviate_schema import create_issue_collection
+    from services.weaviate_service import WeaviateService
+
+    client = LocalClient()
+    create_issue_collection(client, "BenchIngest", embedding_mode='client', multi_tenancy=False)
+    return WeaviateService(client=client, collection_name="BenchIngest").insert_issues
+
+
+def run_mode(mode, corpus, behaviour, base_url, args):
+    behaviour.reset()
+    behaviour.deprecate_search = mode == 'deprecated'
+    jira_service = JiraService(base_url, 'bench@example.com', 'token')
+    if mode == 'range':
+        # Scans past the end until ``stop_after_missing`` keys in a row do not exist
+        source = KeyRangeSource(corpus.project, start=1, end=corpus.size + 1000)
+    else:
+        source = JqlSource(jira_service, f"project = {corpus.project} ORDER BY created ASC",
+                           token_pagination=mode == 'jql-token')
+    checkpoint = ImportCheckpoint(None, source.name, source.params)
+    checkpoint.cursor = source.initial_cursor()
+    store_batch = local_sink() if args.sink == 'local' else (lambda batch: {})
+    pipeline = IngestPipeline(source, jira_fetcher(jira_service), store_batch, checkpoint,
+                              workers=args.workers, batch_size=args.batch_size)
+    started = time.perf_counter()
+    try:
+        counts = pipeline.run()
+        error = None
+    except Exception as e:
+        counts, error = pipeline.counts, e
+    seconds = time.perf_counter() - started
+    return counts, behaviour.stats(), seconds, error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=2000)
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per Jira request')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Jira requests/s before 429s (0: unlimited)')
+    parser.add_argument('--retry-after', type=int, help='Fixed Retry-After seconds on 429s')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of Jira requests failing with 500/503')
+    parser.add_argument('--sink', choices=('null', 'local'), default='null')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"Unknown mode(s) {', '.join(sorted(unknown))} (expected {', '.join(MODES)})")
+    # Retries and failures are counted below; keep per-request and per-ticket logging quiet
+    logging.disable(logging.ERROR)
+
+    corpus = JiraCorpus(size=args.tickets, seed=args.seed)
+    behaviour = FakeJiraBehaviour(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                                  retry_after=args.retry_after, error_rate=args.error_rate, seed=args.seed)
+    server, base_url = serve_in_thread(create_app(corpus, behaviour))
+
+    print("=" * 70)
+    print(f"📥 INGESTION VS FAKE JIRA - {args.tickets} tickets, {args.workers} workers, "
+          f"latency {args.latency * 1000:.0f}ms, rate limit {args.rate_limit or 'none'}, "
+          f"errors {args.error_rate:.1%}, sink {args.sink}")
+    print("=" * 70)
+    print(f"{'mode':<11} {'stored':>7} {'errors':>7} {'seconds':>8} {'tickets/s':>10} "
+          f"{'calls':>7} {'calls/ticket':>13} {'429s':>6} {'5xx':>6}")
+    ok = True
+    try:
+        for mode in modes:
+            counts, stats, seconds, error = run_mode(mode, corpus, behaviour, base_url, args)
+            calls = sum(stats['requests'].values())
+            responses = {int(status): count for status, count in stats['responses'].items()}
+            server_errors = sum(count for status, count in responses.items() if status >= 500)
+            stored = counts['stored']
+            print(f"{mode:<11} {stored:>7} {counts['errors']:>7} {seconds:>8.2f} {stored / seconds:>10.0f} "
+                  f"{calls:>7} {calls / max(stored, 1):>13.2f} {responses.get(429, 0):>6} {server_errors:>6}")
+            if error is not None:
+                print(f"   ❌ {mode} stopped: {error}")
+            # Without injected errors every ticket must arrive
+            ok &= error is None and (args.error_rate > 0 or stored == args.tickets)
+    finally:
+        server.shutdown()
+    print()
+    print(f"{'✅ PASS' if ok else '❌ FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
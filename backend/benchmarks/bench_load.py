@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of /api/query and /webhook/jira
+Sends Poisson arrivals at --query-rate and --webhook-rate requests/s (up to
+--concurrency requests in flight per endpoint) for --duration seconds and
+reports, per endpoint, latency percentiles and error rates, plus the split of
+each query into broker queue wait and task execution (Server-Timing header).
+Latency is measured from each request's scheduled arrival, so a client that
+falls behind does not hide a saturated server.
+
+By default the whole stack runs in this process: the Flask app, Celery workers
+for the query and ingest queues on an in-memory broker (thread pools sized as
+in start_server.sh; unlike Redis the memory broker ignores priorities, so
+digests do not yield to webhook syncs), the local vector store (VECTOR_BACKEND=local) seeded with a
+synthetic corpus, hashing embeddings, and the local Jira and LLM stand-ins of
+fakes/ with configurable latency. Background tasks (webhook batches, issue
+syncs, digests) are timed too. Redis is still needed (REDIS_CACHE_URL), as in
+production, for de-duplication, payloads and caches: it must be an empty
+database (e.g. redis://localhost:6379/15), which the run flushes afterwards. The
+seeded collection is pinned through WEAVIATE_COLLECTION; the shared active
+collection pointer is never written.
+
+With --url the load goes to a running deployment instead (e.g. gunicorn with
+gunicorn_config.py and the workers of start_server.sh, configured with
+JIRA_URL/OLLAMA_URL pointing at fakes/jira_server.py and fakes/llm_server.py);
+only what is visible over HTTP is reported then.
+
+Results are compared with the committed baseline (benchmarks/load_baseline.json)
+when the load parameters match; the run fails when a p50/p99 or error rate
+regresses beyond --tolerance. --save-baseline records a new one.
+
+Usage (from backend/, with Redis running and REDIS_CACHE_URL on an empty database):
+    python3 benchmarks/bench_load.py [--duration 30] [--query-rate 2] [--webhook-rate 3]
+    python3 benchmarks/bench_load.py --webhook-rate 20 --llm-latency 1.0  # find saturation
+    python3 benchmarks/bench_load.py --save-baseline
+    python3 benchmarks/bench_load.py --url http://localhost:5000 --duration 60
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import requests
+
+# In-process stack: local vector store in memory, offline embeddings, query answers and
+# digests from the fake LLM (Ollama API); set before config is imported
+os.environ.setdefault('VECTOR_BACKEND', 'local')
+os.environ.setdefault('LOCAL_STORE_PATH', '')
+os.environ.setdefault('EMBEDDING_MODE', 'client')
+os.environ.setdefault('EMBEDDING_PROVIDER', 'hashing')
+os.environ.setdefault('QUERY_LLM_PROVIDER', 'ollama')
+os.environ.setdefault('DIGEST_LLM_PROVIDER', 'ollama')
+# The synthetic corpus must never reach the real raw issue cache
+os.environ['RAW_CACHE_ENABLED'] = 'false'
+# Debounced syncs must run within the test (production waits 30s for quiet)
+os.environ.setdefault('WEBHOOK_QUIET_SECONDS', '2')
+os.environ.setdefault('WEBHOOK_MAX_DELAY_SECONDS', '10')
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from celery.backends.cache import CacheBackend  # noqa: E402
+from celery.signals import before_task_publish, task_postrun, task_prerun  # noqa: E402
+
+from config import Config  # noqa: E402
+from fakes.behaviour import serve_in_thread  # noqa: E402
+from fakes.jira_corpus import JiraCorpus  # noqa: E402
+
+BASELINE = os.path.join(BACKEND, 'benchmarks', 'load_baseline.json')
+QUERIES = os.path.join(BACKEND, 'benchmarks', 'benchmark_queries.txt')
+# Parameters a baseline is only comparable under
+LOAD_PARAMS = ('duration', 'warmup', 'query_rate', 'webhook_rate', 'concurrency', 'tickets', 'query_workers',
+               'ingest_workers', 'jira_latency', 'llm_latency', 'llm_tokens_per_second', 'llm_output_tokens', 'seed')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+
+def summarize(values):
+    """p50/p90/p99/max of durations in seconds, in milliseconds"""
+    if not values:
+        return {}
+    return {name: round(percentile(values, fraction) * 1000, 1)
+            for name, fraction in (('p50_ms', 0.5), ('p90_ms', 0.9), ('p99_ms', 0.99), ('max_ms', 1.0))}
+
+
+class InProcessResultBackend(CacheBackend):
+    """In-memory result backend polled every few milliseconds.
+
+    AsyncResult.get() on a polling backend sleeps 0.5s between checks, which
+    would dominate query latency; the Redis backend used in production is
+    push-based and has no such delay.
+    """
+
+    def wait_for(self, task_id, timeout=None, interval=0.5, **kwargs):
+        return super().wait_for(task_id, timeout=timeout, interval=min(interval, 0.005), **kwargs)
+
+
+class TaskTimings:
+    """Queue wait and execution time of every Celery task, from task signals"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sent = {}
+        self._started = {}
+        self.records = []
+
+    def connect(self):
+        before_task_publish.connect(self.on_publish, weak=False)
+        task_prerun.connect(self.on_prerun, weak=False)
+        task_postrun.connect(self.on_postrun, weak=False)
+
+    def on_publish(self, sender=None, headers=None, **kwargs):
+        headers = headers or {}
+        ready_at = time.time()
+        # Delayed tasks (debounced syncs) only start waiting at their ETA
+        if headers.get('eta'):
+            ready_at = max(ready_at, datetime.fromisoformat(headers['eta']).timestamp())
+        with self._lock:
+            self._sent[headers.get('id')] = (sender, ready_at)
+
+    def on_prerun(self, task_id=None, **kwargs):
+        with self._lock:
+            self._started[task_id] = time.time()
+
+    def on_postrun(self, task_id=None, task=None, state=None, **kwargs):
+        finished = time.time()
+        with self._lock:
+            name, ready_at = self._sent.pop(task_id, (task.name if task else None, None))
+            started = self._started.pop(task_id, finished)
+            self.records.append({'task': name, 'state': state, 'finished': finished,
+                                 'queue': max(0.0, started - ready_at) if ready_at else None,
+                                 'execution': finished - started})
+
+    def pending(self):
+        with self._lock:
+            return len(self._sent)
+
+
+class LoadDriver:
+    """Open-loop Poisson arrivals against one endpoint"""
+
+    def __init__(self, name, rate, concurrency, make_request, seed):
+        self.name = name
+        self.rate = rate
+        self.make_request = make_request
+        self._rng = random.Random(f"{seed}:{name}")
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f'load-{name.strip("/")}')
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.results = []
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _send(self, scheduled):
+        method, url, kwargs = self.make_request()
+        result = {'scheduled': scheduled, 'status': None, 'queue': None, 'task': None}
+        try:
+            response = self._session().request(method, url, timeout=300, **kwargs)
+            result['status'] = response.status_code
+            for part in response.headers.get('Server-Timing', '').split(','):
+                name, _, duration = part.strip().partition(';dur=')
+                if name in ('queue', 'task') and duration:
+                    result[name] = float(duration) / 1000
+        except requests.RequestException as e:
+            result['error'] = type(e).__name__
+        result['latency'] = time.monotonic() - scheduled
+        with self._lock:
+            self.results.append(result)
+
+    def run(self, start, duration):
+        """Schedule arrivals from ``start`` (monotonic) for ``duration`` seconds"""
+        if self.rate <= 0:
+            return
+        at = start
+        while True:
+            at += self._rng.expovariate(self.rate)
+            if at >= start + duration:
+                break
+            time.sleep(max(0.0, at - time.monotonic()))
+            self._pool.submit(self._send, at)
+
+    def join(self):
+        self._pool.shutdown(wait=True)
+
+
+def endpoint_summary(driver, measured_from, measured_seconds):
+    results = [r for r in driver.results if r['scheduled'] >= measured_from]
+    errors = [r for r in results if r['status'] is None or r['status'] >= 400]
+    statuses = {}
+    for r in results:
+        key = str(r['status'] or r.get('error'))
+        statuses[key] = statuses.get(key, 0) + 1
+    summary = {'requests': len(results), 'errors': len(errors),
+               'error_rate': round(len(errors) / len(results), 4) if results else 0.0,
+               'throughput_rps': round((len(results) - len(errors)) / measured_seconds, 2),
+               'statuses': statuses, 'latency': summarize([r['latency'] for r in results])}
+    ok = [r for r in results if r not in errors]
+    if any(r['queue'] is not None for r in ok):
+        summary['queue_wait'] = summarize([r['queue'] for r in ok if r['queue'] is not None])
+        summary['execution'] = summarize([r['task'] for r in ok if r['task'] is not None])
+    return summary
+
+
+def task_summary(timings, measured_from):
+    by_task = {}
+    for record in timings.records:
+        by_task.setdefault(record['task'], []).append(record)
+    summary = {}
+    for name, records in sorted(by_task.items(), key=lambda item: str(item[0])):
+        measured = [r for r in records if r['finished'] >= measured_from]
+        if not measured:
+            continue
+        failed = sum(1 for r in measured if r['state'] not in ('SUCCESS', 'RETRY'))
+        summary[name] = {'runs': len(measured), 'failures': failed,
+                         'error_rate': round(failed / len(measured), 4),
+                         'queue_wait': summarize([r['queue'] for r in measured if r['queue'] is not None]),
+                         'execution': summarize([r['execution'] for r in measured])}
+    return summary
+
+
+def start_stack(args):
+    """Fake Jira and LLM, seeded local store, Celery workers and the Flask app; returns
+    (base_url, timings, servers, workers)"""
+    from celery._state import _set_task_join_will_block
+    from celery.contrib.testing.worker import TestWorkController, setup_app_for_worker
+
+    from fakes.jira_server import FakeJiraBehaviour, create_app as create_jira_app
+    from fakes.llm_server import FakeLLMBehaviour, create_app as create_llm_app
+    from services.cache_service import get_redis_client
+    from services.collection_versions import CollectionMigration
+    from services.weaviate_service import WeaviateService, connect_client
+
+    try:
+        keys = get_redis_client().dbsize()
+    except Exception as e:
+        sys.exit(f"❌ Redis is required ({Config.REDIS_CACHE_URL}): {e}")
+    if keys:
+        # The run writes de-duplication keys, payloads and caches, and flushes the database
+        # afterwards; it must never share one with a deployment
+        sys.exit(f"❌ Redis database {Config.REDIS_CACHE_URL} is not empty ({keys} keys); "
+                 f"point REDIS_CACHE_URL at an empty one (e.g. redis://localhost:6379/15)")
+
+    corpus = JiraCorpus(size=args.tickets, seed=args.seed, project=Config.JIRA_PROJECT_KEY)
+    jira_server, Config.JIRA_URL = serve_in_thread(create_jira_app(
+        corpus, FakeJiraBehaviour(latency=args.jira_latency, seed=args.seed)))
+    Config.JIRA_USERNAME, Config.JIRA_API_TOKEN = 'load@example.com', 'token'
+    llm_server, Config.OLLAMA_URL = serve_in_thread(create_llm_app(FakeLLMBehaviour(
+        latency=args.llm_latency, tokens_per_second=args.llm_tokens_per_second,
+        output_tokens=args.llm_output_tokens, seed=args.seed)))
+
+    print(f"🗄️  Seeding the local store with {args.tickets} tickets...")
+    client = connect_client()
+    migration = CollectionMigration(client)
+    name = migration.next_name()
+    migration.create(name)
+    # Without a pointer in the (empty) database every WeaviateService of the app and
+    # workers falls back to WEAVIATE_COLLECTION
+    Config.WEAVIATE_COLLECTION = name
+    service = WeaviateService(client=client, collection_name=name)
+    batch = []
+    for issue in corpus.issues():
+        batch.append(issue)
+        if len(batch) == 200:
+            service.insert_issues(batch)
+            batch = []
+    service.insert_issues(batch)
+
+    import app as app_module
+    from celery_app import celery
+
+    celery.conf.update(
+        broker_url='memory://',
+        broker_transport_options=dict(celery.conf.broker_transport_options, polling_interval=0.005),
+        result_backend=f"{InProcessResultBackend.__module__}:{InProcessResultBackend.__name__}",
+        cache_backend='memory',
+        broker_connection_retry_on_startup=True,
+    )
+    timings = TaskTimings()
+    timings.connect()
+    setup_app_for_worker(celery, 'ERROR', None)
+    # Request logs of the in-process servers would drown the report
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    workers = []
+    for queue, concurrency in ((Config.CELERY_QUERY_QUEUE, args.query_workers),
+                               (Config.CELERY_INGEST_QUEUE, args.ingest_workers)):
+        worker = TestWorkController(app=celery, hostname=f'{queue}@load', queues=[queue], pool='threads',
+                                    concurrency=concurrency, loglevel='ERROR', ready_callback=None,
+                                    without_heartbeat=True, without_mingle=True, without_gossip=True)
+        threading.Thread(target=worker.start, name=f'celery-{queue}', daemon=True).start()
+        worker.ensure_started()
+        workers.append(worker)
+    # Starting a worker marks the process as one where result.get() would deadlock;
+    # here the Flask threads waiting on results are not worker threads
+    _set_task_join_will_block(False)
+    app_server, base_url = serve_in_thread(app_module.app)
+    return base_url, timings, [jira_server, llm_server, app_server], workers
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of ``results`` against ``baseline``: (metric, baseline, current) tuples"""
+    regressions = []
+
+    def check(label, current, previous, samples):
+        # The p99 of fewer than 100 samples is their maximum: a single outlier
+        for metric in ('p50_ms', 'p99_ms') if samples >= 100 else ('p50_ms',):
+            if metric in current and metric in previous:
+                # Small absolute slack so millisecond noise never fails a run
+                if current[metric] > previous[metric] * (1 + tolerance) + 10:
+                    regressions.append((f"{label} {metric}", previous[metric], current[metric]))
+
+    for group in ('endpoints', 'tasks'):
+        for name, current in results.get(group, {}).items():
+            previous = baseline.get(group, {}).get(name)
+            if not previous:
+                continue
+            samples = min(current.get('requests', current.get('runs', 0)),
+                          previous.get('requests', previous.get('runs', 0)))
+            for part in ('latency', 'queue_wait', 'execution'):
+                if part in current and part in previous:
+                    check(f"{name} {part}", current[part], previous[part], samples)
+            if current['error_rate'] > previous['error_rate'] + 0.01:
+                regressions.append((f"{name} error_rate", previous['error_rate'], current['error_rate']))
+    return regressions
+
+
+def print_results(results):
+    print()
+    print(f"{'endpoint':<16} {'requests':>8} {'err %':>6} {'ok/s':>6} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    for name, summary in results['endpoints'].items():
+        latency = summary['latency']
+        print(f"{name:<16} {summary['requests']:>8} {summary['error_rate'] * 100:>6.1f} "
+              f"{summary['throughput_rps']:>6.1f} {latency.get('p50_ms', 0):>8.1f} {latency.get('p90_ms', 0):>8.1f} "
+              f"{latency.get('p99_ms', 0):>8.1f} {latency.get('max_ms', 0):>8.1f}")
+    rows = [(f"{name} (Server-Timing)", summary) for name, summary in results['endpoints'].items() if 'queue_wait' in summary]
+    rows += list(results.get('tasks', {}).items())
+    if rows:
+        print()
+        print(f"{'task':<32} {'runs':>6} {'err %':>6} {'queue p50':>10} {'queue p99':>10} "
+              f"{'exec p50':>9} {'exec p99':>9}  (ms)")
+        for name, summary in rows:
+            queue, execution = summary.get('queue_wait', {}), summary.get('execution', {})
+            runs = summary.get('runs', summary.get('requests'))
+            print(f"{str(name):<32} {runs:>6} {summary['error_rate'] * 100:>6.1f} {queue.get('p50_ms', 0):>10.1f} "
+                  f"{queue.get('p99_ms', 0):>10.1f} {execution.get('p50_ms', 0):>9.1f} "
+                  f"{execution.get('p99_ms', 0):>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='Running deployment to load (default: in-process stack)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load')
+    parser.add_argument('--warmup', type=float, default=3, help='Leading seconds left out of the results')
+    parser.add_argument('--query-rate', type=float, default=2, help='/api/query arrivals per second (0: none)')
+    parser.add_argument('--webhook-rate', type=float, default=3, help='/webhook/jira arrivals per second (0: none)')
+    parser.add_argument('--concurrency', type=int, default=64, help='Requests in flight per endpoint')
+    parser.add_argument('--tickets', type=int, default=2000, help='Corpus size (in-process stack)')
+    parser.add_argument('--query-workers', type=int, default=32, help='Query queue worker threads')
+    parser.add_argument('--ingest-workers', type=int, default=4, help='Ingest queue worker threads')
+    parser.add_argument('--jira-latency', type=float, default=0.05, help='Seconds per fake Jira request')
+    parser.add_argument('--llm-latency', type=float, default=0.3, help='Fake LLM seconds to the first token')
+    parser.add_argument('--llm-tokens-per-second', type=float, default=400)
+    parser.add_argument('--llm-output-tokens', type=int, default=200)
+    parser.add_argument('--drain-timeout', type=float, default=60, help='Seconds to wait for queued tasks')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='Record this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed relative slowdown vs the baseline')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='Also write the results as JSON to this file')
+    args = parser.parse_args()
+
+    timings, servers, workers = None, [], []
+    if args.url:
+        base_url = args.url.rstrip('/')
+    else:
+        base_url, timings, servers, workers = start_stack(args)
+
+    with open(QUERIES, encoding='utf-8') as f:
+        queries = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    query_rng = random.Random(f"{args.seed}:queries")
+    events = JiraCorpus(size=args.tickets, seed=args.seed, project=Config.JIRA_PROJECT_KEY).webhook_events(
+        10 ** 9, seed=args.seed, timestamp=int(time.time() * 1000))
+    events_lock = threading.Lock()
+
+    def query_request():
+        return 'POST', f"{base_url}/api/query", {'json': {'query': query_rng.choice(queries)}}
+
+    def webhook_request():
+        with events_lock:
+            body = next(events)
+        # A fresh delivery id per request: repeats would be dropped as Jira retries
+        return 'POST', f"{base_url}/webhook/jira", {'json': body, 'headers': {
+            'X-Atlassian-Webhook-Identifier': str(uuid.uuid4())}}
+
+    drivers = [LoadDriver('/api/query', args.query_rate, args.concurrency, query_request, args.seed),
+               LoadDriver('/webhook/jira', args.webhook_rate, args.concurrency, webhook_request, args.seed)]
+
+    print("=" * 70)
+    print(f"🚦 LOAD TEST - {args.duration:g}s, {args.query_rate:g} queries/s, {args.webhook_rate:g} webhooks/s, "
+          f"{'in-process stack' if not args.url else base_url}")
+    print("=" * 70)
+    start = time.monotonic()
+    wall_start = time.time()
+    threads = [threading.Thread(target=driver.run, args=(start, args.duration), daemon=True) for driver in drivers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for driver in drivers:
+        driver.join()
+    print(f"⏱️  Load finished after {time.monotonic() - start:.1f}s")
+
+    if timings is not None:
+        deadline = time.monotonic() + args.drain_timeout
+        while timings.pending() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if timings.pending():
+            print(f"⚠️  {timings.pending()} task(s) still queued after {args.drain_timeout:g}s")
+
+    measured = max(0.001, args.duration - args.warmup)
+    results = {
+        'recorded': date.today().isoformat(),
+        'params': {name: getattr(args, name) for name in LOAD_PARAMS},
+        'target': 'url' if args.url else 'in-process',
+        'machine': {'python': platform.python_version(), 'platform': platform.platform(terse=True),
+                    'cpus': os.cpu_count()},
+        'endpoints': {driver.name: endpoint_summary(driver, start + args.warmup, measured)
+                      for driver in drivers if driver.rate > 0},
+    }
+    if timings is not None:
+        results['tasks'] = task_summary(timings, wall_start + args.warmup)
+        results['tasks_unfinished'] = timings.pending()
+    print_results(results)
+
+    for worker in workers:
+        worker.stop(in_sighandler=False)
+    for server in servers:
+        server.shutdown()
+    if not args.url:
+        from services.cache_service import get_redis_client
+
+        # Checked to be empty before the run (see start_stack)
+        get_redis_client().flushdb()
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    print()
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baseline written to {os.path.relpath(args.baseline)}")
+        return
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with (record one with --save-baseline)")
+        return
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('params') != results['params'] or baseline.get('target') != results['target']:
+        print("⚠️  Load parameters differ from the baseline; not compared")
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    for metric, previous, current in regressions:
+        print(f"❌ {metric}: {previous} -> {current}")
+    print(f"{'❌ FAIL' if regressions else '✅ PASS'} against the baseline of {baseline.get('recorded')} "
+          f"(tolerance {args.tolerance:.0%})")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
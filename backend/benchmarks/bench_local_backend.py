@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+In-process vector store (VECTOR_BACKEND=local) throughput and latency
+Ingests synthetic tickets through WeaviateService into the NumPy store of
+services/local_vector_store.py and times the operations the app runs on it:
+
+  insert_issues (batched, with the description/comment chunks), re-ingesting the same
+  tickets (property diffing, nothing written), hybrid ticket and chunk searches,
+  filtered searches, find_similar and the recall@k of queries phrased like each
+  ticket's fix. No Weaviate, Redis or Jira is needed; vectors come from the hashing
+  embedder, so recall measures the store's fusion and indexes rather than a model.
+
+Usage (from backend/):
+    python3 benchmarks/bench_local_backend.py [--tickets 2000] [--queries 200]
+    python3 benchmarks/bench_local_backend.py --path /tmp/bench_store  # on-disk (memory-mapped) store only
+
+Without --path the run is repeated on a temporary on-disk store, whose update
+rounds also exercise compaction under the write lock and reopening from disk.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Offline embeddings without the Redis cache; set before config is imported
+os.environ.setdefault('EMBEDDING_PROVIDER', 'hashing')
+os.environ.setdefault('EMBEDDING_CACHE_ENABLED', 'false')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_named_vectors import make_ticket  # noqa: E402
+from services.local_vector_store import LocalClient  # noqa: E402
+from services.weaviate_schema import create_issue_collection  # noqa: E402
+from services.weaviate_service import WeaviateService  # noqa: E402
+
+COLLECTION = "BenchIssues_local"
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def timed(calls):
+    """Milliseconds per call of each zero-argument callable"""
+    durations = []
+    for call in calls:
+        started = time.perf_counter()
+        call()
+        durations.append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def run(args, path):
+    rng = random.Random(args.seed)
+    tickets = [make_ticket(rng, n) for n in range(1, args.tickets + 1)]
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+    client = LocalClient(path)
+    create_issue_collection(client, COLLECTION, named_vectors=args.named, embedding_mode='client',
+                            multi_tenancy=False)
+    service = WeaviateService(client=client, collection_name=COLLECTION)
+
+    print("=" * 70)
+    print(f"🗄️  LOCAL VECTOR STORE - {args.tickets} tickets, {args.queries} queries, "
+          f"{'named' if args.named else 'single'} vectors, {'disk' if path else 'memory'}")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    failures = {}
+    for start in range(0, len(tickets), args.batch_size):
+        failures.update(service.insert_issues(tickets[start:start + args.batch_size]))
+    insert_seconds = time.perf_counter() - started
+    chunks = service.write_stats['chunks']
+    print(f"Insert:    {insert_seconds:.1f}s, {args.tickets / insert_seconds:.0f} tickets/s "
+          f"({chunks} chunks, {len(failures)} failures)")
+
+    started = time.perf_counter()
+    for start in range(0, len(tickets), args.batch_size):
+        service.insert_issues(tickets[start:start + args.batch_size])
+    print(f"Re-ingest: {time.perf_counter() - started:.1f}s unchanged ({service.write_stats['skipped']} skipped)")
+
+    # Two rounds of changed tickets leave more dead rows than live ones, which
+    # compacts the store in the middle of a write
+    started = time.perf_counter()
+    for round_number in (1, 2):
+        changed = [dict(ticket, fields=dict(ticket['fields'], summary=f"{ticket['fields']['summary']} ({round_number})"))
+                   for ticket in tickets]
+        for start in range(0, len(changed), args.batch_size):
+            service.insert_issues(changed[start:start + args.batch_size])
+    print(f"Update:    {time.perf_counter() - started:.1f}s for {2 * len(tickets)} changed tickets (with compaction)")
+    if path:
+        reopened = WeaviateService(client=LocalClient(path), collection_name=COLLECTION)
+        stored = reopened.client.collections.get(COLLECTION).aggregate.over_all(total_count=True).total_count
+        print(f"Reopen:    {stored} tickets on disk")
+        if stored != len(tickets):
+            sys.exit(f"❌ Expected {len(tickets)} tickets after reopening, found {stored}")
+
+    sample = rng.sample(tickets, min(args.queries, len(tickets)))
+    fix_queries = [f"{ticket['_fix']} on {ticket['_system']}" for ticket in sample]
+    summary_queries = [f"{ticket['_system']} {ticket['_symptom']}" for ticket in sample]
+    vector = service.get_ticket(sample[0]['key'], include_vector=True)['vector']
+    # Latencies include embedding the query with the hashing embedder
+    operations = {
+        'hybrid (tickets)': [lambda q=q: service.search_tickets(q, limit=args.k) for q in summary_queries],
+        'hybrid + filter': [lambda q=q, t=t: service.search_tickets(q, limit=args.k,
+                                                                    filters={'labels': t['fields']['labels']})
+                            for q, t in zip(summary_queries, sample)],
+        'keyword only': [lambda q=q: service.search_tickets(q, limit=args.k, alpha=0.0) for q in summary_queries],
+        'hybrid (chunks)': [lambda q=q: service.search_chunks(q, tickets=args.k) for q in fix_queries],
+        'find_similar': [lambda: service.find_similar(vector, limit=args.k)] * len(sample),
+    }
+    print()
+    print(f"{'operation':<18} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, calls in operations.items():
+        durations = timed(calls)
+        print(f"{name:<18} {statistics.median(durations):>8.2f} {percentile(durations, 0.95):>8.2f} "
+              f"{max(durations):>8.2f}")
+
+    hits = sum(any(r['key'] == ticket['key'] for r in service.search_tickets(query, limit=args.k))
+               for ticket, query in zip(sample, fix_queries))
+    print()
+    print(f"Recall@{args.k} of fix queries (hashing embedder): {hits / len(sample):.3f}")
+
+    client.collections.delete(COLLECTION)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10, help='Recall cut-off')
+    parser.add_argument('--named', action='store_true', help="Named 'content' + 'comments' vectors")
+    parser.add_argument('--path', help='Store directory (default: in memory)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    stores = [args.path] if args.path else [None, tempfile.mkdtemp(prefix='bench_local_store_')]
+    for path in stores:
+        run(args, path)
+        if path:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Single ticket vector vs named 'content' + 'comments' vectors
+Builds synthetic tickets whose fix is only described in the comment thread, then:
+
+  Re-embedding cost (always, no services needed): replays a stream of ticket events
+  (comments added/edited, description edits, status changes) through the property
+  diffing used by WeaviateService and reports how many vectors and characters each
+  layout has to embed again.
+
+  --weaviate: creates a temporary collection per layout with the real schema
+  (services/weaviate_schema.py), times the bulk insert, measures recall@k for queries
+  phrased like the summary and like the fix in the comments (content, comments and
+  fused targets), replays the event stream through apply_issue_delta and deletes
+  both collections again. Needs Weaviate and the t2v-transformers container.
+
+Usage (from backend/):
+    python3 benchmarks/bench_named_vectors.py [--tickets 300] [--events 500]
+    python3 benchmarks/bench_named_vectors.py --weaviate [--k 10]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.weaviate_schema import NAMED_VECTOR_SOURCES, SINGLE_VECTOR_SOURCES  # noqa: E402
+from services.weaviate_service import WeaviateService, _normalize  # noqa: E402
+
+SYSTEMS = ["payment gateway", "login service", "order queue", "search index", "email relay", "billing export",
+           "inventory sync", "report scheduler", "file upload", "SSO bridge", "push notifier", "audit log"]
+SYMPTOMS = ["times out", "returns 500 errors", "drops messages", "is extremely slow", "rejects valid requests",
+            "crashes on startup", "shows stale data", "duplicates records"]
+FIXES = ["rotated the expired TLS certificate", "raised the connection pool limit", "rebuilt the corrupted index",
+         "rolled back the faulty deployment", "cleared the poisoned cache entries", "fixed the cron timezone",
+         "increased the worker memory limit", "renewed the integration API token", "patched the retry loop",
+         "re-enabled the disabled feature flag", "vacuumed the bloated database table", "replaced the failing disk"]
+CHATTER = ["Any update on this?", "Customer is asking again.", "Looking into it now.", "Adding logs from prod.",
+           "Escalating to the on-call engineer.", "Still reproducible this morning.", "Linked a related incident."]
+
+
+def adf(text):
+    return {'type': 'doc', 'version': 1,
+            'content': [{'type': 'paragraph', 'content': [{'type': 'text', 'text': text}]}]}
+
+
+def make_ticket(rng, number):
+    system, symptom, fix = rng.choice(SYSTEMS), rng.choice(SYMPTOMS), rng.choice(FIXES)
+    thread = [rng.choice(CHATTER) for _ in range(rng.randint(2, 25))]
+    thread.insert(rng.randint(len(thread) // 2, len(thread)), f"Root cause found: we {fix} on the {system}.")
+    comments = [{'id': str(number * 1000 + n), 'author': {'displayName': f"Engineer {n % 5}"},
+                 'body': adf(body), 'created': f"2024-03-{1 + n % 28:02d}T10:00:00.000+0000"}
+                for n, body in enumerate(thread)]
+    return {
+        'id': str(50000 + number),
+        'key': f"BENCH-{number}",
+        'fields': {
+            'summary': f"{system.capitalize()} {symptom}",
+            'description': adf(f"Since this morning the {system} {symptom} for a subset of users. "
+                               f"Impact is growing and support is receiving tickets."),
+            'labels': [system.replace(' ', '-')],
+            'status': {'name': 'Open'},
+            'project': {'key': 'BENCH'},
+            'updated': '2024-03-01T10:00:00.000+0000',
+            'comment': {'comments': comments, 'total': len(comments)},
+        },
+        '_fix': fix,
+        '_system': system,
+        '_symptom': symptom,
+    }
+
+
+def event_stream(rng, tickets, count):
+    """[(event kind, ticket index, sequence number)]"""
+    events = []
+    for n in range(count):
+        index = rng.randrange(len(tickets))
+        kind = rng.choices(['comment added', 'comment edited', 'description edited', 'status changed'],
+                           weights=[55, 15, 10, 20])[0]
+        events.append((kind, index, n))
+    return events
+
+
+def apply_event(issue, kind, n):
+    """Mutate the full issue and return the matching partial webhook body and comment events"""
+    fields = issue['fields']
+    partial = {'id': issue['id'], 'key': issue['key'], 'fields': {}}
+    if kind == 'comment added':
+        comment = {'id': f"9{n}", 'author': {'displayName': 'Engineer 9'}, 'body': adf(CHATTER[n % len(CHATTER)]),
+                   'created': '2024-04-01T10:00:00.000+0000'}
+        fields['comment']['comments'].append(comment)
+        return partial, [{'event': 'comment_created', 'comment': comment}]
+    if kind == 'comment edited':
+        comment = dict(fields['comment']['comments'][0], body=adf(f"Edited: {CHATTER[n % len(CHATTER)]}"))
+        fields['comment']['comments'][0] = comment
+        return partial, [{'event': 'comment_updated', 'comment': comment}]
+    if kind == 'description edited':
+        fields['description'] = adf(f"Update {n}: the impact is now limited to one region.")
+        partial['fields']['description'] = fields['description']
+        return partial, None
+    fields['status'] = {'name': 'Done' if n % 2 else 'In Progress'}
+    partial['fields']['status'] = fields['status']
+    return partial, None
+
+
+def copy_ticket(ticket):
+    fields = dict(ticket['fields'], comment={'comments': list(ticket['fields']['comment']['comments'])})
+    return dict(ticket, fields=fields)
+
+
+def reembed_cost(tickets, events):
+    """Vectors and characters each layout re-embeds for the event stream"""
+    service = WeaviateService(client=object())  # only the property builders are used, no connection
+    layouts = {
+        'single': SINGLE_VECTOR_SOURCES,
+        # One vector over the ticket text and the comment thread together
+        'single+comments': {'default': SINGLE_VECTOR_SOURCES['default'] + ('commentText',)},
+        'named': NAMED_VECTOR_SOURCES,
+    }
+    issues = [copy_ticket(ticket) for ticket in tickets]
+    stored = [service.build_issue_object(issue) for issue in issues]
+    totals = {name: {'vectors': 0, 'chars': 0} for name in layouts}
+    for kind, index, n in events:
+        apply_event(issues[index], kind, n)
+        new = service.build_issue_object(issues[index])
+        changed = {name for name, value in new.items() if _normalize(name, value) != _normalize(name, stored[index].get(name))}
+        for layout, sources in layouts.items():
+            for properties in sources.values():
+                if changed & set(properties):
+                    totals[layout]['vectors'] += 1
+                    totals[layout]['chars'] += sum(len(str(new.get(p) or '')) for p in properties)
+        stored[index] = new
+    return totals
+
+
+def measure_weaviate(tickets, events, k):
+    import weaviate
+    from services.weaviate_schema import create_issue_collection
+
+    client = weaviate.connect_to_local(host="localhost", port=8080, grpc_port=50051)
+    rows = []
+    try:
+        for layout, named in (('single', False), ('named', True)):
+            name = f"BenchIssues_{layout}"
+            if client.collections.exists(name):
+                client.collections.delete(name)
+            create_issue_collection(client, name, named_vectors=named)
+            service = WeaviateService(client=client, collection_name=name)
+            try:
+                started = time.perf_counter()
+                failures = service.insert_issues(tickets)
+                insert_seconds = time.perf_counter() - started
+                targets = ['default'] if not named else ['content', 'comments', 'fused']
+                recall = {}
+                for target in targets:
+                    for query_kind in ('summary', 'fix'):
+                        hits = 0
+                        for ticket in tickets:
+                            query = (f"{ticket['_system']} {ticket['_symptom']}" if query_kind == 'summary'
+                                     else f"{ticket['_fix']} on {ticket['_system']}")
+                            results = service.search_tickets(query, limit=k, alpha=1.0,
+                                                             target_vector=None if target == 'default' else target)
+                            hits += any(r['key'] == ticket['key'] for r in results)
+                        recall[(target, query_kind)] = hits / len(tickets)
+
+                issues = [copy_ticket(ticket) for ticket in tickets]
+                before = dict(service.write_stats)
+                started = time.perf_counter()
+                for kind, index, n in events:
+                    partial, comment_events = apply_event(issues[index], kind, n)
+                    service.apply_issue_delta(partial, comment_events)
+                event_seconds = time.perf_counter() - started
+                rows.append((layout, insert_seconds, len(failures), recall, event_seconds,
+                             service.write_stats['revectorized'] - before['revectorized']))
+            finally:
+                client.collections.delete(name)
+    finally:
+        client.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=300)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--k', type=int, default=10, help='Recall cut-off')
+    parser.add_argument('--weaviate', action='store_true', help='Also measure recall and timings in Weaviate')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tickets = [make_ticket(rng, n) for n in range(1, args.tickets + 1)]
+    events = event_stream(rng, tickets, args.events)
+
+    print("=" * 70)
+    print(f"🧭 SINGLE VS NAMED VECTORS - {args.tickets} tickets, {args.events} update events")
+    print("=" * 70)
+    print()
+    print("Re-embedding cost of the update stream:")
+    for layout, cost in reembed_cost(tickets, events).items():
+        print(f"   {layout:<16} {cost['vectors']:>6} vectors re-embedded, {cost['chars']:>9} characters")
+    print("   (the single vector never embeds comments, so comment edits are free there but")
+    print("    the fix described in the comment thread is invisible to semantic search)")
+    print()
+
+    if not args.weaviate:
+        print("ℹ️  Run with --weaviate for recall and ingestion timings")
+        return
+
+    rows = measure_weaviate(tickets, events, args.k)
+    print(f"{'layout':<8} {'insert s':>9} {'target':<9} {'recall@' + str(args.k) + ' summary':>18} "
+          f"{'recall@' + str(args.k) + ' fix':>14}")
+    for layout, insert_seconds, failures, recall, event_seconds, reembedded in rows:
+        for target in sorted({target for target, _ in recall}):
+            print(f"{layout:<8} {insert_seconds:>9.1f} {target:<9} {recall[(target, 'summary')]:>18.3f} "
+                  f"{recall[(target, 'fix')]:>14.3f}")
+        print(f"{'':<8} updates: {event_seconds:.1f}s, {reembedded} vectors re-embedded, {failures} insert failures")
+
+
+if __name__ == "__main__":
+    main()
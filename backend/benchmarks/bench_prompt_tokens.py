@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Prompt size per query: whole-ticket retrieval vs description/comment chunk retrieval
+Formats the retrieved tickets exactly like process_user_query (retrieve_query_context in
+tasks.py) in both QUERY_RETRIEVAL modes and reports the packed context size in characters
+and estimated tokens (~4 characters per token). No LLM calls are made.
+
+  Offline (default): synthetic tickets with long comment threads where the fix is in
+  one comment, chunked with services/comment_chunks.py and retrieved by keyword overlap.
+
+  --weaviate: runs the queries in benchmark_queries.txt against the active collection
+  (needs Weaviate with a chunk collection, see SETUP_GUIDE.md).
+
+Usage (from backend/):
+    python3 benchmarks/bench_prompt_tokens.py [--tickets 500] [--queries 40]
+    python3 benchmarks/bench_prompt_tokens.py --weaviate [--queries-file benchmarks/benchmark_queries.txt]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from services.comment_chunks import issue_chunks  # noqa: E402
+from services.weaviate_service import WeaviateService  # noqa: E402
+from tasks import retrieve_query_context  # noqa: E402
+from bench_named_vectors import CHATTER, make_ticket  # noqa: E402
+
+MODES = ('tickets', 'chunks')
+CHARS_PER_TOKEN = 4
+
+# Longer thread messages than the named-vector benchmark, closer to real support threads
+UPDATES = [
+    "Checked the dashboards again, error rate is flat at around 3% since the last deploy and the on-call "
+    "rotation has been notified. Attaching the latest screenshots and a HAR file from the customer session.",
+    "Customer success followed up with the account owner; they are asking for an ETA and a written incident "
+    "summary for their leadership. Please keep this ticket updated at least twice a day.",
+    "Reproduced in staging with the customer's configuration export. Logs show repeated retries before the "
+    "request finally fails; no obvious correlation with region or browser so far.",
+]
+
+
+def _tokens(text):
+    return set(re.findall(r"[a-z0-9]+", (text or '').lower()))
+
+
+class KeywordIndex:
+    """Stand-in for WeaviateService retrieval: keyword overlap instead of hybrid search"""
+
+    def __init__(self, tickets):
+        builder = WeaviateService(client=object())  # only the property builders are used
+        self.tickets = [builder.build_issue_object(ticket) for ticket in tickets]
+        self.chunks = [chunk for ticket in self.tickets for chunk in issue_chunks(ticket).values()]
+        self.by_key = {ticket['key']: ticket for ticket in self.tickets}
+        self.collection_name = 'synthetic'
+
+    def has_chunks(self):
+        return True
+
+    @staticmethod
+    def _rank(query, items, text_of, limit):
+        words = _tokens(query)
+        scored = [(len(words & _tokens(text_of(item))), index) for index, item in enumerate(items)]
+        return [items[index] for score, index in sorted(scored, key=lambda s: (-s[0], s[1]))[:limit] if score]
+
+    def search_tickets(self, query, limit=30, filters=None, alpha=0.75, **kwargs):
+        def text_of(ticket):
+            return " ".join([ticket['summary'], ticket['description'] or '', ticket['commentText']])
+        return [{'key': t['key'], 'properties': t} for t in self._rank(query, self.tickets, text_of, limit)]
+
+    def search_chunks(self, query, tickets=30, project=None, alpha=0.75, limit=None, per_ticket=None):
+        grouped = {}
+        for chunk in self._rank(query, self.chunks, lambda c: c['text'], limit or Config.CHUNK_SEARCH_LIMIT):
+            key = chunk['issueKey']
+            if key not in grouped:
+                if len(grouped) >= tickets:
+                    continue
+                header = {name: self.by_key[key].get(name) for name in WeaviateService.TICKET_HEADER_PROPERTIES}
+                grouped[key] = {'key': key, 'properties': header, 'chunks': []}
+            if len(grouped[key]['chunks']) < (per_ticket or Config.CHUNKS_PER_TICKET):
+                grouped[key]['chunks'].append(chunk)
+        return list(grouped.values())
+
+
+def synthetic(args):
+    rng = random.Random(args.seed)
+    tickets = []
+    for number in range(1, args.tickets + 1):
+        ticket = make_ticket(rng, number)
+        for comment in ticket['fields']['comment']['comments']:
+            text = comment['body']['content'][0]['content'][0]['text']
+            if text in CHATTER:
+                comment['body']['content'][0]['content'][0]['text'] = f"{text} {rng.choice(UPDATES)}"
+        tickets.append(ticket)
+    queries = [f"How was the {t['_system']} that {t['_symptom']} fixed?" for t in rng.sample(tickets, args.queries)]
+    return KeywordIndex(tickets), queries
+
+
+def load_queries(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def measure(service, queries, project=None):
+    sizes = {mode: [] for mode in MODES}
+    for query in queries:
+        for mode in MODES:
+            _, keys, formatted, _ = retrieve_query_context(service, query, project=project, retrieval=mode)
+            sizes[mode].append((len(json.dumps(formatted, indent=2, default=str)), len(keys)))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=40, help='Synthetic queries (offline mode)')
+    parser.add_argument('--queries-file', default=os.path.join(os.path.dirname(__file__), 'benchmark_queries.txt'))
+    parser.add_argument('--weaviate', action='store_true', help='Measure against the active collection')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    if args.weaviate:
+        service = WeaviateService()
+        queries = load_queries(args.queries_file)
+        if not service.has_chunks():
+            print(f"❌ {service.collection_name} has no chunk collection; run migrate_collection.py migrate")
+            sys.exit(1)
+        try:
+            sizes = measure(service, queries, project=Config.JIRA_PROJECT_KEY)
+        finally:
+            service.close()
+        source = service.collection_name
+    else:
+        service, queries = synthetic(args)
+        sizes = measure(service, queries)
+        source = f"{args.tickets} synthetic tickets, {len(service.chunks)} chunks"
+
+    print("=" * 70)
+    print(f"🧮 PROMPT SIZE PER QUERY - {len(queries)} queries ({source})")
+    print("=" * 70)
+    print(f"{'retrieval':<10} {'tickets':>8} {'median chars':>13} {'median ~tokens':>15} {'p95 ~tokens':>12}")
+    medians = {}
+    for mode in MODES:
+        chars = [size for size, _ in sizes[mode]]
+        medians[mode] = statistics.median(chars)
+        p95 = sorted(chars)[min(len(chars) - 1, int(0.95 * len(chars)))]
+        print(f"{mode:<10} {statistics.mean(n for _, n in sizes[mode]):>8.1f} {medians[mode]:>13.0f} "
+              f"{medians[mode] / CHARS_PER_TOKEN:>15.0f} {p95 / CHARS_PER_TOKEN:>12.0f}")
+    print()
+    if medians['chunks']:
+        print(f"📉 Chunk retrieval sends {medians['tickets'] / medians['chunks']:.1f}x fewer prompt tokens "
+              f"per query (median; CHUNKS_PER_TICKET={Config.CHUNKS_PER_TICKET}, "
+              f"CHUNK_MAX_CHARS={Config.CHUNK_MAX_CHARS})")
+
+
+if __name__ == "__main__":
+    main()
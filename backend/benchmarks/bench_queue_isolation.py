@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Show that interactive queries keep low queue latency under an ingestion flood
+Floods the ingest queue with slow tasks, then sends tasks.ping to the query queue
+and reports how long each ping waited before a worker picked it up.
+
+Usage (from backend/, with Redis and both workers from start_server.sh running):
+    python3 benchmarks/bench_queue_isolation.py [--flood 500] [--pings 50]
+
+Pass --shared-queue to send the pings to the ingest queue instead, which shows
+the latency queries would see if everything still shared one queue.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from celery_app import celery  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--flood', type=int, default=500, help='Ingestion tasks to enqueue')
+    parser.add_argument('--pings', type=int, default=50, help='Query-queue pings to send')
+    parser.add_argument('--interval', type=float, default=0.1, help='Seconds between pings')
+    parser.add_argument('--shared-queue', action='store_true', help='Send pings to the ingest queue')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"🌊 Flooding '{Config.CELERY_INGEST_QUEUE}' with {args.flood} tasks...")
+    for _ in range(args.flood):
+        celery.send_task('tasks.test_task')
+
+    ping_queue = Config.CELERY_INGEST_QUEUE if args.shared_queue else Config.CELERY_QUERY_QUEUE
+    print(f"📨 Sending {args.pings} pings to '{ping_queue}'...")
+    pending = []
+    for _ in range(args.pings):
+        pending.append(celery.send_task('tasks.ping', args=[time.time()], queue=ping_queue))
+        time.sleep(args.interval)
+
+    latencies = []
+    timeouts = 0
+    for result in pending:
+        try:
+            latencies.append(result.get(timeout=60)['queue_latency'])
+        except Exception:
+            timeouts += 1
+
+    print()
+    if latencies:
+        ordered = sorted(latencies)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"Queue latency over {len(latencies)} pings: "
+              f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+              f"p99 {p99 * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+    if timeouts:
+        print(f"⚠️  {timeouts} pings not picked up within 60s (queue starved)")
+    print("Purge the flood afterwards with: celery -A celery_app purge -Q ingest")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Time a full Weaviate rebuild from the local raw issue cache (ingest.py reindex)
+Fills a temporary raw cache with synthetic issues (ADF description and comment
+thread, several versions per issue), then runs the ingestion pipeline over it
+exactly like `ingest.py reindex` does and reports wall time, tickets/s and the
+number of HTTP requests made (any request to Jira fails the run).
+
+Usage (from backend/):
+    python3 benchmarks/bench_reindex.py [--tickets 5000] [--versions 2] [--batch-size 100] [--workers 4]
+    python3 benchmarks/bench_reindex.py --weaviate      (write to the running Weaviate instead of a null sink)
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bulk_import import ImportCheckpoint  # noqa: E402
+from services.ingest_pipeline import IngestPipeline, RawCacheSource, raw_cache_fetcher  # noqa: E402
+from services.raw_issue_store import RawIssueStore  # noqa: E402
+
+WORDS = ("queue worker timeout payment retry deploy rollback latency database index replica "
+         "certificate token webhook cache eviction memory leak pod restart alert threshold").split()
+
+
+def adf(text):
+    return {'type': 'doc', 'version': 1,
+            'content': [{'type': 'paragraph', 'content': [{'type': 'text', 'text': text}]}]}
+
+
+def sentence(rng, words=20):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_issue(rng, number, version):
+    comments = [{
+        'id': str(number * 100 + n),
+        'author': {'displayName': f"Engineer {n % 7}"},
+        'body': adf(sentence(rng, 40)),
+        'created': f"2024-01-{1 + n % 28:02d}T10:00:00.000+0000",
+    } for n in range(rng.randint(0, 12))]
+    return {
+        'id': str(10000 + number),
+        'key': f"CO-{number}",
+        'fields': {
+            'summary': sentence(rng, 8),
+            'description': adf(" ".join(sentence(rng) for _ in range(6))),
+            'status': {'name': rng.choice(['Open', 'In Progress', 'Done'])},
+            'priority': {'name': rng.choice(['Low', 'Medium', 'High'])},
+            'issuetype': {'name': 'Bug'},
+            'project': {'key': 'CO'},
+            'created': '2024-01-01T09:00:00.000+0000',
+            'updated': f"2024-02-{1 + version:02d}T09:00:00.000+0000",
+            'comment': {'comments': comments, 'total': len(comments)},
+        },
+    }
+
+
+class RequestCounter:
+    """Counts (and refuses) outgoing HTTP requests while the rebuild runs"""
+
+    def __init__(self):
+        self.calls = 0
+        self._original = requests.Session.request
+
+    def __enter__(self):
+        counter = self
+
+        def refuse(session, method, url, *args, **kwargs):
+            counter.calls += 1
+            raise RuntimeError(f"Unexpected HTTP request during reindex: {method} {url}")
+        requests.Session.request = refuse
+        return self
+
+    def __exit__(self, *exc):
+        requests.Session.request = self._original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=5000)
+    parser.add_argument('--versions', type=int, default=2, help='Cached versions per ticket')
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--weaviate', action='store_true', help='Write to Weaviate instead of a null sink')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"🗄️  REINDEX FROM RAW CACHE - {args.tickets} tickets x {args.versions} version(s)")
+    print("=" * 70)
+    print()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        store = RawIssueStore(os.path.join(workdir, 'raw_issues.sqlite3'))
+        rng = random.Random(args.seed)
+        started = time.perf_counter()
+        for version in range(args.versions):
+            for number in range(1, args.tickets + 1):
+                store.put(synthetic_issue(rng, number, version))
+        issues, versions = store.count()
+        size_mb = os.path.getsize(store.path) / 1e6
+        print(f"   Cache filled in {time.perf_counter() - started:.1f}s: "
+              f"{issues} issues, {versions} versions, {size_mb:.1f} MB")
+
+        weaviate_service = None
+        if args.weaviate:
+            from services.weaviate_service import WeaviateService
+            weaviate_service = WeaviateService()
+            store_batch = weaviate_service.insert_issues
+        else:
+            def store_batch(batch):
+                return {}
+
+        source = RawCacheSource(store)
+        checkpoint = ImportCheckpoint(None, source.name, source.params)
+        checkpoint.cursor = source.initial_cursor()
+        pipeline = IngestPipeline(source, raw_cache_fetcher(store), store_batch, checkpoint,
+                                  workers=args.workers, batch_size=args.batch_size)
+        try:
+            with RequestCounter() as http:
+                counts = pipeline.run()
+        finally:
+            if weaviate_service is not None:
+                weaviate_service.close()
+            store.close()
+
+    rate = counts['stored'] / max(counts['seconds'], 1e-6)
+    print(f"   Sink:             {'Weaviate' if args.weaviate else 'null'}")
+    print(f"   Tickets rebuilt:  {counts['stored']} in {counts['batches']} batches, {counts['errors']} errors")
+    print(f"   Wall time:        {counts['seconds']:.2f}s ({rate:.0f} tickets/s)")
+    print(f"   HTTP requests:    {http.calls}")
+    print()
+    ok = counts['stored'] == args.tickets and http.calls == 0
+    print(f"{'✅ PASS' if ok else '❌ FAIL'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
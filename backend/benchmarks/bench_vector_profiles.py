@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Compare vector index profiles (services/weaviate_schema.py) on a synthetic corpus
+Generates clustered, normalized embeddings (MiniLM-sized by default), computes the
+exact top 30 per query as the uncompressed reference and reports, per profile, the
+estimated index RAM, recall@30 against that reference and per-query latency.
+
+Two modes:
+  --weaviate   creates one temporary collection per profile in the running Weaviate
+               (bring-your-own vectors), runs near_vector queries and deletes it again.
+               Measures the real HNSW graph + quantizer recall and server latency.
+  (default)    simulates the quantizers in NumPy (BQ sign bits, SQ 8-bit, PQ k-means
+               codebooks, each with full-vector rescoring of VECTOR_RESCORE_LIMIT
+               candidates) over an exact scan. HNSW graph error is not simulated, so
+               hnsw_* rows show quantization loss only; latency is NumPy scan time.
+
+Usage (from backend/):
+    python3 benchmarks/bench_vector_profiles.py [--objects 20000] [--dims 384] [--queries 200]
+    python3 benchmarks/bench_vector_profiles.py --weaviate [--profiles hnsw hnsw_bq flat_bq]
+
+RAM figures are estimates (vectors or codes held in memory plus HNSW links); Weaviate
+does not report memory per collection.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from services.weaviate_schema import VECTOR_INDEX_PROFILES, hnsw_parameters, vector_index_config  # noqa: E402
+
+K = 30
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def synthetic_corpus(objects, dims, queries, seed):
+    """Clustered unit vectors (tickets about the same topic sit close together)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, objects // 200), dims)).astype(np.float32)
+    assignment = rng.integers(0, len(centers), size=objects)
+    corpus = centers[assignment] + rng.normal(size=(objects, dims)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    # Queries land near a ticket's topic, not on the ticket itself
+    picks = rng.integers(0, objects, size=queries)
+    probes = corpus[picks] + rng.normal(size=(queries, dims)).astype(np.float32) / np.sqrt(dims)
+    probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+    return corpus, probes.astype(np.float32)
+
+
+def top_k(scores, k):
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part])]
+
+
+def pq_segments(dims):
+    return Config.VECTOR_PQ_SEGMENTS or max(1, dims // 4)
+
+
+def estimate_memory(profile, objects, dims):
+    """Bytes kept in RAM by the vector index (vectors or codes plus HNSW links)"""
+    links = 0
+    if profile.startswith('hnsw'):
+        # Layer 0 holds up to 2 * maxConnections neighbour ids (uint64) per object
+        links = objects * 2 * hnsw_parameters()['max_connections'] * 8
+    if profile == 'hnsw':
+        return objects * dims * 4 + links
+    if profile == 'hnsw_pq':
+        segments = pq_segments(dims)
+        codebook = Config.VECTOR_PQ_CENTROIDS * dims * 4
+        return objects * segments + codebook + links
+    if profile == 'hnsw_sq':
+        return objects * dims + links
+    if profile in ('hnsw_bq', 'flat_bq'):
+        return objects * dims // 8 + links
+    # Uncompressed flat reads vectors from disk; only the vector cache uses RAM
+    cache = int(Config.VECTOR_CACHE_MAX_OBJECTS or 0)
+    return min(cache, objects) * dims * 4
+
+
+# ------------------------------------------------------------ simulation
+
+class Quantizer:
+    """Approximate scores from compact codes, then rescore candidates exactly"""
+
+    def __init__(self, corpus, rescore_limit):
+        self.corpus = corpus
+        self.rescore_limit = max(K, rescore_limit)
+
+    def approximate(self, query):
+        raise NotImplementedError
+
+    def search(self, query):
+        scores = self.approximate(query)
+        candidates = top_k(scores, min(self.rescore_limit, len(scores)))
+        exact = self.corpus[candidates] @ query
+        return candidates[np.argsort(-exact)[:K]]
+
+
+class ExactScan(Quantizer):
+    def approximate(self, query):
+        return self.corpus @ query
+
+    def search(self, query):
+        return top_k(self.corpus @ query, K)
+
+
+class BinaryQuantizer(Quantizer):
+    POPCOUNT = np.array([bin(n).count('1') for n in range(256)], dtype=np.uint8)
+
+    def __init__(self, corpus, rescore_limit):
+        super().__init__(corpus, rescore_limit)
+        self.codes = np.packbits(corpus > 0, axis=1)
+
+    def approximate(self, query):
+        code = np.packbits(query > 0)
+        hamming = self.POPCOUNT[np.bitwise_xor(self.codes, code)].sum(axis=1, dtype=np.int32)
+        return -hamming.astype(np.float32)
+
+
+class ScalarQuantizer(Quantizer):
+    def __init__(self, corpus, rescore_limit, training_limit):
+        super().__init__(corpus, rescore_limit)
+        sample = corpus[:training_limit]
+        self.low = sample.min(axis=0)
+        self.step = (sample.max(axis=0) - self.low) / 255.0 + 1e-12
+        self.codes = np.clip(np.round((corpus - self.low) / self.step), 0, 255).astype(np.uint8)
+
+    def approximate(self, query):
+        return (self.codes.astype(np.float32) * self.step + self.low) @ query
+
+
+class ProductQuantizer(Quantizer):
+    def __init__(self, corpus, rescore_limit, segments, centroids, training_limit, seed, iterations=8):
+        super().__init__(corpus, rescore_limit)
+        dims = corpus.shape[1]
+        self.segments = segments if dims % segments == 0 else max(s for s in range(1, segments + 1) if dims % s == 0)
+        self.width = dims // self.segments
+        rng = np.random.default_rng(seed)
+        sample = corpus[rng.permutation(len(corpus))[:training_limit]]
+        self.codebooks = []
+        codes = []
+        for s in range(self.segments):
+            part = sample[:, s * self.width:(s + 1) * self.width]
+            book = part[rng.choice(len(part), size=min(centroids, len(part)), replace=False)].copy()
+            for _ in range(iterations):
+                nearest = self._nearest(part, book)
+                for c in range(len(book)):
+                    members = part[nearest == c]
+                    if len(members):
+                        book[c] = members.mean(axis=0)
+            self.codebooks.append(book)
+            codes.append(self._nearest(corpus[:, s * self.width:(s + 1) * self.width], book))
+        self.codes = np.stack(codes, axis=1).astype(np.uint8 if centroids <= 256 else np.uint16)
+
+    @staticmethod
+    def _nearest(points, book):
+        distances = (points ** 2).sum(axis=1, keepdims=True) - 2 * points @ book.T + (book ** 2).sum(axis=1)
+        return distances.argmin(axis=1)
+
+    def approximate(self, query):
+        # Asymmetric distance: one lookup table per segment, summed over the codes
+        tables = np.stack([book @ query[s * self.width:(s + 1) * self.width]
+                           for s, book in enumerate(self.codebooks)])
+        return tables[np.arange(self.segments), self.codes].sum(axis=1)
+
+
+def simulated_index(profile, corpus, seed):
+    rescore = Config.VECTOR_RESCORE_LIMIT
+    training = min(len(corpus), Config.VECTOR_PQ_TRAINING_LIMIT)
+    if profile in ('hnsw_bq', 'flat_bq'):
+        return BinaryQuantizer(corpus, rescore)
+    if profile == 'hnsw_sq':
+        return ScalarQuantizer(corpus, rescore, training)
+    if profile == 'hnsw_pq':
+        # PQ results are rescored from the HNSW candidate list (ef); the rescore limit stands in for it
+        return ProductQuantizer(corpus, rescore, pq_segments(corpus.shape[1]), Config.VECTOR_PQ_CENTROIDS,
+                                min(training, 10000), seed)
+    return ExactScan(corpus, rescore)
+
+
+def run_simulated(profile, corpus, probes, truth, seed):
+    started = time.perf_counter()
+    index = simulated_index(profile, corpus, seed)
+    build = time.perf_counter() - started
+    latencies, recalls = [], []
+    for query, expected in zip(probes, truth):
+        started = time.perf_counter()
+        found = index.search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len(set(found.tolist()) & set(expected.tolist())) / K)
+    return recalls, latencies, build
+
+
+# --------------------------------------------------------------- weaviate
+
+def run_weaviate(profile, corpus, probes, truth, batch_size):
+    import weaviate
+    import weaviate.classes as wvc
+    from weaviate.util import generate_uuid5
+
+    name = f"BenchVectors_{profile}"
+    client = weaviate.connect_to_local(host="localhost", port=8080, grpc_port=50051)
+    try:
+        if client.collections.exists(name):
+            client.collections.delete(name)
+        started = time.perf_counter()
+        collection = client.collections.create(
+            name=name,
+            vectorizer_config=wvc.config.Configure.Vectorizer.none(),
+            vector_index_config=vector_index_config(profile),
+            properties=[wvc.config.Property(name="n", data_type=wvc.config.DataType.INT)]
+        )
+        with collection.batch.fixed_size(batch_size=batch_size) as batch:
+            for n, vector in enumerate(corpus):
+                batch.add_object(properties={'n': n}, vector=vector.tolist(), uuid=generate_uuid5(n))
+        if collection.batch.failed_objects:
+            raise RuntimeError(f"{len(collection.batch.failed_objects)} objects failed to import")
+        build = time.perf_counter() - started
+
+        latencies, recalls = [], []
+        for query, expected in zip(probes, truth):
+            started = time.perf_counter()
+            response = collection.query.near_vector(query.tolist(), limit=K, return_properties=['n'])
+            latencies.append((time.perf_counter() - started) * 1000)
+            found = {obj.properties['n'] for obj in response.objects}
+            recalls.append(len(found & set(expected.tolist())) / K)
+        return recalls, latencies, build
+    finally:
+        if client.collections.exists(name):
+            client.collections.delete(name)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--objects', type=int, default=20000)
+    parser.add_argument('--dims', type=int, default=384, help='384 = multi-qa-MiniLM-L6 (t2v-transformers)')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--profiles', nargs='+', choices=VECTOR_INDEX_PROFILES, default=list(VECTOR_INDEX_PROFILES))
+    parser.add_argument('--weaviate', action='store_true', help='Measure against the running Weaviate')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    # Quantizers only train once training_limit objects exist
+    Config.VECTOR_PQ_TRAINING_LIMIT = min(Config.VECTOR_PQ_TRAINING_LIMIT, args.objects)
+
+    print("=" * 70)
+    print(f"🧮 VECTOR INDEX PROFILES - {args.objects} x {args.dims}d, {args.queries} queries, "
+          f"{'Weaviate' if args.weaviate else 'NumPy simulation'}")
+    print(f"   HNSW {Config.VECTOR_HNSW_PRESET}: {hnsw_parameters()}, rescore limit {Config.VECTOR_RESCORE_LIMIT}")
+    print("=" * 70)
+    print()
+
+    corpus, probes = synthetic_corpus(args.objects, args.dims, args.queries, args.seed)
+    truth = [top_k(corpus @ query, K) for query in probes]
+    baseline = estimate_memory('hnsw', args.objects, args.dims)
+
+    print(f"{'profile':<10} {'RAM (est.)':>11} {'vs hnsw':>8} {'recall@30':>10} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8}")
+    for profile in args.profiles:
+        if args.weaviate:
+            recalls, latencies, build = run_weaviate(profile, corpus, probes, truth, args.batch_size)
+        else:
+            recalls, latencies, build = run_simulated(profile, corpus, probes, truth, args.seed)
+        memory = estimate_memory(profile, args.objects, args.dims)
+        print(f"{profile:<10} {memory / 2 ** 20:>8.1f} MB {memory / baseline:>7.0%} "
+              f"{statistics.mean(recalls):>10.3f} {percentile(latencies, 50):>8.2f} "
+              f"{percentile(latencies, 95):>8.2f} {build:>8.1f}")
+    print()
+    if not args.weaviate:
+        print("ℹ️  Simulated: HNSW graph error is not included; run with --weaviate for end-to-end numbers")
+
+
+if __name__ == "__main__":
+    main()
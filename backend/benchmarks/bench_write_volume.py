@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Measure Weaviate write volume per webhook: whole-ticket rewrites vs delta updates
+Replays a sequence of webhook-style changes (new comment, comment edit, status change,
+assignee change, description edit) on a scratch ticket with a long comment thread and
+reports bytes sent and re-vectorizations per event for both strategies.
+
+"before" is the previous behaviour: every event re-sent the full object and re-embedded it.
+"after" is the current insert_issue/apply_issue_delta path.
+
+Usage (from backend/, Weaviate running):
+    python3 benchmarks/bench_write_volume.py [--comments 200]
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.weaviate_service import WeaviateService  # noqa: E402
+from weaviate.util import generate_uuid5  # noqa: E402
+
+ISSUE_ID = 'bench-write-volume'
+
+
+def make_issue(comment_count):
+    return {
+        'id': ISSUE_ID,
+        'key': 'BENCH-1',
+        'fields': {
+            'project': {'key': 'BENCH', 'name': 'Benchmark'},
+            'summary': 'Invoices fail to sync to the accounting integration',
+            'description': 'Invoices created after the upgrade never reach the accounting system. ' * 5,
+            'status': {'name': 'In Progress'},
+            'priority': {'name': 'High'},
+            'labels': ['integration', 'invoices'],
+            'assignee': {'displayName': 'Alex Doe'},
+            'reporter': {'displayName': 'Sam Roe'},
+            'created': '2024-01-01T10:00:00.000+0000',
+            'updated': '2024-01-01T10:00:00.000+0000',
+            'resolutiondate': None,
+            'attachment': [],
+            'comment': {'comments': [
+                {'id': str(i), 'author': {'displayName': 'Engineer'},
+                 'body': f'Investigation note {i}: checked the sync job logs and retried the export. ' * 3,
+                 'created': f'2024-01-{1 + i // 24 % 28:02d}T{i % 24:02d}:00:00.000+0000',
+                 'updated': f'2024-01-{1 + i // 24 % 28:02d}T{i % 24:02d}:00:00.000+0000'}
+                for i in range(comment_count)
+            ]},
+        }
+    }
+
+
+def events(issue):
+    """(name, full issue after the change, partial webhook body, comment events)"""
+    base = copy.deepcopy(issue)
+    steps = []
+
+    def step(name, mutate, partial_fields=None, comment_event=None):
+        mutate(base)
+        base['fields']['updated'] = f"2024-02-01T00:{len(steps):02d}:00.000+0000"
+        partial = {'id': ISSUE_ID, 'key': 'BENCH-1',
+                   'fields': dict(partial_fields or {}, updated=base['fields']['updated'])}
+        steps.append((name, copy.deepcopy(base), partial, [comment_event] if comment_event else None))
+
+    new_comment = {'id': 'new', 'author': {'displayName': 'Engineer'}, 'body': 'Fixed by re-running the export.',
+                   'created': '2024-02-01T00:00:00.000+0000', 'updated': '2024-02-01T00:00:00.000+0000'}
+    step('comment added', lambda i: i['fields']['comment']['comments'].append(copy.deepcopy(new_comment)),
+         comment_event={'event': 'comment_created', 'comment': new_comment})
+    edited = dict(new_comment, body='Fixed by re-running the export with the new token.')
+    step('comment edited',
+         lambda i: i['fields']['comment']['comments'].__setitem__(-1, copy.deepcopy(edited)),
+         comment_event={'event': 'comment_updated', 'comment': edited})
+    step('status changed', lambda i: i['fields'].__setitem__('status', {'name': 'Done'}),
+         partial_fields={'status': {'name': 'Done'}})
+    step('assignee changed', lambda i: i['fields'].__setitem__('assignee', {'displayName': 'Kim Poe'}),
+         partial_fields={'assignee': {'displayName': 'Kim Poe'}})
+    step('description edited',
+         lambda i: i['fields'].__setitem__('description', 'Root cause: expired integration token.'),
+         partial_fields={'description': 'Root cause: expired integration token.'})
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comments', type=int, default=200, help='Comments on the scratch ticket')
+    args = parser.parse_args()
+
+    issue = make_issue(args.comments)
+    weaviate_service = WeaviateService()
+    try:
+        weaviate_service.insert_issue(issue)
+
+        print(f"{'event':<20}{'before bytes':>14}{'after bytes':>13}{'before re-embed':>17}{'after re-embed':>16}")
+        totals = [0, 0, 0, 0]
+        for name, full_issue, partial, comment_events in events(issue):
+            before_bytes = len(json.dumps(weaviate_service.build_issue_object(full_issue), default=str))
+
+            stats_before = dict(weaviate_service.write_stats)
+            weaviate_service.apply_issue_delta(partial, comment_events)
+            after_bytes = weaviate_service.write_stats['bytes'] - stats_before['bytes']
+            after_reembed = weaviate_service.write_stats['revectorized'] - stats_before['revectorized']
+
+            totals = [totals[0] + before_bytes, totals[1] + after_bytes, totals[2] + 1, totals[3] + after_reembed]
+            print(f"{name:<20}{before_bytes:>14}{after_bytes:>13}{1:>17}{after_reembed:>16}")
+
+        print(f"{'total':<20}{totals[0]:>14}{totals[1]:>13}{totals[2]:>17}{totals[3]:>16}")
+    finally:
+        weaviate_service._collection().data.delete_by_id(
+            generate_uuid5(ISSUE_ID))
+        weaviate_service.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Kill-and-resume check for the checkpointed ingestion pipeline (services/ingest_pipeline.py)
+Runs the import in a child process over an in-memory paged source, kills the child
+with os._exit() part-way through, resumes it with the saved checkpoint and checks
+every ticket ends up written and no committed ticket or page is fetched, listed or
+written again. Work that was in flight but not yet checkpointed (tickets fetched
+ahead of the sink, a page listed after the last checkpoint) is repeated; the check
+asserts it stays within IngestPipeline.resume_rework(), the bound ingest.py --resume
+documents.
+
+Two kill points are exercised:
+  after_commit  right after a batch checkpoint: no write is repeated; only tickets
+                fetched ahead of the sink (the fetched queue plus one per worker) are
+                fetched again
+  mid_batch     half-way through writing a batch: only that batch is written again
+                (insert_issues upserts by uuid5 and skips unchanged objects, so the
+                repeats never duplicate data)
+
+Usage (from backend/, no services needed):
+    python3 benchmarks/check_resumable_import.py [--tickets 1400] [--batch-size 20] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.bulk_import import ImportCheckpoint  # noqa: E402
+from services.ingest_pipeline import IngestPipeline  # noqa: E402
+
+PAGE_SIZE = 100
+
+
+def append_line(path, value):
+    # fsync per line so the log survives the kill exactly like Weaviate writes would
+    with open(path, 'a') as f:
+        f.write(json.dumps(value) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read_lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class MemorySource:
+    """Pages of PAGE_SIZE tickets CO-1..CO-<tickets>"""
+
+    name = 'memory'
+
+    def __init__(self, tickets, log):
+        self.tickets = tickets
+        self.log = log
+        self.params = {'tickets': tickets}
+
+    def initial_cursor(self):
+        return {'start_at': 0}
+
+    def pages(self, cursor):
+        start = cursor['start_at']
+        while True:
+            append_line(self.log, {'op': 'page', 'start_at': start})
+            issues = [{'key': f'CO-{n}', 'id': str(n)} for n in range(start + 1, min(start + PAGE_SIZE, self.tickets) + 1)]
+            start += PAGE_SIZE
+            if start >= self.tickets:
+                yield issues, None
+                return
+            yield issues, {'start_at': start}
+
+    def observe(self, key, found):
+        pass
+
+
+def run_child(args):
+    """One import run; dies with os._exit(137) at the requested point"""
+    source = MemorySource(args.tickets, args.log)
+    checkpoint = ImportCheckpoint.load(args.checkpoint, source.name, source.params) if args.resume else None
+    if checkpoint is None:
+        checkpoint = ImportCheckpoint(args.checkpoint, source.name, source.params)
+        checkpoint.cursor = source.initial_cursor()
+        checkpoint.save()
+
+    stores = {'count': 0}
+    if args.die_at == 'after_commit':
+        commit = checkpoint.commit
+
+        def commit_then_die(cursor, keys, failed=None, pending=None):
+            commit(cursor, keys, failed, pending)
+            if keys and stores['count'] >= args.die_after:
+                os._exit(137)
+        checkpoint.commit = commit_then_die
+
+    def fetch_details(issue):
+        append_line(args.log, {'op': 'fetch', 'key': issue['key']})
+        return {'key': issue['key'], 'fields': {'summary': f"Ticket {issue['key']}"}}
+
+    def store_batch(issues):
+        for index, details in enumerate(issues):
+            if args.die_at == 'mid_batch' and stores['count'] >= args.die_after and index == len(issues) // 2:
+                os._exit(137)
+            append_line(args.log, {'op': 'write', 'key': details['key']})
+            stores['count'] += 1
+        return {}
+
+    IngestPipeline(source, fetch_details, store_batch, checkpoint,
+                   workers=args.workers, batch_size=args.batch_size).run()
+
+
+def spawn(args, workdir, die_at=None, resume=False):
+    command = [sys.executable, os.path.abspath(__file__), '--child',
+               '--tickets', str(args.tickets), '--batch-size', str(args.batch_size),
+               '--workers', str(args.workers),
+               '--checkpoint', os.path.join(workdir, 'checkpoint.json'),
+               '--log', os.path.join(workdir, 'ops.jsonl')]
+    if die_at:
+        command += ['--die-at', die_at, '--die-after', str(args.die_after)]
+    if resume:
+        command.append('--resume')
+    return subprocess.run(command).returncode
+
+
+def scenario(args, die_at):
+    with tempfile.TemporaryDirectory() as workdir:
+        first = spawn(args, workdir, die_at=die_at)
+        ops_before = read_lines(os.path.join(workdir, 'ops.jsonl'))
+        second = spawn(args, workdir, resume=True)
+        ops = read_lines(os.path.join(workdir, 'ops.jsonl'))
+
+    fetches = Counter(op['key'] for op in ops if op['op'] == 'fetch')
+    writes = Counter(op['key'] for op in ops if op['op'] == 'write')
+    pages = Counter(op['start_at'] for op in ops if op['op'] == 'page')
+    written_before = sum(1 for op in ops_before if op['op'] == 'write')
+    refetched = sum(count - 1 for count in fetches.values())
+    rewritten = sum(count - 1 for count in writes.values())
+    repaged = sum(count - 1 for count in pages.values())
+
+    print(f"🔪 Kill point: {die_at} (child exit code {first}, resumed run exit code {second})")
+    print(f"   Written before the kill:  {written_before}")
+    print(f"   Tickets written in total: {len(writes)} / {args.tickets}")
+    print(f"   Detail fetches repeated:  {refetched}")
+    print(f"   Writes repeated:          {rewritten}")
+    print(f"   Jira pages re-listed:     {repaged}")
+
+    bound = IngestPipeline.resume_rework(args.workers, args.batch_size)
+    pages_bound = 1 + bound['listed'] // PAGE_SIZE
+    print(f"   Bound (fetches/writes/pages): {bound['fetches']} / {bound['writes']} / {pages_bound}")
+
+    ok = (first == 137 and second == 0 and len(writes) == args.tickets
+          and refetched <= bound['fetches'] and repaged <= pages_bound)
+    if die_at == 'after_commit':
+        ok = ok and rewritten == 0
+    else:
+        ok = ok and rewritten <= bound['writes']
+    print(f"   {'✅ PASS' if ok else '❌ FAIL'}")
+    print()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=1400)
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--die-after', type=int, default=730, help='Tickets written before the kill')
+    # Child process options
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--resume', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--die-at', choices=['after_commit', 'mid_batch'], help=argparse.SUPPRESS)
+    parser.add_argument('--checkpoint', help=argparse.SUPPRESS)
+    parser.add_argument('--log', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    print("=" * 70)
+    print("⏯️  CHECKPOINTED IMPORT: KILL AND RESUME")
+    print("=" * 70)
+    print()
+    results = [scenario(args, 'after_commit'), scenario(args, 'mid_batch')]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from celery import Celery
+from kombu import Exchange, Queue
 from config import Config
 
 celery = Celery(
@@ -14,4 +15,56 @@ celery.conf.update(
     result_serializer='json',
     timezone='Asia/Kolkata',
     enable_utc=True,
-)
\ No newline at end of file
+    # Honour per-message priorities on the Redis broker (0 = highest, 9 = lowest)
+    # so background enrichment such as ticket digests yields to other work
+    broker_transport_options={
+        'priority_steps': list(range(10)),
+        'queue_order_strategy': 'priority',
+    },
+    # Interactive queries and ingestion run on separate queues (and worker pools,
+    # see start_server.sh) so a webhook storm or bulk import never sits in front
+    # of a user's question
+    task_queues=(
+        Queue(Config.CELERY_QUERY_QUEUE, Exchange(Config.CELERY_QUERY_QUEUE),
+              routing_key=Config.CELERY_QUERY_QUEUE, queue_arguments={'x-max-priority': 10}),
+        Queue(Config.CELERY_INGEST_QUEUE, Exchange(Config.CELERY_INGEST_QUEUE),
+              routing_key=Config.CELERY_INGEST_QUEUE, queue_arguments={'x-max-priority': 10}),
+    ),
+    task_default_queue=Config.CELERY_INGEST_QUEUE,
+    task_routes={
+        'tasks.process_user_query': {'queue': Config.CELERY_QUERY_QUEUE, 'priority': 0},
+        'tasks.ping': {'queue': Config.CELERY_QUERY_QUEUE, 'priority': 0},
+        'tasks.process_jira_webhook': {'queue': Config.CELERY_INGEST_QUEUE, 'priority': 3},
+        'tasks.process_webhook_batch': {'queue': Config.CELERY_INGEST_QUEUE, 'priority': 3},
+        'tasks.sync_dirty_issue': {'queue': Config.CELERY_INGEST_QUEUE, 'priority': 3},
+        'tasks.sync_dirty_issues': {'queue': Config.CELERY_INGEST_QUEUE, 'priority': 3},
+        'tasks.replay_dead_letters': {'queue': Config.CELERY_INGEST_QUEUE, 'priority': 5},
+        'tasks.generate_ticket_digest': {'queue': Config.CELERY_INGEST_QUEUE, 'priority': Config.DIGEST_TASK_PRIORITY},
+        'tasks.offload_idle_tenants': {'queue': Config.CELERY_INGEST_QUEUE, 'priority': 5},
+        'tasks.move_to_cold_tier': {'queue': Config.CELERY_INGEST_QUEUE, 'priority': 5},
+        'tasks.test_task': {'queue': Config.CELERY_INGEST_QUEUE},
+    },
+    # Fetch one message at a time so priorities are respected and a long
+    # ingestion task never holds queued work hostage on a busy worker
+    worker_prefetch_multiplier=1,
+)
+
+# Periodic maintenance (run "celery -A celery_app beat"): replay of the ingestion
+# dead-letter stream, offloading of idle project tenants and hot/cold tiering
+beat_schedule = {}
+if Config.DLQ_REPLAY_INTERVAL > 0:
+    beat_schedule['replay-dead-letters'] = {
+        'task': 'tasks.replay_dead_letters',
+        'schedule': Config.DLQ_REPLAY_INTERVAL,
+    }
+if Config.TENANT_OFFLOAD_INTERVAL > 0:
+    beat_schedule['offload-idle-tenants'] = {
+        'task': 'tasks.offload_idle_tenants',
+        'schedule': Config.TENANT_OFFLOAD_INTERVAL,
+    }
+if Config.COLD_TIER_INTERVAL > 0:
+    beat_schedule['move-to-cold-tier'] = {
+        'task': 'tasks.move_to_cold_tier',
+        'schedule': Config.COLD_TIER_INTERVAL,
+    }
+celery.conf.beat_schedule = beat_schedule
@@ -56,7 +56,7 @@ print()
 print("3️⃣  Checking Weaviate Database...")
 try:
     weaviate_service = WeaviateService()
-    collection = weaviate_service.client.collections.get('JiraIssue')
+    collection = weaviate_service.collection_for(Config.JIRA_PROJECT_KEY)
     
     result = collection.query.fetch_objects(limit=100)
     total = len(result.objects)
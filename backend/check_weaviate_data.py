@@ -24,7 +24,7 @@ def get_weaviate_tickets():
     weaviate_service = WeaviateService()
     
     try:
-        collection = weaviate_service.client.collections.get("JiraIssue")
+        collection = weaviate_service.collection_for(Config.JIRA_PROJECT_KEY)
         
         # Get all tickets from CO project
         from weaviate.classes.query import Filter
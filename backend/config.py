@@ -19,16 +19,170 @@ class Config:
     CELERY_TASK_TRACK_STARTED = True  # Enable task tracking
     CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minute timeout
     
+    # Celery queues: interactive queries vs ingestion (webhooks, imports, digests)
+    CELERY_QUERY_QUEUE = 'query'
+    CELERY_INGEST_QUEUE = 'ingest'
+    
+    # Application cache (similar-ticket lookups etc.), kept apart from Celery's databases
+    REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL', 'redis://localhost:6379/2')
+    
+    # "Similar tickets" endpoint: neighbours computed per lookup and cache lifetime
+    # (entries are also invalidated whenever the ticket is re-ingested)
+    SIMILAR_TICKETS_MAX = int(os.getenv('SIMILAR_TICKETS_MAX', '30'))
+    SIMILAR_TICKETS_CACHE_TTL = int(os.getenv('SIMILAR_TICKETS_CACHE_TTL', str(24 * 60 * 60)))
+    
     # Weaviate Configuration
     # WEAVIATE_URL = os.getenv('WEAVIATE_URL', 'http://localhost:8080')
     
+    # Versioned collections (JiraIssue_v1, JiraIssue_v2, ...): the live one is named by a
+    # Redis pointer that migrate_collection.py switches; this is used when no pointer is set
+    WEAVIATE_COLLECTION = os.getenv('WEAVIATE_COLLECTION', 'JiraIssue')
+    
+    # Storage backend: 'weaviate' or 'local' (in-process NumPy store with BM25 and filter
+    # indexes for small deployments, CI and benchmarks; see services/local_vector_store.py).
+    # The local store keeps its files under LOCAL_STORE_PATH (empty: in memory only)
+    VECTOR_BACKEND = os.getenv('VECTOR_BACKEND', 'weaviate')
+    LOCAL_STORE_PATH = os.getenv('LOCAL_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                  'data', 'vector_store'))
+    WEAVIATE_COLLECTION_POINTER_TTL = float(os.getenv('WEAVIATE_COLLECTION_POINTER_TTL', '5'))  # Seconds
+    
+    # Vector index of new collection versions (applied by setup_schema.py / migrate_collection.py):
+    # 'hnsw' (uncompressed), 'hnsw_pq', 'hnsw_bq', 'hnsw_sq', 'flat' or 'flat_bq' (small projects).
+    # Compressed profiles keep only codes in RAM and rescore candidates with the full vectors.
+    VECTOR_INDEX_PROFILE = os.getenv('VECTOR_INDEX_PROFILE', 'hnsw')
+    VECTOR_HNSW_PRESET = os.getenv('VECTOR_HNSW_PRESET', 'balanced')  # 'fast', 'balanced' or 'accurate'
+    VECTOR_HNSW_EF = os.getenv('VECTOR_HNSW_EF')  # Overrides the preset (-1 = dynamic ef)
+    VECTOR_HNSW_EF_CONSTRUCTION = os.getenv('VECTOR_HNSW_EF_CONSTRUCTION')
+    VECTOR_HNSW_MAX_CONNECTIONS = os.getenv('VECTOR_HNSW_MAX_CONNECTIONS')
+    VECTOR_PQ_SEGMENTS = int(os.getenv('VECTOR_PQ_SEGMENTS', '0'))  # 0 lets Weaviate choose
+    VECTOR_PQ_CENTROIDS = int(os.getenv('VECTOR_PQ_CENTROIDS', '256'))
+    VECTOR_PQ_TRAINING_LIMIT = int(os.getenv('VECTOR_PQ_TRAINING_LIMIT', '100000'))
+    VECTOR_RESCORE_LIMIT = int(os.getenv('VECTOR_RESCORE_LIMIT', '200'))  # BQ/SQ candidates rescored
+    VECTOR_CACHE_MAX_OBJECTS = os.getenv('VECTOR_CACHE_MAX_OBJECTS')  # Vectors/codes held in RAM
+    
+    # Named vectors for new collection versions: 'content' (summary, description, labels) and
+    # 'comments' (the comment thread), fused at query time with these weights
+    WEAVIATE_NAMED_VECTORS = os.getenv('WEAVIATE_NAMED_VECTORS', 'true').lower() == 'true'
+    COMMENT_VECTOR_MAX_CHARS = int(os.getenv('COMMENT_VECTOR_MAX_CHARS', '20000'))  # Newest comments kept
+    SEARCH_VECTOR_WEIGHTS = os.getenv('SEARCH_VECTOR_WEIGHTS', 'content:0.7,comments:0.3')
+    
+    # Description/comment chunks in a companion collection (JiraComment_v{n}). With
+    # QUERY_RETRIEVAL='chunks' queries search the chunks, group them by ticket and send
+    # only the matching excerpts plus ticket headers to the LLM ('tickets' sends whole tickets)
+    COMMENT_CHUNKS_ENABLED = os.getenv('COMMENT_CHUNKS_ENABLED', 'true').lower() == 'true'
+    CHUNK_MAX_CHARS = int(os.getenv('CHUNK_MAX_CHARS', '800'))
+    QUERY_RETRIEVAL = os.getenv('QUERY_RETRIEVAL', 'chunks')  # 'chunks' or 'tickets'
+    CHUNK_SEARCH_LIMIT = int(os.getenv('CHUNK_SEARCH_LIMIT', '90'))  # Chunks retrieved per query
+    CHUNKS_PER_TICKET = int(os.getenv('CHUNKS_PER_TICKET', '3'))  # Excerpts kept per ticket
+    
+    # Where vectors are computed for new collection versions: 'weaviate' (t2v-transformers
+    # module, one object at a time) or 'client' (batched in the worker, cached in Redis by
+    # text hash and sent with every insert and query; collections use self-provided vectors)
+    EMBEDDING_MODE = os.getenv('EMBEDDING_MODE', 'weaviate')
+    EMBEDDING_PROVIDER = os.getenv('EMBEDDING_PROVIDER', 'sentence_transformers')  # Or 'hashing' (offline tests)
+    EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'sentence-transformers/multi-qa-MiniLM-L6-cos-v1')
+    EMBEDDING_DEVICE = os.getenv('EMBEDDING_DEVICE', 'cpu')
+    EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '384'))  # Hashing embedder only
+    EMBEDDING_BATCH_SIZE = int(os.getenv('EMBEDDING_BATCH_SIZE', '64'))
+    EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+    EMBEDDING_CACHE_TTL = int(os.getenv('EMBEDDING_CACHE_TTL', str(30 * 24 * 60 * 60)))
+    
     # JIRA Configuration
     JIRA_URL = os.getenv('JIRA_URL')
     JIRA_USERNAME = os.getenv('JIRA_USERNAME')
     JIRA_API_TOKEN = os.getenv('JIRA_API_TOKEN')
     
-    # Board/Project Filter - Only process tickets from this project
+    # Webhook coalescing: Jira sends one event per field edit/comment/transition, so
+    # events are collapsed into a single sync per issue once the issue has been quiet
+    # for WEBHOOK_QUIET_SECONDS (but never later than WEBHOOK_MAX_DELAY_SECONDS)
+    WEBHOOK_DEBOUNCE_ENABLED = os.getenv('WEBHOOK_DEBOUNCE_ENABLED', 'true').lower() == 'true'
+    WEBHOOK_QUIET_SECONDS = float(os.getenv('WEBHOOK_QUIET_SECONDS', '30'))
+    WEBHOOK_MAX_DELAY_SECONDS = float(os.getenv('WEBHOOK_MAX_DELAY_SECONDS', '120'))
+    
+    # Build Weaviate objects from webhook bodies when they carry every needed field
+    # (only missing fields are fetched from Jira; comment events are applied as deltas)
+    WEBHOOK_USE_PAYLOAD = os.getenv('WEBHOOK_USE_PAYLOAD', 'true').lower() == 'true'
+    
+    # Webhook edge: retried deliveries seen within the TTL are dropped, bodies are
+    # parked in Redis so broker messages carry only issue references, and enqueues
+    # arriving within the batch window share one broker message
+    WEBHOOK_DEDUP_TTL = int(os.getenv('WEBHOOK_DEDUP_TTL', '600'))
+    WEBHOOK_PAYLOAD_TTL = int(os.getenv('WEBHOOK_PAYLOAD_TTL', '3600'))
+    WEBHOOK_BATCH_WINDOW_MS = float(os.getenv('WEBHOOK_BATCH_WINDOW_MS', '20'))  # 0 disables batching
+    WEBHOOK_BATCH_MAX = int(os.getenv('WEBHOOK_BATCH_MAX', '20'))  # Events per broker message
+    
+    # Failed ingestion: transient errors are retried with exponential backoff (plus
+    # jitter), then kept in a Redis stream that is replayed every DLQ_REPLAY_INTERVAL
+    INGEST_MAX_RETRIES = int(os.getenv('INGEST_MAX_RETRIES', '5'))
+    INGEST_RETRY_BACKOFF_BASE = float(os.getenv('INGEST_RETRY_BACKOFF_BASE', '10'))  # Seconds
+    INGEST_RETRY_BACKOFF_MAX = float(os.getenv('INGEST_RETRY_BACKOFF_MAX', '600'))
+    DLQ_STREAM = os.getenv('DLQ_STREAM', 'ingest:dlq')
+    DLQ_MAX_LENGTH = int(os.getenv('DLQ_MAX_LENGTH', '100000'))
+    DLQ_REPLAY_INTERVAL = float(os.getenv('DLQ_REPLAY_INTERVAL', '300'))  # Seconds, 0 disables
+    DLQ_REPLAY_BATCH_SIZE = int(os.getenv('DLQ_REPLAY_BATCH_SIZE', '50'))
+    DLQ_REPLAY_MAX_BATCHES = int(os.getenv('DLQ_REPLAY_MAX_BATCHES', '20'))  # Per periodic run
+    DLQ_REPLAY_MIN_AGE_SECONDS = float(os.getenv('DLQ_REPLAY_MIN_AGE_SECONDS', '600'))
+    # Entries that failed permanently (4xx, bad data) or after DLQ_MAX_ATTEMPTS attempts
+    # in total (retries and replays) are parked here for inspection instead of replayed
+    DLQ_PARKED_STREAM = os.getenv('DLQ_PARKED_STREAM', 'ingest:dlq:parked')
+    DLQ_MAX_ATTEMPTS = int(os.getenv('DLQ_MAX_ATTEMPTS', '20'))
+    
+    # Local raw issue cache: every full issue version fetched from Jira's REST API is
+    # kept in SQLite so `ingest.py reindex` can rebuild Weaviate without Jira and imports
+    # skip tickets whose cached copy is current (webhook bodies are not cached)
+    RAW_CACHE_ENABLED = os.getenv('RAW_CACHE_ENABLED', 'true').lower() == 'true'
+    RAW_CACHE_PATH = os.getenv('RAW_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'raw_issues.sqlite3'))
+    
+    # Board/Project Filter - Only process tickets from these projects. JIRA_PROJECT_KEY is
+    # the default project of imports; JIRA_PROJECT_KEYS lists every project accepted
+    # from webhooks and searched by queries (comma-separated, defaults to JIRA_PROJECT_KEY)
     JIRA_PROJECT_KEY = os.getenv('JIRA_PROJECT_KEY', 'CO')  # Project key for "Critical Ops" board
+    JIRA_PROJECT_KEYS = [key.strip() for key in os.getenv('JIRA_PROJECT_KEYS', JIRA_PROJECT_KEY).split(',') if key.strip()]
+    
+    # One Weaviate tenant (own index shard) per project in new collection versions. Tenants
+    # unused for TENANT_IDLE_SECONDS are set to TENANT_COLD_STATE by a periodic task
+    # ('inactive' frees memory; 'offloaded' needs Weaviate's offload-s3 module) and are
+    # reactivated automatically by the next query or write
+    WEAVIATE_MULTI_TENANCY = os.getenv('WEAVIATE_MULTI_TENANCY', 'true').lower() == 'true'
+    TENANT_IDLE_SECONDS = float(os.getenv('TENANT_IDLE_SECONDS', str(3 * 24 * 60 * 60)))
+    TENANT_COLD_STATE = os.getenv('TENANT_COLD_STATE', 'inactive')  # 'inactive' or 'offloaded'
+    TENANT_OFFLOAD_INTERVAL = float(os.getenv('TENANT_OFFLOAD_INTERVAL', '3600'))  # Seconds, 0 disables
+    
+    # Hot/cold tiering: tickets resolved more than COLD_TIER_MONTHS ago are moved by a
+    # periodic task to a cold collection with a compressed index. Queries only search the
+    # cold tier when fewer than COLD_TIER_MIN_HITS hot tickets are within
+    # COLD_TIER_MAX_DISTANCE (cosine) of the question
+    COLD_TIER_MONTHS = float(os.getenv('COLD_TIER_MONTHS', '12'))
+    COLD_TIER_INTERVAL = float(os.getenv('COLD_TIER_INTERVAL', str(24 * 60 * 60)))  # Seconds, 0 disables
+    COLD_VECTOR_INDEX_PROFILE = os.getenv('COLD_VECTOR_INDEX_PROFILE', 'flat_bq')  # See VECTOR_INDEX_PROFILE
+    COLD_TIER_MAX_DISTANCE = float(os.getenv('COLD_TIER_MAX_DISTANCE', '0.5'))
+    COLD_TIER_MIN_HITS = int(os.getenv('COLD_TIER_MIN_HITS', '3'))
+    COLD_TIER_QUERY_LIMIT = int(os.getenv('COLD_TIER_QUERY_LIMIT', '10'))  # Cold tickets added to a prompt
     
     # Gemini AI Configuration
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')  # Must be set in .env file
+    
+    # Local Ollama server (offline LLM, see ollama/)
+    OLLAMA_URL = os.getenv('OLLAMA_URL', 'http://localhost:11434')
+    OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'tinyllama')
+    OLLAMA_TIMEOUT = int(os.getenv('OLLAMA_TIMEOUT', '300'))
+    
+    # Ticket digests: compact problem / root cause / resolution summaries generated
+    # after ingestion and used in query prompts instead of full comment threads.
+    # Off by default: both need a reachable DIGEST_LLM_PROVIDER (Ollama unless set to 'gemini')
+    DIGESTS_ENABLED = os.getenv('DIGESTS_ENABLED', 'false').lower() == 'true'
+    DIGEST_LLM_PROVIDER = os.getenv('DIGEST_LLM_PROVIDER', 'ollama')  # 'ollama' or 'gemini'
+    DIGEST_LLM_MODEL = os.getenv('DIGEST_LLM_MODEL')  # Defaults to the provider's model
+    DIGEST_MAX_INPUT_CHARS = int(os.getenv('DIGEST_MAX_INPUT_CHARS', '12000'))
+    DIGEST_TASK_PRIORITY = 9  # Lowest broker priority (0 is highest on Redis)
+    QUERY_USE_DIGESTS = os.getenv('QUERY_USE_DIGESTS', 'false').lower() == 'true'
+    
+    # Query answer generation (map-reduce calls included)
+    QUERY_LLM_PROVIDER = os.getenv('QUERY_LLM_PROVIDER', 'gemini')  # 'gemini' or 'ollama'
+    QUERY_LLM_MODEL = os.getenv('QUERY_LLM_MODEL', 'gemini-2.5-flash' if QUERY_LLM_PROVIDER == 'gemini' else None)
+    # 'auto' switches to map-reduce when the packed ticket context exceeds the threshold
+    ANSWER_MODE = os.getenv('ANSWER_MODE', 'auto')  # 'auto', 'single' or 'map_reduce'
+    MAP_REDUCE_THRESHOLD_CHARS = int(os.getenv('MAP_REDUCE_THRESHOLD_CHARS', '60000'))
+    MAP_REDUCE_GROUP_CHARS = int(os.getenv('MAP_REDUCE_GROUP_CHARS', '12000'))  # Ticket text per map call
+    MAP_REDUCE_CONCURRENCY = int(os.getenv('MAP_REDUCE_CONCURRENCY', '4'))  # Parallel map calls
+    MAP_FACTS_CACHE_TTL = int(os.getenv('MAP_FACTS_CACHE_TTL', str(7 * 24 * 60 * 60)))
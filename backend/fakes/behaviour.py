@@ -0,0 +1,120 @@
+import math
+import random
+import threading
+import time
+from collections import Counter
+
+from flask import jsonify, request
+
+
+class FakeBehaviour:
+    """Injected latency, rate limiting and errors of a fake HTTP service, plus counters.
+
+    Shared by the local Jira and LLM stand-ins (fakes/jira_server.py,
+    fakes/llm_server.py): ``latency`` seconds (+/- ``jitter``) on every
+    request, a token bucket of ``rate_limit`` requests/s answered with 429 +
+    Retry-After, and a share ``error_rate`` of 500/503 responses.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=0.0, burst=None, retry_after=None,
+                 error_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        # Token bucket: rate_limit requests/s on average, bursts of up to ``burst``
+        self.rate_limit = rate_limit
+        self.burst = burst or max(1.0, rate_limit)
+        self.retry_after = retry_after
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._tokens = self.burst
+        self._refilled = time.monotonic()
+        self._lock = threading.Lock()
+        self.requests = Counter()
+        self.responses = Counter()
+        # What the service handed out (issues, generated tokens, ...)
+        self.served = Counter()
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.responses.clear()
+            self.served.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'requests': dict(self.requests), 'responses': {str(k): v for k, v in self.responses.items()},
+                    'served': dict(self.served)}
+
+    def record(self, counter, name, count=1):
+        """Add ``count`` to ``name`` in the 'requests', 'responses' or 'served' counter"""
+        with self._lock:
+            getattr(self, counter)[name] += count
+
+    def admit(self):
+        """Seconds to wait before retrying when the rate limit is exceeded, else None"""
+        if not self.rate_limit:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return self.retry_after or max(1, math.ceil((1 - self._tokens) / self.rate_limit))
+
+    def injected_error(self):
+        with self._lock:
+            if self.error_rate and self._rng.random() < self.error_rate:
+                return self._rng.choice((500, 503))
+            return None
+
+    def delay(self):
+        with self._lock:
+            seconds = self.latency + (self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+def error_response(status, message, headers=None):
+    """Jira-style error body ({'errorMessages': [...]}) with ``status``"""
+    response = jsonify({'errorMessages': [message], 'errors': {}})
+    response.status_code = status
+    for name, value in (headers or {}).items():
+        response.headers[name] = value
+    return response
+
+
+def install_behaviour(app, behaviour):
+    """Apply ``behaviour`` to every request of ``app`` except the /_fake/ control endpoints"""
+
+    @app.before_request
+    def inject():
+        if request.path.startswith('/_fake/'):
+            return None
+        behaviour.record('requests', request.url_rule.endpoint if request.url_rule else 'unknown')
+        behaviour.delay()
+        wait = behaviour.admit()
+        if wait is not None:
+            return error_response(429, 'Rate limit exceeded.', {
+                'Retry-After': str(wait), 'X-RateLimit-Limit': str(int(behaviour.rate_limit))})
+        status = behaviour.injected_error()
+        if status is not None:
+            return error_response(status, 'Injected failure')
+        return None
+
+    @app.after_request
+    def count(response):
+        if not request.path.startswith('/_fake/'):
+            behaviour.record('responses', response.status_code)
+        return response
+
+
+def serve_in_thread(app, host='127.0.0.1', port=0):
+    """Run ``app`` on a background thread (threaded server); returns (server, base_url).
+    Stop it with server.shutdown()."""
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='fake-http', daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Write a synthetic Jira corpus (fakes/jira_corpus.py) as JSON lines
+One REST v3 issue per line, streamed, so corpora of any size fit in constant
+memory. The same --seed always produces the same issues.
+
+Usage (from backend/):
+    python3 fakes/generate_corpus.py --size 100000 --seed 1 -o corpus.jsonl
+    python3 fakes/generate_corpus.py --size 1000 --stats        (distribution summary only)
+    python3 fakes/generate_corpus.py --webhooks 5000 -o events.jsonl  (webhook bodies instead)
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes.jira_corpus import JiraCorpus, adf_text, write_jsonl  # noqa: E402
+
+
+def show_stats(corpus):
+    comments, description_chars, statuses = [], [], {}
+    for issue in corpus.issues():
+        fields = issue['fields']
+        comments.append(len(fields['comment']['comments']))
+        description_chars.append(len(adf_text(fields['description'])))
+        statuses[fields['status']['name']] = statuses.get(fields['status']['name'], 0) + 1
+    comments.sort()
+    print("=" * 70)
+    print(f"📊 CORPUS {corpus.project} - {len(corpus)} issues, seed {corpus.seed}")
+    print("=" * 70)
+    print(f"Comments per issue: median {statistics.median(comments):g}, "
+          f"p90 {comments[int(0.9 * len(comments))]}, p99 {comments[int(0.99 * len(comments))]}, "
+          f"max {comments[-1]}, total {sum(comments)}")
+    print(f"Description chars:  median {statistics.median(description_chars):g}, max {max(description_chars)}")
+    print("Statuses:           " + ", ".join(f"{name} {count}" for name, count in sorted(statuses.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=1000, help='Number of issues')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--project', default='CO')
+    parser.add_argument('--comment-median', type=float, default=3)
+    parser.add_argument('--max-comments', type=int, default=1000)
+    parser.add_argument('--webhooks', type=int, help='Write this many webhook bodies instead of issues')
+    parser.add_argument('--stats', action='store_true', help='Print distributions instead of writing JSON')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    corpus = JiraCorpus(size=args.size, seed=args.seed, project=args.project,
+                        comment_median=args.comment_median, max_comments=args.max_comments)
+    if args.stats:
+        show_stats(corpus)
+        return
+
+    started = time.monotonic()
+    handle = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.webhooks:
+            count = 0
+            for body in corpus.webhook_events(args.webhooks, seed=args.seed):
+                handle.write(json.dumps(body, ensure_ascii=False) + "\n")
+                count += 1
+        else:
+            count = write_jsonl(corpus, handle)
+    finally:
+        if args.output:
+            handle.close()
+    if args.output:
+        print(f"✅ Wrote {count} {'webhook bodies' if args.webhooks else 'issues'} to {args.output} "
+              f"in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,441 @@
+import json
+import math
+import random
+import re
+from datetime import datetime, timedelta, timezone
+
+# Synthetic Jira Cloud corpus for scale and load tests.
+#
+# Issues are REST v3 JSON (what /rest/api/3/issue/{key} returns for the fields
+# the backend reads) with Atlassian Document Format descriptions and comments:
+# headings, paragraphs with inline code/links/mentions, ordered lists with
+# nested bullet lists and code blocks. Comment thread lengths and description
+# sizes are long-tailed (log-normal), like real trackers where most tickets have
+# a couple of comments and a few have hundreds.
+#
+# Every issue is derived from (seed, number) alone, so a corpus of any size is
+# never held in memory: issues are streamed in order or looked up by key, and
+# the same seed always yields the same corpus.
+
+SYSTEMS = ["payment gateway", "login service", "order queue", "search index", "email relay", "billing export",
+           "inventory sync", "report scheduler", "file upload", "SSO bridge", "push notifier", "audit log",
+           "pricing engine", "customer portal", "mobile API", "data warehouse loader", "webhook dispatcher",
+           "invoice generator", "feature flag service", "session store", "CDN edge config", "metrics pipeline"]
+SYMPTOMS = ["times out", "returns 500 errors", "drops messages", "is extremely slow", "rejects valid requests",
+            "crashes on startup", "shows stale data", "duplicates records", "leaks memory", "deadlocks under load",
+            "loses the user session", "fails health checks", "sends duplicate notifications", "ignores retries"]
+FIXES = ["rotated the expired TLS certificate", "raised the connection pool limit", "rebuilt the corrupted index",
+         "rolled back the faulty deployment", "cleared the poisoned cache entries", "fixed the cron timezone",
+         "increased the worker memory limit", "renewed the integration API token", "patched the retry loop",
+         "re-enabled the disabled feature flag", "vacuumed the bloated database table", "replaced the failing disk",
+         "added the missing database index", "pinned the library to the previous release",
+         "split the oversized batch job", "fixed the race in the session refresh"]
+CHATTER = ["Any update on this?", "Customer is asking again.", "Looking into it now.", "Adding logs from prod.",
+           "Escalating to the on-call engineer.", "Still reproducible this morning.", "Linked a related incident.",
+           "Can we get a workaround for the customer in the meantime?", "Moving this to the current sprint.",
+           "I could not reproduce this on staging.", "Attaching a HAR file from the affected user.",
+           "Same thing happened last quarter, see the linked ticket.", "Deploying a fix candidate to staging.",
+           "Monitoring after the deploy, looks stable so far.", "Reopening, the customer still sees it."]
+ENVIRONMENTS = ["production", "staging", "EU region", "US region", "the mobile app", "the admin console"]
+LANGUAGES = ["python", "java", "javascript", "sql", "bash", "yaml"]
+LABELS = ["customer-reported", "regression", "performance", "security", "tech-debt", "p1-incident", "flaky",
+          "backend", "frontend", "infra", "data", "billing", "mobile", "needs-triage", "sla-breach"]
+FIRST_NAMES = ["Asha", "Ben", "Chen", "Dana", "Emeka", "Farah", "Gustavo", "Hana", "Ivan", "Julia", "Kofi",
+               "Lena", "Mateo", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tariq", "Uma", "Viktor"]
+LAST_NAMES = ["Singh", "Okafor", "Müller", "Tanaka", "Silva", "Kowalski", "Haddad", "Novak", "Reyes", "Larsen"]
+# (name, weight, resolved)
+STATUSES = [("Open", 20, False), ("In Progress", 15, False), ("Code Review", 5, False), ("Blocked", 3, False),
+            ("Done", 45, True), ("Closed", 10, True), ("Won't Fix", 2, True)]
+PRIORITIES = [("Highest", 3), ("High", 17), ("Medium", 55), ("Low", 20), ("Lowest", 5)]
+ISSUE_TYPES = [("Bug", 55), ("Task", 25), ("Story", 15), ("Incident", 5)]
+
+JIRA_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+def jira_date(value):
+    """Jira's timestamp format (2024-03-01T10:00:00.000+0000)"""
+    return value.strftime(JIRA_DATE_FORMAT)[:-3] + "+0000"
+
+
+def _weighted(rng, choices):
+    return rng.choices([choice[0] for choice in choices], weights=[choice[1] for choice in choices])[0]
+
+
+def _long_tail(rng, median, sigma, cap):
+    """Log-normal count: most values near ``median``, a few far above (capped)"""
+    if not median:
+        return 0
+    return max(0, min(cap, int(rng.lognormvariate(math.log(median + 1), sigma)) - 1))
+
+
+# ------------------------------------------------------------------ ADF
+
+def text(value, *marks, href=None):
+    node = {"type": "text", "text": value}
+    node_marks = [{"type": mark} for mark in marks]
+    if href:
+        node_marks.append({"type": "link", "attrs": {"href": href}})
+    if node_marks:
+        node["marks"] = node_marks
+    return node
+
+
+def paragraph(*content):
+    return {"type": "paragraph", "content": [text(item) if isinstance(item, str) else item for item in content]}
+
+
+def heading(value, level=3):
+    return {"type": "heading", "attrs": {"level": level}, "content": [text(value)]}
+
+
+def code_block(code, language=None):
+    node = {"type": "codeBlock", "content": [text(code)]}
+    if language:
+        node["attrs"] = {"language": language}
+    return node
+
+
+def list_item(*content):
+    return {"type": "listItem", "content": list(content)}
+
+
+def bullet_list(*items):
+    return {"type": "bulletList", "content": list(items)}
+
+
+def ordered_list(*items):
+    return {"type": "orderedList", "attrs": {"order": 1}, "content": list(items)}
+
+
+def mention(account_id, name):
+    return {"type": "mention", "attrs": {"id": account_id, "text": f"@{name}", "accessLevel": ""}}
+
+
+def doc(*content):
+    return {"type": "doc", "version": 1, "content": list(content)}
+
+
+def adf_text(node):
+    """Plain text of an ADF node and everything below it (lists and code blocks included)"""
+    if isinstance(node, str):
+        return node
+    if not isinstance(node, dict):
+        return ""
+    if node.get("type") == "text":
+        return node.get("text", "")
+    if node.get("type") == "mention":
+        return (node.get("attrs") or {}).get("text", "")
+    if node.get("type") == "hardBreak":
+        return "\n"
+    parts = [adf_text(child) for child in node.get("content") or []]
+    inline = node.get("type") in ("paragraph", "heading")
+    return ("" if inline else "\n").join(part for part in parts if part)
+
+
+WIKI_MARKS = {"strong": "*{}*", "em": "_{}_", "code": "{{{{{}}}}}", "strike": "-{}-"}
+
+
+def wiki_markup(node, bullets=""):
+    """Wiki markup of an ADF node, as Jira webhooks render descriptions and comment bodies"""
+    if not isinstance(node, dict):
+        return ""
+    kind = node.get("type")
+    attrs = node.get("attrs") or {}
+    children = node.get("content") or []
+    if kind == "text":
+        value = node.get("text", "")
+        for mark in node.get("marks") or []:
+            if mark.get("type") == "link":
+                value = f"[{value}|{(mark.get('attrs') or {}).get('href', '')}]"
+            elif mark.get("type") in WIKI_MARKS:
+                value = WIKI_MARKS[mark["type"]].format(value)
+        return value
+    if kind == "mention":
+        return f"[~accountid:{attrs.get('id', '')}]"
+    if kind == "hardBreak":
+        return "\n"
+    if kind == "paragraph":
+        return "".join(wiki_markup(child) for child in children)
+    if kind == "heading":
+        return f"h{attrs.get('level', 3)}. " + "".join(wiki_markup(child) for child in children)
+    if kind == "codeBlock":
+        language = f":{attrs['language']}" if attrs.get("language") else ""
+        return f"{{code{language}}}\n" + "".join(wiki_markup(child) for child in children) + "\n{code}"
+    if kind in ("bulletList", "orderedList"):
+        prefix = bullets + ("*" if kind == "bulletList" else "#")
+        return "\n".join(wiki_markup(item, prefix) for item in children)
+    if kind == "listItem":
+        return "\n".join(wiki_markup(child, bullets) if child.get("type") in ("bulletList", "orderedList")
+                         else f"{bullets} {wiki_markup(child)}" for child in children)
+    return "\n\n".join(wiki_markup(child, bullets) for child in children)
+
+
+# --------------------------------------------------------------- corpus
+
+class JiraCorpus:
+    """A seeded, streamable synthetic Jira project.
+
+    ``size`` issues numbered 1..size (keys PROJECT-1..PROJECT-size) created
+    between ``start`` and ``end``. issue(n) builds one issue on demand;
+    issues() streams them in creation order.
+    """
+
+    def __init__(self, size=1000, seed=0, project="CO", project_name=None, start=None, end=None,
+                 comment_median=3, comment_sigma=1.2, max_comments=1000, users=40):
+        self.size = size
+        self.seed = seed
+        self.project = project
+        self.project_name = project_name or f"{project} Operations"
+        self.end = end or datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.start = start or self.end - timedelta(days=3 * 365)
+        self.comment_median = comment_median
+        self.comment_sigma = comment_sigma
+        self.max_comments = max_comments
+        people = random.Random(f"{seed}:people")
+        self.users = [
+            {"accountId": f"5b10a2844c20165700ede{n:03d}",
+             "displayName": f"{people.choice(FIRST_NAMES)} {people.choice(LAST_NAMES)}"}
+            for n in range(users)
+        ]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return self.issues()
+
+    def key(self, number):
+        return f"{self.project}-{number}"
+
+    def issue_id(self, number):
+        return str(10000 + number)
+
+    def number(self, key_or_id):
+        """Issue number of a key (CO-12) or id (10012), None when it is not in the corpus"""
+        value = str(key_or_id)
+        if value.startswith(f"{self.project}-"):
+            value = value[len(self.project) + 1:]
+            number = int(value) if value.isdigit() else None
+        else:
+            number = int(value) - 10000 if value.isdigit() else None
+        return number if number is not None and 1 <= number <= self.size else None
+
+    def created(self, number):
+        """Creation time: evenly spread over the corpus window with some jitter"""
+        rng = random.Random(f"{self.seed}:{number}:created")
+        span = (self.end - self.start).total_seconds()
+        offset = span * (number - 1 + rng.random() * 0.9) / self.size
+        return self.start + timedelta(seconds=offset)
+
+    def issues(self, start=1, stop=None):
+        """Stream issues ``start``..``stop`` (inclusive, default: the last one)"""
+        for number in range(start, (stop or self.size) + 1):
+            yield self.issue(number)
+
+    def get(self, key_or_id):
+        number = self.number(key_or_id)
+        return self.issue(number) if number is not None else None
+
+    def _user(self, rng):
+        return dict(self.users[min(len(self.users) - 1, int(rng.paretovariate(1.5)) - 1)],
+                    accountType="atlassian", active=True)
+
+    def issue(self, number):
+        rng = random.Random(f"{self.seed}:{number}")
+        system, symptom, fix = rng.choice(SYSTEMS), rng.choice(SYMPTOMS), rng.choice(FIXES)
+        environment = rng.choice(ENVIRONMENTS)
+        created = self.created(number)
+        status = _weighted(rng, [(name, weight) for name, weight, _ in STATUSES])
+        resolved = next(done for name, _, done in STATUSES if name == status)
+        comments = self._comments(rng, number, created, system, fix if resolved else None)
+        activity = [created] + [datetime.fromisoformat(c["updated"].replace("+0000", "+00:00")) for c in comments]
+        resolution = max(activity) + timedelta(minutes=rng.randint(5, 600)) if resolved else None
+        updated = max(activity + ([resolution] if resolution else []))
+        updated = min(updated, max(self.end, created))
+        assignee = self._user(rng) if rng.random() < 0.8 else None
+        return {
+            "expand": "renderedFields,names,schema,operations,editmeta,changelog,versionedRepresentations",
+            "id": self.issue_id(number),
+            "self": f"https://fake.atlassian.net/rest/api/3/issue/{self.issue_id(number)}",
+            "key": self.key(number),
+            "fields": {
+                "summary": f"{system.capitalize()} {symptom} in {environment}",
+                "description": self._description(rng, system, symptom, environment),
+                "issuetype": {"name": _weighted(rng, ISSUE_TYPES)},
+                "status": {"name": status, "statusCategory": {"key": "done" if resolved else "indeterminate"}},
+                "priority": {"name": _weighted(rng, PRIORITIES)},
+                "project": {"key": self.project, "name": self.project_name, "id": "10000"},
+                "labels": sorted(set(rng.sample(LABELS, _long_tail(rng, 1, 0.6, 5)) +
+                                     [system.replace(" ", "-").lower()])),
+                "assignee": assignee,
+                "reporter": self._user(rng),
+                "created": jira_date(created),
+                "updated": jira_date(updated),
+                "resolutiondate": jira_date(resolution) if resolution else None,
+                "resolution": {"name": "Done" if status != "Won't Fix" else "Won't Fix"} if resolved else None,
+                "customfield_10000": None if rng.random() < 0.7 else "{}",
+                "attachment": [
+                    {"id": str(number * 100 + n), "filename": rng.choice(["app.log", "screenshot.png", "trace.har",
+                                                                          "config.yaml", "heap.hprof"]),
+                     "size": rng.randint(1_000, 5_000_000), "created": jira_date(created)}
+                    for n in range(_long_tail(rng, 0.5, 1.0, 20))
+                ],
+                "comment": {"comments": comments, "maxResults": len(comments), "total": len(comments), "startAt": 0},
+            },
+        }
+
+    def _description(self, rng, system, symptom, environment):
+        blocks = [paragraph(f"Since {rng.choice(['this morning', 'yesterday', 'the last deploy', 'Monday'])} "
+                            f"the {system} {symptom} in {environment}. ",
+                            text("Impact", "strong"), f": {rng.randint(1, 99)}% of requests.")]
+        if rng.random() < 0.6:
+            steps = [list_item(paragraph(step)) for step in
+                     (f"Open the {system} dashboard", f"Trigger a request against {environment}",
+                      "Wait for the response")[:rng.randint(2, 3)]]
+            # Nested bullets under the last step: observed vs expected
+            steps[-1]["content"].append(bullet_list(
+                list_item(paragraph("Observed: the request ", text(symptom, "em"))),
+                list_item(paragraph("Expected: a ", text("200 OK", "code"), " within 2s")),
+            ))
+            blocks += [heading("Steps to reproduce"), ordered_list(*steps)]
+        if rng.random() < 0.5:
+            blocks += [heading("Logs"), code_block(self._log(rng, system), rng.choice(LANGUAGES))]
+        for _ in range(_long_tail(rng, 1, 1.0, 30)):
+            blocks.append(paragraph(" ".join(rng.choice(CHATTER) for _ in range(rng.randint(1, 4)))))
+        if rng.random() < 0.3:
+            blocks.append(paragraph("Runbook: ", text("incident playbook", href="https://wiki.example.com/runbook")))
+        return doc(*blocks)
+
+    @staticmethod
+    def _log(rng, system):
+        service = re.sub(r"[^a-z]+", "_", system.lower())
+        lines = [f"2024-03-0{rng.randint(1, 9)} 1{rng.randint(0, 9)}:0{rng.randint(0, 9)}:00 ERROR "
+                 f"{service}.worker - {rng.choice(['TimeoutError', 'ConnectionResetError', 'KeyError', 'OOMKilled'])}"
+                 for _ in range(rng.randint(1, 6))]
+        lines.append(f'  File "/srv/{service}/handler.py", line {rng.randint(10, 900)}, in handle')
+        return "\n".join(lines)
+
+    def _comments(self, rng, number, created, system, fix):
+        count = _long_tail(rng, self.comment_median, self.comment_sigma, self.max_comments)
+        # The fix is written up somewhere in the second half of a resolved ticket's thread
+        fix_at = rng.randint(count // 2, count) if fix else None
+        comments = []
+        when = created
+        for n in range(count + (1 if fix else 0)):
+            when = min(when + timedelta(minutes=int(rng.expovariate(1 / 240)) + 1), self.end)
+            author = self._user(rng)
+            if n == fix_at:
+                body = doc(paragraph(f"Root cause found: we {fix} on the {system}."),
+                           code_block(f"kubectl rollout restart deployment/{system.replace(' ', '-')}", "bash"))
+            elif rng.random() < 0.1:
+                other = rng.choice(self.users)
+                body = doc(paragraph(mention(other["accountId"], other["displayName"]), " ",
+                                     rng.choice(CHATTER)))
+            elif rng.random() < 0.08:
+                body = doc(paragraph("Output from prod:"), code_block(self._log(rng, system)))
+            else:
+                body = doc(paragraph(rng.choice(CHATTER)))
+            edited = when + timedelta(minutes=rng.randint(1, 90)) if rng.random() < 0.05 else when
+            comments.append({
+                "self": f"https://fake.atlassian.net/rest/api/3/issue/{self.issue_id(number)}/comment/{number * 10000 + n}",
+                "id": str(number * 10000 + n),
+                "author": author,
+                "updateAuthor": author,
+                "body": body,
+                "created": jira_date(when),
+                "updated": jira_date(min(edited, self.end)),
+                "jsdPublic": True,
+            })
+        return comments
+
+    # ------------------------------------------------------------ JQL
+
+    def search(self, jql=None):
+        """Issue numbers matching the JQL subset the importers send:
+        ``project = X``, ``status = "S"`` / ``status in ("S", ...)``, ``key in (...)``
+        joined with AND, and ``ORDER BY created ASC|DESC``."""
+        query = jql or ""
+        order = re.search(r"\s+ORDER\s+BY\s+(\w+)\s*(ASC|DESC)?\s*$", query, re.IGNORECASE)
+        descending = bool(order and (order.group(2) or "").upper() == "DESC")
+        where = query[:order.start()] if order else query
+        project, statuses, keys = None, None, None
+        for clause in re.split(r"\s+AND\s+", where.strip(), flags=re.IGNORECASE) if where.strip() else []:
+            match = re.match(r"(\w+)\s*(=|in)\s*(.+)$", clause.strip(), re.IGNORECASE)
+            if not match:
+                raise ValueError(f"Unsupported JQL clause: {clause!r}")
+            name, values = match.group(1).lower(), [v.strip().strip("'\"") for v in
+                                                   match.group(3).strip().strip("()").split(",")]
+            if name == "project":
+                project = values[0]
+            elif name == "status":
+                statuses = set(values)
+            elif name in ("key", "issuekey"):
+                keys = {self.number(value) for value in values} - {None}
+            else:
+                raise ValueError(f"Unsupported JQL field: {name!r}")
+        if project is not None and project != self.project:
+            return []
+        numbers = sorted(keys) if keys is not None else range(1, self.size + 1)
+        if statuses is not None:
+            numbers = [n for n in numbers if self._status(n) in statuses]
+        return list(reversed(numbers)) if descending else list(numbers)
+
+    def _status(self, number):
+        # Same draws as issue() up to the status, without building the issue
+        rng = random.Random(f"{self.seed}:{number}")
+        rng.choice(SYSTEMS), rng.choice(SYMPTOMS), rng.choice(FIXES), rng.choice(ENVIRONMENTS)
+        return _weighted(rng, [(name, weight) for name, weight, _ in STATUSES])
+
+    # ------------------------------------------------------- webhooks
+
+    def webhook_events(self, count, seed=None, timestamp=None):
+        """Stream ``count`` Jira webhook bodies (issue updates, new and edited
+        comments) against random issues of the corpus, shaped like Jira Cloud
+        deliveries: descriptions and comment bodies are wiki markup strings."""
+        rng = random.Random(f"{self.seed}:events:{seed}")
+        timestamp = timestamp or int(self.end.timestamp() * 1000)
+        for n in range(count):
+            number = min(self.size, int(rng.paretovariate(1.1)) if rng.random() < 0.5 else rng.randint(1, self.size))
+            issue = webhook_issue(self.issue(number))
+            timestamp += rng.randint(1, 5000)
+            now = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+            issue["fields"]["updated"] = jira_date(now)
+            kind = rng.random()
+            body = {"timestamp": timestamp, "issue": issue, "user": self._user(rng)}
+            if kind < 0.5:
+                author = self._user(rng)
+                comment = {"id": str(90_000_000 + n), "author": author, "updateAuthor": author,
+                           "body": rng.choice(CHATTER), "created": jira_date(now), "updated": jira_date(now)}
+                issue["fields"]["comment"]["comments"].append(comment)
+                issue["fields"]["comment"]["total"] += 1
+                body.update(webhookEvent="comment_created", comment=comment)
+            elif kind < 0.6 and issue["fields"]["comment"]["comments"]:
+                comment = dict(rng.choice(issue["fields"]["comment"]["comments"]), updated=jira_date(now))
+                comment["body"] = f"{comment['body']} (edited)"
+                body.update(webhookEvent="comment_updated", comment=comment)
+            else:
+                status = _weighted(rng, [(name, weight) for name, weight, _ in STATUSES])
+                changed = {"field": "status", "fromString": issue["fields"]["status"]["name"], "toString": status}
+                issue["fields"]["status"] = {"name": status}
+                body.update(webhookEvent="jira:issue_updated", issue_event_type_name="issue_generic",
+                            changelog={"id": str(80_000_000 + n), "items": [changed]})
+            yield body
+
+
+def webhook_issue(issue):
+    """An issue as Jira webhooks deliver it: ADF replaced by wiki markup"""
+    fields = dict(issue["fields"])
+    fields["description"] = wiki_markup(fields.get("description")) or None
+    thread = fields.get("comment") or {}
+    fields["comment"] = dict(thread, comments=[dict(comment, body=wiki_markup(comment.get("body")))
+                                               for comment in thread.get("comments") or []])
+    return {"id": issue["id"], "key": issue["key"], "self": issue["self"], "fields": fields}
+
+
+def write_jsonl(corpus, handle, start=1, stop=None):
+    """Stream a corpus to a file object, one issue JSON per line; returns the count"""
+    count = 0
+    for issue in corpus.issues(start, stop):
+        handle.write(json.dumps(issue, ensure_ascii=False) + "\n")
+        count += 1
+    return count
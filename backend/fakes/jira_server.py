@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Jira Cloud REST API, serving a synthetic corpus
+Covers what JiraService and the importers call, so ingestion can be measured and
+regression-tested without credentials (point JIRA_URL at it):
+
+  GET       /rest/api/3/issue/{key or id}   (?fields=a,b)
+  GET/POST  /rest/api/3/search              startAt/maxResults/total pagination
+  GET/POST  /rest/api/3/search/jql          nextPageToken/isLast pagination
+  GET       /rest/api/3/myself
+  GET       /_fake/stats, POST /_fake/reset  request and response counters
+
+Behaviour of the real service can be injected: per-request latency (with jitter),
+a request rate limit answered with 429 + Retry-After, the 410 Gone that Jira now
+returns for the removed /rest/api/3/search, and a random share of 500/503 errors.
+
+Usage (from backend/):
+    python3 fakes/jira_server.py --size 10000 --port 8090 [--latency 0.05] [--rate-limit 50]
+        [--error-rate 0.01] [--deprecate-search]
+    JIRA_URL=http://localhost:8090 python3 ingest.py jql --project CO
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes.behaviour import FakeBehaviour, error_response, install_behaviour  # noqa: E402
+from fakes.jira_corpus import JiraCorpus  # noqa: E402
+from fakes.jira_service import decode_page_token, encode_page_token, select_fields  # noqa: E402
+
+# Jira Cloud caps search pages at 100 issues
+MAX_RESULTS = 100
+SEARCH_REMOVED = ("The requested API has been removed. Please migrate to the /rest/api/3/search/jql API. "
+                  "A full migration guideline is available at https://developer.atlassian.com/changelog/#CHANGE-2046")
+
+
+class FakeJiraBehaviour(FakeBehaviour):
+    """FakeBehaviour plus the 410 Gone of the removed /rest/api/3/search"""
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=0.0, burst=None, retry_after=None,
+                 error_rate=0.0, deprecate_search=False, seed=0):
+        super().__init__(latency=latency, jitter=jitter, rate_limit=rate_limit, burst=burst,
+                         retry_after=retry_after, error_rate=error_rate, seed=seed)
+        self.deprecate_search = deprecate_search
+
+
+def _search_params():
+    """jql/maxResults/fields/startAt/nextPageToken from the query string (GET) or JSON body (POST)"""
+    if request.method == 'POST':
+        body = request.get_json(silent=True) or {}
+    else:
+        body = dict(request.args)
+        if 'fields' in body:
+            body['fields'] = body['fields'].split(',')
+    fields = body.get('fields')
+    if fields in (['*all'], '*all'):
+        fields = None
+    return (body.get('jql') or '', min(int(body.get('maxResults') or 50), MAX_RESULTS), fields,
+            int(body.get('startAt') or 0), body.get('nextPageToken'))
+
+
+def create_app(corpus=None, behaviour=None):
+    """Flask app serving ``corpus`` (a JiraCorpus) with ``behaviour`` (a FakeJiraBehaviour)"""
+    corpus = corpus if corpus is not None else JiraCorpus()
+    behaviour = behaviour if behaviour is not None else FakeJiraBehaviour()
+    app = Flask(__name__)
+    app.config['FAKE_JIRA_CORPUS'] = corpus
+    app.config['FAKE_JIRA_BEHAVIOUR'] = behaviour
+    searches = {}
+    searches_lock = threading.Lock()
+
+    def matches(jql):
+        with searches_lock:
+            numbers = searches.get(jql)
+        if numbers is None:
+            numbers = corpus.search(jql)
+            with searches_lock:
+                searches.clear()
+                searches[jql] = numbers
+        return numbers
+
+    install_behaviour(app, behaviour)
+
+    @app.route('/rest/api/3/issue/<issue_id>', methods=['GET'])
+    def issue(issue_id):
+        found = corpus.get(issue_id)
+        if found is None:
+            return error_response(404, 'Issue does not exist or you do not have permission to see it.')
+        fields = request.args.get('fields')
+        behaviour.record('served', 'issues')
+        return jsonify(select_fields(found, fields.split(',') if fields else None))
+
+    @app.route('/rest/api/3/search', methods=['GET', 'POST'])
+    def search():
+        if behaviour.deprecate_search:
+            return error_response(410, SEARCH_REMOVED)
+        try:
+            jql, max_results, fields, start_at, _ = _search_params()
+            numbers = matches(jql)
+        except ValueError as e:
+            return error_response(400, str(e))
+        page = numbers[start_at:start_at + max_results]
+        return jsonify({
+            'expand': 'schema,names',
+            'startAt': start_at,
+            'maxResults': max_results,
+            'total': len(numbers),
+            'issues': [select_fields(corpus.issue(number), fields) for number in page],
+        })
+
+    @app.route('/rest/api/3/search/jql', methods=['GET', 'POST'])
+    def search_jql():
+        try:
+            jql, max_results, fields, _, token = _search_params()
+            numbers = matches(jql)
+            start_at = decode_page_token(token) if token else 0
+        except ValueError as e:
+            return error_response(400, str(e))
+        end = start_at + max_results
+        # Without a fields list the new endpoint returns ids only
+        issues = [select_fields(corpus.issue(number), fields) if fields else {'id': corpus.issue_id(number)}
+                  for number in numbers[start_at:end]]
+        body = {'issues': issues, 'isLast': end >= len(numbers)}
+        if end < len(numbers):
+            body['nextPageToken'] = encode_page_token(end)
+        return jsonify(body)
+
+    @app.route('/rest/api/3/myself', methods=['GET'])
+    def myself():
+        email = request.authorization.username if request.authorization else 'fake@example.com'
+        return jsonify({'accountId': '5b10a2844c20165700ede000', 'emailAddress': email,
+                        'displayName': 'Fake Jira User', 'active': True, 'timeZone': 'UTC',
+                        'accountType': 'atlassian'})
+
+    @app.route('/_fake/stats', methods=['GET'])
+    def stats():
+        return jsonify(behaviour.stats())
+
+    @app.route('/_fake/reset', methods=['POST'])
+    def reset():
+        behaviour.reset()
+        return jsonify({'status': 'ok'})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=10000, help='Issues in the corpus')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--project', default='CO')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- seconds on top of --latency')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Requests/s before 429s (0: unlimited)')
+    parser.add_argument('--burst', type=float, help='Requests allowed in a burst (default: --rate-limit)')
+    parser.add_argument('--retry-after', type=int, help='Fixed Retry-After seconds on 429s')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with 500/503')
+    parser.add_argument('--deprecate-search', action='store_true', help='Answer /rest/api/3/search with 410 Gone')
+    args = parser.parse_args()
+
+    corpus = JiraCorpus(size=args.size, seed=args.seed, project=args.project)
+    behaviour = FakeJiraBehaviour(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                                  burst=args.burst, retry_after=args.retry_after, error_rate=args.error_rate,
+                                  deprecate_search=args.deprecate_search, seed=args.seed)
+    print("=" * 70)
+    print(f"🧪 FAKE JIRA - {args.project}, {args.size} issues (seed {args.seed}) on http://{args.host}:{args.port}")
+    print("=" * 70)
+    create_app(corpus, behaviour).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import base64
+import json
+import threading
+import time
+from collections import Counter
+import requests
+from fakes.jira_corpus import JiraCorpus
+
+
+def http_error(status, url, retry_after=None):
+    """requests.HTTPError carrying a response with ``status``, as raise_for_status() raises it"""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return requests.HTTPError(f"{status} Client Error for url: {url}", response=response)
+
+
+def select_fields(issue, fields):
+    """``issue`` with only the requested fields (plus id/key), as Jira's ``fields`` parameter does"""
+    if not fields:
+        return issue
+    wanted = set(fields)
+    return dict(issue, fields={name: value for name, value in issue['fields'].items() if name in wanted})
+
+
+class FakeJiraService:
+    """In-process stand-in for services.jira_service.JiraService backed by a JiraCorpus.
+
+    Same methods, arguments and results (including requests.HTTPError for
+    404s), so ingestion pipelines, webhook tasks and benchmarks run against
+    any corpus size without network access. ``latency`` (seconds) is slept on
+    every call; ``calls`` counts calls per method. Full fetches are kept in
+    ``raw_store`` when one is given, like the real service.
+    """
+
+    base_url = "https://fake.atlassian.net"
+
+    def __init__(self, corpus=None, latency=0.0, raw_store=None, max_results=100):
+        self.corpus = corpus if corpus is not None else JiraCorpus()
+        self.latency = latency
+        self.raw_store = raw_store
+        # Jira Cloud caps search pages at 100 issues whatever maxResults asks for
+        self.max_results = max_results
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        # Matches per JQL (pages of one search are requested repeatedly)
+        self._searches = {}
+
+    def _call(self, name):
+        with self._lock:
+            self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _search(self, jql):
+        with self._lock:
+            numbers = self._searches.get(jql)
+        if numbers is None:
+            numbers = self.corpus.search(jql)
+            with self._lock:
+                self._searches = {jql: numbers}
+        return numbers
+
+    def get_issue_details(self, issue_id, fields=None):
+        self._call('get_issue_details')
+        issue = self.corpus.get(issue_id)
+        if issue is None:
+            raise http_error(404, f"{self.base_url}/rest/api/3/issue/{issue_id}")
+        if self.raw_store is not None and not fields:
+            self.raw_store.put(issue)
+        return select_fields(issue, fields)
+
+    def search_issues(self, jql, start_at=0, max_results=100, fields=None):
+        self._call('search_issues')
+        numbers = self._search(jql)
+        page = numbers[start_at:start_at + min(max_results, self.max_results)]
+        return {
+            'startAt': start_at,
+            'maxResults': min(max_results, self.max_results),
+            'total': len(numbers),
+            'issues': [select_fields(self.corpus.issue(number), fields) for number in page],
+        }
+
+    def search_issues_by_token(self, jql, next_page_token=None, max_results=100, fields=None):
+        self._call('search_issues_by_token')
+        numbers = self._search(jql)
+        start_at = decode_page_token(next_page_token) if next_page_token else 0
+        end = start_at + min(max_results, self.max_results)
+        result = {
+            'issues': [select_fields(self.corpus.issue(number), fields) for number in numbers[start_at:end]],
+            'isLast': end >= len(numbers),
+        }
+        if end < len(numbers):
+            result['nextPageToken'] = encode_page_token(end)
+        return result
+
+
+def encode_page_token(offset):
+    """Opaque nextPageToken (Jira's tokens are opaque too; this one is an offset)"""
+    return base64.urlsafe_b64encode(json.dumps({'offset': offset}).encode()).decode()
+
+
+def decode_page_token(token):
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(token.encode()))['offset'])
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Invalid nextPageToken {token!r}")
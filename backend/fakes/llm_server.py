@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the LLM, speaking the Ollama API that LLMService calls
+Point OLLAMA_URL at it and select the 'ollama' provider (QUERY_LLM_PROVIDER,
+DIGEST_LLM_PROVIDER) to run answers, map-reduce and digests without Gemini:
+
+  POST      /api/generate     {"model", "prompt", "system", "options": {"num_predict"}}
+  GET       /api/tags         the served model
+  GET       /_fake/stats, POST /_fake/reset  request, response and token counters
+
+Generation takes --latency (time to first token, +/- --jitter) plus the
+output tokens at --tokens-per-second, so answer length shows up in latency like
+it does with a real model. The answer is canned text citing the ticket keys
+found in the prompt. Rate limits (429 + Retry-After) and 500/503 errors can be
+injected as with fakes/jira_server.py.
+
+Usage (from backend/):
+    python3 fakes/llm_server.py --port 11500 [--latency 0.5] [--tokens-per-second 80] [--output-tokens 600]
+    QUERY_LLM_PROVIDER=ollama OLLAMA_URL=http://localhost:11500 ...
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes.behaviour import FakeBehaviour, error_response, install_behaviour  # noqa: E402
+
+ISSUE_KEY = re.compile(r"\b[A-Z][A-Z0-9]+-\d+\b")
+FILLER = ("The recurring pattern across these tickets points to a configuration drift between "
+          "environments; the resolution steps below restore the expected state and prevent recurrence. ")
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def canned_answer(prompt, tokens):
+    """About ``tokens`` tokens of text citing the ticket keys in ``prompt``"""
+    keys = list(dict.fromkeys(ISSUE_KEY.findall(prompt)))[:5]
+    header = f"EXECUTIVE SUMMARY\nBased on {', '.join(keys) if keys else 'no matching tickets'}: "
+    body = header
+    while estimate_tokens(body) < tokens:
+        body += FILLER
+    return body[:tokens * 4]
+
+
+class FakeLLMBehaviour(FakeBehaviour):
+    """FakeBehaviour plus generation speed and answer length"""
+
+    def __init__(self, latency=0.0, jitter=0.0, tokens_per_second=0.0, output_tokens=400, rate_limit=0.0,
+                 burst=None, retry_after=None, error_rate=0.0, seed=0):
+        super().__init__(latency=latency, jitter=jitter, rate_limit=rate_limit, burst=burst,
+                         retry_after=retry_after, error_rate=error_rate, seed=seed)
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+
+
+def create_app(behaviour=None, model='fake-llm'):
+    """Flask app answering /api/generate with ``behaviour`` (a FakeLLMBehaviour)"""
+    behaviour = behaviour if behaviour is not None else FakeLLMBehaviour()
+    app = Flask(__name__)
+    app.config['FAKE_LLM_BEHAVIOUR'] = behaviour
+    install_behaviour(app, behaviour)
+
+    @app.route('/api/generate', methods=['POST'])
+    def generate():
+        started = time.monotonic()
+        body = request.get_json(silent=True) or {}
+        if not body.get('prompt'):
+            return error_response(400, 'prompt is required')
+        prompt = f"{body.get('system') or ''}\n{body['prompt']}"
+        limit = (body.get('options') or {}).get('num_predict') or behaviour.output_tokens
+        tokens = min(limit, behaviour.output_tokens)
+        if behaviour.tokens_per_second:
+            time.sleep(tokens / behaviour.tokens_per_second)
+        prompt_tokens = estimate_tokens(prompt)
+        behaviour.record('served', 'prompt_tokens', prompt_tokens)
+        behaviour.record('served', 'output_tokens', tokens)
+        return jsonify({
+            'model': body.get('model') or model,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'response': canned_answer(prompt, tokens),
+            'done': True,
+            'done_reason': 'stop',
+            'total_duration': int((time.monotonic() - started) * 1e9),
+            'prompt_eval_count': prompt_tokens,
+            'eval_count': tokens,
+        })
+
+    @app.route('/api/tags', methods=['GET'])
+    def tags():
+        return jsonify({'models': [{'name': model, 'model': model, 'size': 0}]})
+
+    @app.route('/_fake/stats', methods=['GET'])
+    def stats():
+        return jsonify(behaviour.stats())
+
+    @app.route('/_fake/reset', methods=['POST'])
+    def reset():
+        behaviour.reset()
+        return jsonify({'status': 'ok'})
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11500)
+    parser.add_argument('--model', default='fake-llm')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds to the first token')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random +/- seconds on top of --latency')
+    parser.add_argument('--tokens-per-second', type=float, default=80.0, help='Generation speed (0: instant)')
+    parser.add_argument('--output-tokens', type=int, default=400, help='Answer length (capped by num_predict)')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='Requests/s before 429s (0: unlimited)')
+    parser.add_argument('--burst', type=float, help='Requests allowed in a burst (default: --rate-limit)')
+    parser.add_argument('--retry-after', type=int, help='Fixed Retry-After seconds on 429s')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with 500/503')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    behaviour = FakeLLMBehaviour(latency=args.latency, jitter=args.jitter, tokens_per_second=args.tokens_per_second,
+                                 output_tokens=args.output_tokens, rate_limit=args.rate_limit, burst=args.burst,
+                                 retry_after=args.retry_after, error_rate=args.error_rate, seed=args.seed)
+    print("=" * 70)
+    print(f"🧪 FAKE LLM - {args.model} on http://{args.host}:{args.port} ({args.latency:g}s + "
+          f"{args.output_tokens} tokens at {args.tokens_per_second:g}/s)")
+    print("=" * 70)
+    create_app(behaviour, args.model).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
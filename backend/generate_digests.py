@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Queue digest generation for every stored ticket of the configured projects
+Tickets whose digest already matches their content hash are skipped by the task itself
+Usage: python3 generate_digests.py
+"""
+
+from config import Config
+from celery_app import celery
+from services.weaviate_service import WeaviateService
+from services.digest_service import DigestService
+from weaviate.classes.query import Filter
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def queue_digests():
+    """Queue a low-priority digest task per ticket"""
+    print("=" * 70)
+    print(f"🧾 QUEUEING TICKET DIGESTS - {', '.join(Config.JIRA_PROJECT_KEYS)}")
+    print("=" * 70)
+    print()
+    
+    weaviate_service = WeaviateService()
+    try:
+        objects = []
+        for project in Config.JIRA_PROJECT_KEYS:
+            collection = weaviate_service.collection_for(project)
+            result = collection.query.fetch_objects(
+                limit=10000,
+                filters=Filter.by_property("project").equal(project),
+                return_properties=['key', 'summary', 'description', 'comments', 'contentHash', 'digest', 'digestHash']
+            )
+            objects.extend(result.objects)
+        
+        queued = 0
+        fresh = 0
+        for obj in objects:
+            key = obj.properties.get('key')
+            if not key:
+                continue
+            if DigestService.has_fresh_digest(obj.properties):
+                fresh += 1
+                continue
+            celery.send_task(
+                'tasks.generate_ticket_digest',
+                args=[key],
+                priority=Config.DIGEST_TASK_PRIORITY
+            )
+            queued += 1
+        
+        print(f"✅ Queued {queued} digest tasks ({fresh} tickets already have an up-to-date digest)")
+    finally:
+        weaviate_service.close()
+
+if __name__ == "__main__":
+    queue_digests()
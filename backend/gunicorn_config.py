@@ -1,5 +1,9 @@
 bind = "0.0.0.0:5000"
 workers = 3
+# Threaded workers: concurrent webhook deliveries in a worker share one broker
+# message (see EnqueueBatcher) instead of one publish per request
+worker_class = "gthread"
+threads = 8
 timeout = 120
 accesslog = "-"
 errorlog = "-"
\ No newline at end of file
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Bulk import of Jira tickets into Weaviate (single entry point for all fetch modes)
+Tickets are listed, fetched concurrently and written in batches; progress is
+checkpointed after every batch so an interrupted import continues with --resume.
+
+Usage:
+    python3 ingest.py jql   [--jql "project = CO ORDER BY created ASC"] [--status Done]
+    python3 ingest.py range [--start 1] [--end 2000] [--status Done]
+    python3 ingest.py keys  CO-123 CO-456          (no keys: read them interactively)
+    python3 ingest.py reindex [--status Done]      (rebuild from the local raw cache, no Jira calls)
+
+Common options: --project CO, --resume, --skip-existing, --workers 4, --batch-size 50, --checkpoint PATH
+"""
+
+import argparse
+import logging
+import sys
+import time
+from config import Config
+from services.jira_service import JiraService
+from services.weaviate_service import WeaviateService
+from services.bulk_import import ImportCheckpoint, default_checkpoint_path
+from services.raw_issue_store import get_raw_issue_store
+from services.tenants import allowed_projects, is_allowed_project
+from services.ingest_pipeline import (
+    IngestPipeline, JqlSource, KeyRangeSource, KeysSource, RawCacheSource,
+    jira_fetcher, newer_stored_filter, raw_cache_fetcher, project_filter, status_filter
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--project', default=Config.JIRA_PROJECT_KEY,
+                        help=f"Jira project to import (one of {', '.join(Config.JIRA_PROJECT_KEYS)}; "
+                             f"reindex covers all of them)")
+    common.add_argument('--status', action='append', help='Only import tickets in this status (repeatable)')
+    common.add_argument('--skip-existing', action='store_true',
+                        help='Skip tickets already in Weaviate (looked up once, kept in the checkpoint)')
+    common.add_argument('--resume', action='store_true',
+                        help='Continue from the last checkpoint. Committed tickets are never fetched or written '
+                             'again; tickets in flight when the import stopped are: at most 3 x --batch-size + '
+                             '--workers fetches and one batch of (unchanged, so skipped) writes')
+    common.add_argument('--checkpoint', help='Checkpoint file (default: .import_checkpoints/<name>.json)')
+    common.add_argument('--checkpoint-name', help=argparse.SUPPRESS)
+    common.add_argument('--workers', type=int, default=4, help='Concurrent Jira fetches')
+    common.add_argument('--batch-size', type=int, default=50, help='Tickets written (and checkpointed) per batch')
+
+    commands = parser.add_subparsers(dest='command', required=True)
+    jql = commands.add_parser('jql', parents=[common], help='Tickets matching a JQL query')
+    jql.add_argument('--jql', help='Defaults to every ticket of the project, oldest first')
+    jql.add_argument('--token-pagination', action='store_true',
+                     help='Use /rest/api/3/search/jql (nextPageToken) instead of /rest/api/3/search')
+
+    key_range = commands.add_parser('range', parents=[common], help='Scan ticket keys sequentially')
+    key_range.add_argument('--start', type=int, default=1)
+    key_range.add_argument('--end', type=int, default=2000)
+
+    keys = commands.add_parser('keys', parents=[common], help='Specific tickets by key')
+    keys.add_argument('keys', nargs='*')
+
+    commands.add_parser('reindex', parents=[common],
+                        help='Rebuild Weaviate from the local raw issue cache without calling Jira')
+    return parser
+
+
+def read_keys_interactively():
+    print("Enter ticket keys (one per line, empty line to finish):")
+    ticket_keys = []
+    while True:
+        key = input(f"Ticket key (e.g., {Config.JIRA_PROJECT_KEY}-123): ").strip()
+        if not key:
+            break
+        ticket_keys.append(key)
+    return ticket_keys
+
+
+def build_source(args, jira_service):
+    project = args.project
+    if args.command == 'jql':
+        jql = args.jql or f'project = {project} ORDER BY created ASC'
+        if args.status and not args.jql:
+            statuses = ", ".join(f'"{status}"' for status in args.status)
+            jql = f'project = {project} AND status in ({statuses}) ORDER BY created ASC'
+        return JqlSource(jira_service, jql, token_pagination=args.token_pagination)
+    if args.command == 'range':
+        return KeyRangeSource(project, start=args.start, end=args.end)
+    if args.command == 'reindex':
+        return RawCacheSource(jira_service.raw_store)
+    return KeysSource([key.strip() for key in args.keys if key.strip()])
+
+
+def run(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'keys' and not args.keys:
+        args.keys = read_keys_interactively()
+        if not args.keys:
+            print("⚠️  No ticket keys provided!")
+            return
+    if not is_allowed_project(args.project):
+        print(f"⚠️  Project {args.project} is not in JIRA_PROJECT_KEYS ({', '.join(allowed_projects())})")
+        return
+    if args.command == 'reindex' and get_raw_issue_store() is None:
+        print("⚠️  The raw issue cache is disabled (RAW_CACHE_ENABLED=false), nothing to reindex")
+        return
+
+    print("=" * 70)
+    projects = allowed_projects() if args.command == 'reindex' else [args.project]
+    print(f"📥 IMPORTING TICKETS ({args.command.upper()}) - {', '.join(projects)} Project(s)")
+    print("=" * 70)
+    print()
+
+    jira_service = JiraService(Config.JIRA_URL, Config.JIRA_USERNAME, Config.JIRA_API_TOKEN)
+    weaviate_service = WeaviateService()
+    try:
+        source = build_source(args, jira_service)
+        params = dict(source.params, project=args.project if args.command != 'reindex' else projects,
+                      status=args.status)
+        checkpoint_path = args.checkpoint or default_checkpoint_path(args.checkpoint_name or f"ingest_{args.command}")
+        # Explicit key lists are short; they are only checkpointed when asked to resume
+        if args.command == 'keys' and not (args.resume or args.checkpoint):
+            checkpoint_path = None
+
+        checkpoint = ImportCheckpoint.load(checkpoint_path, source.name, params) if args.resume and checkpoint_path else None
+        if checkpoint is not None:
+            if checkpoint.completed and not checkpoint.failed:
+                print(f"✅ Checkpoint {checkpoint_path} shows the import already completed")
+                return
+            print(f"⏯️  Resuming from {checkpoint_path}")
+            print(f"   Cursor: {checkpoint.cursor}, committed: {len(checkpoint.committed)}, "
+                  f"pending: {len(checkpoint.pending)}, previously failed: {len(checkpoint.failed)}")
+        else:
+            if args.resume:
+                print(f"⚠️  No checkpoint at {checkpoint_path}, starting a fresh import")
+            checkpoint = ImportCheckpoint(checkpoint_path, source.name, params)
+            if args.skip_existing:
+                # Looked up once; a resumed run reads them from the checkpoint
+                print("🔍 Checking existing tickets in Weaviate...")
+                checkpoint.skip_keys = set().union(*(weaviate_service.stored_keys(project) for project in projects))
+                print(f"   Found {len(checkpoint.skip_keys)} tickets already in database")
+            checkpoint.cursor = source.initial_cursor()
+            checkpoint.save()
+        print()
+
+        if isinstance(source, KeyRangeSource):
+            # Stored tickets mark the key range as populated without a Jira call
+            source.known_keys = checkpoint.skip_keys | checkpoint.committed
+
+        transforms = [project_filter(projects)]
+        if args.status:
+            transforms.append(status_filter(args.status))
+        if args.command == 'reindex':
+            # Webhook deltas are not cached; keep stored tickets newer than their cached copy
+            transforms.append(newer_stored_filter(weaviate_service.newer_stored_keys))
+
+        started = time.monotonic()
+
+        def on_batch(batch, totals):
+            rate = totals['stored'] / max(time.monotonic() - started, 1e-6)
+            print(f"   📦 Batch {totals['batches']}: +{batch['stored']} stored "
+                  f"(total {totals['stored']}, {rate:.1f}/s), {totals['skipped']} already stored, "
+                  f"{totals['missing'] + totals['filtered']} skipped, {totals['errors']} errors")
+
+        fetch_details = raw_cache_fetcher(source.raw_store) if args.command == 'reindex' else jira_fetcher(jira_service)
+        pipeline = IngestPipeline(
+            source, fetch_details, weaviate_service.insert_issues, checkpoint,
+            transforms=transforms, workers=args.workers, batch_size=args.batch_size, on_batch=on_batch
+        )
+        try:
+            counts = pipeline.run()
+        except KeyboardInterrupt:
+            print()
+            print("⏸️  Interrupted. Progress is saved; continue with --resume")
+            return
+        except Exception as e:
+            logger.error(f"Import stopped: {str(e)}")
+            print()
+            print("❌ Import stopped. Progress is saved; continue with --resume")
+            sys.exit(1)
+
+        print()
+        print("=" * 70)
+        print("📊 FINAL SUMMARY")
+        print("=" * 70)
+        print()
+        print(f"✅ Successfully stored: {counts['stored']} tickets in {counts['seconds']:.1f}s "
+              f"({counts['stored'] / max(counts['seconds'], 1e-6):.1f}/s)")
+        if args.command == 'reindex':
+            print("🗄️  Rebuilt from the raw issue cache (0 Jira calls)")
+        print(f"⏭️  Already in Weaviate / committed: {counts['skipped']} tickets")
+        if counts['missing'] or counts['filtered']:
+            print(f"⏭️  Not found or filtered out: {counts['missing'] + counts['filtered']} tickets")
+        if counts['errors'] > 0:
+            print(f"❌ Errors: {counts['errors']} tickets (retried by the next --resume run)")
+        print()
+        print("🎉 Done! You can now:")
+        print("   - Query tickets at: http://localhost:8501")
+        print("   - Use the API: POST http://localhost:5000/api/query")
+        print("=" * 70)
+    finally:
+        weaviate_service.close()
+
+
+if __name__ == "__main__":
+    run()
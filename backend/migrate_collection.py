@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Zero-downtime schema migrations for the JiraIssue collection
+A new version (JiraIssue_v{n}) is created with the schema in services/weaviate_schema.py
+and filled while the live version keeps serving; tickets changed meanwhile are copied
+again, every ticket is checked to be present and current, then the active collection
+pointer is switched. The old version is only deleted with --retire (or the retire command).
+
+Usage:
+    python3 migrate_collection.py status
+    python3 migrate_collection.py migrate [--from objects|raw-cache] [--reembed] [--retire]
+    python3 migrate_collection.py swap JiraIssue_v1        (roll back / forward)
+    python3 migrate_collection.py retire JiraIssue_v1
+"""
+
+import argparse
+import logging
+import sys
+import time
+from config import Config
+from services.weaviate_service import WeaviateService
+from services.collection_versions import CollectionMigration, count_objects, list_versions
+from services.bulk_import import ImportCheckpoint
+from services.ingest_pipeline import IngestPipeline, RawCacheSource, raw_cache_fetcher, project_filter
+from services.raw_issue_store import get_raw_issue_store
+from services.weaviate_schema import cold_collection_name, vector_sources
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def show_status(migration):
+    active = migration.active()
+    print(f"📍 Active collection: {active}")
+    print()
+    for version, name in list_versions(migration.client):
+        count = count_objects(migration.client.collections.get(name))
+        cold_name = cold_collection_name(name)
+        if migration.client.collections.exists(cold_name):
+            cold = f" (+{count_objects(migration.client.collections.get(cold_name))} in {cold_name})"
+        else:
+            cold = ""
+        marker = "  ← active" if name == active else ""
+        print(f"   v{version:<3} {name:<20} {count:>8} objects{cold}{marker}")
+
+
+def fill_from_raw_cache(weaviate_service, target, batch_size):
+    raw_store = get_raw_issue_store()
+    if raw_store is None:
+        raise ValueError("The raw issue cache is disabled (RAW_CACHE_ENABLED=false)")
+    source = RawCacheSource(raw_store)
+    checkpoint = ImportCheckpoint(None, source.name, source.params)
+    checkpoint.cursor = source.initial_cursor()
+    target_service = WeaviateService(client=weaviate_service.client, collection_name=target)
+
+    def on_batch(batch, totals):
+        print(f"   📦 {totals['stored']} tickets written")
+
+    counts = IngestPipeline(
+        source, raw_cache_fetcher(raw_store), target_service.insert_issues, checkpoint,
+        transforms=[project_filter(Config.JIRA_PROJECT_KEYS)], batch_size=batch_size, on_batch=on_batch
+    ).run()
+    if counts['errors']:
+        raise RuntimeError(f"{counts['errors']} ticket(s) failed to import into {target}")
+    return counts['stored']
+
+
+def migrate(migration, weaviate_service, args):
+    source = migration.active()
+    if not migration.client.collections.exists(source):
+        print(f"❌ Active collection {source} does not exist; run weaviate/setup_schema.py first")
+        sys.exit(1)
+    target = args.target or migration.next_name()
+    reuse_vectors = not args.reembed and args.source == 'objects'
+
+    print("=" * 70)
+    print(f"🔀 MIGRATING {source} → {target}")
+    print("=" * 70)
+    print()
+    migration.create(target)
+    if reuse_vectors and (vector_sources(migration.client.collections.get(source))
+                          != vector_sources(migration.client.collections.get(target))):
+        # e.g. the legacy JiraIssue, whose vectorizer embeds every text property
+        print(f"ℹ️  {source} embeds other properties than {target}; re-embedding instead of reusing vectors")
+        reuse_vectors = False
+
+    print(f"1️⃣  Filling {target} from {'the raw issue cache' if args.source == 'raw-cache' else source}...")
+    if args.source == 'raw-cache':
+        filled = fill_from_raw_cache(weaviate_service, target, args.batch_size)
+    else:
+        filled = migration.copy_objects(source, target, reuse_vectors=reuse_vectors,
+                                        on_batch=lambda copied: print(f"   📦 {copied} objects copied"))
+    print(f"   ✅ {filled} tickets written ({'vectors reused' if reuse_vectors else 're-embedded'})")
+
+    print("2️⃣  Copying tickets changed during the fill...")
+    changed = migration.copy_changed(source, target, reuse_vectors=reuse_vectors)
+    print(f"   ✅ {changed} tickets copied again")
+
+    print("3️⃣  Verifying...")
+    ok, report = migration.verify(source, target)
+    print(f"   {source}: {report['source']}, {target}: {report['target']}, missing: {report['missing']}, "
+          f"stale: {report['stale']}")
+    if not ok:
+        print(f"❌ Verification failed; {source} stays active and {target} is kept for inspection")
+        sys.exit(1)
+
+    print("4️⃣  Switching the active collection...")
+    migration.swap(target)
+    # Processes follow the pointer within its TTL; writes they made to the old
+    # version in the meantime are copied over before it can be retired
+    time.sleep(Config.WEAVIATE_COLLECTION_POINTER_TTL + 1)
+    late = migration.copy_changed(source, target, reuse_vectors=reuse_vectors)
+    ok, report = migration.verify(source, target)
+    print(f"   ✅ {target} is live ({late} late writes copied, missing: {report['missing']}, "
+          f"stale: {report['stale']})")
+
+    print()
+    if args.retire and ok:
+        migration.retire(source)
+        print(f"🗑️  Retired {source}")
+    elif args.retire:
+        print(f"⚠️  {source} was not retired: {report['missing']} objects are missing from {target} "
+              f"and {report['stale']} are older there")
+    else:
+        print(f"ℹ️  {source} is kept; roll back with 'swap {source}' or delete it with 'retire {source}'")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('status', help='List collection versions and the active one')
+
+    run = commands.add_parser('migrate', help='Build, fill, verify and switch to a new version')
+    run.add_argument('--from', dest='source', choices=['objects', 'raw-cache'], default='objects',
+                     help='Copy the live objects, or rebuild from the raw issue cache (no Jira calls)')
+    run.add_argument('--reembed', action='store_true',
+                     help='Let Weaviate embed the copies again (needed when vectorized properties change)')
+    run.add_argument('--target', help='Collection name (default: next JiraIssue_v{n})')
+    run.add_argument('--batch-size', type=int, default=200)
+    run.add_argument('--retire', action='store_true', help='Delete the old version after verification')
+
+    swap = commands.add_parser('swap', help='Point queries at an existing version')
+    swap.add_argument('name')
+    retire = commands.add_parser('retire', help='Delete a version that is no longer active')
+    retire.add_argument('name')
+    args = parser.parse_args()
+
+    weaviate_service = WeaviateService()
+    try:
+        migration = CollectionMigration(weaviate_service.client, batch_size=getattr(args, 'batch_size', 200))
+        if args.command == 'status':
+            show_status(migration)
+        elif args.command == 'migrate':
+            migrate(migration, weaviate_service, args)
+        elif args.command == 'swap':
+            previous = migration.swap(args.name)
+            print(f"✅ Active collection switched from {previous} to {args.name}")
+        else:
+            migration.retire(args.name)
+            print(f"🗑️  Retired {args.name}")
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+    finally:
+        weaviate_service.close()
+
+
+if __name__ == "__main__":
+    main()
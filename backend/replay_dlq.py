@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Inspect and replay the ingestion dead-letter stream
+Failed webhook events are re-queued in batches (one sync per failed issue);
+permanent failures and events past DLQ_MAX_ATTEMPTS are parked instead
+Usage: python3 replay_dlq.py [--list [--parked]] [--batch-size 50] [--max-batches N]
+"""
+
+import argparse
+import datetime
+import logging
+from config import Config
+from celery_app import celery
+from services.dead_letter_service import DeadLetterQueue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def list_dead_letters(dead_letters, limit, parked=False):
+    entries = dead_letters.entries(count=limit, parked=parked)
+    total, stream = (dead_letters.parked(), dead_letters.parked_stream) if parked else \
+        (len(dead_letters), dead_letters.stream)
+    print(f"📋 {total} event(s) in '{stream}' (showing {len(entries)})")
+    print()
+    for entry in entries:
+        failed_at = datetime.datetime.fromtimestamp(float(entry['failed_at']))
+        print(f"  {entry['id']}  issue {entry['ref'].get('issue_id')}  "
+              f"{failed_at:%Y-%m-%d %H:%M:%S}  attempts={entry['attempts']}")
+        print(f"      {entry['error_type']}: {entry['cause'][:150]}")
+
+
+def replay(dead_letters, batch_size, max_batches):
+    print("=" * 70)
+    print("🔁 REPLAYING DEAD-LETTERED INGESTION EVENTS")
+    print("=" * 70)
+    print()
+    print(f"📊 Pending: {len(dead_letters)} event(s)")
+
+    def enqueue(refs):
+        task = celery.send_task('tasks.process_webhook_batch', args=[refs])
+        print(f"   ✅ Queued {len(refs)} issue(s) (task {task.id})")
+
+    replayed = dead_letters.replay(enqueue, batch_size=batch_size, max_batches=max_batches)
+
+    print()
+    print("=" * 70)
+    print(f"✅ Re-queued {replayed} event(s), {len(dead_letters)} left, {dead_letters.parked()} parked")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--list', action='store_true', help='Show dead-lettered events without replaying')
+    parser.add_argument('--limit', type=int, default=20, help='Events shown by --list')
+    parser.add_argument('--parked', action='store_true', help='With --list, show the parked events')
+    parser.add_argument('--batch-size', type=int, default=Config.DLQ_REPLAY_BATCH_SIZE)
+    parser.add_argument('--max-batches', type=int, default=None, help='Stop after N batches (default: drain)')
+    args = parser.parse_args()
+
+    dead_letters = DeadLetterQueue()
+    if args.list:
+        list_dead_letters(dead_letters, args.limit, args.parked)
+    else:
+        replay(dead_letters, args.batch_size, args.max_batches)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import datetime
+import json
+import os
+import tempfile
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.import_checkpoints')
+
+
+def default_checkpoint_path(name):
+    return os.path.join(CHECKPOINT_DIR, f"{name}.json")
+
+
+class ImportCheckpoint:
+    """Durable progress of a bulk import.
+
+    Records the source cursor to continue from (Jira page offset, next key
+    number, ...), the listed issues of the current page not processed yet,
+    the keys already committed to Weaviate, the keys that
+    were already stored when the import started (so a resumed run does not
+    query Weaviate again) and the keys that failed. A checkpoint with no
+    path only tracks progress in memory.
+
+    The state is a JSON snapshot at ``path`` (rewritten atomically) plus an
+    append-only log next to it (``path`` + '.log'): every batch appends one
+    fsynced line with its cursor and keys, so a commit costs the size of the
+    batch rather than of the whole import. The snapshot is rewritten (and
+    the log emptied) once the log outgrows it, which keeps the total
+    checkpoint I/O linear in the number of keys.
+    """
+
+    # Log bytes below which the snapshot is never rewritten
+    COMPACT_MIN_BYTES = 1024 * 1024
+
+    def __init__(self, path, source, params=None):
+        self.path = path
+        self.source = source
+        self.params = params or {}
+        self.cursor = None
+        self.committed = set()
+        self.skip_keys = set()
+        self.failed = {}
+        self.pending = []
+        self.completed = False
+        # Sequence number of the last commit; log lines at or below the snapshot's are stale
+        self.seq = 0
+        self._log_bytes = 0
+        self._snapshot_bytes = 0
+
+    @property
+    def log_path(self):
+        return f"{self.path}.log"
+
+    @classmethod
+    def load(cls, path, source, params=None):
+        """Checkpoint saved at ``path`` by an import of the same source and params, or None"""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            state = json.load(f)
+        if state.get('source') != source or state.get('params') != (params or {}):
+            raise ValueError(
+                f"Checkpoint {path} belongs to a different import "
+                f"({state.get('source')} {state.get('params')}); remove it or start without --resume"
+            )
+        checkpoint = cls(path, source, params)
+        checkpoint.cursor = state.get('cursor')
+        checkpoint.committed = set(state.get('committed_keys') or [])
+        checkpoint.skip_keys = set(state.get('skip_keys') or [])
+        checkpoint.failed = state.get('failed_keys') or {}
+        checkpoint.pending = state.get('pending') or []
+        checkpoint.completed = bool(state.get('completed'))
+        checkpoint.seq = state.get('seq') or 0
+        checkpoint._snapshot_bytes = os.path.getsize(path)
+        checkpoint._replay_log()
+        return checkpoint
+
+    def _replay_log(self):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'rb+') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line) if line.endswith(b'\n') else None
+                except ValueError:
+                    entry = None
+                if entry is None:
+                    # A crash mid-append leaves a partial last line; that batch was not
+                    # durable. Cut it off so later appends start on a fresh line
+                    f.truncate(self._log_bytes)
+                    break
+                self._log_bytes += len(line)
+                if entry['seq'] > self.seq:
+                    self._apply(entry['cursor'], entry['committed'], entry['failed'], entry['pending'])
+                    self.seq = entry['seq']
+
+    def is_done(self, key):
+        return key in self.committed or key in self.skip_keys
+
+    def _apply(self, cursor, keys, failed, pending):
+        self.cursor = cursor
+        self.committed.update(keys)
+        for key in keys:
+            self.failed.pop(key, None)
+        self.failed.update(failed or {})
+        self.pending = pending or []
+
+    def commit(self, cursor, keys, failed=None, pending=None):
+        """Record a batch as durable.
+
+        ``keys`` are stored, ``cursor`` is the next page to list and
+        ``pending`` the listed issues still to be processed before it.
+        """
+        self._apply(cursor, keys, failed, pending)
+        self.seq += 1
+        if self.path is None:
+            return
+        if self._log_bytes > max(self.COMPACT_MIN_BYTES, self._snapshot_bytes):
+            self.save()
+            return
+        line = json.dumps({'seq': self.seq, 'cursor': cursor, 'committed': list(keys),
+                           'failed': failed or {}, 'pending': pending or []}) + '\n'
+        with open(self.log_path, 'a') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._log_bytes += len(line)
+
+    def finish(self):
+        self.completed = True
+        self.save()
+
+    def save(self):
+        """Rewrite the snapshot with the whole state and empty the log"""
+        if self.path is None:
+            # In-memory checkpoint (imports run without --checkpoint tracking)
+            return
+        state = {
+            'source': self.source,
+            'params': self.params,
+            'cursor': self.cursor,
+            'committed_keys': sorted(self.committed),
+            'skip_keys': sorted(self.skip_keys),
+            'failed_keys': self.failed,
+            'pending': self.pending,
+            'completed': self.completed,
+            'seq': self.seq,
+            'saved_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename over the old checkpoint so a crash
+        # mid-write never leaves a truncated file behind
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.checkpoint-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._snapshot_bytes = os.path.getsize(self.path)
+        # Lines up to ``seq`` are in the snapshot; a crash before this point
+        # leaves them in the log, where load() skips them
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        self._log_bytes = 0
@@ -0,0 +1,62 @@
+import json
+import logging
+import threading
+import redis
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+_redis_client_lock = threading.Lock()
+
+
+def get_redis_client():
+    """Process-wide Redis client (redis-py pools connections internally)"""
+    global _redis_client
+    with _redis_client_lock:
+        if _redis_client is None:
+            _redis_client = redis.Redis.from_url(Config.REDIS_CACHE_URL)
+        return _redis_client
+
+
+def similar_tickets_cache_key(issue_key):
+    return f"similar:{issue_key}"
+
+
+class CacheService:
+    """Small JSON cache on top of Redis.
+
+    Cache failures are logged and treated as misses so that a Redis outage
+    degrades to uncached behaviour instead of failing the request.
+    """
+
+    def __init__(self, client=None):
+        self.client = client if client is not None else get_redis_client()
+
+    def get_json(self, key):
+        try:
+            raw = self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache read failed for {key}: {str(e)}")
+            return None
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def set_json(self, key, value, ttl=None):
+        try:
+            self.client.set(key, json.dumps(value, default=str), ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+    def delete(self, *keys):
+        if not keys:
+            return 0
+        try:
+            return self.client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Cache delete failed for {keys}: {str(e)}")
+            return 0
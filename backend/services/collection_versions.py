@@ -0,0 +1,307 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter
+from config import Config
+from services.cache_service import get_redis_client
+from services.comment_chunks import sync_chunks
+from services.embedding_service import get_embedding_service
+from services.weaviate_schema import (
+    chunk_collection_name, cold_collection_name, comment_text, create_issue_collection, forget_companion_collection,
+    forget_vector_layout, multi_tenant, parse_version, self_provided_vectors, vector_sources, versioned_name
+)
+
+logger = logging.getLogger(__name__)
+
+# Redis key holding the name of the collection queries and writes use. Weaviate
+# 1.28 has no collection aliases, so switching versions is a single SET here.
+POINTER_KEY = 'weaviate:active_collection'
+
+_pointer = {'name': None, 'read_at': 0.0}
+_pointer_lock = threading.Lock()
+
+
+def active_collection_name(redis_client=None, fresh=False):
+    """Name of the live JiraIssue collection.
+
+    Read from the Redis pointer at most every WEAVIATE_COLLECTION_POINTER_TTL
+    seconds per process (``fresh`` skips that cache); falls back to the last
+    known name, then to Config.WEAVIATE_COLLECTION when Redis has no pointer
+    or is unreachable.
+    """
+    now = time.monotonic()
+    with _pointer_lock:
+        if not fresh and _pointer['name'] and now - _pointer['read_at'] < Config.WEAVIATE_COLLECTION_POINTER_TTL:
+            return _pointer['name']
+    try:
+        value = (redis_client or get_redis_client()).get(POINTER_KEY)
+        name = value.decode() if value else Config.WEAVIATE_COLLECTION
+    except Exception as e:
+        logger.warning(f"Could not read the active collection pointer: {str(e)}")
+        name = _pointer['name'] or Config.WEAVIATE_COLLECTION
+    with _pointer_lock:
+        _pointer['name'], _pointer['read_at'] = name, now
+    return name
+
+
+def set_active_collection(name, redis_client=None):
+    """Atomically switch every process to ``name`` (within the pointer TTL)"""
+    (redis_client or get_redis_client()).set(POINTER_KEY, name)
+    with _pointer_lock:
+        _pointer['name'], _pointer['read_at'] = name, time.monotonic()
+
+
+def list_versions(client):
+    """[(version, name)] of the JiraIssue collections in Weaviate, oldest first"""
+    versions = []
+    for name in client.collections.list_all(simple=True):
+        version = parse_version(name)
+        if version is not None:
+            versions.append((version, name))
+    return sorted(versions)
+
+
+def tenant_views(collection):
+    """The collection itself, or one view per tenant of a multi-tenant collection
+    (cold tenants are activated on access, see _multi_tenancy_config)"""
+    if not multi_tenant(collection):
+        return [collection]
+    return [collection.with_tenant(name) for name in sorted(collection.tenants.get())]
+
+
+def count_objects(collection):
+    return sum(view.aggregate.over_all(total_count=True).total_count for view in tenant_views(collection))
+
+
+# Properties that tell two copies of a ticket apart (see CollectionMigration.copy_changed)
+VERSION_PROPERTIES = ["updated", "contentHash", "digestHash"]
+
+
+def _timestamp(value):
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return 0.0
+    return value.timestamp() if value else 0.0
+
+
+def is_newer(source, target):
+    """True when ``source`` properties (VERSION_PROPERTIES) hold a write ``target``
+    lacks: a later Jira update, different content at the same update, or a
+    fresh digest of the same content that the target does not have"""
+    if target is None:
+        return True
+    source_updated, target_updated = _timestamp(source.get("updated")), _timestamp(target.get("updated"))
+    if source_updated != target_updated:
+        return source_updated > target_updated
+    if source.get("contentHash") != target.get("contentHash"):
+        return True
+    return (source.get("digestHash") != target.get("digestHash")
+            and bool(source.get("digestHash")) and source.get("digestHash") == source.get("contentHash"))
+
+
+class CollectionMigration:
+    """Builds a new JiraIssue collection version next to the live one.
+
+    The new version is filled while the old one keeps serving queries, then
+    objects changed in the meantime are copied again (by their Jira
+    ``updated`` date), every object of the old version is checked to exist in
+    the new one and only then is the pointer switched. The old version is
+    kept until retire() is called for it.
+
+    Tickets of the old version's cold tier are copied into the new version
+    itself; the tiering task moves them to the new cold tier again.
+    """
+
+    def __init__(self, client, redis_client=None, batch_size=200):
+        self.client = client
+        self.redis_client = redis_client
+        self.batch_size = batch_size
+
+    def active(self):
+        return active_collection_name(self.redis_client, fresh=True)
+
+    def next_name(self):
+        versions = list_versions(self.client)
+        return versioned_name((versions[-1][0] if versions else 0) + 1)
+
+    def create(self, name):
+        if self.client.collections.exists(name):
+            raise ValueError(f"Collection {name} already exists")
+        create_issue_collection(self.client, name)
+        logger.info(f"Created collection {name}")
+
+    def _embed_missing(self, target, objects):
+        """Targets with self-provided vectors cannot embed: vectors that are not
+        reused are computed client-side, one batch per insert"""
+        pending = [index for index, obj in enumerate(objects) if obj.vector is None]
+        if not pending or not self_provided_vectors(target):
+            return objects
+        sources = vector_sources(target)
+        vectors = get_embedding_service().embed_objects([(objects[index].properties, sources) for index in pending])
+        objects = list(objects)
+        for index, vector in zip(pending, vectors):
+            obj = objects[index]
+            objects[index] = DataObject(properties=obj.properties, uuid=obj.uuid,
+                                        vector=vector.get('default') if 'default' in sources else vector or None)
+        return objects
+
+    def _insert(self, target, objects, new=True):
+        if not objects:
+            return
+        if multi_tenant(target) and target.tenant is None:
+            # Objects go to their project's tenant (created on first write)
+            groups = {}
+            for obj in objects:
+                groups.setdefault(obj.properties.get("project"), []).append(obj)
+            for project, group in groups.items():
+                if not project:
+                    raise RuntimeError(f"{len(group)} object(s) without a project cannot be copied into "
+                                       f"multi-tenant {target.name}")
+                self._insert(target.with_tenant(project), group, new=new)
+            return
+        objects = self._embed_missing(target, objects)
+        result = target.data.insert_many(objects)
+        if result.errors:
+            first = next(iter(result.errors.values()))
+            raise RuntimeError(f"{len(result.errors)} object(s) failed to copy into {target.name}: {first.message}")
+        # Chunks are rebuilt from the copied properties and embedded by the target
+        chunk_name = chunk_collection_name(target.name)
+        if self.client.collections.exists(chunk_name):
+            chunks = self.client.collections.get(chunk_name)
+            if target.tenant is not None:
+                chunks = chunks.with_tenant(target.tenant)
+            embed = get_embedding_service().embed if self_provided_vectors(chunks) else None
+            _, failures = sync_chunks(chunks, {str(obj.uuid): obj.properties for obj in objects}, new=new, embed=embed)
+            if failures:
+                raise RuntimeError(f"Chunks of {len(failures)} ticket(s) failed to copy into {chunk_name}: "
+                                   f"{next(iter(failures.values()))}")
+
+    def _data_object(self, obj, target_sources, reuse_vectors):
+        """Copy of ``obj`` shaped for a target with ``target_sources`` vectors.
+
+        Vectors are only reused when both versions have the same vectors
+        (single 'default' or the same named vectors); otherwise the target
+        embeds the object itself.
+        """
+        properties = dict(obj.properties)
+        if any("commentText" in names for names in target_sources.values()):
+            properties.setdefault("commentText", comment_text(properties.get("comments")))
+        else:
+            properties.pop("commentText", None)
+        vector = None
+        stored = obj.vector or {}
+        if reuse_vectors and stored and set(stored) == set(target_sources):
+            vector = stored['default'] if 'default' in target_sources else dict(stored)
+        return DataObject(properties=properties, uuid=obj.uuid, vector=vector)
+
+    def copy_objects(self, source_name, target_name, reuse_vectors=True, on_batch=None):
+        """Copy every object (same uuid) from one version to another.
+
+        With ``reuse_vectors`` the stored vectors are copied as well, which is
+        only valid while the vectorizer and vectorized properties are unchanged;
+        otherwise (or when the vector layout changes, e.g. single to named
+        vectors) the new version embeds the objects again.
+        """
+        target = self.client.collections.get(target_name)
+        target_sources = vector_sources(target)
+        copied = 0
+        for view in self._source_views(source_name):
+            batch = []
+            for obj in view.iterator(include_vector=reuse_vectors):
+                batch.append(self._data_object(obj, target_sources, reuse_vectors))
+                if len(batch) >= self.batch_size:
+                    self._insert(target, batch)
+                    copied += len(batch)
+                    batch = []
+                    if on_batch:
+                        on_batch(copied)
+            self._insert(target, batch)
+            copied += len(batch)
+        return copied
+
+    def copy_changed(self, source_name, target_name, reuse_vectors=True):
+        """Copy again the objects the target lacks or holds an older copy of.
+
+        Versions are compared on Jira ``updated`` and the content and digest
+        hashes (see is_newer()), so digest writes made during the migration
+        are caught as well as ticket updates, and objects the target already
+        updated itself after the swap are left alone. Returns the number of
+        objects copied.
+        """
+        target = self.client.collections.get(target_name)
+        target_sources = vector_sources(target)
+        target_versions = self._versions(target_name)
+        copied = 0
+        for view in self._source_views(source_name):
+            changed = [str(obj.uuid) for obj in view.iterator(return_properties=VERSION_PROPERTIES)
+                       if is_newer(obj.properties, target_versions.get(str(obj.uuid)))]
+            for start in range(0, len(changed), self.batch_size):
+                ids = changed[start:start + self.batch_size]
+                response = view.query.fetch_objects(
+                    filters=Filter.by_id().contains_any(ids),
+                    include_vector=reuse_vectors,
+                    limit=len(ids)
+                )
+                self._insert(target, [self._data_object(obj, target_sources, reuse_vectors)
+                                      for obj in response.objects], new=False)
+                copied += len(response.objects)
+        return copied
+
+    def _source_views(self, name):
+        """Tenant views of a version and of its cold tier"""
+        views = tenant_views(self.client.collections.get(name))
+        cold_name = cold_collection_name(name)
+        if self.client.collections.exists(cold_name):
+            views += tenant_views(self.client.collections.get(cold_name))
+        return views
+
+    def _versions(self, name):
+        """{uuid: VERSION_PROPERTIES} of a version and its cold tier"""
+        return {str(obj.uuid): obj.properties for view in self._source_views(name)
+                for obj in view.iterator(return_properties=VERSION_PROPERTIES)}
+
+    def verify(self, source_name, target_name):
+        """(ok, report): every object of the source version exists in the target,
+        in a copy at least as recent (see is_newer())"""
+        source_versions = self._versions(source_name)
+        target_versions = self._versions(target_name)
+        missing = set(source_versions) - set(target_versions)
+        stale = {uuid for uuid, version in source_versions.items()
+                 if uuid not in missing and is_newer(version, target_versions[uuid])}
+        report = {'source': len(source_versions), 'target': len(target_versions), 'missing': len(missing),
+                  'stale': len(stale)}
+        return not missing and not stale, report
+
+    @staticmethod
+    def _forget(name):
+        """Drop this process's cached layout and companion existence of a version,
+        so a name that is deleted and created again is read afresh"""
+        for cached in (name, chunk_collection_name(name), cold_collection_name(name)):
+            forget_vector_layout(cached)
+            forget_companion_collection(cached)
+
+    def swap(self, name):
+        if not self.client.collections.exists(name):
+            raise ValueError(f"Collection {name} does not exist")
+        previous = self.active()
+        self._forget(name)
+        set_active_collection(name, self.redis_client)
+        logger.info(f"Active collection switched from {previous} to {name}")
+        return previous
+
+    def retire(self, name):
+        """Delete an old version once nothing points at it any more"""
+        if name == self.active():
+            raise ValueError(f"{name} is the active collection; swap to another version first")
+        if parse_version(name) is None:
+            raise ValueError(f"{name} is not a JiraIssue collection")
+        for companion in (chunk_collection_name(name), cold_collection_name(name)):
+            if self.client.collections.exists(companion):
+                self.client.collections.delete(companion)
+        self.client.collections.delete(name)
+        self._forget(name)
+        logger.info(f"Retired collection {name}")
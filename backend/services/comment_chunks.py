@@ -0,0 +1,191 @@
+import hashlib
+import json
+import logging
+import re
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter
+from weaviate.util import generate_uuid5
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_PARAGRAPHS = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+# Chunks of one insert_many request
+CHUNK_BATCH_SIZE = 200
+# Objects one lookup of stored chunks returns (Weaviate's QUERY_MAXIMUM_RESULTS default)
+CHUNK_LOOKUP_LIMIT = 10000
+
+
+def split_text(text, max_chars=None):
+    """Split text into chunks of at most ``max_chars`` on paragraph, then sentence boundaries"""
+    max_chars = max_chars or Config.CHUNK_MAX_CHARS
+    text = (text or '').strip()
+    if not text:
+        return []
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces = []
+    for paragraph in _PARAGRAPHS.split(text):
+        paragraph = paragraph.strip()
+        if len(paragraph) <= max_chars:
+            pieces.append(("\n", paragraph))
+            continue
+        separator = "\n"
+        for sentence in _SENTENCE_END.split(paragraph):
+            # Run-on text (logs, stack traces) is cut hard
+            while len(sentence) > max_chars:
+                pieces.append((separator, sentence[:max_chars]))
+                sentence = sentence[max_chars:]
+                separator = ""
+            pieces.append((separator, sentence))
+            separator = " "
+
+    chunks = []
+    current = ''
+    for separator, piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            continue
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def issue_chunks(issue_obj):
+    """{chunk uuid: properties} for an issue object (built or stored properties).
+
+    Chunk uuids are derived from the issue, the source text and the chunk
+    position, so re-chunking an unchanged ticket yields the same objects.
+    """
+    issue_id = str(issue_obj.get('issueID') or issue_obj.get('key') or '')
+    chunks = {}
+
+    def add(kind, comment_id, position, text, author=None, created=None):
+        properties = {
+            "text": text,
+            "issueID": issue_id,
+            "issueKey": issue_obj.get('key') or '',
+            "project": issue_obj.get('project') or '',
+            "kind": kind,
+            "commentID": comment_id,
+            "author": author,
+            "created": _iso(created),
+            "position": position,
+        }
+        properties["textHash"] = hashlib.sha1(
+            json.dumps(properties, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        chunks[generate_uuid5(f"{issue_id}:{kind}:{comment_id}:{position}")] = properties
+
+    for position, text in enumerate(split_text(issue_obj.get('description'))):
+        add('description', '', position, text, created=issue_obj.get('created'))
+    for comment in issue_obj.get('comments') or []:
+        comment_id = str(comment.get('commentID') or '')
+        for position, text in enumerate(split_text(comment.get('body'))):
+            add('comment', comment_id, position, text, comment.get('author'), comment.get('created'))
+    return chunks
+
+
+def sync_chunks(chunk_collection, issues, new=False, embed=None):
+    """Bring the chunks of ``issues`` ({issue uuid: issue object}) up to date.
+
+    Only chunks whose text or metadata changed are (re)written, and chunks of
+    removed comments or shortened texts are deleted once the new chunks of
+    their ticket are written, so a failed write leaves the ticket with its
+    old chunks rather than with none. ``new`` skips the
+    lookup of stored chunks for tickets that were just created. ``embed``
+    (texts -> vectors) is given for collections with self-provided vectors.
+    Returns ``(chunks written, {issue_key: error})``.
+    """
+    wanted = {}
+    expected = {}
+    for issue_uuid, issue_obj in issues.items():
+        chunks = issue_chunks(issue_obj)
+        expected[str(issue_obj.get('issueID') or issue_obj.get('key') or '')] = len(chunks)
+        for chunk_uuid, properties in chunks.items():
+            wanted[chunk_uuid] = (issue_uuid, properties)
+
+    stored = _stored_chunks(chunk_collection, expected) if not new else {}
+
+    changed = [(chunk_uuid, issue_uuid, properties)
+               for chunk_uuid, (issue_uuid, properties) in wanted.items()
+               if stored.get(chunk_uuid, (None, None))[1] != properties["textHash"]]
+    vectors = embed([properties["text"] for _, _, properties in changed]) if embed and changed else None
+    objects = [
+        DataObject(properties=properties, uuid=chunk_uuid, references={"ticket": issue_uuid},
+                   vector=vectors[index] if vectors else None)
+        for index, (chunk_uuid, issue_uuid, properties) in enumerate(changed)
+    ]
+    written = 0
+    failures = {}
+    failed_ids = set()
+    for start in range(0, len(objects), CHUNK_BATCH_SIZE):
+        batch = objects[start:start + CHUNK_BATCH_SIZE]
+        result = chunk_collection.data.insert_many(batch)
+        written += len(batch) - len(result.errors or {})
+        for index, error in (result.errors or {}).items():
+            failures[batch[index].properties.get("issueKey")] = error.message
+            failed_ids.add(batch[index].properties.get("issueID"))
+    if failures:
+        logger.warning(f"{len(failures)} ticket(s) have chunks that failed to write; their old chunks are kept")
+
+    stale = [chunk_uuid for chunk_uuid, (issue_id, _) in stored.items()
+             if chunk_uuid not in wanted and issue_id not in failed_ids]
+    if stale:
+        chunk_collection.data.delete_many(where=Filter.by_id().contains_any(stale))
+    return written, failures
+
+
+def _stored_chunks(chunk_collection, expected):
+    """{chunk uuid: (issueID, textHash)} of the stored chunks of the issues in
+    ``expected`` ({issueID: chunk count wanted now}).
+
+    Issues are looked up in groups expected to fill half a result page; a
+    group whose lookup comes back full is split and asked again, so no
+    stored chunk is cut off by the result limit.
+    """
+    groups, current, size = [], [], 0
+    for issue_id in sorted(expected):
+        if current and size + expected[issue_id] + 1 > CHUNK_LOOKUP_LIMIT // 2:
+            groups.append(current)
+            current, size = [], 0
+        current.append(issue_id)
+        size += expected[issue_id] + 1
+    if current:
+        groups.append(current)
+
+    stored = {}
+    while groups:
+        group = groups.pop()
+        response = chunk_collection.query.fetch_objects(
+            filters=Filter.by_property("issueID").contains_any(group),
+            return_properties=["issueID", "textHash"],
+            limit=CHUNK_LOOKUP_LIMIT
+        )
+        if len(response.objects) >= CHUNK_LOOKUP_LIMIT:
+            if len(group) > 1:
+                groups += [group[:len(group) // 2], group[len(group) // 2:]]
+                continue
+            logger.warning(f"Issue {group[0]} has {CHUNK_LOOKUP_LIMIT}+ stored chunks; only those are compared")
+        stored.update((str(obj.uuid), (obj.properties.get("issueID"), obj.properties.get("textHash")))
+                      for obj in response.objects)
+    return stored
+
+
+def delete_chunks(chunk_collection, issue_ids):
+    """Delete every chunk of the given issues (issueID values)"""
+    if not issue_ids:
+        return
+    chunk_collection.data.delete_many(where=Filter.by_property("issueID").contains_any(sorted(issue_ids)))
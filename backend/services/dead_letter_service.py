@@ -0,0 +1,130 @@
+import json
+import logging
+import random
+import time
+import redis
+import requests
+from weaviate.exceptions import WeaviateBaseError
+from config import Config
+from services.cache_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Failures worth retrying: Jira/Weaviate/Redis unreachable, timeouts, 5xx
+TRANSIENT_ERRORS = (requests.RequestException, WeaviateBaseError, redis.RedisError, ConnectionError, TimeoutError)
+
+
+def is_transient(exc):
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        # 4xx (deleted issue, bad credentials) will not fix itself; 429 will
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+
+def retry_countdown(retries):
+    """Exponential backoff with full jitter for the given retry number (0-based)"""
+    ceiling = min(Config.INGEST_RETRY_BACKOFF_MAX, Config.INGEST_RETRY_BACKOFF_BASE * (2 ** retries))
+    return random.uniform(0, ceiling)
+
+
+class DeadLetterQueue:
+    """Failed ingestion events kept in a Redis stream until they are replayed.
+
+    Each entry is a webhook reference ({'issue_id', 'payload_key'}) plus the
+    failure cause and attempt count. Replay re-queues references in batches
+    through tasks.process_webhook_batch, so recovering from an outage costs
+    one sync per failed issue instead of a full re-import. Permanent
+    failures and entries past DLQ_MAX_ATTEMPTS are moved to the parked
+    stream instead, where they wait for a person.
+    """
+
+    def __init__(self, client=None, stream=None, parked_stream=None):
+        self.client = client if client is not None else get_redis_client()
+        self.stream = stream or Config.DLQ_STREAM
+        self.parked_stream = parked_stream or Config.DLQ_PARKED_STREAM
+
+    def push(self, ref, exc, attempts, task_name=None):
+        entry = {
+            'ref': json.dumps({k: v for k, v in ref.items() if k != 'attempts'}),
+            'task': task_name or '',
+            'error_type': type(exc).__name__,
+            'transient': int(is_transient(exc)),
+            'cause': str(exc)[:2000],
+            'attempts': attempts,
+            'failed_at': time.time(),
+        }
+        entry_id = self.client.xadd(self.stream, entry, maxlen=Config.DLQ_MAX_LENGTH, approximate=True)
+        logger.error(f"Dead-lettered issue {ref.get('issue_id')} after {attempts} attempt(s): {entry['cause']}")
+        return entry_id
+
+    def __len__(self):
+        return self.client.xlen(self.stream)
+
+    def parked(self):
+        """Number of entries in the parked stream"""
+        return self.client.xlen(self.parked_stream)
+
+    def entries(self, count=100, min_age_seconds=0, parked=False):
+        """Oldest entries first, limited to those failed at least ``min_age_seconds`` ago"""
+        # Stream ids start with the insertion time in milliseconds
+        newest = int((time.time() - min_age_seconds) * 1000)
+        rows = self.client.xrange(self.parked_stream if parked else self.stream, min='-', max=newest, count=count)
+        entries = []
+        for entry_id, fields in rows:
+            decoded = {k.decode(): v.decode() for k, v in fields.items()}
+            decoded['id'] = entry_id.decode()
+            decoded['ref'] = json.loads(decoded['ref'])
+            decoded['attempts'] = int(decoded.get('attempts', 0))
+            # Entries written before the flag existed are assumed transient
+            decoded['transient'] = decoded.get('transient', '1') == '1'
+            entries.append(decoded)
+        return entries
+
+    def replay(self, enqueue, batch_size=None, max_batches=None, min_age_seconds=0):
+        """Drain the stream in batches through ``enqueue(refs)``.
+
+        Entries are deleted once their batch has been queued (at-least-once).
+        Several failures of the same issue collapse into one full sync, as
+        the latest Jira state supersedes each failed event. Each reference
+        carries its ``attempts`` so far, which the replayed task adds to its
+        own. Permanent failures and entries with DLQ_MAX_ATTEMPTS or more
+        attempts are parked (see park()) instead. Returns the number of
+        entries replayed.
+        """
+        batch_size = batch_size or Config.DLQ_REPLAY_BATCH_SIZE
+        replayed = 0
+        parked = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            entries = self.entries(count=batch_size, min_age_seconds=min_age_seconds)
+            if not entries:
+                break
+            refs = {}
+            for entry in entries:
+                if not entry['transient'] or entry['attempts'] >= Config.DLQ_MAX_ATTEMPTS:
+                    self.park(entry)
+                    parked += 1
+                    continue
+                replayed += 1
+                ref = dict(entry['ref'], attempts=entry['attempts'])
+                issue_id = str(ref.get('issue_id'))
+                if issue_id in refs:
+                    attempts = max(refs[issue_id]['attempts'], ref['attempts'])
+                    refs[issue_id] = {'issue_id': issue_id, 'payload_key': None, 'attempts': attempts}
+                else:
+                    refs[issue_id] = ref
+            if refs:
+                enqueue(list(refs.values()))
+            self.client.xdel(self.stream, *[entry['id'] for entry in entries])
+            batches += 1
+        if replayed or parked:
+            logger.info(f"Replayed {replayed} dead-lettered event(s) in {batches} batch(es), parked {parked}")
+        return replayed
+
+    def park(self, entry):
+        """Copy ``entry`` (from entries()) to the parked stream; the caller deletes it"""
+        fields = {name: value for name, value in entry.items() if name not in ('id', 'ref', 'transient')}
+        fields.update(ref=json.dumps(entry['ref']), transient=int(entry['transient']), dead_lettered_id=entry['id'])
+        self.client.xadd(self.parked_stream, fields, maxlen=Config.DLQ_MAX_LENGTH, approximate=True)
+        reason = 'permanent failure' if not entry['transient'] else f"{entry['attempts']} attempts"
+        logger.warning(f"Parked dead-lettered issue {entry['ref'].get('issue_id')} ({reason}): {entry['cause'][:200]}")
@@ -0,0 +1,67 @@
+import logging
+from config import Config
+from services.llm_service import LLMService
+from services.weaviate_service import WeaviateService
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SYSTEM_PROMPT = """You summarize resolved support tickets for a knowledge base.
+Read the ticket and its comment thread and reply with EXACTLY these three sections:
+
+PROBLEM: one or two sentences on what went wrong and who was affected
+ROOT CAUSE: one or two sentences on why it happened (write "Unknown" if the thread does not say)
+RESOLUTION STEPS:
+1. concrete step taken
+2. ...
+
+Use only facts from the ticket. Keep the whole digest under 150 words."""
+
+
+class DigestService:
+    """Builds compact per-ticket digests (problem, root cause, resolution).
+
+    Digests are generated once per ticket content hash at ingestion time so
+    query prompts can carry them instead of full comment threads.
+    """
+
+    def __init__(self, llm=None):
+        self.llm = llm or LLMService(Config.DIGEST_LLM_PROVIDER, Config.DIGEST_LLM_MODEL)
+
+    @staticmethod
+    def current_hash(properties):
+        return properties.get('contentHash') or WeaviateService.content_hash(properties)
+
+    @classmethod
+    def has_fresh_digest(cls, properties):
+        """True when the stored digest was generated from the current content"""
+        return bool(properties.get('digest')) and properties.get('digestHash') == cls.current_hash(properties)
+
+    def build_prompt(self, properties):
+        lines = [
+            f"Ticket: {properties.get('key', 'N/A')}",
+            f"Summary: {properties.get('summary') or 'No summary'}",
+            f"Status: {properties.get('status') or 'N/A'}",
+            f"Description: {properties.get('description') or 'No description'}",
+            "",
+            "Comments (chronological):",
+        ]
+        for idx, comment in enumerate(properties.get('comments') or [], 1):
+            lines.append(f"[{idx}] {comment.get('author') or 'Unknown'}: {comment.get('body') or ''}")
+        text = "\n".join(lines)
+
+        # Keep the head (problem statement) and the tail (where resolutions are
+        # usually recorded) when the thread is longer than the model can take
+        limit = Config.DIGEST_MAX_INPUT_CHARS
+        if len(text) > limit:
+            half = limit // 2
+            text = f"{text[:half]}\n...\n{text[-half:]}"
+        return text
+
+    def generate(self, properties):
+        digest = self.llm.generate(
+            self.build_prompt(properties),
+            system=DIGEST_SYSTEM_PROMPT,
+            temperature=0.1,
+            max_output_tokens=400
+        )
+        return digest.strip()
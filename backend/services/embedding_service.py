@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+import numpy as np
+import redis
+from config import Config
+from services.cache_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def vector_text(properties, source_properties):
+    """Text embedded for a vector: its source properties joined in order"""
+    parts = []
+    for name in source_properties:
+        value = properties.get(name)
+        if isinstance(value, (list, tuple)):
+            value = " ".join(str(v) for v in value if v)
+        if value:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+class HashingEmbedder:
+    """Deterministic feature-hashing embedder (word unigrams and bigrams).
+
+    Needs no model download and gives the same vector for the same text on
+    every machine, so offline checks and benchmarks can run the client-side
+    embedding path end to end. Not meant for production search quality.
+    """
+
+    def __init__(self, dimensions=None):
+        self.dimensions = dimensions or Config.EMBEDDING_DIMENSIONS
+        self.model_id = f"hashing-{self.dimensions}"
+
+    def embed(self, texts):
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall((text or '').lower())
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], 'little') % self.dimensions
+                matrix[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEmbedder:
+    """sentence-transformers model run in the worker process (CPU by default)"""
+
+    def __init__(self, model_name=None, device=None):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError("EMBEDDING_PROVIDER=sentence_transformers needs the sentence-transformers "
+                              "package (pip install sentence-transformers)")
+        self.model_id = model_name or Config.EMBEDDING_MODEL
+        self.model = SentenceTransformer(self.model_id, device=device or Config.EMBEDDING_DEVICE)
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return self.model.encode(
+            list(texts),
+            batch_size=Config.EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ).astype(np.float32)
+
+
+def create_embedder(provider=None):
+    provider = provider or Config.EMBEDDING_PROVIDER
+    if provider == 'hashing':
+        return HashingEmbedder()
+    if provider == 'sentence_transformers':
+        return SentenceTransformerEmbedder()
+    raise ValueError(f"Unknown embedding provider {provider!r} (expected 'sentence_transformers' or 'hashing')")
+
+
+class EmbeddingService:
+    """Batched embedding with a Redis cache keyed by model and text hash.
+
+    Texts are de-duplicated, looked up in the cache in one MGET and only the
+    misses are embedded, EMBEDDING_BATCH_SIZE at a time, so a bulk import
+    embeds across tickets and an unchanged text is never embedded twice (also
+    across collection versions). Cache failures are logged and treated as
+    misses.
+    """
+
+    def __init__(self, embedder=None, redis_client=None, batch_size=None):
+        self.embedder = embedder or create_embedder()
+        self.redis_client = redis_client
+        self.batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+        self.stats = {"texts": 0, "cache_hits": 0, "embedded": 0, "seconds": 0.0}
+
+    @property
+    def model_id(self):
+        return self.embedder.model_id
+
+    def _key(self, text):
+        return f"emb:{self.model_id}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def _client(self):
+        return self.redis_client if self.redis_client is not None else get_redis_client()
+
+    def _cached(self, texts):
+        if not texts or not Config.EMBEDDING_CACHE_ENABLED:
+            return {}
+        try:
+            values = self._client().mget([self._key(text) for text in texts])
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache read failed: {str(e)}")
+            return {}
+        return {text: np.frombuffer(value, dtype=np.float32) for text, value in zip(texts, values) if value}
+
+    def _store(self, vectors):
+        if not vectors or not Config.EMBEDDING_CACHE_ENABLED:
+            return
+        try:
+            pipe = self._client().pipeline(transaction=False)
+            for text, vector in vectors.items():
+                pipe.set(self._key(text), np.asarray(vector, dtype=np.float32).tobytes(),
+                         ex=Config.EMBEDDING_CACHE_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache write failed: {str(e)}")
+
+    def embed(self, texts):
+        """Vectors (lists of floats) for ``texts``, in order"""
+        unique = list(dict.fromkeys(texts))
+        vectors = self._cached(unique)
+        missing = [text for text in unique if text not in vectors]
+        started = time.perf_counter()
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            computed = dict(zip(batch, self.embedder.embed(batch)))
+            self._store(computed)
+            vectors.update(computed)
+        self.stats["texts"] += len(texts)
+        self.stats["cache_hits"] += len(unique) - len(missing)
+        self.stats["embedded"] += len(missing)
+        self.stats["seconds"] += time.perf_counter() - started
+        return [vectors[text].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.embed([text])[0]
+
+    def embed_objects(self, items):
+        """Vectors for several objects in one batched call.
+
+        ``items`` is a list of ``(properties, {vector name: source properties})``;
+        returns a list of ``{vector name: vector}`` in the same order. Vectors
+        whose source text is empty (a ticket without comments) are left out
+        rather than embedded as a meaningless zero/constant vector.
+        """
+        requests = [(index, name, vector_text(properties, sources))
+                    for index, (properties, vector_sources) in enumerate(items)
+                    for name, sources in vector_sources.items()]
+        requests = [request for request in requests if request[2].strip()]
+        vectors = self.embed([text for _, _, text in requests])
+        results = [{} for _ in items]
+        for (index, name, _), vector in zip(requests, vectors):
+            results[index][name] = vector
+        return results
+
+
+_embedding_service = None
+_embedding_service_lock = threading.Lock()
+
+
+def get_embedding_service():
+    """Process-wide EmbeddingService (the model is loaded once per worker)"""
+    global _embedding_service
+    with _embedding_service_lock:
+        if _embedding_service is None:
+            _embedding_service = EmbeddingService()
+        return _embedding_service
@@ -0,0 +1,542 @@
+import logging
+import queue
+import threading
+import time
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Fields requested when listing search pages; full issues are fetched per ticket
+LIST_FIELDS = ('key', 'id', 'summary', 'status', 'project', 'created', 'updated')
+
+_DONE = object()   # End of stream marker between stages
+_TICK = object()   # Lets the sink flush a partial batch when input is slow
+
+
+def call_with_retry(func, *args, max_attempts=5, **kwargs):
+    """Call a Jira request, waiting out 429/503 responses (honours Retry-After)"""
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return func(*args, **kwargs)
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status not in (429, 503) or attempt == max_attempts:
+                raise
+            retry_after = e.response.headers.get('Retry-After')
+            delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+            logger.warning(f"Jira returned {status}, retrying in {delay:g}s")
+            time.sleep(delay)
+
+
+def stub(issue):
+    """What the pipeline (and its checkpoint) keeps of a listed issue"""
+    kept = {name: issue[name] for name in ('key', 'id') if name in issue}
+    fields = issue.get('fields') or {}
+    listed = {}
+    if (fields.get('project') or {}).get('key'):
+        listed['project'] = {'key': fields['project']['key']}
+    if fields.get('updated'):
+        # Lets the fetch stage serve the issue from the raw cache when it is current
+        listed['updated'] = fields['updated']
+    if listed:
+        kept['fields'] = listed
+    return kept
+
+
+class IssueRecord:
+    """An issue travelling through the pipeline.
+
+    ``status`` is None while it is still to be stored, then 'stored',
+    'missing' (not found), 'filtered' (rejected by a transform) or 'error'.
+    """
+
+    __slots__ = ('stub', 'details', 'status', 'error')
+
+    def __init__(self, issue_stub):
+        self.stub = issue_stub
+        self.details = None
+        self.status = None
+        self.error = None
+
+    @property
+    def key(self):
+        return self.stub.get('key')
+
+
+# ---------------------------------------------------------------- sources
+#
+# A source lists issues page by page: pages(cursor) is a generator of
+# (issues, next_cursor) with next_cursor None after the last page, and
+# initial_cursor() is where a fresh import starts. Cursors are JSON so they
+# can be checkpointed.
+
+class JqlSource:
+    """Issues matching a JQL query.
+
+    Uses offset pagination on /rest/api/3/search, or nextPageToken
+    pagination on /rest/api/3/search/jql when ``token_pagination`` is set.
+    Sites where /rest/api/3/search is removed (410 Gone) are switched to
+    token pagination from the first page; issues already committed are
+    skipped by the checkpoint.
+    """
+
+    name = 'jql'
+
+    def __init__(self, jira_service, jql, page_size=100, token_pagination=False):
+        self.jira_service = jira_service
+        self.jql = jql
+        self.page_size = page_size
+        self.token_pagination = token_pagination
+        self.params = {'jql': jql, 'token_pagination': token_pagination}
+
+    def initial_cursor(self):
+        return {'next_page_token': None} if self.token_pagination else {'start_at': 0}
+
+    def pages(self, cursor):
+        while cursor is not None:
+            if 'next_page_token' in cursor:
+                data = call_with_retry(self.jira_service.search_issues_by_token, self.jql,
+                                       cursor.get('next_page_token'), self.page_size, LIST_FIELDS)
+                issues = data.get('issues', [])
+                token = data.get('nextPageToken')
+                next_cursor = {'next_page_token': token} if token and not data.get('isLast') else None
+            else:
+                start_at = cursor['start_at']
+                try:
+                    data = call_with_retry(self.jira_service.search_issues, self.jql,
+                                           start_at, self.page_size, LIST_FIELDS)
+                except requests.HTTPError as e:
+                    if e.response is None or e.response.status_code != 410:
+                        raise
+                    logger.warning("/rest/api/3/search is gone (410), continuing with /rest/api/3/search/jql")
+                    self.token_pagination = True
+                    cursor = {'next_page_token': None}
+                    continue
+                issues = data.get('issues', [])
+                # Jira may cap maxResults below page_size, so advance by what came back
+                next_start = start_at + len(issues)
+                next_cursor = {'start_at': next_start} if issues and next_start < data.get('total', 0) else None
+            yield issues, next_cursor
+            cursor = next_cursor
+
+    def observe(self, key, found):
+        pass
+
+
+class KeyRangeSource:
+    """Keys PREFIX-start .. PREFIX-end, for sites where search is unavailable.
+
+    Listing is free (keys are generated); the end of the project is
+    detected after ``stop_after_missing`` consecutive keys that do not
+    exist, as reported by observe().
+    """
+
+    name = 'key_range'
+
+    def __init__(self, prefix, start=1, end=2000, chunk=50, stop_after_missing=100, known_keys=()):
+        self.prefix = prefix
+        self.start = start
+        self.end = end
+        self.chunk = chunk
+        self.stop_after_missing = stop_after_missing
+        self.known_keys = known_keys
+        self.params = {'prefix': prefix, 'start': start, 'end': end}
+        self._last_found = 0
+        self._lock = threading.Lock()
+
+    def initial_cursor(self):
+        return {'next_number': self.start, 'last_found': 0}
+
+    def _number(self, key):
+        return int(key.rsplit('-', 1)[-1])
+
+    def pages(self, cursor):
+        with self._lock:
+            self._last_found = max(self._last_found, cursor.get('last_found', 0))
+        number = cursor['next_number']
+        while True:
+            with self._lock:
+                last_found = self._last_found
+            # Detection lags behind the fetchers by the queue length, which only
+            # costs a few extra not-found lookups
+            if last_found and number - last_found > self.stop_after_missing:
+                logger.info(f"Stopping after {number - last_found - 1} consecutive missing keys")
+                yield [], None
+                return
+            stop = min(number + self.chunk, self.end + 1)
+            issues = [{'key': f"{self.prefix}-{n}"} for n in range(number, stop)]
+            # Already stored tickets count as found without asking Jira again
+            for issue in issues:
+                if issue['key'] in self.known_keys:
+                    self.observe(issue['key'], True)
+            number = stop
+            if number > self.end:
+                yield issues, None
+                return
+            yield issues, {'next_number': number, 'last_found': self._last_found}
+
+    def observe(self, key, found):
+        if found:
+            with self._lock:
+                self._last_found = max(self._last_found, self._number(key))
+
+
+class RawCacheSource:
+    """Every issue in the local raw cache (services/raw_issue_store.py), by issue id"""
+
+    name = 'raw_cache'
+
+    def __init__(self, raw_store, chunk=500):
+        self.raw_store = raw_store
+        self.chunk = chunk
+        self.params = {'path': raw_store.path}
+
+    def initial_cursor(self):
+        return {'after': ''}
+
+    def pages(self, cursor):
+        after = cursor['after']
+        while True:
+            rows = self.raw_store.issue_refs(after, self.chunk)
+            issues = [{'id': issue_id, 'key': issue_key} for issue_id, issue_key in rows]
+            if len(rows) < self.chunk:
+                yield issues, None
+                return
+            after = rows[-1][0]
+            yield issues, {'after': after}
+
+    def observe(self, key, found):
+        pass
+
+
+class KeysSource:
+    """An explicit list of issue keys"""
+
+    name = 'keys'
+
+    def __init__(self, keys, chunk=50):
+        self.keys = list(keys)
+        self.chunk = chunk
+        self.params = {'keys': self.keys}
+
+    def initial_cursor(self):
+        return {'index': 0} if self.keys else None
+
+    def pages(self, cursor):
+        index = cursor['index']
+        while index < len(self.keys):
+            issues = [{'key': key} for key in self.keys[index:index + self.chunk]]
+            index += self.chunk
+            yield issues, ({'index': index} if index < len(self.keys) else None)
+
+    def observe(self, key, found):
+        pass
+
+
+# ------------------------------------------------------------- transforms
+#
+# Transforms are generators over the record stream, chained between the
+# fetch stage and the sink. They mark records instead of dropping them so
+# every listed issue is still acknowledged in the checkpoint.
+
+def record_transform(check):
+    """Build a transform from ``check(record)``, applied to records still to be stored"""
+    def transform(records):
+        for record in records:
+            if isinstance(record, IssueRecord) and record.status is None:
+                check(record)
+            yield record
+    return transform
+
+
+def project_filter(project_keys):
+    """Filter out issues outside one project key or a collection of them"""
+    wanted = {project_keys} if isinstance(project_keys, str) else set(project_keys)
+
+    def check(record):
+        project = ((record.details.get('fields') or {}).get('project') or {}).get('key')
+        if project not in wanted:
+            record.status = 'filtered'
+    return record_transform(check)
+
+
+def status_filter(statuses):
+    wanted = {status.lower() for status in statuses}
+
+    def check(record):
+        status = ((record.details.get('fields') or {}).get('status') or {}).get('name') or ''
+        if status.lower() not in wanted:
+            record.status = 'filtered'
+    return record_transform(check)
+
+
+def newer_stored_filter(newer_stored_keys, chunk=100):
+    """Filter out issues whose stored copy is newer than the fetched version.
+
+    ``newer_stored_keys(issues)`` (WeaviateService.newer_stored_keys) is
+    asked about up to ``chunk`` records at a time; held records are released
+    whenever the stream stalls, so batches are not delayed.
+    """
+    def mark(held):
+        newer = newer_stored_keys([record.details for record in held])
+        for record in held:
+            if record.key in newer:
+                record.status = 'filtered'
+
+    def transform(records):
+        held = []
+        for item in records:
+            pending = isinstance(item, IssueRecord) and item.status is None
+            if pending:
+                held.append(item)
+            if held and (not pending or len(held) >= chunk):
+                mark(held)
+                yield from held
+                held = []
+            if not pending:
+                yield item
+        if held:
+            mark(held)
+            yield from held
+    return transform
+
+
+def jira_fetcher(jira_service):
+    """Fetch stage for Jira: the full issue by id (or key), None when it does not exist.
+
+    Listed issues whose cached raw copy is at least as recent as their
+    ``updated`` field are served from the raw cache without a Jira call.
+    """
+    raw_store = getattr(jira_service, 'raw_store', None)
+
+    def fetch(issue_stub):
+        updated = (issue_stub.get('fields') or {}).get('updated')
+        if raw_store is not None and updated:
+            cached = raw_store.get(issue_stub.get('id') or issue_stub['key'], min_updated=updated)
+            if cached is not None:
+                return cached
+        try:
+            return call_with_retry(jira_service.get_issue_details, issue_stub.get('id') or issue_stub['key'])
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+    return fetch
+
+
+def raw_cache_fetcher(raw_store):
+    """Fetch stage for reindexing: the latest cached version, never Jira"""
+    def fetch(issue_stub):
+        return raw_store.get(issue_stub.get('id') or issue_stub['key'])
+    return fetch
+
+
+# --------------------------------------------------------------- pipeline
+
+class IngestPipeline:
+    """Streaming bulk import: source -> fetchers -> transforms -> batched sink.
+
+    One thread lists pages from the source, ``workers`` threads fetch full
+    issues, and the calling thread runs the transform generators and
+    writes batches with ``store_batch(issues) -> {key: error}``. Stages are
+    joined by bounded queues, so a slow sink throttles fetching and
+    listing and memory stays constant whatever the project size.
+
+    After every batch the checkpoint records the source cursor, the
+    committed keys and the listed issues not yet committed, so an
+    interrupted import resumes without listing, fetching or writing
+    committed issues again (see ImportCheckpoint). Work in flight when it
+    stopped is repeated, within resume_rework().
+    """
+
+    # Queue capacities: issues listed ahead of the fetchers per worker, and
+    # fetched issues waiting for the sink per batch
+    TODO_PER_WORKER = 4
+    FETCHED_PER_BATCH = 2
+
+    @classmethod
+    def resume_rework(cls, workers=4, batch_size=50):
+        """Most work a resumed import repeats, as {'fetches', 'writes', 'listed'}.
+
+        Issues fetched but not checkpointed when the import died (the
+        fetched queue, one per fetcher and the batch being written) are
+        fetched again; only the batch being written can be written again
+        (insert_issues skips tickets that are unchanged); pages holding the
+        issues listed since the last checkpoint are listed again. Records a
+        transform holds back (newer_stored_filter) add to the fetches.
+        """
+        workers, batch_size = max(1, workers), max(1, batch_size)
+        fetches = batch_size * cls.FETCHED_PER_BATCH + workers + batch_size
+        return {'fetches': fetches, 'writes': batch_size, 'listed': workers * cls.TODO_PER_WORKER + fetches}
+
+    def __init__(self, source, fetch_details, store_batch, checkpoint, transforms=(),
+                 workers=4, batch_size=50, flush_seconds=2.0, on_batch=None):
+        self.source = source
+        self.fetch_details = fetch_details
+        self.store_batch = store_batch
+        self.checkpoint = checkpoint
+        self.transforms = list(transforms)
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.on_batch = on_batch
+
+        self._todo = queue.Queue(maxsize=self.workers * self.TODO_PER_WORKER)
+        self._fetched = queue.Queue(maxsize=self.batch_size * self.FETCHED_PER_BATCH)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._outstanding = {}
+        self._cursor = checkpoint.cursor
+        self._errors = []
+        self.counts = {'stored': 0, 'skipped': 0, 'missing': 0, 'filtered': 0, 'errors': 0,
+                       'pages': 0, 'batches': 0, 'seconds': 0.0}
+
+    def _put(self, target, item):
+        """Blocking put that gives up once the pipeline is stopping"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _enqueue(self, issues, next_cursor=None, advance=False):
+        records = []
+        with self._lock:
+            for issue in issues:
+                key = issue.get('key')
+                if self.checkpoint.is_done(key):
+                    self.counts['skipped'] += 1
+                elif key not in self._outstanding:
+                    self._outstanding[key] = stub(issue)
+                    records.append(IssueRecord(self._outstanding[key]))
+            if advance:
+                self._cursor = next_cursor
+        for record in records:
+            if not self._put(self._todo, record):
+                return False
+        return True
+
+    def _produce(self):
+        try:
+            # Failed keys from an earlier run, then the rest of the interrupted page(s)
+            retry = [{'key': key} for key in sorted(self.checkpoint.failed)]
+            if retry:
+                logger.info(f"Retrying {len(retry)} previously failed issue(s)")
+            if not self._enqueue(retry + list(self.checkpoint.pending)):
+                return
+            if self._cursor is not None:
+                for issues, next_cursor in self.source.pages(self._cursor):
+                    self.counts['pages'] += 1
+                    if not self._enqueue(issues, next_cursor, advance=True):
+                        return
+        except Exception as e:
+            # Issues listed so far are still fetched and committed; run() raises afterwards
+            logger.error(f"Source failed: {str(e)}")
+            self._errors.append(e)
+        finally:
+            for _ in range(self.workers):
+                self._todo.put(_DONE)
+
+    def _fetch(self):
+        while True:
+            record = self._todo.get()
+            if record is _DONE:
+                if not self._stop.is_set():
+                    self._fetched.put(_DONE)
+                return
+            if self._stop.is_set():
+                continue
+            try:
+                record.details = self.fetch_details(record.stub)
+                if record.details is None:
+                    record.status = 'missing'
+                self.source.observe(record.key, record.details is not None)
+            except Exception as e:
+                record.status = 'error'
+                record.error = e
+            self._put(self._fetched, record)
+
+    def _stream(self):
+        """Records from the fetchers, with a tick whenever the input stalls"""
+        finished = 0
+        while finished < self.workers:
+            try:
+                item = self._fetched.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                yield _TICK
+                continue
+            if item is _DONE:
+                finished += 1
+            else:
+                yield item
+
+    def _commit(self, batch):
+        to_store = [record for record in batch if record.status is None]
+        if to_store:
+            failures = self.store_batch([record.details for record in to_store]) or {}
+            for record in to_store:
+                if record.key in failures:
+                    record.status, record.error = 'error', failures[record.key]
+                else:
+                    record.status = 'stored'
+
+        committed = [record.key for record in batch if record.status != 'error']
+        failed = {record.key: str(record.error)[:200] for record in batch if record.status == 'error'}
+        with self._lock:
+            for record in batch:
+                self._outstanding.pop(record.key, None)
+            cursor = self._cursor
+            pending = list(self._outstanding.values())
+        self.checkpoint.commit(cursor, committed, failed, pending)
+
+        batch_counts = {'stored': 0, 'missing': 0, 'filtered': 0, 'errors': 0}
+        for record in batch:
+            batch_counts['errors' if record.status == 'error' else record.status] += 1
+            if record.status == 'error':
+                logger.error(f"Failed to import {record.key}: {record.error}")
+        for name, value in batch_counts.items():
+            self.counts[name] += value
+        self.counts['batches'] += 1
+        if self.on_batch:
+            self.on_batch(batch_counts, self.counts)
+
+    def run(self):
+        started = time.monotonic()
+        threads = [threading.Thread(target=self._produce, name='ingest-source', daemon=True)]
+        threads += [threading.Thread(target=self._fetch, name=f'ingest-fetch-{n}', daemon=True)
+                    for n in range(self.workers)]
+        for thread in threads:
+            thread.start()
+
+        try:
+            stream = self._stream()
+            for transform in self.transforms:
+                stream = transform(stream)
+
+            batch = []
+            last_flush = time.monotonic()
+            for item in stream:
+                if item is not _TICK:
+                    batch.append(item)
+                if len(batch) >= self.batch_size or (batch and time.monotonic() - last_flush >= self.flush_seconds):
+                    self._commit(batch)
+                    batch = []
+                    last_flush = time.monotonic()
+            if batch:
+                self._commit(batch)
+        except BaseException:
+            # Uncommitted records stay pending in the checkpoint for --resume
+            self._stop.set()
+            raise
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+            self.counts['seconds'] = time.monotonic() - started
+
+        if self._errors:
+            raise self._errors[0]
+        self.checkpoint.finish()
+        return self.counts
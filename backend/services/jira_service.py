@@ -5,16 +5,50 @@ import logging
 from requests.auth import HTTPBasicAuth
 import requests
 from flask import current_app
+from services.raw_issue_store import get_raw_issue_store
 
 class JiraService:
-    def __init__(self, base_url, username, api_token):
+    def __init__(self, base_url, username, api_token, raw_store=None):
         self.base_url = base_url
         self.auth = HTTPBasicAuth(username, api_token)
         self.headers = {"Accept": "application/json"}
+        # Every complete issue fetched is also kept in the local raw cache
+        self.raw_store = raw_store if raw_store is not None else get_raw_issue_store()
 
-    def get_issue_details(self, issue_id):
-        """Fetch complete issue details from Jira API"""
+    def get_issue_details(self, issue_id, fields=None):
+        """Fetch complete issue details from Jira API
+
+        Pass ``fields`` to fetch only those fields (plus id/key).
+        """
         url = f"{self.base_url}/rest/api/3/issue/{issue_id}"
-        response = requests.get(url, headers=self.headers, auth=self.auth)
+        params = {'fields': ','.join(fields)} if fields else None
+        response = requests.get(url, headers=self.headers, auth=self.auth, params=params, timeout=60)
+        response.raise_for_status()
+        issue = response.json()
+        if self.raw_store is not None and not fields:
+            self.raw_store.put(issue)
+        return issue
+
+    def search_issues(self, jql, start_at=0, max_results=100, fields=None):
+        """One page of a JQL search (/rest/api/3/search, offset pagination)"""
+        url = f"{self.base_url}/rest/api/3/search"
+        payload = {'jql': jql, 'startAt': start_at, 'maxResults': max_results}
+        if fields:
+            payload['fields'] = list(fields)
+        response = requests.post(url, headers=dict(self.headers, **{"Content-Type": "application/json"}),
+                                 auth=self.auth, json=payload, timeout=60)
+        response.raise_for_status()
+        return response.json()
+
+    def search_issues_by_token(self, jql, next_page_token=None, max_results=100, fields=None):
+        """One page of a JQL search (/rest/api/3/search/jql, nextPageToken pagination)"""
+        url = f"{self.base_url}/rest/api/3/search/jql"
+        payload = {'jql': jql, 'maxResults': max_results}
+        if next_page_token:
+            payload['nextPageToken'] = next_page_token
+        if fields:
+            payload['fields'] = list(fields)
+        response = requests.post(url, headers=dict(self.headers, **{"Content-Type": "application/json"}),
+                                 auth=self.auth, json=payload, timeout=60)
         response.raise_for_status()
         return response.json()
\ No newline at end of file
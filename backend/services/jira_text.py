@@ -0,0 +1,88 @@
+import re
+
+# Jira REST v3 returns descriptions and comment bodies as Atlassian Document
+# Format (ADF) while webhooks deliver the same text as wiki markup. Both are
+# reduced here to their words on one line, so the stored text, contentHash,
+# vectors and digests of a ticket do not depend on which path wrote it last.
+
+_WHITESPACE = re.compile(r"\s+")
+
+# {code:java} ... {code} and {noformat} ... {noformat}: content kept as is
+_WIKI_PREFORMATTED = re.compile(r"\{(code|noformat)(?::[^}]*)?\}(.*?)\{\1\}", re.DOTALL)
+
+# Wiki markup outside preformatted blocks, applied in order
+# (https://jira.atlassian.com/secure/WikiRendererHelpAction.jspa)
+_WIKI_RULES = [
+    # {quote}, {panel:title=x}, {color:red} ... tags; their content is kept
+    (re.compile(r"\{(?:quote|panel|color)(?::[^}]*)?\}"), " "),
+    # Headings, block quotes and list bullets at the start of a line
+    (re.compile(r"^\s*(?:h[1-6]\.|bq\.|[*#-]+(?=\s))\s*", re.MULTILINE), ""),
+    (re.compile(r"^\s*-{4,}\s*$", re.MULTILINE), " "),
+    # Attached or linked images: !name.png|thumbnail!
+    (re.compile(r"!(?:[^\s!|]+\.\w{2,5}|https?://[^\s!|]+)(?:\|[^!\n]*)?!"), " "),
+    # Mentions (ADF keeps them as nodes without text) and links: [text|url], [url]
+    (re.compile(r"\[~[^\]]*\]"), " "),
+    (re.compile(r"\[([^|\]\n]+)(?:\|[^\]\n]*)?\]"), r"\1"),
+    (re.compile(r"\{\{(.+?)\}\}"), r"\1"),
+    # *strong* _emphasis_ -deleted- +inserted+ ^sup^ ~sub~ ??citation?? between word boundaries
+    (re.compile(r"(?<![\w\\])([*_\-+^~])(?=\S)(.+?)(?<=\S)\1(?!\w)"), r"\2"),
+    (re.compile(r"(?<![\w\\])\?\?(?=\S)(.+?)(?<=\S)\?\?(?!\w)"), r"\1"),
+    # Table cell separators, forced line breaks, then escaped markup characters
+    (re.compile(r"\|\|?"), " "),
+    (re.compile(r"\\\\"), " "),
+    (re.compile(r"\\([^\s\\])"), r"\1"),
+]
+
+
+def collapse_whitespace(text):
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def _wiki_inline(text):
+    for pattern, replacement in _WIKI_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def wiki_text(markup):
+    """Words of a wiki markup string (webhook descriptions and comment bodies)"""
+    markup = markup or ""
+    pieces = []
+    position = 0
+    for match in _WIKI_PREFORMATTED.finditer(markup):
+        pieces += [_wiki_inline(markup[position:match.start()]), match.group(2)]
+        position = match.end()
+    pieces.append(_wiki_inline(markup[position:]))
+    return collapse_whitespace(" ".join(pieces))
+
+
+def _adf_parts(node, parts):
+    if isinstance(node, list):
+        for child in node:
+            _adf_parts(child, parts)
+        return
+    if not isinstance(node, dict):
+        return
+    kind = node.get('type')
+    if kind == 'text':
+        parts.append(node.get('text') or '')
+    elif kind == 'inlineCard':
+        parts.append((node.get('attrs') or {}).get('url') or '')
+    _adf_parts(node.get('content'), parts)
+    if kind != 'text':
+        # Paragraphs, list items, table cells and hard breaks separate words
+        parts.append(' ')
+
+
+def adf_text(doc):
+    """Words of an Atlassian Document Format node (REST v3 descriptions and comment bodies)"""
+    parts = []
+    _adf_parts(doc, parts)
+    return collapse_whitespace(''.join(parts))
+
+
+def plain_text(value):
+    """Words of a Jira rich text field in either format, or None when it is empty"""
+    if not value:
+        return None
+    return wiki_text(value) if isinstance(value, str) else adf_text(value)
@@ -0,0 +1,68 @@
+import logging
+import requests
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMService:
+    """Thin wrapper over the text-generation backends used by the agent.
+
+    provider is 'gemini' (Google Gemini API) or 'ollama' (local Ollama
+    server, see ollama/test_llama.py), so offline-capable stages such as
+    ticket digests can run without the Gemini API.
+    """
+
+    def __init__(self, provider='gemini', model=None):
+        self.provider = provider
+        if provider == 'gemini':
+            self.model = model or 'gemini-2.5-flash'
+        elif provider == 'ollama':
+            self.model = model or Config.OLLAMA_MODEL
+        else:
+            raise ValueError(f"Unknown LLM provider '{provider}'")
+
+    def generate(self, prompt, system=None, temperature=0.2, max_output_tokens=1024, top_p=None, top_k=None):
+        """Generated text for ``prompt``; top_p/top_k are left to the backend default when None"""
+        sampling = {name: value for name, value in (("top_p", top_p), ("top_k", top_k)) if value is not None}
+        if self.provider == 'gemini':
+            return self._generate_gemini(prompt, system, temperature, max_output_tokens, sampling)
+        return self._generate_ollama(prompt, system, temperature, max_output_tokens, sampling)
+
+    def _generate_gemini(self, prompt, system, temperature, max_output_tokens, sampling):
+        import google.generativeai as genai
+
+        genai.configure(api_key=Config.GEMINI_API_KEY)
+        model = genai.GenerativeModel(self.model)
+        full_prompt = f"{system}\n\n{prompt}" if system else prompt
+        response = model.generate_content(
+            full_prompt,
+            generation_config={
+                "temperature": temperature,
+                "max_output_tokens": max_output_tokens,
+                **sampling,
+            }
+        )
+        return response.text or ''
+
+    def _generate_ollama(self, prompt, system, temperature, max_output_tokens, sampling):
+        data = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_output_tokens,
+                **sampling,
+            }
+        }
+        if system:
+            data["system"] = system
+        response = requests.post(
+            f"{Config.OLLAMA_URL}/api/generate",
+            json=data,
+            headers={"Content-Type": "application/json"},
+            timeout=Config.OLLAMA_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json().get('response', '')
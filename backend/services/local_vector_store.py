@@ -0,0 +1,1148 @@
+import fcntl
+import fnmatch
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import threading
+import uuid as uuid_lib
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import numpy as np
+from weaviate.classes.config import DataType, Tokenization, Vectorizers
+from weaviate.classes.tenants import TenantActivityStatus
+from weaviate.collections.classes.filters import _FilterAnd, _FilterOr, _FilterValue, _Operator
+from weaviate.collections.classes.grpc import _MultiTargetVectorJoin, _MultiTargetVectorJoinEnum
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# In-process storage backend (VECTOR_BACKEND=local).
+#
+# LocalClient implements the subset of the Weaviate client collection API that
+# WeaviateService, the chunk/tier/tenant helpers and the migration and snapshot
+# tools use (create/get/exists/delete collections, with_tenant, tenants,
+# data.insert/insert_many/update/delete_many, query.fetch_objects/
+# fetch_object_by_id/hybrid/near_vector/bm25, aggregate.over_all, iterator),
+# so the service code runs unchanged on either backend.
+#
+# Every collection (and tenant) is a shard directory under LOCAL_STORE_PATH:
+#
+#   log.<gen>.jsonl     append-only log of puts and deletes (properties, references)
+#   <vector>.<gen>.f32  memory-mapped float32 matrix, one row per put (NaN: no vector)
+#   meta.json           vector dimensions
+#   CURRENT             generation number, bumped by compaction
+#
+# An update is a put of a new row; the old row is marked dead, so the files are
+# only ever appended to until compaction rewrites the live rows. Writers take an
+# flock on the shard; other processes replay the log tail on their next call.
+# Searches use brute-force cosine similarity over the matrix, a BM25 inverted
+# index over the text properties and per-value row bitmaps for filters.
+#
+# The backend never embeds text: collections report no vectorizer, so
+# WeaviateService sends client-side vectors (see services/embedding_service.py).
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Candidates taken from each side of a hybrid search before fusion
+HYBRID_CANDIDATES = 100
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Weaviate's 'en' stopword preset (subset that matters for ticket text)
+STOPWORDS = frozenset(
+    "a an and are as at be but by for if in into is it no not of on or such that the their then "
+    "there these they this to was will with".split()
+)
+_TEXT_TYPES = (DataType.TEXT.value, DataType.TEXT_ARRAY.value)
+_NUMERIC_TYPES = (DataType.INT.value, DataType.NUMBER.value, DataType.DATE.value)
+_DEFAULT_TENANT = "_default"
+
+
+class LocalStoreError(Exception):
+    pass
+
+
+def _tokens(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _timestamp(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
+
+
+def _uuid(value):
+    return str(uuid_lib.UUID(str(value)))
+
+
+class _Schema:
+    """Collection definition kept in <collection>/schema.json"""
+
+    def __init__(self, name, properties, vectors, named, multi_tenant, references, tenants=None):
+        self.name = name
+        self.properties = properties  # {name: {"type", "tokenization", "searchable"}}
+        self.vectors = vectors  # {vector name: [source properties]}
+        self.named = named
+        self.multi_tenant = multi_tenant
+        self.references = references  # {reference name: target collection}
+        self.tenants = tenants or {}  # {tenant: activity status}
+
+    @classmethod
+    def from_create(cls, name, properties=None, references=None, vectorizer_config=None,
+                    multi_tenancy_config=None, **_):
+        props = {}
+        for prop in properties or []:
+            props[prop.name] = {
+                "type": prop.dataType.value,
+                "tokenization": prop.tokenization.value if prop.tokenization else None,
+                "searchable": prop.indexSearchable is not False,
+            }
+        if isinstance(vectorizer_config, list):
+            vectors = {config.name: list(config.properties or []) for config in vectorizer_config}
+            named = True
+        else:
+            vectors = {"default": []}
+            named = False
+        return cls(name, props, vectors, named, bool(multi_tenancy_config and multi_tenancy_config.enabled),
+                   {ref.name: ref.target_collection for ref in references or []})
+
+    def to_json(self):
+        return {"name": self.name, "properties": self.properties, "vectors": self.vectors, "named": self.named,
+                "multi_tenant": self.multi_tenant, "references": self.references, "tenants": self.tenants}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["name"], data["properties"], data["vectors"], data["named"], data["multi_tenant"],
+                   data["references"], data.get("tenants"))
+
+    def config(self):
+        """Collection config in the shape of Weaviate's collection.config.get()"""
+        none = SimpleNamespace(vectorizer=Vectorizers.NONE)
+        vector_config = None
+        if self.named:
+            vector_config = {
+                name: SimpleNamespace(vectorizer=SimpleNamespace(vectorizer=Vectorizers.NONE,
+                                                                 source_properties=sources or None))
+                for name, sources in self.vectors.items()
+            }
+        return SimpleNamespace(
+            name=self.name,
+            properties=[SimpleNamespace(name=name, data_type=DataType(spec["type"]))
+                        for name, spec in self.properties.items()],
+            references=[SimpleNamespace(name=name, target_collections=[target])
+                        for name, target in self.references.items()],
+            vectorizer=none.vectorizer,
+            vector_config=vector_config,
+            multi_tenancy_config=SimpleNamespace(enabled=self.multi_tenant, auto_tenant_creation=True,
+                                                 auto_tenant_activation=True),
+        )
+
+
+class _Shard:
+    """Objects of one collection or tenant, with their vector, text and filter indexes"""
+
+    def __init__(self, schema, directory=None):
+        self.schema = schema
+        self.directory = directory
+        self.lock = threading.RLock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # -- state -------------------------------------------------------------
+
+    def _reset(self):
+        self.uuids = []  # row -> uuid
+        self.row_of = {}  # uuid -> live row
+        self.props = []  # row -> properties
+        self.refs = []  # row -> {reference: [uuid]}
+        self.alive = np.zeros(0, dtype=bool)
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.postings = {}  # term -> ([rows], [term frequencies])
+        self.values = {}  # property -> {normalized value: [rows]}
+        self.numeric = {}  # property -> float64 column (NaN: no value)
+        self.vectors = {}  # vector name -> (rows x dims) float32 matrix
+        self.norms = {}  # vector name -> row norms (NaN: no vector)
+        self.dims = {}
+        self.version = 0  # bumped by every write; keys the filter bitmap cache
+        self._bitmaps = {}
+        self._capacity = 0
+        self._offset = 0
+        self._grow(1)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _generation(self):
+        try:
+            with open(self._path("CURRENT")) as handle:
+                return int(handle.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def _load(self):
+        self._reset()
+        self.generation = self._generation() if self.directory else 0
+        if not self.directory:
+            return
+        try:
+            with open(self._path("meta.json")) as handle:
+                self.dims = json.load(handle).get("dims", {})
+        except FileNotFoundError:
+            self.dims = {}
+        self._replay()
+
+    def _replay(self):
+        """Apply log entries written since the last call (by this or another process)"""
+        path = self._path(f"log.{self.generation}.jsonl")
+        if not os.path.exists(path) or os.path.getsize(path) <= self._offset:
+            return
+        with open(path, "rb") as handle:
+            handle.seek(self._offset)
+            data = handle.read()
+        end = data.rfind(b"\n") + 1  # an entry being written is picked up next time
+        self._open_stored_vectors()
+        for line in data[:end].splitlines():
+            entry = json.loads(line)
+            if "d" in entry:
+                self._apply_delete(entry["d"])
+            else:
+                self._apply_put(entry["u"], entry["p"], entry.get("r") or {}, stored_vectors=True)
+        self._offset += end
+
+    def sync(self):
+        """Catch up with writes made by other processes"""
+        if not self.directory:
+            return
+        if self._generation() != self.generation:
+            self._load()
+        else:
+            self._replay()
+
+    # -- storage -----------------------------------------------------------
+
+    def _grow(self, rows):
+        if rows <= self._capacity:
+            return
+        capacity = max(1024, self._capacity * 2, rows)
+        self.alive = np.concatenate([self.alive, np.zeros(capacity - len(self.alive), dtype=bool)])
+        self.doc_len = np.concatenate([self.doc_len, np.zeros(capacity - len(self.doc_len), dtype=np.float32)])
+        for name in self.numeric:
+            self.numeric[name] = np.concatenate([self.numeric[name], np.full(capacity - len(self.numeric[name]), np.nan)])
+        for name in self.vectors:
+            self._map_vectors(name, capacity)
+        self._capacity = capacity
+
+    def _map_vectors(self, name, capacity):
+        dims = self.dims[name]
+        norms = self.norms.get(name, np.zeros(0, dtype=np.float32))
+        self.norms[name] = np.concatenate([norms, np.full(capacity - len(norms), np.nan, dtype=np.float32)])
+        if not self.directory:
+            matrix = np.full((capacity, dims), np.nan, dtype=np.float32)
+            if name in self.vectors:
+                matrix[:len(self.vectors[name])] = self.vectors[name]
+            self.vectors[name] = matrix
+            return
+        path = self._path(f"{name}.{self.generation}.f32")
+        size = capacity * dims * 4
+        with open(path, "ab") as handle:
+            current = handle.tell()
+            if current < size:
+                # New rows read as NaN until written
+                handle.write(np.full((size - current) // 4, np.nan, dtype="<f4").tobytes())
+        self.vectors[name] = np.memmap(path, dtype="<f4", mode="r+", shape=(capacity, dims))
+
+    def _ensure_vector(self, name, dims):
+        if name in self.vectors:
+            if dims != self.dims[name]:
+                raise LocalStoreError(f"Vector '{name}' has {dims} dimensions, expected {self.dims[name]}")
+            return
+        if self.dims.get(name) not in (None, dims):
+            raise LocalStoreError(f"Vector '{name}' has {dims} dimensions, expected {self.dims[name]}")
+        self.dims[name] = dims
+        if self.directory:
+            with open(self._path("meta.json"), "w") as handle:
+                json.dump({"dims": self.dims}, handle)
+        self._map_vectors(name, self._capacity)
+
+    def _open_stored_vectors(self):
+        """Map vectors another process added to this shard"""
+        try:
+            with open(self._path("meta.json")) as handle:
+                self.dims = json.load(handle).get("dims", {})
+        except FileNotFoundError:
+            return
+        for name in self.dims:
+            if name not in self.vectors:
+                self._map_vectors(name, self._capacity)
+
+    # -- indexing ----------------------------------------------------------
+
+    def _normalize_value(self, name, value):
+        spec = self.schema.properties.get(name) or {}
+        if isinstance(value, str) and spec.get("tokenization") != Tokenization.FIELD.value:
+            return value.lower()
+        return value
+
+    def _apply_put(self, uuid, properties, references, vectors=None, stored_vectors=False):
+        old = self.row_of.get(uuid)
+        if old is not None:
+            self.alive[old] = False
+        row = len(self.uuids)
+        self._grow(row + 1)
+        self.uuids.append(uuid)
+        self.props.append(properties)
+        self.refs.append(references)
+        self.row_of[uuid] = row
+        self.alive[row] = True
+
+        terms = Counter()
+        for name, spec in self.schema.properties.items():
+            value = properties.get(name)
+            if value is None:
+                continue
+            if spec["type"] in _TEXT_TYPES and spec["searchable"]:
+                for text in _as_list(value):
+                    terms.update(_tokens(str(text)))
+            if spec["type"] in _NUMERIC_TYPES:
+                if name not in self.numeric:
+                    self.numeric[name] = np.full(self._capacity, np.nan)
+                self.numeric[name][row] = _timestamp(value)
+            elif spec["type"] not in (DataType.OBJECT.value, DataType.OBJECT_ARRAY.value):
+                index = self.values.setdefault(name, {})
+                for item in _as_list(value):
+                    index.setdefault(self._normalize_value(name, item), []).append(row)
+        for term, count in terms.items():
+            rows, counts = self.postings.setdefault(term, ([], []))
+            rows.append(row)
+            counts.append(count)
+        self.doc_len[row] = sum(terms.values())
+
+        if stored_vectors:
+            for name, matrix in self.vectors.items():
+                self.norms[name][row] = np.linalg.norm(matrix[row])
+        else:
+            for name, vector in (vectors or {}).items():
+                vector = np.asarray(vector, dtype=np.float32)
+                self._ensure_vector(name, len(vector))
+                self.vectors[name][row] = vector
+                self.norms[name][row] = np.linalg.norm(vector)
+        self.version += 1
+        return row
+
+    def _apply_delete(self, uuid):
+        row = self.row_of.pop(uuid, None)
+        if row is not None:
+            self.alive[row] = False
+            self.version += 1
+
+    # -- writes ------------------------------------------------------------
+
+    def _locked(self):
+        return _FileLock(self._path("lock") if self.directory else None)
+
+    def put(self, items):
+        """Write [(uuid, properties, {vector name: vector}, references)]"""
+        with self.lock, self._locked():
+            self.sync()
+            lines = []
+            for uuid, properties, vectors, references in items:
+                properties = json.loads(json.dumps(properties, default=_json_default))
+                self._apply_put(uuid, properties, references, vectors)
+                lines.append(json.dumps({"u": uuid, "p": properties, "r": references or None}, default=_json_default))
+            if self.directory:
+                for matrix in self.vectors.values():
+                    matrix.flush()
+                self._append(lines)
+            self._maybe_compact()
+
+    def delete(self, uuids):
+        with self.lock, self._locked():
+            self.sync()
+            deleted = [uuid for uuid in uuids if uuid in self.row_of]
+            for uuid in deleted:
+                self._apply_delete(uuid)
+            if self.directory and deleted:
+                self._append([json.dumps({"d": uuid}) for uuid in deleted])
+            self._maybe_compact()
+            return len(deleted)
+
+    def _append(self, lines):
+        path = self._path(f"log.{self.generation}.jsonl")
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        with open(path, "ab") as handle:
+            handle.write(data)
+        self._offset += len(data)
+
+    def _maybe_compact(self):
+        dead = len(self.uuids) - len(self.row_of)
+        if dead > max(1000, len(self.row_of)):
+            self._compact()
+
+    def compact(self):
+        """Rewrite the live rows only (drops the rows of updated and deleted objects)"""
+        with self.lock, self._locked():
+            self.sync()
+            self._compact()
+
+    def _compact(self):
+        # Callers hold the shard's thread lock and file lock (flock is per open
+        # file, so taking it again here would deadlock on the on-disk store)
+        live = [(uuid, self.props[row], {name: self.vectors[name][row].copy() for name in self.vectors},
+                 self.refs[row]) for uuid, row in self.row_of.items()]
+        previous = self.generation
+        dims = dict(self.dims)
+        self._reset()
+        self.dims = dims
+        self.generation = previous + 1
+        for uuid, properties, vectors, references in live:
+            self._apply_put(uuid, properties, references,
+                            {name: vector for name, vector in vectors.items() if not np.isnan(vector[0])})
+        if self.directory:
+            for matrix in self.vectors.values():
+                matrix.flush()
+            self._offset = 0
+            self._append([json.dumps({"u": uuid, "p": properties, "r": references or None})
+                          for uuid, properties, _, references in live] if live else [])
+            with open(self._path("CURRENT.tmp"), "w") as handle:
+                handle.write(str(self.generation))
+            os.replace(self._path("CURRENT.tmp"), self._path("CURRENT"))
+            for filename in os.listdir(self.directory):
+                if re.match(rf".+\.{previous}\.(jsonl|f32)$", filename):
+                    os.remove(self._path(filename))
+
+    # -- reads -------------------------------------------------------------
+
+    def live_rows(self):
+        return sorted(self.row_of.values())
+
+    def _bitmap(self, name, value):
+        key = (name, value)
+        cached = self._bitmaps.get(key)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        mask = np.zeros(len(self.uuids), dtype=bool)
+        mask[self.values.get(name, {}).get(value, [])] = True
+        self._bitmaps[key] = (self.version, mask)
+        return mask
+
+    def _present(self, name):
+        if name in self.numeric:
+            return ~np.isnan(self.numeric[name][:len(self.uuids)])
+        mask = np.zeros(len(self.uuids), dtype=bool)
+        for rows in self.values.get(name, {}).values():
+            mask[rows] = True
+        return mask
+
+    def mask(self, filters):
+        """Rows (live or not) matching a Weaviate filter, as a boolean array"""
+        size = len(self.uuids)
+        if filters is None:
+            return np.ones(size, dtype=bool)
+        if isinstance(filters, _FilterAnd):
+            result = np.ones(size, dtype=bool)
+            for part in filters.filters:
+                result &= self.mask(part)
+            return result
+        if isinstance(filters, _FilterOr):
+            result = np.zeros(size, dtype=bool)
+            for part in filters.filters:
+                result |= self.mask(part)
+            return result
+        if not isinstance(filters, _FilterValue) or not isinstance(filters.target, str):
+            raise LocalStoreError(f"Unsupported filter {filters!r} (reference and count filters need Weaviate)")
+        return self._value_mask(filters.target, filters.operator, filters.value)
+
+    def _value_mask(self, name, operator, value):
+        size = len(self.uuids)
+        if name == "_id":
+            mask = np.zeros(size, dtype=bool)
+            rows = [self.row_of.get(_uuid(item)) for item in _as_list(value)]
+            mask[[row for row in rows if row is not None]] = True
+            if operator in (_Operator.EQUAL, _Operator.CONTAINS_ANY):
+                return mask
+            if operator == _Operator.NOT_EQUAL:
+                return ~mask
+            raise LocalStoreError(f"Unsupported id filter operator {operator}")
+        if operator == _Operator.IS_NULL:
+            present = self._present(name)
+            return ~present if value else present
+        if name in self.numeric or (self.schema.properties.get(name) or {}).get("type") in _NUMERIC_TYPES:
+            column = self.numeric.get(name, np.full(self._capacity, np.nan))[:size]
+            if operator in (_Operator.CONTAINS_ANY, _Operator.CONTAINS_ALL):
+                return np.isin(column, [_timestamp(item) for item in _as_list(value)])
+            target = _timestamp(value)
+            with np.errstate(invalid="ignore"):
+                compare = {
+                    _Operator.EQUAL: column == target,
+                    _Operator.NOT_EQUAL: column != target,
+                    _Operator.LESS_THAN: column < target,
+                    _Operator.LESS_THAN_EQUAL: column <= target,
+                    _Operator.GREATER_THAN: column > target,
+                    _Operator.GREATER_THAN_EQUAL: column >= target,
+                }
+            if operator not in compare:
+                raise LocalStoreError(f"Unsupported operator {operator} on {name}")
+            return compare[operator]
+
+        values = [self._normalize_value(name, item) for item in _as_list(value)]
+        if operator == _Operator.EQUAL:
+            return self._bitmap(name, values[0])
+        if operator == _Operator.NOT_EQUAL:
+            return ~self._bitmap(name, values[0])
+        if operator == _Operator.CONTAINS_ANY:
+            result = np.zeros(size, dtype=bool)
+            for item in values:
+                result |= self._bitmap(name, item)
+            return result
+        if operator == _Operator.CONTAINS_ALL:
+            result = np.ones(size, dtype=bool)
+            for item in values:
+                result &= self._bitmap(name, item)
+            return result
+        if operator == _Operator.LIKE:
+            result = np.zeros(size, dtype=bool)
+            for stored in self.values.get(name, {}):
+                if isinstance(stored, str) and fnmatch.fnmatchcase(stored, values[0]):
+                    result |= self._bitmap(name, stored)
+            return result
+        raise LocalStoreError(f"Unsupported operator {operator} on {name}")
+
+    def candidates(self, filters):
+        return np.flatnonzero(self.alive[:len(self.uuids)] & self.mask(filters))
+
+    def vector_distances(self, rows, vector, target_vector):
+        """Cosine distances of ``rows`` to a query vector; NaN where a row has no vector.
+
+        Multi-target queries combine only the target vectors a row has, with
+        their weights scaled back up to the full weight, so a ticket without
+        a comments vector still ranks on its content vector."""
+        weights, combination = _target_weights(self.schema, target_vector)
+        query = np.asarray(vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query) or 1.0
+        parts, present = [], []
+        for name, weight in weights.items():
+            if name not in self.vectors:
+                parts.append(np.full(len(rows), np.nan))
+                present.append(np.zeros(len(rows)))
+                continue
+            matrix = self.vectors[name][rows]
+            if matrix.shape[1] != len(query):
+                raise LocalStoreError(f"Query vector has {len(query)} dimensions, '{name}' has {matrix.shape[1]}")
+            with np.errstate(invalid="ignore", divide="ignore"):
+                distances = 1.0 - matrix @ query / (self.norms[name][rows] * query_norm)
+            # Zero-norm vectors (empty source text) count as missing
+            distances[~np.isfinite(distances)] = np.nan
+            parts.append(weight * distances)
+            present.append(np.where(np.isnan(distances), 0.0, weight))
+        if not parts:
+            return np.full(len(rows), np.nan)
+        stacked, present = np.vstack(parts), np.vstack(present)
+        available = present.sum(axis=0)
+        result = np.full(len(rows), np.nan)
+        has = np.flatnonzero(available > 0)
+        if combination == _MultiTargetVectorJoinEnum.MINIMUM:
+            result[has] = np.nanmin(stacked[:, has], axis=0)
+        elif combination == _MultiTargetVectorJoinEnum.AVERAGE:
+            result[has] = np.nanmean(stacked[:, has], axis=0)
+        else:
+            result[has] = np.nansum(stacked[:, has], axis=0) * sum(weights.values()) / available[has]
+        return result
+
+    def bm25(self, rows, query):
+        """BM25 scores of ``rows`` for a keyword query (all searchable text properties)"""
+        scores = np.zeros(len(rows))
+        terms = [term for term in _tokens(query or "") if term not in STOPWORDS]
+        if not terms or not len(rows):
+            return scores
+        alive = self.alive[:len(self.uuids)]
+        live_count = int(alive.sum())
+        avg_len = float(self.doc_len[:len(self.uuids)][alive].mean()) or 1.0
+        position = np.full(len(self.uuids), -1)
+        position[rows] = np.arange(len(rows))
+        for term in terms:
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            posting_rows = np.asarray(posting[0])
+            counts = np.asarray(posting[1], dtype=np.float64)
+            live = alive[posting_rows]
+            frequency = int(live.sum())
+            if not frequency:
+                continue
+            idf = math.log(1 + (live_count - frequency + 0.5) / (frequency + 0.5))
+            keep = live & (position[posting_rows] >= 0)
+            hits, tf = posting_rows[keep], counts[keep]
+            length = self.doc_len[hits]
+            scores[position[hits]] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+        return scores
+
+
+def _target_weights(schema, target_vector):
+    """({vector name: weight}, combination) for a query's target_vector argument"""
+    if target_vector is None:
+        if schema.named and len(schema.vectors) > 1:
+            raise LocalStoreError(f"{schema.name} has several named vectors; a target vector is required")
+        return {next(iter(schema.vectors)): 1.0}, _MultiTargetVectorJoinEnum.SUM
+    if isinstance(target_vector, str):
+        return {target_vector: 1.0}, _MultiTargetVectorJoinEnum.SUM
+    if isinstance(target_vector, list):
+        return {name: 1.0 for name in target_vector}, _MultiTargetVectorJoinEnum.SUM
+    if isinstance(target_vector, _MultiTargetVectorJoin):
+        weights = target_vector.weights or {name: 1.0 for name in target_vector.target_vectors}
+        weights = {name: float(weight[0] if isinstance(weight, list) else weight) for name, weight in weights.items()}
+        return weights, target_vector.combination
+    raise LocalStoreError(f"Unsupported target vector {target_vector!r}")
+
+
+class _FileLock:
+    """flock on a shard's lock file (no-op for in-memory stores)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def __enter__(self):
+        if self.path:
+            self.handle = open(self.path, "a")
+            fcntl.flock(self.handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.handle:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+            self.handle.close()
+
+
+class LocalObject:
+    """Result object shaped like the Weaviate client's"""
+
+    __slots__ = ("uuid", "properties", "vector", "metadata", "references", "collection")
+
+    def __init__(self, uuid, properties, vector=None, metadata=None, references=None, collection=None):
+        self.uuid = uuid_lib.UUID(uuid)
+        self.properties = properties
+        self.vector = vector or {}
+        self.metadata = metadata or SimpleNamespace(score=None, distance=None, certainty=None)
+        self.references = references
+        self.collection = collection
+
+
+class LocalCollection:
+    """One collection (optionally bound to a tenant) of a LocalClient"""
+
+    def __init__(self, client, name, tenant=None):
+        self._client = client
+        self.name = name
+        self.tenant = tenant
+        self.config = SimpleNamespace(get=lambda simple=False: self._schema().config())
+        self.tenants = _LocalTenants(self)
+        self.data = _LocalData(self)
+        self.query = _LocalQuery(self)
+        self.aggregate = _LocalAggregate(self)
+
+    def with_tenant(self, tenant):
+        return LocalCollection(self._client, self.name, getattr(tenant, "name", tenant))
+
+    def _schema(self):
+        return self._client._schema(self.name)
+
+    def _shard(self, create=False):
+        schema = self._schema()
+        if not schema.multi_tenant:
+            if self.tenant:
+                raise LocalStoreError(f"{self.name} is not multi-tenant")
+            return self._client._shard(schema, _DEFAULT_TENANT)
+        if not self.tenant:
+            raise LocalStoreError(f"{self.name} is multi-tenant; use with_tenant()")
+        if self.tenant not in schema.tenants:
+            self._client._reload_schema(self.name)
+            schema = self._schema()
+        if self.tenant not in schema.tenants:
+            if not create:
+                # Reads see an empty tenant; the first write creates it
+                return _Shard(schema)
+            self._client._set_tenant(self.name, self.tenant, TenantActivityStatus.ACTIVE.value)
+        elif schema.tenants[self.tenant] != TenantActivityStatus.ACTIVE.value:
+            # Automatic tenant activation, as configured for Weaviate
+            self._client._set_tenant(self.name, self.tenant, TenantActivityStatus.ACTIVE.value)
+        return self._client._shard(self._schema(), self.tenant)
+
+    def _object(self, shard, row, include_vector=False, return_properties=None, metadata=None,
+                return_references=None):
+        properties = shard.props[row]
+        if return_properties is not None and return_properties is not True:
+            names = [return_properties] if isinstance(return_properties, str) else return_properties
+            properties = {name: properties[name] for name in names if name in properties}
+        properties = self._decode(shard.schema, properties)
+        vector = None
+        if include_vector:
+            vector = {name: matrix[row].tolist() for name, matrix in shard.vectors.items()
+                      if not np.isnan(shard.norms[name][row])}
+        references = self._references(shard, row, return_references) if return_references else None
+        return LocalObject(shard.uuids[row], properties, vector, metadata, references, self.name)
+
+    @staticmethod
+    def _decode(schema, properties):
+        """Stored (JSON) properties with dates as datetimes, like Weaviate returns them"""
+        decoded = dict(properties)
+        for name, value in properties.items():
+            kind = (schema.properties.get(name) or {}).get("type")
+            if kind == DataType.DATE.value and isinstance(value, str):
+                decoded[name] = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            elif kind == DataType.DATE_ARRAY.value and value:
+                decoded[name] = [datetime.fromisoformat(item.replace('Z', '+00:00')) for item in value]
+        return decoded
+
+    def _references(self, shard, row, return_references):
+        references = {}
+        for reference in _as_list(return_references):
+            target_name = shard.schema.references.get(reference.link_on)
+            if target_name is None:
+                continue
+            target = LocalCollection(self._client, target_name, self.tenant)
+            objects = [target.query.fetch_object_by_id(uuid, return_properties=reference.return_properties)
+                       for uuid in shard.refs[row].get(reference.link_on, [])]
+            references[reference.link_on] = SimpleNamespace(objects=[obj for obj in objects if obj is not None])
+        return references
+
+    def iterator(self, include_vector=False, return_properties=None, return_references=None, **_):
+        shard = self._shard()
+        with shard.lock:
+            shard.sync()
+            rows = shard.live_rows()
+        for row in rows:
+            yield self._object(shard, row, include_vector, return_properties, return_references=return_references)
+
+    def __len__(self):
+        return self.aggregate.over_all(total_count=True).total_count
+
+
+class _LocalTenants:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def get(self):
+        client = self._collection._client
+        client._reload_schema(self._collection.name)
+        return {name: SimpleNamespace(name=name, activity_status=TenantActivityStatus(status))
+                for name, status in client._schema(self._collection.name).tenants.items()}
+
+    def create(self, tenants):
+        for tenant in _as_list(tenants):
+            self._collection._client._set_tenant(self._collection.name, getattr(tenant, "name", tenant),
+                                                 TenantActivityStatus.ACTIVE.value)
+
+    def update(self, tenants):
+        client = self._collection._client
+        for tenant in _as_list(tenants):
+            status = getattr(tenant.activity_status, "value", tenant.activity_status)
+            # Cold tenants are unloaded from memory; their files stay on disk
+            client._set_tenant(self._collection.name, tenant.name,
+                               TenantActivityStatus.ACTIVE.value if status == "ACTIVE" else
+                               TenantActivityStatus.INACTIVE.value)
+
+    def remove(self, tenants):
+        client = self._collection._client
+        for tenant in _as_list(tenants):
+            client._remove_tenant(self._collection.name, getattr(tenant, "name", tenant))
+
+
+class _LocalData:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def _vectors(self, schema, vector):
+        if vector is None:
+            return {}
+        if isinstance(vector, dict):
+            unknown = set(vector) - set(schema.vectors)
+            if unknown:
+                raise LocalStoreError(f"{schema.name} has no vector(s) {', '.join(sorted(unknown))}")
+            return vector
+        if schema.named:
+            raise LocalStoreError(f"{schema.name} has named vectors; pass a {{name: vector}} dict")
+        return {"default": vector}
+
+    @staticmethod
+    def _references(references):
+        return {name: [_uuid(value) for value in _as_list(values)] for name, values in (references or {}).items()}
+
+    def insert(self, properties, uuid=None, vector=None, references=None):
+        shard = self._collection._shard(create=True)
+        uuid = _uuid(uuid or uuid_lib.uuid4())
+        shard.sync()
+        if uuid in shard.row_of:
+            raise LocalStoreError(f"id '{uuid}' already exists")
+        shard.put([(uuid, properties, self._vectors(shard.schema, vector), self._references(references))])
+        return uuid_lib.UUID(uuid)
+
+    def insert_many(self, objects):
+        """Batch upsert (like Weaviate batches, existing ids are replaced)"""
+        shard = self._collection._shard(create=True)
+        items, errors, uuids = [], {}, {}
+        for index, obj in enumerate(objects):
+            try:
+                uuid = _uuid(obj.uuid or uuid_lib.uuid4())
+                vectors = self._vectors(shard.schema, obj.vector)
+                for name, vector in vectors.items():
+                    expected = shard.dims.get(name)
+                    if expected is not None and len(vector) != expected:
+                        raise LocalStoreError(f"Vector '{name}' has {len(vector)} dimensions, expected {expected}")
+                items.append((uuid, obj.properties, vectors, self._references(obj.references)))
+                uuids[index] = uuid_lib.UUID(uuid)
+            except (LocalStoreError, ValueError) as e:
+                errors[index] = SimpleNamespace(message=str(e), object_=obj, original_uuid=obj.uuid)
+        if items:
+            shard.put(items)
+        return SimpleNamespace(errors=errors, uuids=uuids, has_errors=bool(errors), elapsed_seconds=0.0)
+
+    def update(self, uuid, properties=None, vector=None, references=None):
+        """Merge properties (and replace the given vectors) of an existing object"""
+        shard = self._collection._shard()
+        uuid = _uuid(uuid)
+        with shard.lock:
+            shard.sync()
+            row = shard.row_of.get(uuid)
+            if row is None:
+                raise LocalStoreError(f"Object {uuid} not found in {self._collection.name}")
+            merged = dict(shard.props[row])
+            merged.update(json.loads(json.dumps(properties or {}, default=_json_default)))
+            vectors = {name: matrix[row].copy() for name, matrix in shard.vectors.items()
+                       if not np.isnan(shard.norms[name][row])}
+            vectors.update(self._vectors(shard.schema, vector))
+            refs = dict(shard.refs[row])
+            refs.update(self._references(references))
+            shard.put([(uuid, merged, vectors, refs)])
+
+    def replace(self, uuid, properties, vector=None, references=None):
+        shard = self._collection._shard()
+        shard.put([(_uuid(uuid), properties, self._vectors(shard.schema, vector), self._references(references))])
+
+    def delete_by_id(self, uuid):
+        return self._collection._shard().delete([_uuid(uuid)]) == 1
+
+    def delete_many(self, where, verbose=False, dry_run=False):
+        shard = self._collection._shard()
+        with shard.lock:
+            shard.sync()
+            rows = shard.candidates(where)
+            uuids = [shard.uuids[row] for row in rows]
+        deleted = len(uuids) if dry_run else shard.delete(uuids)
+        return SimpleNamespace(failed=0, matches=len(uuids), successful=deleted, objects=None)
+
+
+class _LocalQuery:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def _results(self, shard, rows, include_vector, return_properties, return_references, metadata=None):
+        objects = [
+            self._collection._object(shard, row, include_vector, return_properties,
+                                     metadata[index] if metadata else None, return_references)
+            for index, row in enumerate(rows)
+        ]
+        return SimpleNamespace(objects=objects)
+
+    def fetch_objects(self, limit=None, offset=None, after=None, filters=None, include_vector=False,
+                      return_properties=None, return_references=None, **_):
+        shard = self._collection._shard()
+        with shard.lock:
+            shard.sync()
+            rows = shard.candidates(filters)
+        start = offset or 0
+        if after is not None:
+            uuids = [shard.uuids[row] for row in rows]
+            start = uuids.index(_uuid(after)) + 1 if _uuid(after) in uuids else len(rows)
+        rows = rows[start:start + limit if limit else None]
+        return self._results(shard, rows, include_vector, return_properties, return_references)
+
+    def fetch_object_by_id(self, uuid, include_vector=False, return_properties=None, return_references=None):
+        try:
+            shard = self._collection._shard()
+        except LocalStoreError:
+            return None
+        with shard.lock:
+            shard.sync()
+            row = shard.row_of.get(_uuid(uuid))
+        if row is None:
+            return None
+        return self._collection._object(shard, row, include_vector, return_properties,
+                                        return_references=return_references)
+
+    def near_vector(self, near_vector, limit=None, offset=None, distance=None, certainty=None, filters=None,
+                    target_vector=None, include_vector=False, return_metadata=None, return_properties=None,
+                    return_references=None, **_):
+        shard = self._collection._shard()
+        with shard.lock:
+            shard.sync()
+            rows = shard.candidates(filters)
+            distances = shard.vector_distances(rows, near_vector, target_vector)
+        keep = ~np.isnan(distances)
+        if distance is not None:
+            keep &= distances <= distance
+        rows, distances = rows[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        start = offset or 0
+        order = order[start:start + limit if limit else None]
+        metadata = [SimpleNamespace(distance=float(distances[i]), certainty=1 - float(distances[i]) / 2, score=None)
+                    for i in order]
+        return self._results(shard, rows[order], include_vector, return_properties, return_references, metadata)
+
+    def near_text(self, query, **_):
+        raise LocalStoreError("The local backend does not embed text; query with near_vector "
+                              "(collections report self-provided vectors)")
+
+    def bm25(self, query, limit=None, offset=None, filters=None, include_vector=False, return_metadata=None,
+             return_properties=None, return_references=None, **_):
+        shard = self._collection._shard()
+        with shard.lock:
+            shard.sync()
+            rows = shard.candidates(filters)
+            scores = shard.bm25(rows, query)
+        keep = scores > 0
+        rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        start = offset or 0
+        order = order[start:start + limit if limit else None]
+        metadata = [SimpleNamespace(score=float(scores[i]), distance=None, certainty=None) for i in order]
+        return self._results(shard, rows[order], include_vector, return_properties, return_references, metadata)
+
+    def hybrid(self, query, alpha=0.7, vector=None, query_properties=None, fusion_type=None,
+               max_vector_distance=None, limit=None, offset=None, filters=None, target_vector=None,
+               include_vector=False, return_metadata=None, return_properties=None, return_references=None, **_):
+        """Relative score fusion of a vector search and a BM25 search, as Weaviate does
+        by default: each side's top candidates are min-max normalised and combined
+        as alpha * vector + (1 - alpha) * keyword."""
+        if vector is None and alpha > 0:
+            raise LocalStoreError("The local backend does not embed text; pass the query vector")
+        shard = self._collection._shard()
+        wanted = (limit or 10) + (offset or 0)
+        candidates = max(HYBRID_CANDIDATES, wanted)
+        with shard.lock:
+            shard.sync()
+            rows = shard.candidates(filters)
+            fused = np.zeros(len(rows))
+            if alpha > 0 and len(rows):
+                distances = shard.vector_distances(rows, vector, target_vector)
+                valid = ~np.isnan(distances)
+                if max_vector_distance is not None:
+                    valid &= distances <= max_vector_distance
+                fused += alpha * _normalized_top(-np.where(valid, distances, np.inf), valid, candidates)
+            if alpha < 1 and len(rows):
+                scores = shard.bm25(rows, query)
+                fused += (1 - alpha) * _normalized_top(scores, scores > 0, candidates)
+        keep = fused > 0
+        rows, fused = rows[keep], fused[keep]
+        order = np.argsort(-fused, kind="stable")[offset or 0:wanted]
+        metadata = [SimpleNamespace(score=float(fused[i]), distance=None, certainty=None) for i in order]
+        return self._results(shard, rows[order], include_vector, return_properties, return_references, metadata)
+
+
+def _normalized_top(values, valid, count):
+    """Min-max normalised values of the ``count`` best valid entries (0 elsewhere)"""
+    result = np.zeros(len(values))
+    indexes = np.flatnonzero(valid)
+    if not len(indexes):
+        return result
+    top = indexes[np.argsort(-values[indexes], kind="stable")[:count]]
+    best, worst = values[top].max(), values[top].min()
+    # A single candidate (or a tie) counts as a perfect match, like Weaviate
+    result[top] = 1.0 if best == worst else (values[top] - worst) / (best - worst)
+    # The worst candidate still ranks above non-candidates
+    result[top] = np.maximum(result[top], 1e-6)
+    return result
+
+
+class _LocalAggregate:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def over_all(self, total_count=True, filters=None, **_):
+        shard = self._collection._shard()
+        with shard.lock:
+            shard.sync()
+            return SimpleNamespace(total_count=int(len(shard.candidates(filters))), properties={})
+
+
+class _LocalCollections:
+    def __init__(self, client):
+        self._client = client
+
+    def get(self, name):
+        return LocalCollection(self._client, name)
+
+    def exists(self, name):
+        return self._client._exists(name)
+
+    def create(self, name, **options):
+        return self._client._create(name, options)
+
+    def delete(self, name):
+        for item in _as_list(name):
+            self._client._delete(item)
+
+    def list_all(self, simple=True):
+        return {name: self._client._schema(name).config() for name in self._client._names()}
+
+
+class LocalClient:
+    """In-process stand-in for a Weaviate client (see the module comment).
+
+    ``path`` is the store directory; None keeps everything in memory (tests,
+    benchmarks). One instance per process and path: use get_local_client().
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.collections = _LocalCollections(self)
+        self._schemas = {}
+        self._shards = {}
+        self._lock = threading.RLock()
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    # Connection API of the Weaviate client; the store is always available
+    def is_connected(self):
+        return True
+
+    def is_ready(self):
+        return True
+
+    def connect(self):
+        pass
+
+    def close(self):
+        # Shared by every WeaviateService of the process; nothing to release
+        pass
+
+    def _collection_dir(self, name):
+        return os.path.join(self.path, name) if self.path else None
+
+    def _names(self):
+        with self._lock:
+            names = set(self._schemas)
+            if self.path:
+                names.update(entry for entry in os.listdir(self.path)
+                             if os.path.exists(os.path.join(self.path, entry, "schema.json")))
+            return sorted(names)
+
+    def _exists(self, name):
+        with self._lock:
+            if name in self._schemas:
+                if not self.path or os.path.exists(os.path.join(self._collection_dir(name), "schema.json")):
+                    return True
+                self._forget(name)  # deleted by another process
+            return bool(self.path) and os.path.exists(os.path.join(self._collection_dir(name), "schema.json"))
+
+    def _create(self, name, options):
+        with self._lock:
+            if self._exists(name):
+                raise LocalStoreError(f"Collection {name} already exists")
+            schema = _Schema.from_create(name, **options)
+            self._schemas[name] = schema
+            self._save_schema(schema)
+            return LocalCollection(self, name)
+
+    def _save_schema(self, schema):
+        if not self.path:
+            return
+        directory = self._collection_dir(schema.name)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "schema.json.tmp"), "w") as handle:
+            json.dump(schema.to_json(), handle, indent=2)
+        os.replace(os.path.join(directory, "schema.json.tmp"), os.path.join(directory, "schema.json"))
+
+    def _reload_schema(self, name):
+        if not self.path:
+            return
+        with self._lock:
+            path = os.path.join(self._collection_dir(name), "schema.json")
+            if os.path.exists(path):
+                with open(path) as handle:
+                    fresh = _Schema.from_json(json.load(handle))
+                schema = self._schemas.get(name)
+                if schema is None:
+                    self._schemas[name] = fresh
+                else:
+                    schema.tenants = fresh.tenants
+
+    def _schema(self, name):
+        with self._lock:
+            if name not in self._schemas:
+                self._reload_schema(name)
+            if name not in self._schemas:
+                raise LocalStoreError(f"Collection {name} does not exist")
+            return self._schemas[name]
+
+    def _set_tenant(self, name, tenant, status):
+        with self._lock:
+            schema = self._schema(name)
+            self._reload_schema(name)
+            if schema.tenants.get(tenant) == status:
+                return
+            schema.tenants[tenant] = status
+            self._save_schema(schema)
+            if status != TenantActivityStatus.ACTIVE.value:
+                self._shards.pop((name, tenant), None)
+
+    def _remove_tenant(self, name, tenant):
+        with self._lock:
+            schema = self._schema(name)
+            schema.tenants.pop(tenant, None)
+            self._save_schema(schema)
+            self._shards.pop((name, tenant), None)
+            if self.path:
+                shutil.rmtree(os.path.join(self._collection_dir(name), tenant), ignore_errors=True)
+
+    def _shard(self, schema, tenant):
+        with self._lock:
+            key = (schema.name, tenant)
+            if key not in self._shards:
+                directory = os.path.join(self._collection_dir(schema.name), tenant) if self.path else None
+                self._shards[key] = _Shard(schema, directory)
+            return self._shards[key]
+
+    def _forget(self, name):
+        self._schemas.pop(name, None)
+        for key in [key for key in self._shards if key[0] == name]:
+            del self._shards[key]
+
+    def _delete(self, name):
+        with self._lock:
+            self._forget(name)
+            if self.path:
+                shutil.rmtree(self._collection_dir(name), ignore_errors=True)
+
+
+_local_clients = {}
+_local_clients_lock = threading.Lock()
+
+
+def get_local_client(path=None):
+    """Process-wide LocalClient for ``path`` (default: Config.LOCAL_STORE_PATH;
+    an empty LOCAL_STORE_PATH keeps the store in memory)"""
+    path = Config.LOCAL_STORE_PATH if path is None else path
+    with _local_clients_lock:
+        if path not in _local_clients:
+            _local_clients[path] = LocalClient(path or None)
+        return _local_clients[path]
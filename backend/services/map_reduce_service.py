@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from services.llm_service import LLMService
+from services.weaviate_service import WeaviateService
+
+logger = logging.getLogger(__name__)
+
+NOT_RELEVANT = "NOT RELEVANT"
+
+MAP_SYSTEM_PROMPT = f"""You extract facts from Critical Ops support tickets for a later report.
+For EACH ticket you are given, list only the facts that help answer the user's question:
+what happened, the root cause, the concrete resolution steps, and any preventive measures.
+Be terse (bullet points, at most 120 words per ticket). If a ticket does not help answer
+the question, its value must be exactly "{NOT_RELEVANT}".
+
+Reply with a single JSON object mapping each ticket key to its extracted facts, e.g.
+{{"CO-12": "- ...", "CO-40": "{NOT_RELEVANT}"}}"""
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'did', 'do', 'does', 'for',
+    'from', 'how', 'i', 'in', 'is', 'it', 'of', 'on', 'or', 'our', 'the', 'to', 'we',
+    'what', 'when', 'where', 'which', 'who', 'why', 'with', 'you',
+}
+
+
+def query_intent(query):
+    """Normalise a query so paraphrases with the same words share map results"""
+    tokens = re.findall(r"[a-z0-9]+", query.lower())
+    words = sorted({t for t in tokens if t not in STOPWORDS}) or sorted(set(tokens))
+    return hashlib.sha1(" ".join(words).encode("utf-8")).hexdigest()[:16]
+
+
+def select_answer_mode(packed_context_chars, requested=None):
+    """Pick 'single' or 'map_reduce' for a packed ticket context of the given size"""
+    mode = requested or Config.ANSWER_MODE
+    if mode in ('single', 'map_reduce'):
+        return mode
+    return 'map_reduce' if packed_context_chars > Config.MAP_REDUCE_THRESHOLD_CHARS else 'single'
+
+
+class MapReduceService:
+    """Answer generation for broad questions over many tickets.
+
+    Map: bounded-parallel small LLM calls, one per group of tickets, extract
+    the facts relevant to the question; results are cached per ticket,
+    query intent and ticket content hash. Reduce: one call writes the final
+    report from the extracted facts only.
+    """
+
+    def __init__(self, llm=None, cache=None, concurrency=None):
+        self.llm = llm or LLMService(Config.QUERY_LLM_PROVIDER, Config.QUERY_LLM_MODEL)
+        self.cache = cache
+        self.concurrency = concurrency or Config.MAP_REDUCE_CONCURRENCY
+
+    @staticmethod
+    def _cache_key(intent, ticket):
+        content_hash = ticket.get('contentHash') or WeaviateService.content_hash(ticket)
+        return f"mapfacts:{intent}:{ticket.get('key')}:{content_hash}"
+
+    def _group(self, items):
+        """Split (ticket, formatted) pairs into groups under the per-call budget"""
+        groups, current, size = [], [], 0
+        for item in items:
+            item_size = len(json.dumps(item[1], default=str))
+            if current and size + item_size > Config.MAP_REDUCE_GROUP_CHARS:
+                groups.append(current)
+                current, size = [], 0
+            current.append(item)
+            size += item_size
+        if current:
+            groups.append(current)
+        return groups
+
+    @staticmethod
+    def _parse_facts(text, keys):
+        """({key: facts}, keys the model answered for). Only answered keys are
+        cached: an omitted key or an unparseable reply may read differently next time."""
+        cleaned = text.strip()
+        if cleaned.startswith("```"):
+            cleaned = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", cleaned)
+        try:
+            parsed = json.loads(cleaned)
+        except ValueError:
+            parsed = None
+        if isinstance(parsed, dict):
+            return ({key: str(parsed.get(key, NOT_RELEVANT)).strip() for key in keys},
+                    {key for key in keys if key in parsed})
+        # Unparseable reply: keep the text for this answer, attributed to the group's first ticket
+        logger.warning(f"Map step returned non-JSON output for {keys}")
+        return {keys[0]: text.strip(), **{key: '' for key in keys[1:]}}, set()
+
+    def _map_group(self, query, group):
+        keys = [ticket.get('key') for ticket, _ in group]
+        prompt = (
+            f'USER QUESTION: "{query}"\n\n'
+            f"TICKETS:\n{json.dumps([formatted for _, formatted in group], indent=2, default=str)}"
+        )
+        text = self.llm.generate(prompt, system=MAP_SYSTEM_PROMPT, temperature=0.1, max_output_tokens=1024)
+        return self._parse_facts(text, keys)
+
+    def extract_facts(self, query, tickets, formatted_tickets):
+        """Map step. Returns {ticket_key: facts} in ticket order."""
+        intent = query_intent(query)
+        facts = {}
+        pending = []
+        for ticket, formatted in zip(tickets, formatted_tickets):
+            cached = self.cache.get_json(self._cache_key(intent, ticket)) if self.cache else None
+            if cached is not None:
+                facts[ticket.get('key')] = cached
+            else:
+                pending.append((ticket, formatted))
+
+        if pending:
+            groups = self._group(pending)
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(groups))) as executor:
+                group_results = list(executor.map(lambda g: self._map_group(query, g), groups))
+            for group, (result, answered) in zip(groups, group_results):
+                for ticket, _ in group:
+                    value = result.get(ticket.get('key'), '')
+                    facts[ticket.get('key')] = value
+                    if self.cache and value and ticket.get('key') in answered:
+                        self.cache.set_json(self._cache_key(intent, ticket), value,
+                                            ttl=Config.MAP_FACTS_CACHE_TTL)
+
+        logger.info(f"Map step: {len(tickets) - len(pending)} cached, {len(pending)} extracted")
+        return {ticket.get('key'): facts.get(ticket.get('key'), '') for ticket in tickets}
+
+    def answer(self, query, tickets, formatted_tickets, system_prompt):
+        """Run map + reduce and return the final report text"""
+        facts = self.extract_facts(query, tickets, formatted_tickets)
+        relevant = {key: value for key, value in facts.items()
+                    if value and value.strip().upper() != NOT_RELEVANT}
+
+        if not relevant:
+            facts_text = "(none of the retrieved tickets are relevant)"
+        else:
+            facts_text = "\n\n".join(f"[{key}]\n{value}" for key, value in relevant.items())
+
+        prompt = f"""USER QUERY: "{query}"
+
+Facts below were extracted from {len(tickets)} retrieved tickets ({len(relevant)} relevant),
+ordered from most to least relevant. Write the full report in the required structure using
+ONLY these facts and cite ticket keys. If no facts are listed, state: "No such incident has
+occurred before. Please reach out to the respective POC (Point of Contact) to investigate further."
+
+EXTRACTED FACTS:
+{facts_text}"""
+
+        return self.llm.generate(prompt, system=system_prompt, temperature=0.4, max_output_tokens=4096)
+
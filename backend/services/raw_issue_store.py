@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_raw_issue_store():
+    """Process-wide raw issue store, or None when the cache is disabled"""
+    global _store
+    if not Config.RAW_CACHE_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = RawIssueStore(Config.RAW_CACHE_PATH)
+        return _store
+
+
+def _updated_timestamp(value):
+    if not value:
+        return 0.0
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class RawIssueStore:
+    """Append-only local copy of the raw Jira issue JSON.
+
+    Every version of an issue (by ``fields.updated``) fetched in full from
+    the REST API is kept zlib-compressed in SQLite, so Weaviate can be
+    rebuilt without crawling Jira again (``ingest.py reindex``) and imports
+    can skip issues whose cached copy is current. Webhook bodies are not
+    stored: their text is wiki markup rather than ADF, and deltas are
+    partial. Store errors are logged and never fail the caller.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS raw_issues (
+            issue_id   TEXT NOT NULL,
+            issue_key  TEXT,
+            updated    TEXT NOT NULL,
+            updated_ts REAL NOT NULL,
+            fetched_at REAL NOT NULL,
+            payload    BLOB NOT NULL,
+            PRIMARY KEY (issue_id, updated)
+        );
+        CREATE INDEX IF NOT EXISTS raw_issues_key ON raw_issues (issue_key);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self):
+        # One connection per thread; WAL lets pipeline fetchers and Celery
+        # workers write while a reindex reads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, issue):
+        """Append this version of the issue; returns True if it was not stored yet"""
+        issue_id = issue.get('id')
+        if not issue_id or 'fields' not in issue:
+            return False
+        updated = (issue.get('fields') or {}).get('updated') or ''
+        try:
+            conn = self._conn()
+            with conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO raw_issues VALUES (?, ?, ?, ?, ?, ?)",
+                    (str(issue_id), issue.get('key'), updated, _updated_timestamp(updated), time.time(),
+                     zlib.compress(json.dumps(issue).encode('utf-8')))
+                )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logger.warning(f"Raw issue cache write failed for {issue.get('key')}: {str(e)}")
+            return False
+
+    def get(self, issue_ref, min_updated=None):
+        """Latest cached version of an issue (by id or key).
+
+        With ``min_updated`` (a Jira ``updated`` value), only a version at
+        least that recent is returned, so callers can skip the Jira fetch.
+        """
+        column = 'issue_id' if str(issue_ref).isdigit() else 'issue_key'
+        try:
+            row = self._conn().execute(
+                f"SELECT updated_ts, payload FROM raw_issues WHERE {column} = ? "
+                f"ORDER BY updated_ts DESC, fetched_at DESC LIMIT 1",
+                (str(issue_ref),)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Raw issue cache read failed for {issue_ref}: {str(e)}")
+            return None
+        if row is None:
+            return None
+        if min_updated is not None and row[0] < _updated_timestamp(min_updated):
+            return None
+        return json.loads(zlib.decompress(row[1]))
+
+    def issue_refs(self, after='', limit=500):
+        """Distinct (issue_id, issue_key) pairs ordered by id, for paging through the cache"""
+        return self._conn().execute(
+            "SELECT issue_id, MAX(issue_key) FROM raw_issues WHERE issue_id > ? "
+            "GROUP BY issue_id ORDER BY issue_id LIMIT ?",
+            (after, limit)
+        ).fetchall()
+
+    def count(self):
+        """(distinct issues, stored versions)"""
+        return self._conn().execute("SELECT COUNT(DISTINCT issue_id), COUNT(*) FROM raw_issues").fetchone()
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime, timezone
+import numpy as np
+from weaviate.classes.data import DataObject
+from weaviate.util import generate_uuid5
+from config import Config
+from services.collection_versions import tenant_views
+from services.weaviate_schema import (
+    chunk_collection_name, cold_collection_name, create_chunk_collection, create_cold_collection,
+    create_issue_collection, multi_tenant, self_provided_vectors, vector_sources
+)
+
+logger = logging.getLogger(__name__)
+
+# Snapshot layout (a zip archive):
+#
+#   manifest.json              format, source collection, vector layout, row counts
+#   <table>/_uuid.jsonl        one JSON value per line and object, all columns of a
+#   <table>/_tenant.jsonl      table in the same row order (_tenant: multi-tenant only)
+#   <table>/<property>.jsonl
+#   <table>/<vector>.f32       contiguous little-endian float32 matrix, rows x dims
+#                              (a row of NaN: the object had no such vector)
+#
+# Tables are 'issues', 'cold' (the cold tier) and 'chunks'. Chunks carry no
+# reference column: their 'ticket' reference is the uuid of their issueID.
+FORMAT = "jira-ai-agent-snapshot"
+FORMAT_VERSION = 1
+TABLES = ("issues", "cold", "chunks")
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class _TableWriter:
+    """Streams the objects of one table into column files in a directory"""
+
+    def __init__(self, directory, properties, vector_names, tenants):
+        self.directory = directory
+        self.properties = list(properties)
+        self.vector_names = list(vector_names)
+        self.rows = 0
+        self.dims = {name: None for name in self.vector_names}
+        # Rows without a vector seen before the dimension of that vector is known
+        self._pending_missing = {name: 0 for name in self.vector_names}
+        os.makedirs(directory, exist_ok=True)
+        columns = ["_uuid"] + (["_tenant"] if tenants else []) + self.properties
+        self._columns = {name: open(os.path.join(directory, f"{name}.jsonl"), "w", encoding="utf-8")
+                         for name in columns}
+        self._vectors = {name: open(os.path.join(directory, f"{name}.f32"), "wb") for name in self.vector_names}
+
+    def write(self, obj, tenant=None):
+        self._columns["_uuid"].write(json.dumps(str(obj.uuid)) + "\n")
+        if "_tenant" in self._columns:
+            self._columns["_tenant"].write(json.dumps(tenant) + "\n")
+        for name in self.properties:
+            self._columns[name].write(json.dumps(obj.properties.get(name), default=_json_default) + "\n")
+        vectors = obj.vector or {}
+        for name in self.vector_names:
+            self._write_vector(name, vectors.get(name))
+        self.rows += 1
+
+    def _write_vector(self, name, vector):
+        handle = self._vectors[name]
+        if vector is None:
+            if self.dims[name] is None:
+                self._pending_missing[name] += 1
+            else:
+                handle.write(np.full(self.dims[name], np.nan, dtype="<f4").tobytes())
+            return
+        vector = np.asarray(vector, dtype="<f4")
+        if self.dims[name] is None:
+            self.dims[name] = len(vector)
+            handle.write(np.full((self._pending_missing[name], len(vector)), np.nan, dtype="<f4").tobytes())
+        elif len(vector) != self.dims[name]:
+            raise ValueError(f"Vector '{name}' has {len(vector)} dimensions, expected {self.dims[name]}")
+        handle.write(vector.tobytes())
+
+    def close(self):
+        for handle in list(self._columns.values()) + list(self._vectors.values()):
+            handle.close()
+        return {
+            "rows": self.rows,
+            "properties": self.properties,
+            "tenants": "_tenant" in self._columns,
+            "vectors": {name: self.dims[name] for name in self.vector_names if self.dims[name]},
+        }
+
+
+def _export_table(collection, directory, on_progress=None):
+    properties = [prop.name for prop in collection.config.get().properties]
+    writer = _TableWriter(directory, properties, vector_sources(collection), multi_tenant(collection))
+    try:
+        for view in tenant_views(collection):
+            for obj in view.iterator(include_vector=True):
+                writer.write(obj, view.tenant)
+                if on_progress and writer.rows % 1000 == 0:
+                    on_progress(os.path.basename(directory), writer.rows)
+    finally:
+        table = writer.close()
+    return table
+
+
+def export_snapshot(client, collection_name, path, include_cold=True, include_chunks=True, on_progress=None):
+    """Write every object of ``collection_name`` (and of its cold tier and chunk
+    collection) with its vectors to a snapshot file; returns the manifest"""
+    issues = client.collections.get(collection_name)
+    sources = {
+        "issues": issues,
+        "cold": client.collections.get(cold_collection_name(collection_name))
+        if include_cold and client.collections.exists(cold_collection_name(collection_name)) else None,
+        "chunks": client.collections.get(chunk_collection_name(collection_name))
+        if include_chunks and client.collections.exists(chunk_collection_name(collection_name)) else None,
+    }
+    manifest = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "collection": collection_name,
+        "layout": {
+            "named_vectors": "default" not in vector_sources(issues),
+            "self_provided": self_provided_vectors(issues),
+            "multi_tenant": multi_tenant(issues),
+            "embedding_model": Config.EMBEDDING_MODEL if self_provided_vectors(issues) else "t2v-transformers",
+        },
+        "tables": {},
+    }
+    workdir = tempfile.mkdtemp(prefix="snapshot_")
+    try:
+        for table, collection in sources.items():
+            if collection is not None:
+                manifest["tables"][table] = _export_table(collection, os.path.join(workdir, table), on_progress)
+
+        tmp_path = f"{path}.tmp"
+        with zipfile.ZipFile(tmp_path, "w", allowZip64=True) as archive:
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+            for table in manifest["tables"]:
+                for filename in sorted(os.listdir(os.path.join(workdir, table))):
+                    # Float32 vectors barely compress; they are stored as-is
+                    compression = zipfile.ZIP_STORED if filename.endswith(".f32") else zipfile.ZIP_DEFLATED
+                    archive.write(os.path.join(workdir, table, filename), f"{table}/{filename}",
+                                  compress_type=compression)
+        os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(path):
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+    if manifest.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a snapshot file")
+    if manifest.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"{path} has snapshot format version {manifest['version']}; "
+                         f"this code reads up to {FORMAT_VERSION}")
+    return manifest
+
+
+def _read_rows(archive, table, spec, batch_size):
+    """Yield lists of (uuid, tenant, properties, {vector name: vector}) read column by column"""
+    columns = ["_uuid"] + (["_tenant"] if spec["tenants"] else []) + spec["properties"]
+    handles = {name: archive.open(f"{table}/{name}.jsonl") for name in columns}
+    vectors = {name: (archive.open(f"{table}/{name}.f32"), dims) for name, dims in spec["vectors"].items()}
+    try:
+        for start in range(0, spec["rows"], batch_size):
+            count = min(batch_size, spec["rows"] - start)
+            values = {name: [json.loads(handle.readline()) for _ in range(count)] for name, handle in handles.items()}
+            matrices = {
+                name: np.frombuffer(handle.read(count * dims * 4), dtype="<f4").reshape(count, dims)
+                for name, (handle, dims) in vectors.items()
+            }
+            rows = []
+            for row in range(count):
+                properties = {name: values[name][row] for name in spec["properties"] if values[name][row] is not None}
+                row_vectors = {name: matrix[row].tolist() for name, matrix in matrices.items()
+                               if not np.isnan(matrix[row][0])}
+                tenant = values["_tenant"][row] if spec["tenants"] else None
+                rows.append((values["_uuid"][row], tenant, properties, row_vectors))
+            yield rows
+    finally:
+        for handle in list(handles.values()) + [handle for handle, _ in vectors.values()]:
+            handle.close()
+
+
+def _insert_rows(collection, rows, chunks=False):
+    """Batched insert of snapshot rows, one request per tenant; returns the error count"""
+    tenanted = multi_tenant(collection)
+    groups = {}
+    for uuid, tenant, properties, vectors in rows:
+        # A snapshot of a single-tenant version goes to the project tenants and vice versa
+        tenant = (tenant or properties.get("project")) if tenanted else None
+        vector = vectors.get("default") if "default" in vectors else (vectors or None)
+        references = {"ticket": generate_uuid5(properties.get("issueID", ""))} if chunks else None
+        groups.setdefault(tenant, []).append(
+            DataObject(properties=properties, uuid=uuid, vector=vector, references=references)
+        )
+    errors = 0
+    for tenant, objects in groups.items():
+        target = collection.with_tenant(tenant) if tenant else collection
+        result = target.data.insert_many(objects)
+        for index, error in (result.errors or {}).items():
+            errors += 1
+            logger.error(f"Could not import {objects[index].uuid} into {collection.name}: {error.message}")
+    return errors
+
+
+def _stored_dimensions(collection):
+    """{vector name: dimensions} of one stored object of ``collection`` ({} when empty)"""
+    for view in tenant_views(collection):
+        response = view.query.fetch_objects(limit=1, include_vector=True)
+        if response.objects:
+            return {name: len(vector) for name, vector in (response.objects[0].vector or {}).items()}
+    return {}
+
+
+def layout_mismatches(client, manifest, collection_name):
+    """Reasons the snapshot's vectors would not fit this deployment: another
+    embedding model for self-provided vectors, or an existing target
+    collection with a different vector layout. Empty when they fit."""
+    layout = manifest["layout"]
+    spec = manifest["tables"].get("issues") or {"vectors": {}}
+    problems = []
+    if layout["self_provided"] and layout["embedding_model"] != Config.EMBEDDING_MODEL:
+        problems.append(f"vectors were embedded with {layout['embedding_model']}, queries here use "
+                        f"{Config.EMBEDDING_MODEL} (EMBEDDING_MODEL)")
+    if not client.collections.exists(collection_name):
+        return problems
+    target = client.collections.get(collection_name)
+    names = set(vector_sources(target))
+    if set(spec["vectors"]) - names or layout["named_vectors"] == ("default" in names):
+        problems.append(f"{collection_name} has vectors {', '.join(sorted(names))}, the snapshot "
+                        f"{', '.join(sorted(spec['vectors'])) or 'none'}")
+    if self_provided_vectors(target) != layout["self_provided"]:
+        problems.append(f"{collection_name} {'has no' if self_provided_vectors(target) else 'has a'} vectorizer, "
+                        f"the snapshot vectors were {'self-provided' if layout['self_provided'] else 'Weaviate-embedded'}")
+    for name, dims in _stored_dimensions(target).items():
+        if spec["vectors"].get(name, dims) != dims:
+            problems.append(f"{collection_name} stores {dims}-dimensional '{name}' vectors, "
+                            f"the snapshot {spec['vectors'][name]}")
+    return problems
+
+
+def import_snapshot(client, path, collection_name, batch_size=500, on_progress=None, force=False):
+    """Load a snapshot into ``collection_name``, created with the snapshot's vector
+    layout if it does not exist. Vectors are written as stored: nothing is
+    re-embedded. Raises ValueError when the vectors do not fit (see
+    layout_mismatches()) unless ``force`` is set. Returns ``{table: (rows, errors)}``."""
+    manifest = read_manifest(path)
+    layout = manifest["layout"]
+    tables = manifest["tables"]
+    problems = layout_mismatches(client, manifest, collection_name)
+    if problems and not force:
+        raise ValueError(f"{path} does not fit {collection_name}: {'; '.join(problems)} (use --force to import anyway)")
+    for problem in problems:
+        logger.warning(f"Importing {path} despite a mismatch: {problem}")
+    embedding_mode = "client" if layout["self_provided"] else "weaviate"
+    if not client.collections.exists(collection_name):
+        create_issue_collection(client, collection_name, named_vectors=layout["named_vectors"], chunks=False,
+                                embedding_mode=embedding_mode, multi_tenancy=layout["multi_tenant"])
+    issues = client.collections.get(collection_name)
+    targets = {"issues": issues}
+    if "cold" in tables:
+        if not client.collections.exists(cold_collection_name(collection_name)):
+            create_cold_collection(client, issues)
+        targets["cold"] = client.collections.get(cold_collection_name(collection_name))
+    if "chunks" in tables:
+        if not client.collections.exists(chunk_collection_name(collection_name)):
+            create_chunk_collection(client, collection_name, embedding_mode, layout["multi_tenant"])
+        targets["chunks"] = client.collections.get(chunk_collection_name(collection_name))
+
+    counts = {}
+    with zipfile.ZipFile(path) as archive:
+        # Chunks reference their tickets, which must be imported first
+        for table in (table for table in TABLES if table in tables):
+            done = errors = 0
+            for rows in _read_rows(archive, table, tables[table], batch_size):
+                errors += _insert_rows(targets[table], rows, chunks=table == "chunks")
+                done += len(rows)
+                if on_progress:
+                    on_progress(table, done)
+            counts[table] = (done, errors)
+    return counts
@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+import redis
+from weaviate.classes.tenants import TenantActivityStatus, TenantUpdate, TenantUpdateActivityStatus
+from config import Config
+from services.cache_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Redis hash {project: epoch seconds of the last query or write}, read by the
+# periodic offload task. Each process writes it at most every _TOUCH_INTERVAL
+# seconds per project.
+ACTIVITY_KEY = 'weaviate:tenant_activity'
+_TOUCH_INTERVAL = 60
+_touched = {}
+_touched_lock = threading.Lock()
+
+# Tenant lists per collection, so queries over every project only fan out to
+# tenants that exist (a new project's tenant is created by its first write)
+_TENANT_LIST_SECONDS = 30
+_tenant_lists = {}
+_tenant_lists_lock = threading.Lock()
+
+COLD_STATES = {
+    'inactive': TenantUpdateActivityStatus.INACTIVE,
+    'offloaded': TenantUpdateActivityStatus.OFFLOADED,
+}
+
+
+def allowed_projects():
+    return list(Config.JIRA_PROJECT_KEYS)
+
+
+def is_allowed_project(project_key):
+    return project_key in Config.JIRA_PROJECT_KEYS
+
+
+def project_from_key(issue_key):
+    """Project key of an issue key ('CO-123' -> 'CO')"""
+    project, separator, number = (issue_key or '').rpartition('-')
+    return project if separator and number.isdigit() else None
+
+
+def project_of(issue_data):
+    """Project key of a (possibly partial) Jira issue body"""
+    project = ((issue_data.get('fields') or {}).get('project') or {}).get('key')
+    return project or project_from_key(issue_data.get('key'))
+
+
+def tenant_name(project_key):
+    # Jira project keys (A-Z, 0-9, _) are valid tenant names as they are
+    return project_key
+
+
+def touch(project_key, redis_client=None):
+    """Record that a project's tenant is in use"""
+    now = time.time()
+    with _touched_lock:
+        if now - _touched.get(project_key, 0) < _TOUCH_INTERVAL:
+            return
+        _touched[project_key] = now
+    try:
+        (redis_client or get_redis_client()).hset(ACTIVITY_KEY, project_key, now)
+    except redis.RedisError as e:
+        logger.warning(f"Could not record tenant activity for {project_key}: {str(e)}")
+
+
+def last_activity(redis_client=None):
+    """{project: epoch seconds} of the last recorded use"""
+    values = (redis_client or get_redis_client()).hgetall(ACTIVITY_KEY)
+    return {key.decode(): float(value) for key, value in values.items()}
+
+
+def existing_tenants(collection, fresh=False):
+    """Names of the tenants of a multi-tenant collection (cached briefly)"""
+    now = time.monotonic()
+    with _tenant_lists_lock:
+        cached = _tenant_lists.get(collection.name)
+        if cached and not fresh and now - cached[1] < _TENANT_LIST_SECONDS:
+            return cached[0]
+    names = set(collection.tenants.get())
+    with _tenant_lists_lock:
+        _tenant_lists[collection.name] = (names, now)
+    return names
+
+
+def offload_idle_tenants(collections, idle_seconds=None, cold_state=None, redis_client=None, now=None):
+    """Move the tenants of projects idle for ``idle_seconds`` to a cold state.
+
+    ``collections`` are multi-tenant collections whose tenants follow the same
+    projects (an issue collection and its chunk collection). A tenant that
+    was never recorded as used gets its first activity stamp instead of
+    being offloaded. Returns the offloaded project keys.
+    """
+    idle_seconds = Config.TENANT_IDLE_SECONDS if idle_seconds is None else idle_seconds
+    cold_state = cold_state or Config.TENANT_COLD_STATE
+    if cold_state not in COLD_STATES:
+        raise ValueError(f"Unknown tenant cold state {cold_state!r} (expected one of {', '.join(COLD_STATES)})")
+    client = redis_client or get_redis_client()
+    now = now or time.time()
+    activity = last_activity(client)
+
+    offloaded = set()
+    for collection in collections:
+        idle = []
+        for name, tenant in collection.tenants.get().items():
+            if tenant.activity_status != TenantActivityStatus.ACTIVE:
+                continue
+            if name not in activity:
+                client.hset(ACTIVITY_KEY, name, now)
+                continue
+            if now - activity[name] >= idle_seconds:
+                idle.append(TenantUpdate(name=name, activity_status=COLD_STATES[cold_state]))
+        if idle:
+            collection.tenants.update(idle)
+            offloaded.update(tenant.name for tenant in idle)
+            logger.info(f"Set {len(idle)} idle tenant(s) of {collection.name} to {cold_state}: "
+                        f"{', '.join(sorted(tenant.name for tenant in idle))}")
+    return sorted(offloaded)
@@ -0,0 +1,446 @@
+import logging
+import re
+import threading
+import time
+import weaviate.classes as wvc
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Collections are versioned (JiraIssue_v1, JiraIssue_v2, ...) so a schema change
+# is built next to the live collection and switched to atomically (see
+# services/collection_versions.py). The unversioned legacy "JiraIssue" is version 0.
+BASE_NAME = "JiraIssue"
+_VERSION_PATTERN = re.compile(rf"^{BASE_NAME}(?:_v(\d+))?$")
+
+
+def versioned_name(version):
+    return f"{BASE_NAME}_v{version}"
+
+
+def parse_version(name):
+    """Version number of a JiraIssue collection name (0 for the legacy name), or None"""
+    match = _VERSION_PATTERN.match(name or '')
+    if not match:
+        return None
+    return int(match.group(1)) if match.group(1) else 0
+
+
+VECTOR_INDEX_PROFILES = ('hnsw', 'hnsw_pq', 'hnsw_bq', 'hnsw_sq', 'flat', 'flat_bq')
+
+# ef / ef_construction / max_connections (ef -1 lets Weaviate size ef per query limit)
+HNSW_PRESETS = {
+    'fast': {'ef': 64, 'ef_construction': 64, 'max_connections': 16},
+    'balanced': {'ef': -1, 'ef_construction': 128, 'max_connections': 32},
+    'accurate': {'ef': 256, 'ef_construction': 256, 'max_connections': 64},
+}
+
+
+def _optional_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def hnsw_parameters(preset=None):
+    """HNSW preset from Config, with any VECTOR_HNSW_* overrides applied"""
+    preset = preset or Config.VECTOR_HNSW_PRESET
+    if preset not in HNSW_PRESETS:
+        raise ValueError(f"Unknown HNSW preset {preset!r} (expected one of {', '.join(HNSW_PRESETS)})")
+    parameters = dict(HNSW_PRESETS[preset])
+    overrides = {
+        'ef': _optional_int(Config.VECTOR_HNSW_EF),
+        'ef_construction': _optional_int(Config.VECTOR_HNSW_EF_CONSTRUCTION),
+        'max_connections': _optional_int(Config.VECTOR_HNSW_MAX_CONNECTIONS),
+    }
+    parameters.update({name: value for name, value in overrides.items() if value is not None})
+    return parameters
+
+
+def vector_index_config(profile=None, preset=None):
+    """Vector index settings for a profile (default: Config.VECTOR_INDEX_PROFILE).
+
+    The index type and quantizer are fixed when a collection is created, so a
+    new profile is rolled out with migrate_collection.py (vectors are reused).
+    """
+    profile = profile or Config.VECTOR_INDEX_PROFILE
+    if profile not in VECTOR_INDEX_PROFILES:
+        raise ValueError(f"Unknown vector index profile {profile!r} "
+                         f"(expected one of {', '.join(VECTOR_INDEX_PROFILES)})")
+    VectorIndex = wvc.config.Configure.VectorIndex
+    cache_max_objects = _optional_int(Config.VECTOR_CACHE_MAX_OBJECTS)
+
+    if profile.startswith('flat'):
+        quantizer = None
+        if profile == 'flat_bq':
+            quantizer = VectorIndex.Quantizer.bq(cache=True, rescore_limit=Config.VECTOR_RESCORE_LIMIT)
+        return VectorIndex.flat(vector_cache_max_objects=cache_max_objects, quantizer=quantizer)
+
+    quantizer = None
+    if profile == 'hnsw_pq':
+        quantizer = VectorIndex.Quantizer.pq(
+            segments=Config.VECTOR_PQ_SEGMENTS or None,
+            centroids=Config.VECTOR_PQ_CENTROIDS,
+            training_limit=Config.VECTOR_PQ_TRAINING_LIMIT
+        )
+    elif profile == 'hnsw_bq':
+        quantizer = VectorIndex.Quantizer.bq(rescore_limit=Config.VECTOR_RESCORE_LIMIT)
+    elif profile == 'hnsw_sq':
+        quantizer = VectorIndex.Quantizer.sq(rescore_limit=Config.VECTOR_RESCORE_LIMIT,
+                                             training_limit=Config.VECTOR_PQ_TRAINING_LIMIT)
+    return VectorIndex.hnsw(vector_cache_max_objects=cache_max_objects, quantizer=quantizer,
+                            **hnsw_parameters(preset))
+
+
+# Text each vector embeds. Metadata such as status or assignee is never embedded,
+# so changing it never forces a re-embed. With named vectors the comment thread
+# (flattened into commentText) gets its own vector: long threads no longer dilute
+# the ticket vector and a comment edit only re-embeds the comments vector.
+CONTENT_PROPERTIES = ("summary", "description", "labels")
+NAMED_VECTOR_SOURCES = {"content": CONTENT_PROPERTIES, "comments": ("commentText",)}
+# Self-provided single vector (the client embeds these); a single vector built by
+# Weaviate's vectorizer embeds whatever properties are not skipped, see below
+SINGLE_VECTOR_SOURCES = {"default": CONTENT_PROPERTIES}
+_VECTORIZED_TYPES = {wvc.config.DataType.TEXT, wvc.config.DataType.TEXT_ARRAY,
+                     wvc.config.DataType.OBJECT, wvc.config.DataType.OBJECT_ARRAY}
+
+_vector_sources = {}
+_vector_sources_lock = threading.Lock()
+
+
+def _vector_layout(collection):
+    """(sources, self_provided, multi_tenant) of a collection, read from its config
+    once per process; vectorizers and multi-tenancy never change after a
+    collection is created."""
+    with _vector_sources_lock:
+        if collection.name in _vector_sources:
+            return _vector_sources[collection.name]
+    config = collection.config.get()
+    named = config.vector_config
+    if named:
+        # Self-provided named vectors carry no source properties in Weaviate
+        sources = {name: tuple(vector.vectorizer.source_properties or NAMED_VECTOR_SOURCES.get(name, ()))
+                   for name, vector in named.items()}
+        self_provided = all(_is_none(vector.vectorizer.vectorizer) for vector in named.values())
+    else:
+        self_provided = _is_none(config.vectorizer)
+        sources = SINGLE_VECTOR_SOURCES if self_provided else {"default": _vectorized_properties(config)}
+    multi_tenant = bool(config.multi_tenancy_config and config.multi_tenancy_config.enabled)
+    with _vector_sources_lock:
+        _vector_sources[collection.name] = (sources, self_provided, multi_tenant)
+    return sources, self_provided, multi_tenant
+
+
+def _vectorized_properties(config):
+    """Properties a collection's own vectorizer embeds into its single vector.
+
+    The legacy JiraIssue (created before skip_vectorization was set) embeds
+    every text property, metadata and comments included, so a status change
+    there is a content change and the stored vector must not be kept.
+    """
+    return tuple(prop.name for prop in config.properties
+                 if prop.data_type in _VECTORIZED_TYPES
+                 and not (prop.vectorizer_config and prop.vectorizer_config.skip))
+
+
+def forget_vector_layout(name):
+    """Drop the cached layout of ``name`` (deleted, or about to be recreated)"""
+    with _vector_sources_lock:
+        _vector_sources.pop(name, None)
+    with _enrichment_lock:
+        _enrichment_checked.discard(name)
+
+
+def _is_none(vectorizer):
+    return getattr(vectorizer, 'value', vectorizer) == wvc.config.Vectorizers.NONE.value
+
+
+def vector_sources(collection):
+    """{vector name: source properties} of a collection ('default' for a single vector)"""
+    return _vector_layout(collection)[0]
+
+
+def self_provided_vectors(collection):
+    """True when the collection has no vectorizer and every vector is sent by the
+    client (EMBEDDING_MODE=client, see services/embedding_service.py)"""
+    return _vector_layout(collection)[1]
+
+
+def multi_tenant(collection):
+    """True when the collection keeps one tenant per Jira project (see services/tenants.py)"""
+    return _vector_layout(collection)[2]
+
+
+def _multi_tenancy_config(enabled):
+    if not enabled:
+        return None
+    # Writes create a project's tenant on first use; queries and writes
+    # reactivate tenants that were moved to a cold state
+    return wvc.config.Configure.multi_tenancy(enabled=True, auto_tenant_creation=True,
+                                              auto_tenant_activation=True)
+
+
+def comment_text(comments):
+    """Comment thread flattened for the 'comments' vector (newest comments win the length cap)"""
+    lines = []
+    size = 0
+    for comment in reversed(comments or []):
+        body = (comment.get('body') or '').strip()
+        if not body:
+            continue
+        line = f"{comment.get('author') or 'Unknown'}: {body}"
+        if lines and size + len(line) > Config.COMMENT_VECTOR_MAX_CHARS:
+            break
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(reversed(lines))[:Config.COMMENT_VECTOR_MAX_CHARS]
+
+
+def issue_properties(named_vectors=True):
+    # Property-level skip_vectorization only matters for the single 'default'
+    # vector; named vectors embed exactly their source properties
+    comment_text = []
+    if named_vectors:
+        comment_text = [wvc.config.Property(name="commentText", data_type=wvc.config.DataType.TEXT)]
+    return comment_text + [
+        wvc.config.Property(name="issueID", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="key", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="project", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="projectName", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="summary", data_type=wvc.config.DataType.TEXT),
+        wvc.config.Property(name="description", data_type=wvc.config.DataType.TEXT),
+        wvc.config.Property(name="status", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="priority", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="labels", data_type=wvc.config.DataType.TEXT_ARRAY),
+        wvc.config.Property(name="assignee", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="reporter", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="created", data_type=wvc.config.DataType.DATE),
+        wvc.config.Property(name="updated", data_type=wvc.config.DataType.DATE),
+        wvc.config.Property(name="resolutionDate", data_type=wvc.config.DataType.DATE),
+        wvc.config.Property(name="customFields", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="attachments", data_type=wvc.config.DataType.TEXT_ARRAY, skip_vectorization=True),
+        # Ingestion-side enrichment: hash of summary/description/comments and the
+        # LLM digest generated from it (not vectorized, so digests never shift search;
+        # added the same way to older collections, see ensure_enrichment_properties)
+        wvc.config.Property(name="contentHash", data_type=wvc.config.DataType.TEXT,
+                            skip_vectorization=True, tokenization=wvc.config.Tokenization.FIELD),
+        wvc.config.Property(name="digest", data_type=wvc.config.DataType.TEXT,
+                            skip_vectorization=True),
+        wvc.config.Property(name="digestHash", data_type=wvc.config.DataType.TEXT,
+                            skip_vectorization=True, tokenization=wvc.config.Tokenization.FIELD),
+        wvc.config.Property(
+            name="comments",
+            data_type=wvc.config.DataType.OBJECT_ARRAY,
+            skip_vectorization=True,
+            nested_properties=[
+                wvc.config.Property(name="commentID", data_type=wvc.config.DataType.TEXT),
+                wvc.config.Property(name="author", data_type=wvc.config.DataType.TEXT),
+                wvc.config.Property(name="body", data_type=wvc.config.DataType.TEXT),
+                wvc.config.Property(name="created", data_type=wvc.config.DataType.DATE),
+                wvc.config.Property(name="updated", data_type=wvc.config.DataType.DATE)
+            ]
+        )
+    ]
+
+
+ENRICHMENT_PROPERTIES = ("contentHash", "digest", "digestHash")
+_enrichment_checked = set()
+_enrichment_lock = threading.Lock()
+
+
+def ensure_enrichment_properties(collection):
+    """Declare contentHash/digest/digestHash on a collection that lacks them.
+
+    Collections created before these properties existed (the legacy JiraIssue)
+    would get them from Weaviate's auto-schema on the first write, vectorized,
+    so every digest would re-embed the ticket. Checked once per process.
+    """
+    with _enrichment_lock:
+        if collection.name in _enrichment_checked:
+            return
+    if not self_provided_vectors(collection):
+        present = {prop.name for prop in collection.config.get().properties}
+        missing = [prop for prop in issue_properties() if prop.name in ENRICHMENT_PROPERTIES and prop.name not in present]
+        for prop in missing:
+            try:
+                collection.config.add_property(prop)
+            except Exception:
+                # Another worker added it first
+                if prop.name not in {p.name for p in collection.config.get().properties}:
+                    raise
+        if missing:
+            forget_vector_layout(collection.name)
+        vectorized = set(ENRICHMENT_PROPERTIES) & set(vector_sources(collection).get("default", ()))
+        if vectorized:
+            logger.warning(f"{collection.name} vectorizes {', '.join(sorted(vectorized))}; digest updates re-embed "
+                           f"its tickets until it is migrated with migrate_collection.py")
+    with _enrichment_lock:
+        _enrichment_checked.add(collection.name)
+
+
+def _single_vectorizer(embedding_mode):
+    if embedding_mode == 'client':
+        return wvc.config.Configure.Vectorizer.none()
+    return wvc.config.Configure.Vectorizer.text2vec_transformers(inference_url="http://t2v-transformers:8080")
+
+
+def create_issue_collection(client, name, named_vectors=None, chunks=None, embedding_mode=None, multi_tenancy=None,
+                            index_profile=None):
+    """Create a JiraIssue collection with the current schema under ``name``
+    (and its companion chunk collection unless COMMENT_CHUNKS_ENABLED is off)"""
+    if named_vectors is None:
+        named_vectors = Config.WEAVIATE_NAMED_VECTORS
+    if chunks is None:
+        chunks = Config.COMMENT_CHUNKS_ENABLED
+    if multi_tenancy is None:
+        multi_tenancy = Config.WEAVIATE_MULTI_TENANCY
+    embedding_mode = embedding_mode or Config.EMBEDDING_MODE
+    vectors = {}
+    if named_vectors and embedding_mode == 'client':
+        vectors['vectorizer_config'] = [
+            wvc.config.Configure.NamedVectors.none(name=vector_name, vector_index_config=vector_index_config(index_profile))
+            for vector_name in NAMED_VECTOR_SOURCES
+        ]
+    elif named_vectors:
+        vectors['vectorizer_config'] = [
+            wvc.config.Configure.NamedVectors.text2vec_transformers(
+                name=vector_name,
+                source_properties=list(properties),
+                vector_index_config=vector_index_config(index_profile),
+                inference_url="http://t2v-transformers:8080"
+            )
+            for vector_name, properties in NAMED_VECTOR_SOURCES.items()
+        ]
+    else:
+        vectors['vectorizer_config'] = _single_vectorizer(embedding_mode)
+        vectors['vector_index_config'] = vector_index_config(index_profile)
+    collection = client.collections.create(
+        name=name,
+        generative_config=wvc.config.Configure.Generative.ollama(
+            api_endpoint="http://172.17.0.1:11434",
+            model="tinyllama"
+        ),
+        properties=issue_properties(named_vectors),
+        multi_tenancy_config=_multi_tenancy_config(multi_tenancy),
+        **vectors
+    )
+    forget_vector_layout(name)
+    if chunks:
+        create_chunk_collection(client, name, embedding_mode, multi_tenancy)
+    return collection
+
+
+# Descriptions and comments are also stored split into chunks in a companion
+# collection (JiraComment_v{n} next to JiraIssue_v{n}), each with a 'ticket'
+# reference to its parent. Queries retrieve chunks and send only the matching
+# excerpts plus the ticket header to the LLM instead of whole comment threads.
+CHUNK_BASE_NAME = "JiraComment"
+
+
+def chunk_collection_name(issue_name):
+    """Chunk collection belonging to an issue collection"""
+    version = parse_version(issue_name)
+    if version is None:
+        return f"{issue_name}Chunks"
+    return CHUNK_BASE_NAME if version == 0 else f"{CHUNK_BASE_NAME}_v{version}"
+
+
+def chunk_properties():
+    Tokenization = wvc.config.Tokenization
+    return [
+        wvc.config.Property(name="text", data_type=wvc.config.DataType.TEXT),
+        wvc.config.Property(name="issueID", data_type=wvc.config.DataType.TEXT,
+                            skip_vectorization=True, tokenization=Tokenization.FIELD),
+        wvc.config.Property(name="issueKey", data_type=wvc.config.DataType.TEXT,
+                            skip_vectorization=True, tokenization=Tokenization.FIELD),
+        wvc.config.Property(name="project", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        # 'description' or 'comment'; position orders the chunks of one text
+        wvc.config.Property(name="kind", data_type=wvc.config.DataType.TEXT,
+                            skip_vectorization=True, tokenization=Tokenization.FIELD),
+        wvc.config.Property(name="commentID", data_type=wvc.config.DataType.TEXT,
+                            skip_vectorization=True, tokenization=Tokenization.FIELD),
+        wvc.config.Property(name="author", data_type=wvc.config.DataType.TEXT, skip_vectorization=True),
+        wvc.config.Property(name="created", data_type=wvc.config.DataType.DATE),
+        wvc.config.Property(name="position", data_type=wvc.config.DataType.INT),
+        wvc.config.Property(name="textHash", data_type=wvc.config.DataType.TEXT,
+                            skip_vectorization=True, tokenization=Tokenization.FIELD),
+    ]
+
+
+def create_chunk_collection(client, issue_name, embedding_mode=None, multi_tenancy=None):
+    """Create the chunk collection of ``issue_name`` (which must exist already).
+
+    With multi-tenancy the chunks of a project live in the tenant of the same
+    name, next to the tickets they reference.
+    """
+    if multi_tenancy is None:
+        multi_tenancy = Config.WEAVIATE_MULTI_TENANCY
+    collection = client.collections.create(
+        name=chunk_collection_name(issue_name),
+        vectorizer_config=_single_vectorizer(embedding_mode or Config.EMBEDDING_MODE),
+        vector_index_config=vector_index_config(),
+        properties=chunk_properties(),
+        multi_tenancy_config=_multi_tenancy_config(multi_tenancy),
+        references=[wvc.config.ReferenceProperty(name="ticket", target_collection=issue_name)]
+    )
+    # Drop a cached "does not exist" answer
+    forget_companion_collection(collection.name)
+    forget_vector_layout(collection.name)
+    return collection
+
+
+# Tickets resolved more than COLD_TIER_MONTHS ago are moved to a companion cold
+# collection (JiraIssueCold_v{n} next to JiraIssue_v{n}) with the same properties,
+# vectors and tenants but a compressed index (COLD_VECTOR_INDEX_PROFILE). Cold
+# tickets have no chunks; they are retrieved whole.
+COLD_BASE_NAME = "JiraIssueCold"
+
+
+def cold_collection_name(issue_name):
+    """Cold tier collection belonging to an issue collection"""
+    version = parse_version(issue_name)
+    if version is None:
+        return f"{issue_name}Cold"
+    return COLD_BASE_NAME if version == 0 else f"{COLD_BASE_NAME}_v{version}"
+
+
+def create_cold_collection(client, issue_collection):
+    """Create the cold tier of an existing issue collection.
+
+    The vector layout, embedding mode and multi-tenancy mirror the issue
+    collection so objects move between the tiers with their stored vectors.
+    """
+    collection = create_issue_collection(
+        client,
+        cold_collection_name(issue_collection.name),
+        named_vectors="default" not in vector_sources(issue_collection),
+        chunks=False,
+        embedding_mode='client' if self_provided_vectors(issue_collection) else 'weaviate',
+        multi_tenancy=multi_tenant(issue_collection),
+        index_profile=Config.COLD_VECTOR_INDEX_PROFILE
+    )
+    forget_companion_collection(collection.name)
+    return collection
+
+
+# Existence of the chunk and cold collections. Negative answers are re-checked
+# so a companion collection added by a migration or the tiering task is picked
+# up without a restart
+_COMPANION_CHECK_SECONDS = 60
+_companion_collections = {}
+_companion_collections_lock = threading.Lock()
+
+
+def has_companion_collection(client, name):
+    now = time.monotonic()
+    with _companion_collections_lock:
+        exists, checked_at = _companion_collections.get(name, (False, None))
+        if exists or (checked_at is not None and now - checked_at < _COMPANION_CHECK_SECONDS):
+            return exists
+    exists = client.collections.exists(name)
+    with _companion_collections_lock:
+        _companion_collections[name] = (exists, now)
+    return exists
+
+
+def forget_companion_collection(name):
+    with _companion_collections_lock:
+        _companion_collections.pop(name, None)
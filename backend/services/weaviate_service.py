@@ -1,7 +1,24 @@
 import weaviate
+import hashlib
+import json
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta, timezone
+from weaviate.classes.data import DataObject
+from weaviate.classes.query import Filter, MetadataQuery, QueryReference, TargetVectors
+from weaviate.util import generate_uuid5
 from config import Config
+from services.collection_versions import active_collection_name
+from services.comment_chunks import delete_chunks, sync_chunks
+from services.embedding_service import get_embedding_service
+from services.jira_text import plain_text
+from services.local_vector_store import get_local_client
+from services.tenants import allowed_projects, existing_tenants, project_from_key, project_of, tenant_name, touch
+from services.weaviate_schema import (
+    chunk_collection_name, cold_collection_name, comment_text, create_cold_collection, ensure_enrichment_properties,
+    has_companion_collection, multi_tenant, self_provided_vectors, vector_sources
+)
+from services.webhook_service import truncated_comments
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -11,17 +28,194 @@ load_dotenv(dotenv_path=env_path)
 
 logger = logging.getLogger(__name__)
 
+# Process-wide client shared by request handlers (see WeaviateService.shared)
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def connect_client():
+    """Client for the configured storage backend (VECTOR_BACKEND)"""
+    if Config.VECTOR_BACKEND == 'local':
+        return get_local_client()
+    return weaviate.connect_to_local(
+        host="localhost",
+        port=8080,
+        grpc_port=50051,
+        additional_config=weaviate.classes.init.AdditionalConfig(
+            timeout=(60, 300),
+        )
+    )
+
+
+DATE_PROPERTIES = ("created", "updated", "resolutionDate")
+
+
+def _as_timestamp(value):
+    """Epoch seconds for an ISO date string or datetime (None if unparseable)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    return value.timestamp()
+
+
+def _normalize(name, value):
+    """Comparable form of a property value (stored values come back as datetimes)"""
+    if name in DATE_PROPERTIES:
+        return _as_timestamp(value)
+    if name == "comments":
+        return [
+            {k: (_as_timestamp(v) if k in ("created", "updated") else (v or None)) for k, v in (c or {}).items()}
+            for c in (value or [])
+        ]
+    if value in ('', [], None):
+        return None
+    return value
+
+
 class WeaviateService:
-    def __init__(self):
-        self.client = weaviate.connect_to_local(
-            host="localhost",
-            port=8080,
-            grpc_port=50051,
-            additional_config=weaviate.classes.init.AdditionalConfig(
-                timeout=(60, 300),
-            )
+    # Vector used for "similar tickets" on collections with named vectors
+    SIMILARITY_VECTOR = "content"
+    # Parent ticket properties returned with chunk search results
+    TICKET_HEADER_PROPERTIES = ["key", "summary", "status", "priority", "labels", "assignee", "reporter",
+                                "created", "resolutionDate", "contentHash", "digest", "digestHash"]
+
+    def __init__(self, client=None, collection_name=None, embedding_service=None):
+        # A service built around an existing client does not own it and
+        # will not close it
+        self._owns_client = client is None
+        self.client = client if client is not None else connect_client()
+        # Pinned collection (e.g. a version being built by a migration); by
+        # default every call follows the active collection pointer
+        self._collection_name = collection_name
+        # Only used for collections with self-provided vectors (EMBEDDING_MODE=client)
+        self._embedding_service = embedding_service
+        # Write volume counters (objects written, property bytes sent, re-embeds,
+        # description/comment chunks written)
+        self.write_stats = {"writes": 0, "skipped": 0, "bytes": 0, "revectorized": 0, "chunks": 0}
+
+    @classmethod
+    def shared(cls):
+        """Return a service bound to the process-wide pooled client.
+
+        Used by synchronous request paths (e.g. /api/search) so each request
+        does not pay for a new HTTP + gRPC connection. close() is a no-op.
+        """
+        global _shared_client
+        with _shared_client_lock:
+            if _shared_client is None or not _shared_client.is_connected():
+                _shared_client = connect_client()
+            return cls(client=_shared_client)
+
+    @property
+    def collection_name(self):
+        return self._collection_name or active_collection_name()
+
+    def _collection(self):
+        return self.client.collections.get(self.collection_name)
+
+    @staticmethod
+    def _bind(collection, project):
+        """``collection`` bound to the project's tenant when it has one tenant per project"""
+        if not multi_tenant(collection):
+            return collection
+        if not project:
+            raise ValueError(f"{collection.name} has one tenant per project; a project key is required")
+        touch(project)
+        return collection.with_tenant(tenant_name(project))
+
+    def collection_for(self, project=None):
+        """The active collection, bound to ``project``'s tenant on multi-tenant versions"""
+        return self._bind(self._collection(), project)
+
+    def _collections_for(self, projects=None, cold=False):
+        """Collections a read over ``projects`` (a key, a list, or None for every
+        configured project) runs on: one per existing tenant, or the collection itself.
+        ``cold`` selects the cold tier (no collections when there is none)."""
+        collection = self._collection()
+        if cold:
+            collection = self._cold_collection(collection)
+            if collection is None:
+                return []
+        if not multi_tenant(collection):
+            return [collection]
+        if isinstance(projects, str):
+            projects = [projects]
+        existing = existing_tenants(collection)
+        return [self._bind(collection, project) for project in (projects or allowed_projects())
+                if tenant_name(project) in existing]
+
+    @property
+    def embedding_service(self):
+        if self._embedding_service is None:
+            self._embedding_service = get_embedding_service()
+        return self._embedding_service
+
+    def _embed_vectors(self, collection, items):
+        """Client-side vectors for ``items`` ([(issue object, vector names)]),
+        embedded in one batch; returns [{vector name: vector}]"""
+        sources = vector_sources(collection)
+        return self.embedding_service.embed_objects(
+            [(issue_obj, {name: sources[name] for name in names}) for issue_obj, names in items]
         )
 
+    @staticmethod
+    def _insert_vector(collection, vectors):
+        """Insert/update ``vector`` argument for {vector name: vector}"""
+        if not vectors:
+            return None
+        return vectors.get("default") if "default" in vector_sources(collection) else vectors
+
+    def _query_vector(self, collection, query):
+        """Query embedding for collections with self-provided vectors (None lets Weaviate embed)"""
+        return self.embedding_service.embed_query(query) if self_provided_vectors(collection) else None
+
+    def _chunk_collection(self, collection):
+        """Companion chunk collection of ``collection``, or None if it has none"""
+        name = chunk_collection_name(collection.name)
+        if not has_companion_collection(self.client, name):
+            return None
+        # Chunks of a project live in the tenant of the same name
+        chunks = self.client.collections.get(name)
+        return chunks.with_tenant(collection.tenant) if collection.tenant else chunks
+
+    def has_chunks(self):
+        return self._chunk_collection(self._collection()) is not None
+
+    def _cold_collection(self, collection, create=False):
+        """Cold tier of ``collection`` (bound to the same tenant), or None if it has none"""
+        name = cold_collection_name(collection.name)
+        if not has_companion_collection(self.client, name):
+            if not create:
+                return None
+            create_cold_collection(self.client, self.client.collections.get(collection.name))
+            logger.info(f"Created cold tier collection {name}")
+        cold = self.client.collections.get(name)
+        return cold.with_tenant(collection.tenant) if collection.tenant else cold
+
+    def has_cold_tier(self):
+        return self._cold_collection(self._collection()) is not None
+
+    def _drop_cold_copies(self, collection, issue_uuids):
+        """Remove tickets written to the hot tier from the cold tier (a reopened or
+        updated old ticket is hot again until it qualifies for the cold tier)"""
+        Cold = self._cold_collection(collection)
+        if Cold is not None and issue_uuids:
+            Cold.data.delete_many(where=Filter.by_id().contains_any(list(issue_uuids)))
+
+    def _sync_chunks(self, collection, issues, new=False):
+        """Update the chunks of ``issues`` ({uuid: issue object}); returns {issue_key: error}"""
+        Chunks = self._chunk_collection(collection)
+        if Chunks is None or not issues:
+            return {}
+        embed = self.embedding_service.embed if self_provided_vectors(Chunks) else None
+        written, failures = sync_chunks(Chunks, issues, new=new, embed=embed)
+        self.write_stats["chunks"] += written
+        return failures
+
     def _parse_date(self, date_str):
         if not date_str:
             return None
@@ -31,78 +225,111 @@ class WeaviateService:
             return None
 
     def _extract_text_from_doc(self, doc_obj):
-        if not doc_obj:
-            return None
-        text = ""
-        if isinstance(doc_obj, dict):
-            content = doc_obj.get('content', [])
-            for item in content:
-                if item.get('type') == 'paragraph':
-                    for text_content in item.get('content', []):
-                        if text_content.get('type') == 'text':
-                            text += text_content.get('text', '') + " "
-        return text.strip()
+        # REST v3 returns Atlassian Document Format, webhook payloads wiki markup
+        # strings; both become the same plain text (see services/jira_text.py)
+        return plain_text(doc_obj)
+
+    def _build_comment(self, comment):
+        return {
+            "commentID": str(comment.get('id')),
+            "author": (comment.get('author') or {}).get('displayName'),
+            "body": self._extract_text_from_doc(comment.get('body')),
+            "created": self._parse_date(comment.get('created')),
+            "updated": self._parse_date(comment.get('updated'))
+        }
+
+    def _field_properties(self, fields):
+        """Weaviate properties for the Jira fields present in ``fields``.
+
+        Fields missing from the dict produce no properties, which lets
+        partial webhook bodies be applied as deltas.
+        """
+        converters = {
+            'project': lambda v: {"project": (v or {}).get('key', ''), "projectName": (v or {}).get('name', '')},
+            'summary': lambda v: {"summary": v or ''},
+            'description': lambda v: {"description": self._extract_text_from_doc(v)},
+            'status': lambda v: {"status": (v or {}).get('name', '')},
+            'priority': lambda v: {"priority": (v or {}).get('name', '')},
+            'labels': lambda v: {"labels": v or []},
+            'assignee': lambda v: {"assignee": (v or {}).get('displayName')},
+            'reporter': lambda v: {"reporter": (v or {}).get('displayName')},
+            'created': lambda v: {"created": self._parse_date(v)},
+            'updated': lambda v: {"updated": self._parse_date(v)},
+            'resolutiondate': lambda v: {"resolutionDate": self._parse_date(v)},
+            'customfield_10000': lambda v: {"customFields": str(v)},
+            'attachment': lambda v: {"attachments": [att.get('filename', '') for att in (v or []) if att]},
+            'comment': lambda v: self._comment_properties([self._build_comment(c) for c in (v or {}).get('comments', [])]),
+        }
+        properties = {}
+        for name, convert in converters.items():
+            if name in fields:
+                properties.update(convert(fields[name]))
+        return properties
+
+    def _comment_properties(self, comments):
+        return {"comments": comments, "commentText": comment_text(comments)}
+
+    def _for_collection(self, collection, issue_obj):
+        """Drop commentText where no vector embeds it (collections created before named vectors)"""
+        ensure_enrichment_properties(collection)
+        if not any("commentText" in properties for properties in vector_sources(collection).values()):
+            issue_obj = {name: value for name, value in issue_obj.items() if name != "commentText"}
+        return issue_obj
+
+    def build_issue_object(self, issue_data):
+        """Weaviate properties for a complete Jira issue (REST v3 or webhook format)"""
+        fields = issue_data.get('fields', {}) or {}
+        issue_obj = {
+            "issueID": str(issue_data.get('id', '')),
+            "key": issue_data.get('key', ''),
+            "project": '',
+            "projectName": '',
+            "summary": '',
+            "description": None,
+            "status": '',
+            "priority": '',
+            "labels": [],
+            "assignee": None,
+            "reporter": None,
+            "created": None,
+            "updated": None,
+            "resolutionDate": None,
+            "customFields": '',
+            "attachments": [],
+            "comments": [],
+            "commentText": ''
+        }
+        issue_obj.update(self._field_properties(fields))
+        issue_obj["contentHash"] = self.content_hash(issue_obj)
+        return issue_obj
 
     def insert_issue(self, issue_data):
         try:
-            # Process comments
-            comments = []
-            for comment in issue_data.get('fields', {}).get('comment', {}).get('comments', []):
-                comment_obj = {
-                    "commentID": str(comment.get('id')),
-                    "author": comment.get('author', {}).get('displayName'),
-                    "body": self._extract_text_from_doc(comment.get('body')),
-                    "created": self._parse_date(comment.get('created')),
-                    "updated": self._parse_date(comment.get('updated'))
-                }
-                comments.append(comment_obj)
-
-            # Helper function to safely get nested values
-            def safe_get(data, *keys, default=None):
-                """Safely get nested dictionary values"""
-                result = data
-                for key in keys:
-                    if result is None:
-                        return default
-                    if isinstance(result, dict):
-                        result = result.get(key)
-                    else:
-                        return default
-                return result if result is not None else default
-            
-            # Prepare issue data with safe access to handle None values
-            fields = issue_data.get('fields', {}) or {}
-            assignee = safe_get(fields, 'assignee', 'displayName', default=None)
-            reporter = safe_get(fields, 'reporter', 'displayName', default=None)
-            project = fields.get('project', {}) or {}
-            status = fields.get('status', {}) or {}
-            priority = fields.get('priority', {}) or {}
-            
-            issue_obj = {
-                "issueID": str(issue_data.get('id', '')),
-                "key": issue_data.get('key', ''),
-                "project": project.get('key', ''),
-                "projectName": project.get('name', ''),
-                "summary": fields.get('summary') or '',
-                "description": self._extract_text_from_doc(fields.get('description')),
-                "status": status.get('name', ''),
-                "priority": priority.get('name', ''),
-                "labels": fields.get('labels', []) or [],
-                "assignee": assignee,
-                "reporter": reporter,
-                "created": self._parse_date(fields.get('created')),
-                "updated": self._parse_date(fields.get('updated')),
-                "resolutionDate": self._parse_date(fields.get('resolutiondate')),
-                "customFields": str(fields.get('customfield_10000', '')),
-                "attachments": [att.get('filename', '') for att in (fields.get('attachment', []) or []) if att],
-                "comments": comments
-            }
-
-            # Insert issue
-            Issue = self.client.collections.get("JiraIssue")
-            issue_uuid = Issue.data.insert(
-                properties=issue_obj
-            )
+            issue_obj = self.build_issue_object(issue_data)
+
+            # Upsert under a UUID derived from the Jira issue ID so repeated
+            # webhooks update the ticket instead of adding duplicates
+            Issue = self.collection_for(issue_obj["project"])
+            issue_obj = self._for_collection(Issue, issue_obj)
+            issue_uuid = generate_uuid5(issue_obj["issueID"] or issue_obj["key"])
+            existing = Issue.query.fetch_object_by_id(issue_uuid, include_vector=True)
+            if existing is None:
+                vector = None
+                if self_provided_vectors(Issue):
+                    vector = self._insert_vector(Issue, self._embed_vectors(Issue, [(issue_obj, vector_sources(Issue))])[0])
+                Issue.data.insert(properties=issue_obj, uuid=issue_uuid, vector=vector)
+                self._record_write(issue_obj, revectorized=len(vector_sources(Issue)))
+                self._drop_cold_copies(Issue, [issue_uuid])
+            else:
+                # Only changed properties are written; derived properties
+                # (digests) are untouched because they are not in issue_obj
+                self._update_changed(Issue, issue_uuid, existing, issue_obj)
+
+            # Chunks are compared with the stored ones on every call, which
+            # also repairs chunks a previous attempt failed to write
+            failures = self._sync_chunks(Issue, {issue_uuid: issue_obj}, new=existing is None)
+            if failures:
+                raise RuntimeError(f"Chunks of {issue_obj['key']} failed to write: {next(iter(failures.values()))}")
 
             return issue_uuid
 
@@ -110,8 +337,640 @@ class WeaviateService:
             logger.error(f"Error inserting issue: {str(e)}")
             raise
 
+    def insert_issues(self, issues_data):
+        """Batched insert_issue for bulk imports.
+
+        Looks up the stored versions of the whole batch in one query, sends
+        new tickets in a single batch request and PATCHes only the changed
+        properties of existing ones (unchanged tickets cost nothing). Returns
+        ``{issue_key: error}`` for the tickets that could not be written.
+        """
+        failures = {}
+        objects = {}
+        for issue_data in issues_data:
+            try:
+                issue_obj = self.build_issue_object(issue_data)
+                objects[generate_uuid5(issue_obj["issueID"] or issue_obj["key"])] = issue_obj
+            except Exception as e:
+                failures[issue_data.get('key')] = str(e)
+        if not objects:
+            return failures
+
+        # Multi-tenant versions take one write per project tenant
+        collection = self._collection()
+        groups = {}
+        for issue_uuid, issue_obj in objects.items():
+            project = issue_obj["project"] if multi_tenant(collection) else None
+            groups.setdefault(project, {})[issue_uuid] = issue_obj
+        for project, group in groups.items():
+            try:
+                failures.update(self._insert_group(self._bind(collection, project), group))
+            except Exception as e:
+                failures.update({issue_obj.get("key"): str(e) for issue_obj in group.values()})
+        return failures
+
+    def _insert_group(self, Issue, objects):
+        """insert_issues for {uuid: issue object} of one collection (or tenant)"""
+        failures = {}
+        objects = {issue_uuid: self._for_collection(Issue, issue_obj) for issue_uuid, issue_obj in objects.items()}
+        stored = Issue.query.fetch_objects(
+            filters=Filter.by_id().contains_any(list(objects)),
+            include_vector=True,
+            limit=len(objects)
+        )
+        existing = {str(obj.uuid): obj for obj in stored.objects}
+
+        # With self-provided vectors, new tickets and the stale vectors of
+        # changed ones are embedded together in one batch
+        vectors = {}
+        if self_provided_vectors(Issue):
+            pending = []
+            for issue_uuid, issue_obj in objects.items():
+                if issue_uuid in existing:
+                    names = self._stale_vectors(Issue, self._changes(existing[issue_uuid], issue_obj))
+                else:
+                    names = set(vector_sources(Issue))
+                if names:
+                    pending.append((issue_uuid, issue_obj, names))
+            embedded = self._embed_vectors(Issue, [(issue_obj, names) for _, issue_obj, names in pending])
+            vectors = {issue_uuid: vector for (issue_uuid, _, _), vector in zip(pending, embedded)}
+
+        new_objects = [
+            DataObject(properties=issue_obj, uuid=issue_uuid,
+                       vector=self._insert_vector(Issue, vectors.get(issue_uuid)))
+            for issue_uuid, issue_obj in objects.items() if issue_uuid not in existing
+        ]
+        if new_objects:
+            result = Issue.data.insert_many(new_objects)
+            for index, error in (result.errors or {}).items():
+                failures[new_objects[index].properties.get("key")] = error.message
+            for index, data_object in enumerate(new_objects):
+                if index not in (result.errors or {}):
+                    self._record_write(data_object.properties, revectorized=len(vector_sources(Issue)))
+            self._drop_cold_copies(Issue, [str(data_object.uuid) for index, data_object in enumerate(new_objects)
+                                           if index not in (result.errors or {})])
+
+        for issue_uuid, issue_obj in objects.items():
+            if issue_uuid in existing:
+                try:
+                    self._update_changed(Issue, issue_uuid, existing[issue_uuid], issue_obj,
+                                         fresh_vectors=vectors.get(issue_uuid))
+                except Exception as e:
+                    failures[issue_obj.get("key")] = str(e)
+
+        written = {issue_uuid: issue_obj for issue_uuid, issue_obj in objects.items()
+                   if issue_obj.get("key") not in failures}
+        try:
+            failures.update(self._sync_chunks(
+                Issue, {u: o for u, o in written.items() if u not in existing}, new=True))
+            failures.update(self._sync_chunks(
+                Issue, {u: o for u, o in written.items() if u in existing}))
+        except Exception as e:
+            logger.error(f"Error writing chunks: {str(e)}")
+            failures.update({issue_obj.get("key"): str(e) for issue_obj in written.values()})
+        return failures
+
+    def newer_stored_keys(self, issues_data):
+        """Keys of ``issues_data`` whose stored ticket has a later ``updated``.
+
+        Reindexing from the raw issue cache skips these, so a cached version
+        never rolls back changes that reached Weaviate as webhook deltas
+        (which are not cached).
+        """
+        groups = {}
+        for issue_data in issues_data:
+            issue_uuid = generate_uuid5(str(issue_data.get('id') or '') or issue_data.get('key'))
+            groups.setdefault(project_of(issue_data), {})[issue_uuid] = issue_data
+        multi = multi_tenant(self._collection())
+        newer = set()
+        for project, group in groups.items():
+            for Issue in self._collections_for(project if multi else None):
+                stored = Issue.query.fetch_objects(
+                    filters=Filter.by_id().contains_any(list(group)),
+                    return_properties=["key", "updated"],
+                    limit=len(group)
+                )
+                for obj in stored.objects:
+                    cached = _as_timestamp((group[str(obj.uuid)].get('fields') or {}).get('updated'))
+                    current = _as_timestamp(obj.properties.get("updated"))
+                    if cached is not None and current is not None and current > cached:
+                        newer.add(obj.properties.get("key"))
+        return newer
+
+    def stored_keys(self, project=None):
+        """Keys of the tickets already stored in either tier (optionally for one project)"""
+        keys = set()
+        for Issue in self._collections_for(project) + self._collections_for(project, cold=True):
+            # The cursor iterator pages through every object (fetch_objects stops at
+            # QUERY_MAXIMUM_RESULTS); iterators take no filter, so projects are
+            # compared here (tenants already hold a single project)
+            for obj in Issue.iterator(return_properties=["key", "project"]):
+                key = obj.properties.get("key")
+                if key and (not project or obj.properties.get("project") == project):
+                    keys.add(key)
+        return keys
+
+    def count_tickets(self, project=None):
+        """Number of stored tickets in either tier (one project, or every configured project)"""
+        total = 0
+        for Issue in self._collections_for(project) + self._collections_for(project, cold=True):
+            filters = None if Issue.tenant else self.build_filters(project=project or allowed_projects())
+            total += Issue.aggregate.over_all(total_count=True, filters=filters).total_count
+        return total
+
+    @staticmethod
+    def cold_tier_cutoff(months=None, now=None):
+        """Resolution date before which tickets belong to the cold tier"""
+        months = Config.COLD_TIER_MONTHS if months is None else months
+        return (now or datetime.now(timezone.utc)) - timedelta(days=round(months * 365.25 / 12))
+
+    def move_to_cold_tier(self, cutoff, batch_size=200):
+        """Move tickets resolved before ``cutoff`` (a datetime) to the cold tier.
+
+        Objects keep their uuid, properties and stored vectors (nothing is
+        re-embedded) and their chunks are deleted. Each batch is written to
+        the cold tier before it is deleted from the hot one, so an
+        interrupted run leaves a ticket in both tiers rather than in none.
+        Returns ``{tenant: tickets moved}`` ('' for single-tenant versions).
+        """
+        self._cold_collection(self._collection(), create=True)
+        moved = {}
+        for Hot in self._collections_for():
+            Cold = self._cold_collection(Hot)
+            Chunks = self._chunk_collection(Hot)
+            count = 0
+            while True:
+                response = Hot.query.fetch_objects(
+                    filters=Filter.by_property("resolutionDate").less_than(cutoff),
+                    include_vector=True,
+                    limit=batch_size
+                )
+                if not response.objects:
+                    break
+                objects = [DataObject(properties=o.properties, uuid=o.uuid, vector=self._insert_vector(Hot, o.vector))
+                           for o in response.objects]
+                result = Cold.data.insert_many(objects)
+                errors = result.errors or {}
+                done = [obj for index, obj in enumerate(objects) if index not in errors]
+                if done:
+                    if Chunks is not None:
+                        delete_chunks(Chunks, {str(obj.properties.get("issueID") or obj.properties.get("key"))
+                                               for obj in done})
+                    deleted = Hot.data.delete_many(where=Filter.by_id().contains_any([str(obj.uuid) for obj in done]))
+                    if deleted.failed:
+                        raise RuntimeError(f"{deleted.failed} moved ticket(s) could not be deleted from {Hot.name}")
+                    count += len(done)
+                if errors:
+                    # The failed tickets would be fetched again on every iteration
+                    raise RuntimeError(f"{len(errors)} ticket(s) failed to move to {Cold.name}: "
+                                       f"{next(iter(errors.values())).message}")
+            moved[Hot.tenant or ''] = count
+            if count:
+                logger.info(f"Moved {count} ticket(s) resolved before {cutoff:%Y-%m-%d} to {Cold.name}"
+                            f"{f' ({Hot.tenant})' if Hot.tenant else ''}")
+        return moved
+
+    def apply_issue_delta(self, issue_data, comment_events=None):
+        """Merge a partial update into the stored ticket without a Jira fetch.
+
+        ``issue_data`` is a (possibly partial) webhook issue body; only the
+        fields it carries are applied, and only if it is not older than the
+        stored ticket. ``comment_events`` are comment created/updated/deleted
+        deltas. Returns the ticket UUID, or None when the ticket is not
+        stored yet (the caller must then do a full insert).
+        """
+        issue_uuid = generate_uuid5(str(issue_data.get('id') or '') or issue_data.get('key', ''))
+        Issue = self._collection()
+        if multi_tenant(Issue):
+            # Partial bodies may lack the project; the issue key carries it
+            Issue = self._bind(Issue, project_of(issue_data))
+        existing = Issue.query.fetch_object_by_id(issue_uuid, include_vector=True)
+        if existing is None:
+            return None
+
+        stored = dict(existing.properties)
+        updated_obj = dict(stored)
+        fields = dict(issue_data.get('fields') or {})
+        if truncated_comments(fields):
+            # A partial page would replace the whole stored thread; comment
+            # changes arrive as comment events instead
+            del fields['comment']
+        field_changes = self._field_properties(fields)
+        payload_updated = _as_timestamp(field_changes.get("updated"))
+        stored_updated = _as_timestamp(stored.get("updated"))
+        if payload_updated is None or stored_updated is None or payload_updated >= stored_updated:
+            updated_obj.update(field_changes)
+        else:
+            logger.info(f"Ignoring out-of-date fields for issue {issue_data.get('id')}")
+
+        if comment_events:
+            updated_obj["comments"] = self._merge_comments(updated_obj.get("comments") or [], comment_events)
+        updated_obj.update(self._comment_properties(updated_obj.get("comments") or []))
+        updated_obj["contentHash"] = self.content_hash(updated_obj)
+
+        self._update_changed(Issue, issue_uuid, existing, self._for_collection(Issue, updated_obj))
+        failures = self._sync_chunks(Issue, {issue_uuid: updated_obj})
+        if failures:
+            raise RuntimeError(f"Chunks of {updated_obj.get('key')} failed to write: {next(iter(failures.values()))}")
+        return issue_uuid
+
+    def _merge_comments(self, comments, comment_events):
+        comments = list(comments)
+        for delta in comment_events:
+            comment = delta.get('comment') or {}
+            comment_id = str(comment.get('id'))
+            comments = [c for c in comments if str(c.get('commentID')) != comment_id]
+            if delta.get('event') != 'comment_deleted':
+                comments.append(self._build_comment(comment))
+        comments.sort(key=lambda c: _as_timestamp(c.get('created')) or 0)
+        return comments
+
+    @staticmethod
+    def _changes(existing, issue_obj):
+        return {
+            name: value for name, value in issue_obj.items()
+            if _normalize(name, value) != _normalize(name, existing.properties.get(name))
+        }
+
+    @staticmethod
+    def _stale_vectors(collection, changes):
+        """Vectors whose source properties are among ``changes``"""
+        return {name for name, properties in vector_sources(collection).items() if set(changes) & set(properties)}
+
+    def _update_changed(self, collection, issue_uuid, existing, issue_obj, fresh_vectors=None):
+        """PATCH only the properties that differ from the stored object.
+
+        Stored vectors whose source properties did not change are sent
+        along, so Weaviate only re-embeds the vectors (the single 'default'
+        one, or the 'content' / 'comments' named vectors) whose text changed.
+        With self-provided vectors the stale ones are embedded here (or
+        taken from ``fresh_vectors`` when the caller embedded a batch).
+        """
+        changes = self._changes(existing, issue_obj)
+        if not changes:
+            self.write_stats["skipped"] += 1
+            return
+
+        sources = vector_sources(collection)
+        stale = self._stale_vectors(collection, changes)
+        stored_vectors = existing.vector or {}
+        kept = {name: stored_vectors[name] for name in sources if name not in stale and stored_vectors.get(name)}
+        emptied = set()
+        if stale and self_provided_vectors(collection):
+            fresh = fresh_vectors or self._embed_vectors(collection, [(issue_obj, stale)])[0]
+            kept.update(fresh)
+            # A vector whose text became empty (all comments deleted) is not
+            # embedded; an update would keep the stored one, so replace the object
+            emptied = stale - set(fresh)
+        vector = self._insert_vector(collection, kept)
+        if emptied:
+            collection.data.replace(uuid=issue_uuid, properties={**existing.properties, **changes}, vector=vector)
+        else:
+            collection.data.update(uuid=issue_uuid, properties=changes, vector=vector)
+        self._record_write(changes, revectorized=len(stale))
+
+    def _record_write(self, properties, revectorized):
+        """``revectorized`` is the number of vectors Weaviate (re)computes for this write"""
+        size = len(json.dumps(properties, default=str))
+        self.write_stats["writes"] += 1
+        self.write_stats["bytes"] += size
+        self.write_stats["revectorized"] += int(revectorized)
+        logger.debug(f"Weaviate write: {sorted(properties)} ({size} bytes, revectorized={revectorized})")
+
     # Remove insert_comments method as it's no longer needed
 
+    @staticmethod
+    def content_hash(issue_obj):
+        """Hash of the ticket text that digests are derived from.
+
+        Works on both freshly built issue objects and stored properties.
+        """
+        payload = {
+            "summary": issue_obj.get("summary") or "",
+            "description": issue_obj.get("description") or "",
+            "comments": [
+                [str(c.get("commentID") or ""), c.get("body") or ""]
+                for c in (issue_obj.get("comments") or [])
+            ],
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def update_digest(self, issue_uuid, digest, digest_hash, project=None, cold=False):
+        """Store a generated digest (digest properties are not vectorized)"""
+        Issue = self.collection_for(project)
+        if cold:
+            Issue = self._cold_collection(Issue)
+        ensure_enrichment_properties(Issue)
+        Issue.data.update(
+            uuid=issue_uuid,
+            properties={"digest": digest, "digestHash": digest_hash}
+        )
+
+    def build_filters(self, project=None, status=None, priority=None, labels=None,
+                      created_after=None, created_before=None):
+        """Combine optional ticket filters into a single Weaviate filter.
+
+        project/status/priority/labels accept a single value or a list
+        (matched with any-of semantics). Returns None when no filter is requested.
+        """
+        def as_list(value):
+            if value is None or value == '' or value == []:
+                return []
+            return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+        def any_equal(name, values):
+            matches = [Filter.by_property(name).equal(v) for v in values]
+            return Filter.any_of(matches) if len(matches) > 1 else matches[0]
+
+        conditions = []
+        projects = as_list(project)
+        if projects:
+            conditions.append(any_equal("project", projects))
+        statuses = as_list(status)
+        if statuses:
+            conditions.append(any_equal("status", statuses))
+        priorities = as_list(priority)
+        if priorities:
+            conditions.append(any_equal("priority", priorities))
+        label_values = as_list(labels)
+        if label_values:
+            conditions.append(Filter.by_property("labels").contains_any(label_values))
+        if created_after:
+            conditions.append(Filter.by_property("created").greater_or_equal(self._parse_date(created_after)))
+        if created_before:
+            conditions.append(Filter.by_property("created").less_or_equal(self._parse_date(created_before)))
+
+        if not conditions:
+            return None
+        return Filter.all_of(conditions) if len(conditions) > 1 else conditions[0]
+
+    @staticmethod
+    def search_vector_weights(sources):
+        """Configured SEARCH_VECTOR_WEIGHTS limited to the collection's named vectors"""
+        weights = {}
+        for part in Config.SEARCH_VECTOR_WEIGHTS.split(','):
+            name, _, weight = part.partition(':')
+            if name.strip() in sources:
+                weights[name.strip()] = float(weight or 1)
+        return weights or {name: 1.0 for name in sources}
+
+    def _target_vector(self, collection, target_vector=None):
+        """Vector(s) a query searches: None for single-vector collections,
+        a named vector, or the weighted fusion of all of them ('fused')."""
+        sources = vector_sources(collection)
+        if "default" in sources:
+            return None
+        if target_vector and target_vector != 'fused':
+            if target_vector not in sources:
+                raise ValueError(f"Unknown vector {target_vector!r} (expected one of {', '.join(sources)} or 'fused')")
+            return target_vector
+        weights = self.search_vector_weights(sources)
+        if len(weights) == 1:
+            return next(iter(weights))
+        return TargetVectors.manual_weights(weights)
+
+    def search_tickets(self, query, limit=30, offset=0, alpha=0.75, filters=None, target_vector=None, cold=False):
+        """Hybrid search over JiraIssue.
+
+        ``filters`` is a dict of build_filters() keyword arguments and
+        ``target_vector`` picks the named vector to search ('content',
+        'comments' or 'fused', the default). Returns a list of dicts with
+        ``uuid``, ``key``, ``score`` and ``properties``, ordered from most
+        to least relevant. ``cold`` searches the cold tier instead (see
+        search_tiered()).
+
+        On multi-tenant versions the search runs in the tenant of each
+        requested project (``filters['project']``, default: every configured
+        project) and the hits are merged by score.
+        """
+        collections = self._collections_for((filters or {}).get('project'), cold=cold)
+        fan_out = len(collections) > 1
+        query_vector = self._query_vector(collections[0], query) if collections else None
+        results = []
+        for Issue in collections:
+            response = Issue.query.hybrid(
+                query=query,
+                # Each tenant has to return the first offset + limit hits for the merged page
+                limit=limit + offset if fan_out else limit,
+                offset=None if fan_out else offset or None,
+                filters=self.build_filters(**(filters or {})),
+                alpha=alpha,  # Weight towards semantic/vector search vs keyword
+                vector=query_vector,
+                target_vector=self._target_vector(Issue, target_vector),
+                return_metadata=MetadataQuery(score=True)
+            )
+            for o in response.objects:
+                results.append({
+                    'uuid': str(o.uuid),
+                    'key': o.properties.get('key'),
+                    'score': o.metadata.score if o.metadata else None,
+                    'properties': o.properties,
+                    'tier': 'cold' if cold else 'hot'
+                })
+        if fan_out:
+            results.sort(key=lambda result: result['score'] or 0, reverse=True)
+            results = results[offset:offset + limit]
+        return results
+
+    def hot_matches(self, query, filters=None, target_vector=None, count=None):
+        """Number of hot tickets (at most ``count``, default COLD_TIER_MIN_HITS)
+        within COLD_TIER_MAX_DISTANCE of the query.
+
+        Hybrid scores are relative to each result set, so whether the hot
+        tier answers a question well is judged on vector distance: one small
+        near-text/near-vector probe per tenant. Fused queries also probe the
+        heaviest named vector alone, so tickets lacking one of the fused
+        vectors (no comments yet) still count.
+        """
+        count = count or Config.COLD_TIER_MIN_HITS
+        collections = self._collections_for((filters or {}).get('project'))
+        query_vector = self._query_vector(collections[0], query) if collections else None
+        matches = set()
+        for Issue in collections:
+            target = self._target_vector(Issue, target_vector)
+            targets = [target]
+            if target is not None and not isinstance(target, str):
+                weights = self.search_vector_weights(vector_sources(Issue))
+                targets.append(max(weights, key=weights.get))
+            for probe in targets:
+                options = dict(
+                    limit=count - len(matches),
+                    distance=Config.COLD_TIER_MAX_DISTANCE,
+                    filters=self.build_filters(**(filters or {})),
+                    target_vector=probe
+                )
+                if query_vector is None:
+                    response = Issue.query.near_text(query=query, **options)
+                else:
+                    response = Issue.query.near_vector(near_vector=query_vector, **options)
+                matches.update((Issue.name, Issue.tenant, o.uuid) for o in response.objects)
+                if len(matches) >= count:
+                    return count
+        return len(matches)
+
+    def search_cold_if_weak(self, query, limit=None, alpha=0.75, filters=None, target_vector=None):
+        """Cold tier hits for a query the hot tier answers weakly (see hot_matches()),
+        otherwise (or without a cold tier) an empty list"""
+        if not self.has_cold_tier() or self.hot_matches(query, filters, target_vector) >= Config.COLD_TIER_MIN_HITS:
+            return []
+        return self.search_tickets(query, limit=limit or Config.COLD_TIER_QUERY_LIMIT, alpha=alpha,
+                                   filters=filters, target_vector=target_vector, cold=True)
+
+    def search_tiered(self, query, limit=30, offset=0, alpha=0.75, filters=None, target_vector=None):
+        """search_tickets() over the hot tier, merged with the cold tier when the
+        hot tier has too few close matches.
+
+        Both tiers are asked for ``offset + limit`` hits and merged by score
+        (a ticket caught mid-move is kept once, from the hot tier); results
+        carry ``tier`` ('hot' or 'cold').
+        """
+        cold = self.search_cold_if_weak(query, limit=limit + offset, alpha=alpha, filters=filters,
+                                        target_vector=target_vector)
+        if not cold:
+            return self.search_tickets(query, limit=limit, offset=offset, alpha=alpha, filters=filters,
+                                       target_vector=target_vector)
+        hot = self.search_tickets(query, limit=limit + offset, alpha=alpha, filters=filters,
+                                  target_vector=target_vector)
+        hot_keys = {result['key'] for result in hot}
+        results = hot + [result for result in cold if result['key'] not in hot_keys]
+        results.sort(key=lambda result: result['score'] or 0, reverse=True)
+        return results[offset:offset + limit]
+
+    def search_chunks(self, query, tickets=30, project=None, alpha=0.75, limit=None, per_ticket=None):
+        """Hybrid search over the description/comment chunks, grouped by ticket.
+
+        Returns up to ``tickets`` dicts with ``uuid``, ``key``, ``score`` (of
+        the best chunk), ``properties`` (the ticket header, see
+        TICKET_HEADER_PROPERTIES) and ``chunks`` (at most ``per_ticket``
+        matching chunks, best first), ordered from most to least relevant.
+        """
+        if not self.has_chunks():
+            raise ValueError(f"{self.collection_name} has no chunk collection")
+        per_ticket = per_ticket or Config.CHUNKS_PER_TICKET
+        chunk_collections = [self._chunk_collection(Issue) for Issue in self._collections_for(project)]
+        query_vector = self._query_vector(chunk_collections[0], query) if chunk_collections else None
+        objects = []
+        for Chunks in chunk_collections:
+            response = Chunks.query.hybrid(
+                query=query,
+                limit=limit or Config.CHUNK_SEARCH_LIMIT,
+                filters=self.build_filters(project=project) if project and not Chunks.tenant else None,
+                alpha=alpha,
+                vector=query_vector,
+                return_metadata=MetadataQuery(score=True),
+                return_references=QueryReference(link_on="ticket", return_properties=self.TICKET_HEADER_PROPERTIES)
+            )
+            objects.extend(response.objects)
+        if len(chunk_collections) > 1:
+            objects.sort(key=lambda o: (o.metadata.score if o.metadata else None) or 0, reverse=True)
+
+        grouped = {}
+        for o in objects:
+            key = o.properties.get('issueKey')
+            entry = grouped.get(key)
+            if entry is None:
+                if len(grouped) >= tickets:
+                    continue
+                reference = (o.references or {}).get('ticket')
+                parent = reference.objects[0] if reference and reference.objects else None
+                entry = grouped[key] = {
+                    'uuid': str(parent.uuid) if parent else None,
+                    'key': key,
+                    'score': o.metadata.score if o.metadata else None,
+                    'properties': dict(parent.properties) if parent else {'key': key},
+                    'chunks': []
+                }
+            if len(entry['chunks']) < per_ticket:
+                entry['chunks'].append(o.properties)
+        return list(grouped.values())
+
+    def get_ticket(self, issue_key, include_vector=False):
+        """Fetch a stored ticket by key.
+
+        Returns a dict with ``uuid``, ``properties``, ``tier`` and (optionally)
+        ``vector``, or None when the ticket is in neither tier.
+        """
+        Issue = self._collection()
+        o = None
+        for tier, collection in (('hot', Issue), ('cold', self._cold_collection(Issue))):
+            if collection is None:
+                continue
+            if multi_tenant(collection):
+                project = project_from_key(issue_key)
+                if project not in existing_tenants(collection):
+                    continue
+                collection = self._bind(collection, project)
+            response = collection.query.fetch_objects(
+                limit=1,
+                filters=Filter.by_property("key").equal(issue_key),
+                include_vector=include_vector
+            )
+            if response.objects:
+                o = response.objects[0]
+                break
+        if o is None:
+            return None
+        ticket = {'uuid': str(o.uuid), 'properties': o.properties, 'tier': tier}
+        if include_vector:
+            vectors = o.vector or {}
+            ticket['vector'] = vectors.get('default') or vectors.get(self.SIMILARITY_VECTOR)
+        return ticket
+
+    def find_similar(self, vector, limit=10, filters=None, exclude_key=None):
+        """Nearest tickets to an already-computed vector (no re-vectorization).
+
+        Same result shape as search_tickets(), with ``distance`` instead of a
+        hybrid score (``score`` is reported as 1 - distance).
+        """
+        where = self.build_filters(**(filters or {}))
+        if exclude_key:
+            exclude = Filter.by_property("key").not_equal(exclude_key)
+            where = exclude if where is None else where & exclude
+
+        collections = self._collections_for((filters or {}).get('project'))
+        results = []
+        for Issue in collections:
+            response = Issue.query.near_vector(
+                near_vector=vector,
+                limit=limit,
+                filters=where,
+                target_vector=None if "default" in vector_sources(Issue) else self.SIMILARITY_VECTOR,
+                return_metadata=MetadataQuery(distance=True)
+            )
+            for o in response.objects:
+                distance = o.metadata.distance if o.metadata else None
+                results.append({
+                    'uuid': str(o.uuid),
+                    'key': o.properties.get('key'),
+                    'distance': distance,
+                    'score': 1 - distance if distance is not None else None,
+                    'properties': o.properties
+                })
+        if len(collections) > 1:
+            results.sort(key=lambda result: result['distance'] if result['distance'] is not None else 2)
+            results = results[:limit]
+        return results
+
+    @staticmethod
+    def resolution_snippet(properties, max_chars=300):
+        """Short text showing how a ticket was resolved.
+
+        Uses the latest comment (where resolutions are usually recorded) and
+        falls back to the description.
+        """
+        text = ''
+        comments = [c for c in (properties.get('comments') or []) if c.get('body')]
+        if comments:
+            text = comments[-1].get('body', '')
+        if not text:
+            text = properties.get('description') or ''
+        text = ' '.join(text.split())
+        if len(text) > max_chars:
+            text = text[:max_chars].rstrip() + '...'
+        return text
+
     def close(self):
-        if self.client:
-            self.client = None
+        if self.client and self._owns_client:
+            self.client.close()
+        self.client = None
@@ -0,0 +1,333 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future
+import redis
+from config import Config
+from services.cache_service import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+# Issue fields insert_issue needs; when a webhook body carries all of them the
+# Weaviate object is built straight from the payload without calling Jira
+REQUIRED_ISSUE_FIELDS = (
+    'summary', 'description', 'status', 'priority', 'project', 'labels', 'assignee',
+    'reporter', 'created', 'updated', 'resolutiondate', 'attachment', 'comment',
+)
+
+COMMENT_EVENTS = ('comment_created', 'comment_updated', 'comment_deleted')
+
+# Set by Jira Cloud on every delivery and kept identical on retries
+DELIVERY_ID_HEADER = 'X-Atlassian-Webhook-Identifier'
+
+
+def comment_event(data):
+    """Comment delta carried by a webhook body, or None"""
+    event = data.get('webhookEvent')
+    if event in COMMENT_EVENTS and data.get('comment'):
+        return {'event': event, 'comment': data['comment']}
+    return None
+
+
+def truncated_comments(fields):
+    """True when the comment field of an issue is a truncated page of the thread"""
+    comment = (fields or {}).get('comment')
+    return isinstance(comment, dict) and comment.get('total', 0) > len(comment.get('comments') or [])
+
+
+def missing_fields(issue):
+    """Required fields absent from a webhook issue (None values count as present)"""
+    fields = (issue or {}).get('fields') or {}
+    missing = [name for name in REQUIRED_ISSUE_FIELDS if name not in fields]
+    if 'comment' not in missing and truncated_comments(fields):
+        missing.append('comment')
+    return missing
+
+
+def apply_comment_events(issue, events):
+    """Apply comment created/updated/deleted deltas to a Jira issue dict (returns a copy)"""
+    issue = copy.deepcopy(issue)
+    fields = issue.setdefault('fields', {})
+    thread = fields.get('comment') or {}
+    comments = list(thread.get('comments') or [])
+    for delta in events or []:
+        comment = delta.get('comment') or {}
+        comment_id = str(comment.get('id'))
+        comments = [c for c in comments if str(c.get('id')) != comment_id]
+        if delta.get('event') != 'comment_deleted':
+            comments.append(comment)
+    comments.sort(key=lambda c: c.get('created') or '')
+    fields['comment'] = dict(thread, comments=comments, total=len(comments), maxResults=len(comments))
+    return issue
+
+
+def resolve_issue_details(jira_service, issue_id, issue_payload=None, comment_events=None):
+    """Build the full issue representation for insert_issue.
+
+    Uses the webhook issue body when it is complete, fetches only the
+    missing fields from Jira otherwise (the whole issue when there is no
+    body), then applies comment deltas on top. Returns
+    ``(issue_details, rest_calls)``.
+    """
+    if not issue_payload:
+        return jira_service.get_issue_details(issue_id), 1
+
+    issue_details = copy.deepcopy(issue_payload)
+    rest_calls = 0
+    missing = missing_fields(issue_details)
+    if missing:
+        fetched = jira_service.get_issue_details(issue_id, fields=missing)
+        issue_details.setdefault('fields', {}).update(fetched.get('fields') or {})
+        issue_details.setdefault('key', fetched.get('key'))
+        rest_calls = 1
+        logger.info(f"Issue {issue_id}: fetched missing fields {missing} from Jira")
+    else:
+        logger.info(f"Issue {issue_id}: built from webhook payload without a Jira fetch")
+
+    if comment_events:
+        issue_details = apply_comment_events(issue_details, comment_events)
+    return issue_details, rest_calls
+
+
+def webhook_identity(data, headers=None):
+    """Identity of a webhook delivery for de-duplication, or None if unknown.
+
+    Prefers Jira's delivery identifier (stable across retries); otherwise
+    derives one from the event itself (event type, issue, timestamp,
+    comment and changelog ids). Events without a timestamp or changelog id
+    are not de-duplicated, as distinct events could share an identity.
+    """
+    delivery_id = (headers or {}).get(DELIVERY_ID_HEADER)
+    if delivery_id:
+        return f"delivery:{delivery_id}"
+    if not data.get('timestamp') and not (data.get('changelog') or {}).get('id'):
+        return None
+    parts = [
+        data.get('webhookEvent'),
+        (data.get('issue') or {}).get('id'),
+        data.get('timestamp'),
+        (data.get('comment') or {}).get('id'),
+        (data.get('changelog') or {}).get('id'),
+    ]
+    return "event:" + hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
+
+
+def seen_key(identity):
+    return f"webhook:seen:{identity}"
+
+
+def payload_key(identity):
+    return f"webhook:payload:{identity}"
+
+
+class WebhookDeduplicator:
+    """Drops repeated webhook deliveries using a short-TTL Redis key per identity.
+
+    Redis errors fail open (the delivery is processed): a duplicate sync is
+    harmless, a lost one is not.
+    """
+
+    def __init__(self, client=None, ttl_seconds=None):
+        self.client = client if client is not None else get_redis_client()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.WEBHOOK_DEDUP_TTL
+
+    def first_delivery(self, identity):
+        """True the first time an identity is seen within the TTL"""
+        if identity is None:
+            return True
+        try:
+            return bool(self.client.set(seen_key(identity), 1, nx=True, ex=self.ttl_seconds))
+        except redis.RedisError as e:
+            logger.warning(f"Webhook de-duplication unavailable: {str(e)}")
+            return True
+
+    def forget(self, identity):
+        """Let a delivery be processed again (used when enqueueing it failed)"""
+        if identity is None:
+            return
+        try:
+            self.client.delete(seen_key(identity))
+        except redis.RedisError as e:
+            logger.warning(f"Could not clear webhook identity {identity}: {str(e)}")
+
+
+class EnqueueBatcher:
+    """Groups items submitted from concurrent requests into one broker message.
+
+    The first item of a batch starts a ``window_seconds`` timer; the batch is
+    published by ``send_batch(items)`` when the timer fires or when it
+    reaches ``max_items``, whichever comes first. submit() returns a Future
+    resolved with ``(send_batch result, batch size)``, so a request only
+    acknowledges an event once it is on the broker. Under light load every batch holds a
+    single item and only the window is added to the request.
+    """
+
+    def __init__(self, send_batch, window_seconds, max_items):
+        self.send_batch = send_batch
+        self.window_seconds = window_seconds
+        self.max_items = max(1, max_items)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._timer = None
+
+    def submit(self, item):
+        future = Future()
+        batch = None
+        with self._lock:
+            self._pending.append((item, future))
+            if len(self._pending) >= self.max_items or self.window_seconds <= 0:
+                batch = self._take()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._publish(batch)
+        return future
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        if batch:
+            self._publish(batch)
+
+    def _take(self):
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _publish(self, batch):
+        try:
+            result = self.send_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for _, future in batch:
+            future.set_result((result, len(batch)))
+
+
+def _issue_updated(issue):
+    return ((issue.get('fields') or {}).get('updated')) or ''
+
+
+def comments_key(issue_id):
+    return f"webhook:comments:{issue_id}"
+
+
+def dirty_key(issue_id):
+    return f"webhook:dirty:{issue_id}"
+
+
+def scheduled_key(issue_id):
+    return f"webhook:scheduled:{issue_id}"
+
+
+class WebhookCoalescer:
+    """Collapses bursts of Jira webhook events into one sync per issue.
+
+    Every event marks the issue dirty in Redis (first/last event time). Only
+    the first event of a burst schedules a delayed sync; when that sync runs
+    it either waits out the rest of the quiet window (if newer events
+    arrived) or claims the dirty state and performs a single fetch + write.
+    A sync is never delayed more than ``max_delay`` after the first event.
+    """
+
+    def __init__(self, client=None, quiet_seconds=None, max_delay_seconds=None):
+        self.client = client if client is not None else get_redis_client()
+        self.quiet_seconds = quiet_seconds if quiet_seconds is not None else Config.WEBHOOK_QUIET_SECONDS
+        self.max_delay_seconds = (max_delay_seconds if max_delay_seconds is not None
+                                  else Config.WEBHOOK_MAX_DELAY_SECONDS)
+
+    @property
+    def _state_ttl(self):
+        # Safety net so a lost sync cannot leave an issue dirty forever
+        return int(self.max_delay_seconds + self.quiet_seconds) * 2 + 60
+
+    def mark_dirty(self, issue_id, issue=None, comment=None, now=None):
+        """Record an event for the issue.
+
+        ``issue`` is the webhook issue body (the newest one by ``updated`` is
+        kept for the sync) and ``comment`` a comment delta from
+        comment_event(). Returns True when the caller must schedule the
+        delayed sync (first event of a burst) and False when a sync is
+        already pending.
+        """
+        now = now if now is not None else time.time()
+        key = dirty_key(issue_id)
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    merged_issue = None
+                    if issue:
+                        # Merge with the body stashed by earlier events of the burst; fields
+                        # from the most recently updated body win (deliveries can arrive out
+                        # of order and comment events carry only a subset of fields). WATCH
+                        # makes the read-merge-write atomic against concurrent events and claim()
+                        pipe.watch(key)
+                        stored = pipe.hget(key, 'issue')
+                        merged_issue = issue
+                        if stored:
+                            stored = json.loads(stored)
+                            older, newer = stored, issue
+                            if _issue_updated(issue) < _issue_updated(stored):
+                                older, newer = issue, stored
+                            merged_issue = dict(older, **newer)
+                            merged_issue['fields'] = dict(older.get('fields') or {}, **(newer.get('fields') or {}))
+
+                    pipe.multi()
+                    pipe.hsetnx(key, 'first_seen', now)
+                    pipe.hset(key, 'last_seen', now)
+                    pipe.hincrby(key, 'events', 1)
+                    if merged_issue is not None:
+                        pipe.hset(key, 'issue', json.dumps(merged_issue))
+                    pipe.expire(key, self._state_ttl)
+                    if comment:
+                        pipe.rpush(comments_key(issue_id), json.dumps(comment))
+                        pipe.expire(comments_key(issue_id), self._state_ttl)
+                    pipe.set(scheduled_key(issue_id), now, nx=True, ex=self._state_ttl)
+                    return bool(pipe.execute()[-1])
+                except redis.WatchError:
+                    # Another event (or a claim) changed the state in between: merge again
+                    continue
+
+    def unschedule(self, issue_id):
+        """Undo mark_dirty's scheduling claim when the sync could not be queued"""
+        self.client.delete(scheduled_key(issue_id))
+
+    def due_in(self, issue_id, now=None):
+        """Seconds until the issue should be synced (0 = now), None if not dirty"""
+        state = self.client.hgetall(dirty_key(issue_id))
+        if not state:
+            return None
+        now = now if now is not None else time.time()
+        first_seen = float(state[b'first_seen'])
+        last_seen = float(state[b'last_seen'])
+        due_at = min(last_seen + self.quiet_seconds, first_seen + self.max_delay_seconds)
+        return max(0.0, due_at - now)
+
+    def claim(self, issue_id):
+        """Take ownership of the pending sync.
+
+        Returns a dict with the number of coalesced ``events``, the newest
+        webhook ``issue`` body (or None) and the ordered ``comment_events``.
+        Events arriving after the claim start a new burst with its own sync.
+        """
+        pipe = self.client.pipeline()
+        pipe.hgetall(dirty_key(issue_id))
+        pipe.lrange(comments_key(issue_id), 0, -1)
+        pipe.delete(dirty_key(issue_id))
+        pipe.delete(comments_key(issue_id))
+        pipe.delete(scheduled_key(issue_id))
+        state, comments = pipe.execute()[:2]
+        return {
+            'events': int(state.get(b'events', 0)),
+            'issue': json.loads(state[b'issue']) if state.get(b'issue') else None,
+            'comment_events': [json.loads(c) for c in comments],
+        }
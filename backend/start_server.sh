@@ -3,8 +3,15 @@
 # Start Redis if not running
 sudo service redis-server start
 
-# Start Celery worker in background (Updated command)
-celery -A celery_app worker --loglevel=info &
+# Start Celery workers in background, one pool per queue:
+# - query: interactive questions, almost all time spent waiting on Weaviate/Gemini I/O,
+#   so a thread pool gives high concurrency cheaply (or use "-P gevent -c 100" with gevent installed)
+# - ingest: webhooks, imports and digests, CPU/serialization heavy, so a prefork pool
+celery -A celery_app worker -Q query -P threads -c 32 -n query@%h --loglevel=info &
+celery -A celery_app worker -Q ingest -P prefork -c 4 -n ingest@%h -O fair --loglevel=info &
+
+# Periodic jobs (dead-letter replay)
+celery -A celery_app beat --loglevel=info &
 
 # Start Flask application with gunicorn
-gunicorn -c gunicorn_config.py app:app
\ No newline at end of file
+gunicorn -c gunicorn_config.py app:app
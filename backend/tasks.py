@@ -5,7 +5,14 @@ import time
 import logging
 import json
 from services.weaviate_service import WeaviateService
-import google.generativeai as genai
+from services.cache_service import CacheService, similar_tickets_cache_key
+from services.digest_service import DigestService
+from services.llm_service import LLMService
+from services.map_reduce_service import MapReduceService, select_answer_mode
+from services.dead_letter_service import DeadLetterQueue, is_transient, retry_countdown
+from services.webhook_service import WebhookCoalescer, comment_event, missing_fields, resolve_issue_details
+from services.tenants import allowed_projects, is_allowed_project, offload_idle_tenants
+from services.weaviate_schema import chunk_collection_name, cold_collection_name, multi_tenant
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +21,108 @@ def test_task():
     time.sleep(5)  # Simulate some work
     return {'status': 'Task completed successfully'}
 
+@shared_task(name='tasks.ping')
+def ping(sent_at=None):
+    """No-op task on the query queue, used to measure queue latency"""
+    started_at = time.time()
+    return {
+        'status': 'success',
+        'started_at': started_at,
+        'queue_latency': started_at - sent_at if sent_at else None
+    }
+
+def _sync_issue(issue_id, issue_payload=None, comment_events=None):
+    """Store an issue in Weaviate, fetching from Jira only what the webhook lacks"""
+    if not Config.WEBHOOK_USE_PAYLOAD:
+        issue_payload, comment_events = None, None
+    
+    weaviate_service = WeaviateService()
+    try:
+        issue_uuid = None
+        jira_calls = 0
+        issue_key = (issue_payload or {}).get('key')
+        
+        # Partial webhook bodies (comment events, bodies without the comment thread)
+        # are merged into the stored ticket as a delta: no Jira fetch, and only the
+        # changed properties are written
+        missing = missing_fields(issue_payload) if issue_payload else []
+        if missing:
+            issue_uuid = weaviate_service.apply_issue_delta(issue_payload, comment_events)
+            if issue_uuid is None:
+                # Nothing stored to merge into: complete the body with a fetch of the
+                # missing fields below
+                logger.info(f"Issue {issue_id} not stored yet; fetching missing fields {missing} from Jira")
+        
+        if issue_uuid is None:
+            # Initialize Jira service
+            jira_service = JiraService(
+                Config.JIRA_URL,
+                Config.JIRA_USERNAME,
+                Config.JIRA_API_TOKEN
+            )
+            
+            # Complete issue details: straight from the webhook body when it carries every
+            # needed field, otherwise with a REST fetch of the missing fields (or whole issue)
+            issue_details, jira_calls = resolve_issue_details(
+                jira_service, issue_id, issue_payload, comment_events
+            )
+            issue_key = issue_details.get('key')
+            
+            # Webhook bodies are not put in the raw cache: their description and comments
+            # are wiki markup, not the ADF of REST fetches (full fetches are cached by
+            # JiraService). ingest.py reindex keeps tickets stored newer than the cache.
+            
+            # Insert issue with embedded comments
+            issue_uuid = weaviate_service.insert_issue(issue_details)
+        
+        # Drop the cached "similar tickets" list computed from the old version
+        if issue_key:
+            CacheService().delete(similar_tickets_cache_key(issue_key))
+            
+            # Refresh the ticket digest in the background (no-op if content is unchanged)
+            if Config.DIGESTS_ENABLED:
+                generate_ticket_digest.apply_async(
+                    args=[issue_key],
+                    priority=Config.DIGEST_TASK_PRIORITY
+                )
+        
+        logger.info(f"Successfully stored issue {issue_id} in Weaviate ({weaviate_service.write_stats})")
+        return {
+            'status': 'success',
+            'message': f'Issue {issue_id} processed and stored',
+            'issue_uuid': issue_uuid,
+            'jira_calls': jira_calls,
+            'write_stats': weaviate_service.write_stats
+        }
+        
+    finally:
+        weaviate_service.close()
+
+def _webhook_ref(issue_id, payload_key=None):
+    return {'issue_id': str(issue_id), 'payload_key': payload_key}
+
+def _dead_letter(refs, exc, attempts, task_name):
+    dead_letters = DeadLetterQueue()
+    for ref in refs:
+        # Replayed references carry the attempts of earlier rounds
+        dead_letters.push(ref, exc, ref.get('attempts', 0) + attempts, task_name)
+
+def _recover_failed(refs, exc, task_name):
+    """Hand events that failed outside process_webhook_batch to its retry path.
+
+    Transient failures get their first backoff retry there; anything else
+    goes straight to the dead-letter stream.
+    """
+    try:
+        if is_transient(exc) and Config.INGEST_MAX_RETRIES > 0:
+            process_webhook_batch.apply_async(args=[refs, 1], countdown=retry_countdown(0))
+            return 'retrying'
+        _dead_letter(refs, exc, 1, task_name)
+        return 'dead_lettered'
+    except Exception as e:
+        logger.error(f"Could not recover failed issue(s) {[ref['issue_id'] for ref in refs]}: {str(e)}")
+        return 'lost'
+
 @shared_task(name='tasks.process_jira_webhook')
 def process_jira_webhook(data):
     try:
@@ -22,52 +131,369 @@ def process_jira_webhook(data):
         project_name = data['issue'].get('fields', {}).get('project', {}).get('name', '')
         project_key = data['issue'].get('fields', {}).get('project', {}).get('key', '')
         
-        # Filter: Only process tickets from "CO" project (Critical Ops board)
-        target_project_key = Config.JIRA_PROJECT_KEY
-        if project_key != target_project_key:
-            logger.info(f"Skipping issue {issue_id} from project '{project_key}' (not '{target_project_key}')")
+        # Filter: Only process tickets from the configured projects (JIRA_PROJECT_KEYS)
+        if not is_allowed_project(project_key):
+            logger.info(f"Skipping issue {issue_id} from project '{project_key}' (not in {allowed_projects()})")
             return {
                 'status': 'skipped',
-                'message': f"Issue from project '{project_key}' skipped (only processing '{target_project_key}')"
+                'message': f"Issue from project '{project_key}' skipped (only processing {', '.join(allowed_projects())})"
             }
         
         logger.info(f"Processing issue {issue_id} from '{project_name}' board (project key: {project_key})")
         
-        # Initialize Jira service
-        jira_service = JiraService(
-            Config.JIRA_URL,
-            Config.JIRA_USERNAME,
-            Config.JIRA_API_TOKEN
+        event = comment_event(data)
+        return _sync_issue(issue_id, data['issue'], [event] if event else None)
+            
+    except Exception as e:
+        logger.error(f"Error processing webhook: {str(e)}")
+        result = {
+            'status': 'error',
+            'message': str(e)
+        }
+        issue_id = (data.get('issue') or {}).get('id')
+        if issue_id:
+            # The retry re-syncs the issue from Jira rather than replaying this body
+            result['recovery'] = _recover_failed([_webhook_ref(issue_id)], e, 'tasks.process_jira_webhook')
+        return result
+
+def _process_webhook_ref(ref):
+    """Sync the issue behind a reference queued by the webhook endpoint"""
+    cache = CacheService()
+    data = cache.get_json(ref['payload_key']) if ref.get('payload_key') else None
+    if data is None:
+        # No parked body (disabled or expired): fetch the whole issue from Jira
+        return _sync_issue(ref['issue_id'])
+    
+    event = comment_event(data)
+    result = _sync_issue(ref['issue_id'], data['issue'], [event] if event else None)
+    cache.delete(ref['payload_key'])
+    return result
+
+@shared_task(name='tasks.process_webhook_batch', bind=True, max_retries=None)
+def process_webhook_batch(self, refs, prior_attempts=0):
+    """Process webhook references batched into one message by the endpoint.
+
+    Events failing with a transient error (Jira 5xx/429, Weaviate or Redis
+    unavailable) are retried as a smaller batch with exponential backoff;
+    the retry is a delayed broker message, so no worker slot waits it out.
+    After INGEST_MAX_RETRIES attempts, and immediately for other errors,
+    they are written to the dead-letter stream for replay_dead_letters.
+    """
+    results = []
+    failed = []
+    for ref in refs:
+        try:
+            results.append(_process_webhook_ref(ref))
+        except Exception as e:
+            logger.error(f"Error processing webhook for issue {ref.get('issue_id')}: {str(e)}")
+            results.append({'status': 'error', 'issue_id': ref.get('issue_id'), 'message': str(e)})
+            failed.append((ref, e))
+    
+    if failed:
+        attempts = prior_attempts + self.request.retries + 1
+        retryable = [ref for ref, e in failed if is_transient(e)]
+        for ref, e in failed:
+            if not is_transient(e):
+                _dead_letter([ref], e, attempts, self.name)
+        if retryable and attempts <= Config.INGEST_MAX_RETRIES:
+            countdown = retry_countdown(attempts - 1)
+            logger.warning(f"Retrying {len(retryable)} webhook event(s) in {countdown:.0f}s (attempt {attempts})")
+            raise self.retry(args=[retryable, prior_attempts], countdown=countdown, exc=failed[-1][1])
+        if retryable:
+            last_error = next(e for ref, e in reversed(failed) if is_transient(e))
+            _dead_letter(retryable, last_error, attempts, self.name)
+    
+    return {
+        'status': 'error' if failed else 'success',
+        'message': f'{len(refs) - len(failed)} of {len(refs)} webhook event(s) processed',
+        'results': results
+    }
+
+@shared_task(name='tasks.sync_dirty_issue')
+def sync_dirty_issue(issue_id):
+    """Delayed, coalesced sync scheduled by the webhook endpoint.
+
+    If more events arrived since this sync was scheduled, it re-schedules
+    itself for the end of the quiet window (bounded by the max delay);
+    otherwise it claims the burst and syncs the issue once.
+    """
+    try:
+        coalescer = WebhookCoalescer()
+        due_in = coalescer.due_in(issue_id)
+        if due_in is None:
+            return {'status': 'skipped', 'message': f'Issue {issue_id} has no pending events'}
+        if due_in > 0:
+            sync_dirty_issue.apply_async(args=[issue_id], countdown=due_in)
+            return {'status': 'rescheduled', 'message': f'Issue {issue_id} still receiving events', 'countdown': due_in}
+        
+        burst = coalescer.claim(issue_id)
+        logger.info(f"Syncing issue {issue_id} after {burst['events']} coalesced webhook event(s)")
+        result = _sync_issue(issue_id, burst['issue'], burst['comment_events'])
+        result['coalesced_events'] = burst['events']
+        return result
+    
+    except Exception as e:
+        logger.error(f"Error syncing issue {issue_id}: {str(e)}")
+        return {
+            'status': 'error',
+            'message': str(e),
+            # The burst has been claimed, so the retry does a full sync from Jira
+            'recovery': _recover_failed([_webhook_ref(issue_id)], e, 'tasks.sync_dirty_issue')
+        }
+
+@shared_task(name='tasks.sync_dirty_issues')
+def sync_dirty_issues(issue_ids):
+    """Batched form of sync_dirty_issue, scheduled by the webhook endpoint"""
+    results = [sync_dirty_issue(issue_id) for issue_id in issue_ids]
+    failed = sum(1 for result in results if result.get('status') == 'error')
+    return {
+        'status': 'error' if failed else 'success',
+        'message': f'{len(issue_ids) - failed} of {len(issue_ids)} issue sync(s) handled',
+        'results': results
+    }
+
+@shared_task(name='tasks.replay_dead_letters')
+def replay_dead_letters(batch_size=None, max_batches=None):
+    """Periodic drain of the ingestion dead-letter stream (see celery_app beat_schedule)"""
+    try:
+        replayed = DeadLetterQueue().replay(
+            lambda refs: process_webhook_batch.apply_async(args=[refs]),
+            batch_size=batch_size,
+            max_batches=max_batches or Config.DLQ_REPLAY_MAX_BATCHES,
+            min_age_seconds=Config.DLQ_REPLAY_MIN_AGE_SECONDS
         )
+        return {'status': 'success', 'message': f'{replayed} dead-lettered event(s) re-queued'}
+    except Exception as e:
+        logger.error(f"Error replaying dead letters: {str(e)}")
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
+
+@shared_task(name='tasks.offload_idle_tenants')
+def offload_idle_tenants_task(idle_seconds=None):
+    """Periodic move of idle project tenants to a cold state (see celery_app beat_schedule)"""
+    weaviate_service = WeaviateService()
+    try:
+        Issue = weaviate_service.client.collections.get(weaviate_service.collection_name)
+        if not multi_tenant(Issue):
+            return {'status': 'skipped', 'message': f'{Issue.name} is not multi-tenant'}
+        collections = [Issue]
+        for name in (chunk_collection_name(Issue.name), cold_collection_name(Issue.name)):
+            if weaviate_service.client.collections.exists(name):
+                collections.append(weaviate_service.client.collections.get(name))
+        offloaded = offload_idle_tenants(collections, idle_seconds=idle_seconds)
+        return {
+            'status': 'success',
+            'message': f'{len(offloaded)} idle tenant(s) set to {Config.TENANT_COLD_STATE}',
+            'tenants': offloaded
+        }
+    except Exception as e:
+        logger.error(f"Error offloading idle tenants: {str(e)}")
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
+    finally:
+        weaviate_service.close()
+
+@shared_task(name='tasks.move_to_cold_tier')
+def move_to_cold_tier(months=None):
+    """Periodic move of tickets resolved more than COLD_TIER_MONTHS ago to the cold tier"""
+    weaviate_service = WeaviateService()
+    try:
+        cutoff = WeaviateService.cold_tier_cutoff(months)
+        moved = weaviate_service.move_to_cold_tier(cutoff)
+        return {
+            'status': 'success',
+            'message': f'{sum(moved.values())} ticket(s) resolved before {cutoff:%Y-%m-%d} moved to the cold tier',
+            'moved': moved
+        }
+    except Exception as e:
+        logger.error(f"Error moving tickets to the cold tier: {str(e)}")
+        return {
+            'status': 'error',
+            'message': str(e)
+        }
+    finally:
+        weaviate_service.close()
+
+
+@shared_task(name='tasks.generate_ticket_digest')
+def generate_ticket_digest(issue_key):
+    """Generate the problem / root cause / resolution digest for a stored ticket.
+
+    Skipped when the stored digest was already built from the current
+    content hash, so re-ingesting an unchanged ticket costs no LLM call.
+    """
+    weaviate_service = WeaviateService()
+    try:
+        ticket = weaviate_service.get_ticket(issue_key)
+        if ticket is None:
+            return {'status': 'skipped', 'message': f'Issue {issue_key} not found in Weaviate'}
         
-        # Fetch complete issue details
-        issue_details = jira_service.get_issue_details(issue_id)
+        properties = ticket['properties']
+        if DigestService.has_fresh_digest(properties):
+            return {'status': 'skipped', 'message': f'Digest for {issue_key} is up to date'}
         
-        # Initialize Weaviate service and store data
-        weaviate_service = WeaviateService()
-        try:
-            # Insert issue with embedded comments
-            issue_uuid = weaviate_service.insert_issue(issue_details)
-            
-            logger.info(f"Successfully stored issue {issue_id} in Weaviate")
-            return {
-                'status': 'success',
-                'message': f'Issue {issue_id} processed and stored',
-                'issue_uuid': issue_uuid
-            }
-            
-        finally:
-            weaviate_service.close()
-            
+        content_hash = DigestService.current_hash(properties)
+        digest = DigestService().generate(properties)
+        if not digest:
+            return {'status': 'error', 'message': f'Empty digest generated for {issue_key}'}
+        
+        weaviate_service.update_digest(ticket['uuid'], digest, content_hash, project=properties.get('project'),
+                                       cold=ticket.get('tier') == 'cold')
+        logger.info(f"Stored digest for {issue_key}")
+        return {'status': 'success', 'message': f'Digest stored for {issue_key}'}
+    
     except Exception as e:
-        logger.error(f"Error processing webhook: {str(e)}")
+        logger.error(f"Error generating digest for {issue_key}: {str(e)}")
         return {
             'status': 'error',
             'message': str(e)
         }
+    finally:
+        weaviate_service.close()
+
+def format_ticket(ticket):
+    """Whole-ticket prompt entry: description and the full comment thread
+    (or the digest when it is up to date)"""
+    # Tickets with an up-to-date digest are sent as the digest instead
+    # of the raw description + full comment thread
+    if Config.QUERY_USE_DIGESTS and DigestService.has_fresh_digest(ticket):
+        return {
+            'ticket_key': ticket.get('key', 'N/A'),
+            'summary': ticket.get('summary', 'No summary'),
+            'status': ticket.get('status', 'N/A'),
+            'priority': ticket.get('priority', 'N/A'),
+            'labels': ticket.get('labels', []),
+            'assignee': ticket.get('assignee', 'Unassigned'),
+            'created_date': ticket.get('created', 'N/A'),
+            'resolution_date': ticket.get('resolutionDate', 'N/A'),
+            'digest': ticket.get('digest')
+        }
+
+    # Extract all comments chronologically to understand resolution steps
+    comments_text = ""
+    if ticket.get('comments'):
+        comments_text = "\n\nComments (in chronological order, showing resolution steps):\n"
+        for idx, comment in enumerate(ticket.get('comments', []), 1):
+            author = comment.get('author', 'Unknown')
+            body = comment.get('body', '')
+            created = comment.get('created', '')
+            comments_text += f"\n[{idx}] {author} ({created}):\n{body}\n"
+
+    return {
+        'ticket_key': ticket.get('key', 'N/A'),
+        'summary': ticket.get('summary', 'No summary'),
+        'description': ticket.get('description', 'No description'),
+        'status': ticket.get('status', 'N/A'),
+        'priority': ticket.get('priority', 'N/A'),
+        'labels': ticket.get('labels', []),
+        'assignee': ticket.get('assignee', 'Unassigned'),
+        'reporter': ticket.get('reporter', 'Unknown'),
+        'created_date': ticket.get('created', 'N/A'),
+        'resolution_date': ticket.get('resolutionDate', 'N/A'),
+        'all_comments': comments_text if comments_text else "No comments available",
+        'full_context': f"""
+Ticket: {ticket.get('key', 'N/A')}
+Summary: {ticket.get('summary', 'No summary')}
+Description: {ticket.get('description', 'No description')}
+Status: {ticket.get('status', 'N/A')}
+Priority: {ticket.get('priority', 'N/A')}
+{comments_text}
+"""
+    }
+
+
+def format_ticket_excerpts(ticket, chunks):
+    """Chunk-retrieval prompt entry: ticket header plus only the matching
+    description/comment chunks (in thread order), and the digest when fresh"""
+    def thread_order(chunk):
+        return (chunk.get('kind') != 'description', str(chunk.get('created') or ''), chunk.get('position') or 0)
+
+    excerpts = []
+    for chunk in sorted(chunks, key=thread_order):
+        if chunk.get('kind') == 'description':
+            source = "Description"
+        else:
+            source = f"Comment by {chunk.get('author') or 'Unknown'} ({chunk.get('created') or ''})"
+        excerpts.append(f"{source}:\n{chunk.get('text', '')}")
+
+    formatted = {
+        'ticket_key': ticket.get('key', 'N/A'),
+        'summary': ticket.get('summary', 'No summary'),
+        'status': ticket.get('status', 'N/A'),
+        'priority': ticket.get('priority', 'N/A'),
+        'labels': ticket.get('labels', []),
+        'assignee': ticket.get('assignee', 'Unassigned'),
+        'created_date': ticket.get('created', 'N/A'),
+        'resolution_date': ticket.get('resolutionDate', 'N/A'),
+    }
+    if Config.QUERY_USE_DIGESTS and DigestService.has_fresh_digest(ticket):
+        formatted['digest'] = ticket.get('digest')
+    formatted['matching_excerpts'] = excerpts
+    return formatted
+
+
+def retrieve_query_context(weaviate_service, query, project=None, retrieval=None):
+    """Search for a query and format the prompt entries.
+
+    ``retrieval`` is 'chunks' (search description/comment chunks, grouped by
+    ticket) or 'tickets' (whole tickets); defaults to Config.QUERY_RETRIEVAL
+    and falls back to 'tickets' when the collection has no chunks. Cold tier
+    tickets (no chunks) are added whole when the hot tier matches weakly.
+    Returns ``(tickets, ticket_keys, formatted_tickets, retrieval)``.
+    """
+    retrieval = retrieval or Config.QUERY_RETRIEVAL
+    if retrieval == 'chunks' and not weaviate_service.has_chunks():
+        logger.info(f"{weaviate_service.collection_name} has no chunk collection, retrieving whole tickets")
+        retrieval = 'tickets'
+
+    # Hybrid search searches ALL tickets semantically, returns top matches
+    # This searches every single ticket in the database, not just the limit
+    if retrieval == 'chunks':
+        results = weaviate_service.search_chunks(
+            query,
+            tickets=30,  # Chunks are grouped into at most 30 tickets
+            project=project,
+            alpha=0.75
+        )
+        hot_keys = {result['key'] for result in results}
+        results += [result for result in weaviate_service.search_cold_if_weak(
+            query,
+            filters={'project': project} if project else None,
+            alpha=0.75
+        ) if result['key'] not in hot_keys]
+    else:
+        # (same search as the retrieval-only /api/search endpoint)
+        results = weaviate_service.search_tiered(
+            query,
+            limit=30,  # Return top 30 most relevant tickets (but searches ALL tickets in database)
+            filters={'project': project} if project else None,
+            alpha=0.75  # Weight towards semantic/vector search (0.75) vs keyword (0.25)
+        )
+
+    tickets = []
+    ticket_keys = []
+    formatted_tickets = []
+    for result in results:
+        ticket_data = result['properties']
+        tickets.append(ticket_data)
+        ticket_keys.append(ticket_data.get('key', 'Unknown'))
+        if retrieval == 'chunks' and 'chunks' in result:
+            formatted_tickets.append(format_ticket_excerpts(ticket_data, result['chunks']))
+        else:
+            # Format tickets with COMPLETE context for deep analysis (also
+            # cold tier tickets, which have no chunks)
+            formatted_tickets.append(format_ticket(ticket_data))
+    return tickets, ticket_keys, formatted_tickets, retrieval
+
 
 @shared_task(name='tasks.process_user_query')
-def process_user_query(query):
+def process_user_query(query, answer_mode=None, project=None):
+    # Reported with the result so callers can split queue wait from execution time
+    started_at = time.time()
     try:
         weaviate_service = WeaviateService()
         
@@ -112,11 +538,9 @@ def process_user_query(query):
         Be thorough, strategic, and provide actionable insights that demonstrate deep understanding."""
 
         try:
-            collection = weaviate_service.client.collections.get("JiraIssue")
-
-            # Filter queries to only search within "CO" project tickets (Critical Ops board)
-            target_project_key = Config.JIRA_PROJECT_KEY
-            from weaviate.classes.query import Filter
+            # Search one project (its own tenant on multi-tenant versions), or every
+            # configured project (JIRA_PROJECT_KEYS) when none is given
+            target_projects = project or allowed_projects()
             
             # IMPORTANT: Weaviate hybrid search searches through ALL tickets in the database
             # It performs semantic search across every ticket, then returns the top N most relevant ones
@@ -124,65 +548,36 @@ def process_user_query(query):
             # So this WILL search all 1400+ tickets if they're stored in Weaviate
             
             # Get total count of tickets in database for logging
-            total_tickets_result = collection.query.fetch_objects(
-                limit=10000,  # Large limit to count all tickets
-                filters=Filter.by_property("project").equal(target_project_key)
-            )
-            total_tickets_in_db = len(total_tickets_result.objects)
+            total_tickets_in_db = weaviate_service.count_tickets(target_projects)
             logger.info(f"Searching through {total_tickets_in_db} tickets in Weaviate database")
             
-            # Hybrid search searches ALL tickets semantically, returns top matches
-            # This searches every single ticket in the database, not just the limit
-            response = collection.query.hybrid(
-                query=query, 
-                limit=30,  # Return top 30 most relevant tickets (but searches ALL tickets in database)
-                filters=Filter.by_property("project").equal(target_project_key),
-                alpha=0.75  # Weight towards semantic/vector search (0.75) vs keyword (0.25)
+            tickets, ticket_keys, formatted_tickets, retrieval = retrieve_query_context(
+                weaviate_service, query, project=target_projects
             )
 
-            tickets = []
-            ticket_keys = []
-            
-            for o in response.objects:
-                ticket_data = o.properties
-                tickets.append(ticket_data)
-                ticket_keys.append(ticket_data.get('key', 'Unknown'))
+            # Broad questions with a large packed context are answered map-reduce style
+            # (parallel per-ticket fact extraction, then one report-writing call)
+            packed_chars = len(json.dumps(formatted_tickets, default=str))
+            mode = select_answer_mode(packed_chars, answer_mode)
+            logger.info(f"Answer mode: {mode} ({retrieval} retrieval, packed context {packed_chars} chars)")
+            generation_started = time.time()
             
-            # Format tickets with COMPLETE context for deep analysis
-            formatted_tickets = []
-            for ticket in tickets:
-                # Extract all comments chronologically to understand resolution steps
-                comments_text = ""
-                if ticket.get('comments'):
-                    comments_text = "\n\nComments (in chronological order, showing resolution steps):\n"
-                    for idx, comment in enumerate(ticket.get('comments', []), 1):
-                        author = comment.get('author', 'Unknown')
-                        body = comment.get('body', '')
-                        created = comment.get('created', '')
-                        comments_text += f"\n[{idx}] {author} ({created}):\n{body}\n"
-                
-                formatted_ticket = {
-                    'ticket_key': ticket.get('key', 'N/A'),
-                    'summary': ticket.get('summary', 'No summary'),
-                    'description': ticket.get('description', 'No description'),
-                    'status': ticket.get('status', 'N/A'),
-                    'priority': ticket.get('priority', 'N/A'),
-                    'labels': ticket.get('labels', []),
-                    'assignee': ticket.get('assignee', 'Unassigned'),
-                    'reporter': ticket.get('reporter', 'Unknown'),
-                    'created_date': ticket.get('created', 'N/A'),
-                    'resolution_date': ticket.get('resolutionDate', 'N/A'),
-                    'all_comments': comments_text if comments_text else "No comments available",
-                    'full_context': f"""
-Ticket: {ticket.get('key', 'N/A')}
-Summary: {ticket.get('summary', 'No summary')}
-Description: {ticket.get('description', 'No description')}
-Status: {ticket.get('status', 'N/A')}
-Priority: {ticket.get('priority', 'N/A')}
-{comments_text}
-"""
+            if mode == 'map_reduce':
+                summary_text = MapReduceService(cache=CacheService()).answer(
+                    query, tickets, formatted_tickets, system_prompt
+                ) or "No summary provided"
+                return {
+                    'status': 'success',
+                    'summary': summary_text,
+                    'tickets_found': len(tickets),
+                    'ticket_keys': ticket_keys,
+                    'answer_mode': mode,
+                    'retrieval': retrieval,
+                    'context_chars': packed_chars,
+                    'generation_seconds': time.time() - generation_started,
+                    'started_at': started_at,
+                    'timestamp': time.time()
                 }
-                formatted_tickets.append(formatted_ticket)
 
             # Build comprehensive context for the AI
             context = f"""USER QUERY: "{query}"
@@ -195,7 +590,7 @@ SEARCH RESULTS:
 - Ticket keys analyzed: {', '.join(ticket_keys[:10])}{'...' if len(ticket_keys) > 10 else ''}
 
 YOUR CONSULTING TASK:
-1. Conduct deep analysis of each ticket's COMPLETE context (description + all comments + status changes)
+1. Conduct deep analysis of each ticket's COMPLETE context (description + all comments + status changes; some tickets are given as a pre-computed digest of problem, root cause and resolution steps, and with chunk retrieval only the description/comment excerpts that matched the query are included under 'matching_excerpts')
 2. Identify which tickets are ACTUALLY relevant to the user's query
 3. Extract comprehensive resolution methodology from relevant tickets
 4. Provide executive-level, strategic analysis following McKinsey consulting standards
@@ -240,36 +635,22 @@ CONSULTING STANDARDS:
 
 Remember: Soak in 100% of the ticket context. Every comment may contain crucial resolution steps. Write as if presenting to a C-level executive."""
 
-            # Configure Gemini API
-            genai.configure(api_key=Config.GEMINI_API_KEY)
-            
-            # Use a more capable model for better analysis
-            model = genai.GenerativeModel('gemini-2.5-flash')
-            
-            # Create the full prompt with system instructions
-            full_prompt = f"{system_prompt}\n\n{prompt}"
-            
-            # Generate response using Gemini API with longer context for comprehensive consultant-style analysis
-            generation_config = {
-                "temperature": 0.4,  # Slightly higher for more strategic, consultant-style thinking while staying factual
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 4096,  # Increased for comprehensive McKinsey-style detailed responses
-            }
-            
-            gemini_response = model.generate_content(
-                full_prompt,
-                generation_config=generation_config
-            )
-            
-            # Extract the response text
-            summary_text = gemini_response.text if gemini_response.text else "No summary provided"
+            # Gemini, Ollama, or fakes/llm_server.py in load tests. Slightly higher temperature for
+            # consultant-style thinking while staying factual; 4096 tokens for detailed responses
+            summary_text = LLMService(Config.QUERY_LLM_PROVIDER, Config.QUERY_LLM_MODEL).generate(
+                prompt, system=system_prompt, temperature=0.4, max_output_tokens=4096, top_p=0.95, top_k=40
+            ) or "No summary provided"
             
             return {
                 'status': 'success',
                 'summary': summary_text,
                 'tickets_found': len(tickets),
                 'ticket_keys': ticket_keys,
+                'answer_mode': mode,
+                'retrieval': retrieval,
+                'context_chars': packed_chars,
+                'generation_seconds': time.time() - generation_started,
+                'started_at': started_at,
                 'timestamp': time.time()
             }
 
@@ -281,6 +662,7 @@ Remember: Soak in 100% of the ticket context. Every comment may contain crucial
             return {
                 'status': 'error',
                 'message': f"An error occurred during processing: {str(e)}",
+                'started_at': started_at,
                 'timestamp': time.time()
             }
 
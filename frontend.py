@@ -1,6 +1,8 @@
 import streamlit as st
 import requests
 import json
+import html
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Page configuration
@@ -293,19 +295,65 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
+def show_similar_tickets(api_url, user_query, limit=10):
+    """Stream ranked tickets from /api/search (no LLM) into the page"""
+    placeholder = st.empty()
+    cards = []
+    try:
+        with requests.post(
+            f"{api_url}/api/search",
+            json={"query": user_query, "limit": limit},
+            stream=True,
+            timeout=30
+        ) as response:
+            if response.status_code != 200:
+                return
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                item = json.loads(line)
+                if item.get('type') != 'ticket':
+                    continue
+                score = item.get('score')
+                score_text = f" · score {score:.2f}" if isinstance(score, (int, float)) else ""
+                # Ticket text is user content rendered as HTML: escape it
+                cards.append(
+                    f"<strong>{html.escape(str(item.get('key') or ''))}</strong> — "
+                    f"{html.escape(item.get('summary') or 'No summary')} "
+                    f"<em>[{html.escape(item.get('status') or 'N/A')}{score_text}]</em><br>"
+                    f"<span style='color: #999;'>{html.escape(item.get('snippet') or '')}</span>"
+                )
+                placeholder.markdown(f"""
+                    <div class="results-container">
+                        <div class="result-title">🎫 Similar Past Tickets</div>
+                        <div class="result-content">{'<br><br>'.join(cards)}</div>
+                    </div>
+                """, unsafe_allow_html=True)
+    except requests.exceptions.RequestException:
+        # The similar-ticket list is best effort; the analysis below still runs
+        pass
+
 # Display results
 if search_button or user_query:
     if not user_query.strip():
         st.warning("⚠️ Please enter a question to search.")
     else:
+        # Start the LLM analysis in the background, then show the raw
+        # similar-ticket list from /api/search while it is being generated
+        executor = ThreadPoolExecutor(max_workers=1)
+        analysis_future = executor.submit(
+            requests.post,
+            f"{api_url}/api/query",
+            json={"query": user_query},
+            timeout=300
+        )
+        executor.shutdown(wait=False)
+        
+        show_similar_tickets(api_url, user_query)
+        
         with st.spinner("🔍 Analyzing tickets and generating insights..."):
             try:
-                # Make API request
-                response = requests.post(
-                    f"{api_url}/api/query",
-                    json={"query": user_query},
-                    timeout=300
-                )
+                response = analysis_future.result()
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -1,63 +1,39 @@
-import weaviate
-import weaviate.classes as wvc
-import os
+import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
 env_path = Path('../backend/.env')
 load_dotenv(dotenv_path=env_path)
 
-client = weaviate.connect_to_local(
-    host="localhost",
-    port=8080,
-    grpc_port=50051
-)
+# The schema lives in backend/services/weaviate_schema.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
 
-# Try to delete existing collection if it exists
-try:
-    client.collections.delete("JiraIssue")
-except Exception:
-    pass  # Collection doesn't exist yet, that's fine
+from services.collection_versions import CollectionMigration, list_versions  # noqa: E402
+from services.weaviate_schema import CONTENT_PROPERTIES, vector_sources  # noqa: E402
+from services.weaviate_service import connect_client  # noqa: E402
+
+# Weaviate, or the local store with VECTOR_BACKEND=local
+client = connect_client()
 
+# Never drops data: on an existing install schema changes go through
+# backend/migrate_collection.py, which builds a new version next to the live one
 try:
-    client.collections.create(
-        name="JiraIssue",
-        generative_config=wvc.config.Configure.Generative.ollama(
-            api_endpoint="http://172.17.0.1:11434",
-            model="tinyllama"
-        ),
-        vectorizer_config=wvc.config.Configure.Vectorizer.text2vec_transformers(
-            inference_url="http://t2v-transformers:8080"
-        ),
-        properties=[
-            wvc.config.Property(name="issueID", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="key", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="project", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="projectName", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="summary", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="description", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="status", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="priority", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="labels", data_type=wvc.config.DataType.TEXT_ARRAY),
-            wvc.config.Property(name="assignee", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="reporter", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="created", data_type=wvc.config.DataType.DATE),
-            wvc.config.Property(name="updated", data_type=wvc.config.DataType.DATE),
-            wvc.config.Property(name="resolutionDate", data_type=wvc.config.DataType.DATE),
-            wvc.config.Property(name="customFields", data_type=wvc.config.DataType.TEXT),
-            wvc.config.Property(name="attachments", data_type=wvc.config.DataType.TEXT_ARRAY),
-            wvc.config.Property(
-                name="comments",
-                data_type=wvc.config.DataType.OBJECT_ARRAY,
-                nested_properties=[
-                    wvc.config.Property(name="commentID", data_type=wvc.config.DataType.TEXT),
-                    wvc.config.Property(name="author", data_type=wvc.config.DataType.TEXT),
-                    wvc.config.Property(name="body", data_type=wvc.config.DataType.TEXT),
-                    wvc.config.Property(name="created", data_type=wvc.config.DataType.DATE),
-                    wvc.config.Property(name="updated", data_type=wvc.config.DataType.DATE)
-                ]
-            )
-        ]
-    )
+    migration = CollectionMigration(client)
+    active = migration.active()
+    if client.collections.exists(active):
+        print(f"Collection {active} already exists; use backend/migrate_collection.py to change the schema")
+        print(f"Versions: {', '.join(name for _, name in list_versions(client))}")
+        # The unversioned JiraIssue of older setups has no skip_vectorization on metadata
+        metadata = [name for name in vector_sources(client.collections.get(active)).get('default', ())
+                    if name not in CONTENT_PROPERTIES]
+        if metadata:
+            print(f"WARNING: the vectorizer of {active} also embeds {', '.join(metadata)}, so metadata and "
+                  f"comment changes re-embed tickets. Move to {migration.next_name()} with: "
+                  f"python3 backend/migrate_collection.py migrate")
+    else:
+        name = migration.next_name()
+        migration.create(name)
+        migration.swap(name)
+        print(f"Created {name} and made it the active collection")
 finally:
-    client.close()
\ No newline at end of file
+    client.close()
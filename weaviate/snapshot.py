@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Offline snapshots of the JiraIssue collection with its vectors
+Export streams every ticket (plus the cold tier and the description/comment chunks)
+to a zip of per-property JSONL columns and contiguous float32 vector matrices.
+Import writes them in batches with the stored vectors, so nothing is re-embedded
+and no Jira call is made: dev/staging environments and benchmark corpora are
+restored from a file in minutes.
+
+Usage (from weaviate/):
+    python3 snapshot.py export jira.snapshot.zip [--collection JiraIssue_v3] [--no-chunks]
+    python3 snapshot.py import jira.snapshot.zip [--collection JiraIssue_v4] [--activate] [--force]
+    python3 snapshot.py info jira.snapshot.zip
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+env_path = Path('../backend/.env')
+load_dotenv(dotenv_path=env_path)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from services.collection_versions import CollectionMigration  # noqa: E402
+from services.snapshots import export_snapshot, import_snapshot, read_manifest  # noqa: E402
+from services.weaviate_service import connect_client  # noqa: E402
+
+
+def progress(table, rows):
+    print(f"   📦 {table}: {rows} objects")
+
+
+def show_manifest(manifest):
+    layout = manifest['layout']
+    print(f"   Source: {manifest['collection']} (exported {manifest['created']})")
+    print(f"   Vectors: {'named' if layout['named_vectors'] else 'single'}, "
+          f"{'self-provided' if layout['self_provided'] else 'Weaviate-embedded'} ({layout['embedding_model']}), "
+          f"{'multi-tenant' if layout['multi_tenant'] else 'single-tenant'}")
+    for table, spec in manifest['tables'].items():
+        vectors = ", ".join(f"{name} x{dims}" for name, dims in spec['vectors'].items()) or "none"
+        print(f"   {table:<7} {spec['rows']:>8} objects, {len(spec['properties'])} properties, vectors: {vectors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    export = commands.add_parser('export', help='Write a collection and its vectors to a snapshot file')
+    export.add_argument('path')
+    export.add_argument('--collection', help='Collection to export (default: the active one)')
+    export.add_argument('--no-cold', action='store_true', help='Leave out the cold tier')
+    export.add_argument('--no-chunks', action='store_true', help='Leave out the description/comment chunks')
+
+    load = commands.add_parser('import', help='Load a snapshot without re-embedding')
+    load.add_argument('path')
+    load.add_argument('--collection', help='Target collection (default: next JiraIssue_v{n}, created from the snapshot)')
+    load.add_argument('--activate', action='store_true', help='Make the target the active collection afterwards')
+    load.add_argument('--batch-size', type=int, default=500)
+    load.add_argument('--force', action='store_true',
+                      help='Import even if the embedding model or the target vector layout differs')
+
+    info = commands.add_parser('info', help='Show what a snapshot contains')
+    info.add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        show_manifest(read_manifest(args.path))
+        return
+
+    client = connect_client()
+    try:
+        migration = CollectionMigration(client)
+        started = time.monotonic()
+        if args.command == 'export':
+            name = args.collection or migration.active()
+            print("=" * 70)
+            print(f"📤 EXPORTING {name} → {args.path}")
+            print("=" * 70)
+            manifest = export_snapshot(client, name, args.path, include_cold=not args.no_cold,
+                                       include_chunks=not args.no_chunks, on_progress=progress)
+            show_manifest(manifest)
+            size = os.path.getsize(args.path) / 1024 / 1024
+            print(f"✅ Wrote {args.path} ({size:.1f} MB) in {time.monotonic() - started:.1f}s")
+        else:
+            manifest = read_manifest(args.path)
+            name = args.collection or migration.next_name()
+            print("=" * 70)
+            print(f"📥 IMPORTING {args.path} → {name}")
+            print("=" * 70)
+            show_manifest(manifest)
+            counts = import_snapshot(client, args.path, name, batch_size=args.batch_size, on_progress=progress,
+                                     force=args.force)
+            errors = sum(failed for _, failed in counts.values())
+            for table, (rows, failed) in counts.items():
+                print(f"   {table:<7} {rows - failed:>8} imported, {failed} failed")
+            print(f"{'✅' if not errors else '⚠️ '} Imported in {time.monotonic() - started:.1f}s")
+            if args.activate and not errors:
+                previous = migration.swap(name)
+                print(f"✅ Active collection switched from {previous} to {name}")
+            elif args.activate:
+                print(f"⚠️  {name} was not activated: {errors} objects failed to import")
+                sys.exit(1)
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()